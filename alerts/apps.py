@@ -4,4 +4,11 @@ from django.apps import AppConfig
 class AlertsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'alerts'
-    verbose_name = 'Alertas' 
\ No newline at end of file
+    verbose_name = 'Alertas' 
+
+    def ready(self):
+        """
+        Perform app initialization when Django starts.
+        """
+        # Import signals to ensure they are registered
+        import alerts.signals
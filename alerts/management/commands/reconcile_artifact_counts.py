@@ -0,0 +1,74 @@
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count, F
+from alerts.models import Alert
+from companies.models import Company
+
+
+class Command(BaseCommand):
+    help = 'Recompute Alert.artifact_count in bulk and repair counters that drifted'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--company',
+            help='Only reconcile alerts of this company ID'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=2000,
+            help='Alerts read and repaired per query (default: 2000)'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report drifted alerts without updating them'
+        )
+
+    def handle(self, *args, **options):
+        alerts = Alert.objects.order_by('id')
+        if options['company']:
+            try:
+                company = Company.objects.get(id=options['company'])
+            except (Company.DoesNotExist, ValidationError):
+                raise CommandError(f"Company with ID {options['company']} does not exist")
+            alerts = alerts.filter(company=company)
+
+        batch_size = max(options['batch_size'], 1)
+        checked = drifted = 0
+        last_id = None
+
+        while True:
+            page = alerts if last_id is None else alerts.filter(id__gt=last_id)
+            rows = list(
+                page.annotate(linked=Count('observables'))
+                .values('id', 'observable_data', 'artifact_count', 'linked')[:batch_size]
+            )
+            if not rows:
+                break
+            last_id = rows[-1]['id']
+            checked += len(rows)
+
+            # Apply the difference with F() so links added meanwhile are not lost
+            repairs = []
+            for row in rows:
+                delta = row['linked'] + Alert.count_observable_data(row['observable_data']) - row['artifact_count']
+                if delta:
+                    repairs.append(Alert(id=row['id'], artifact_count=F('artifact_count') + delta))
+                    if options['verbosity'] > 1:
+                        self.stdout.write(f"Alert {row['id']}: artifact_count off by {delta}")
+            drifted += len(repairs)
+
+            if repairs and not options['dry_run']:
+                with transaction.atomic():
+                    Alert.objects.bulk_update(repairs, ['artifact_count'])
+
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(
+                f"DRY RUN: {drifted} of {checked} alerts have a drifted artifact_count"
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f"Checked {checked} alerts, repaired {drifted} artifact counts"
+            ))
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-16 20:20
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alerts', '0003_initial'),
+        ('companies', '0001_initial'),
+        ('mitre', '0001_initial'),
+        ('observables', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='alert',
+            name='unique_alert_per_source_ref_and_company',
+        ),
+        migrations.AddConstraint(
+            model_name='alert',
+            constraint=models.UniqueConstraint(condition=models.Q(('source_ref', ''), _negated=True), fields=('source_ref', 'external_source', 'company'), name='unique_alert_per_source_ref_and_company'),
+        ),
+    ]
@@ -4,7 +4,7 @@ from django.contrib.postgres.fields import ArrayField
 from django.contrib.auth import get_user_model
 from companies.models import Company
 from django.utils import timezone
-from django.db.models import Count
+from django.db.models import Count, F
 from observables.models import Observable
 from model_utils import FieldTracker
 import logging
@@ -57,7 +57,7 @@ class Alert(CoreModel):
     )
     
     # Field tracker
-    tracker = FieldTracker(fields=['status'])
+    tracker = FieldTracker(fields=['status', 'observable_data'])
     
     date = models.DateTimeField(
         'Alert Date',
@@ -153,8 +153,10 @@ class Alert(CoreModel):
             models.Index(fields=['external_source']),
         ]
         constraints = [
+            # Enforces ingest deduplication; alerts without a source_ref never collide
             models.UniqueConstraint(
                 fields=['source_ref', 'external_source', 'company'],
+                condition=~models.Q(source_ref=''),
                 name='unique_alert_per_source_ref_and_company'
             )
         ]
@@ -175,29 +177,54 @@ class Alert(CoreModel):
         """
         return self.status == AlertStatusEnum.ESCALATED.value
     
-    def update_artifact_count(self):
+    @staticmethod
+    def count_observable_data(observable_data):
         """
-        Updates the artifact_count based on observable count and observable_data.
+        Counts the observables listed in an observable_data value.
         """
-        # Count direct observables
-        observable_count = self.observables.count()
-        
-        # Count observables in observable_data
-        json_observable_count = 0
-        if self.observable_data and isinstance(self.observable_data, dict):
-            json_observable_count = sum(len(items) if isinstance(items, list) else 1 
-                                     for items in self.observable_data.values())
-        elif self.observable_data and isinstance(self.observable_data, list):
-            json_observable_count = len(self.observable_data)
-        
-        self.artifact_count = observable_count + json_observable_count
-        
+        if observable_data and isinstance(observable_data, dict):
+            return sum(len(items) if isinstance(items, list) else 1
+                       for items in observable_data.values())
+        elif observable_data and isinstance(observable_data, list):
+            return len(observable_data)
+        return 0
+    
     def save(self, *args, **kwargs):
         """
-        Override save method to update artifact_count before saving.
+        Override save method to keep artifact_count out of regular updates.
+        
+        New alerts start with the observable_data count (they cannot have linked
+        observables yet). Afterwards the counter is only changed with F()
+        updates, by the m2m_changed handlers and here when observable_data
+        changes, so saving a stale instance never overwrites it.
         """
-        self.update_artifact_count()
+        adding = self._state.adding
+        if adding:
+            self.artifact_count = self.count_observable_data(self.observable_data)
+            super().save(*args, **kwargs)
+            return
+        
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'artifact_count'
+            ]
+        
+        data_delta = 0
+        if self.tracker.has_changed('observable_data') and (
+            update_fields is None or 'observable_data' in update_fields
+        ):
+            data_delta = (
+                self.count_observable_data(self.observable_data)
+                - self.count_observable_data(self.tracker.previous('observable_data'))
+            )
+        
         super().save(*args, **kwargs)
+        
+        if data_delta:
+            Alert.objects.filter(pk=self.pk).update(artifact_count=F('artifact_count') + data_delta)
+            self.artifact_count += data_delta
     
     def add_observable(self, observable, is_ioc=False):
         """
@@ -207,18 +234,14 @@ class Alert(CoreModel):
             observable (Observable): Observable instance to add
             is_ioc (bool): Whether this observable is an Indicator of Compromise
         """
-        if is_ioc and observable.id not in self.observables.values_list('id', flat=True):
-            # If it's an IOC, add its tags to ioc_tags
-            if observable.tags:
-                self.ioc_tags = list(set(self.ioc_tags + observable.tags))
+        if is_ioc and observable.tags and not self.observables.filter(id=observable.id).exists():
+            # If it's a new IOC, add its tags to ioc_tags
+            self.ioc_tags = list(set(self.ioc_tags + observable.tags))
+            self.save(update_fields=['ioc_tags'])
                 
-        # Add the observable to the M2M relationship
+        # The m2m_changed handler updates artifact_count
         self.observables.add(observable)
         
-        # Update the artifact count
-        self.update_artifact_count()
-        self.save(update_fields=['artifact_count', 'ioc_tags'])
-        
         return True
     
     def remove_observable(self, observable):
@@ -228,13 +251,9 @@ class Alert(CoreModel):
         Args:
             observable (Observable): Observable instance to remove
         """
-        if observable.id in self.observables.values_list('id', flat=True):
+        if self.observables.filter(id=observable.id).exists():
+            # The m2m_changed handler updates artifact_count
             self.observables.remove(observable)
-            
-            # Update the artifact count
-            self.update_artifact_count()
-            self.save(update_fields=['artifact_count'])
-            
             return True
         return False
     
@@ -0,0 +1,3 @@
+from alerts.services.ingest import AlertBatchIngestor
+
+__all__ = ['AlertBatchIngestor']
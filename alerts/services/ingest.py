@@ -0,0 +1,264 @@
+import logging
+from django.db import transaction
+from django.db.models.signals import post_save
+from alerts.models import Alert
+from observables.models import Observable
+from observables.services.bulk_import import MISP_TYPE_MAP, VALID_TYPES
+
+logger = logging.getLogger('api.alerts')
+
+REQUIRED_FIELDS = ['title', 'description', 'source', 'source_ref']
+
+# Bare "hash" keys in observable_data are typed by digest length
+HASH_TYPES_BY_LENGTH = {32: 'hash-md5', 40: 'hash-sha1', 64: 'hash-sha256', 128: 'hash-sha512'}
+
+
+def observable_type_for_key(key, value):
+    """
+    Map an observable_data key to an Observable type.
+
+    Args:
+        key (str): Key used in the alert's observable_data (``ip``, ``ip-src``, ``sha256``...)
+        value (str): Observable value, used to type bare hashes
+
+    Returns:
+        str or None: Observable type, or None when the key has no equivalent
+    """
+    key = str(key).lower()
+    if key in VALID_TYPES:
+        return key
+    if key in MISP_TYPE_MAP:
+        return MISP_TYPE_MAP[key]
+    if key in ('hash', 'file_hash'):
+        return HASH_TYPES_BY_LENGTH.get(len(value))
+    return None
+
+
+def iter_observable_data(observable_data):
+    """
+    Yield (type, value) pairs from an alert's observable_data.
+
+    Accepts the ``{"ip": ["1.2.3.4"], "domain": "x.com"}`` mapping used by
+    ingestion as well as a list of ``{"type": ..., "value": ...}`` dicts.
+    Keys without an Observable type are skipped; they still count as
+    artifacts through observable_data.
+    """
+    if isinstance(observable_data, dict):
+        pairs = (
+            (key, value)
+            for key, values in observable_data.items()
+            for value in (values if isinstance(values, list) else [values])
+        )
+    elif isinstance(observable_data, list):
+        pairs = (
+            (item.get('type'), item.get('value'))
+            for item in observable_data if isinstance(item, dict)
+        )
+    else:
+        return
+
+    for key, value in pairs:
+        if key is None or value is None or isinstance(value, (dict, list)):
+            continue
+        value = str(value).strip()
+        obs_type = observable_type_for_key(key, value) if value else None
+        if obs_type:
+            yield obs_type, value
+
+
+class AlertBatchIngestor:
+    """
+    Ingest a batch of alerts with a constant number of queries.
+
+    Duplicates are resolved for the whole batch with one
+    ``(source_ref, external_source)`` lookup, new alerts and their observables
+    are written with bulk inserts, and the
+    ``unique_alert_per_source_ref_and_company`` constraint settles races with
+    concurrent ingest workers: rows another worker inserted first are reported
+    as duplicates instead of failing the batch.
+    """
+
+    def __init__(self, company, user, serializer_class=None, serializer_context=None):
+        """
+        Args:
+            company (Company): Company the alerts belong to
+            user (User): User recorded as created_by on alerts and observables
+            serializer_class: Serializer validating each item (default: AlertCreateSerializer)
+            serializer_context (dict, optional): Context passed to the serializer
+        """
+        if serializer_class is None:
+            from api.v1.alerts.serializers import AlertCreateSerializer
+            serializer_class = AlertCreateSerializer
+        self.company = company
+        self.user = user
+        self.serializer_class = serializer_class
+        self.serializer_context = serializer_context or {}
+
+    def _validate(self, item):
+        """Validate one item; returns (alert kwargs, None) or (None, errors)."""
+        if not isinstance(item, dict):
+            return None, {'non_field_errors': ['Each item must be a JSON object.']}
+
+        missing = [field for field in REQUIRED_FIELDS if not item.get(field)]
+        if missing:
+            return None, {field: ['This field is required.'] for field in missing}
+
+        data = {key: value for key, value in item.items() if key not in ('company', 'company_id')}
+        serializer = self.serializer_class(data=data, context=self.serializer_context)
+        if not serializer.is_valid():
+            return None, serializer.errors
+
+        values = dict(serializer.validated_data)
+        values['external_source'] = str(item.get('external_source') or values['source'])[:100]
+        if 'raw_payload' in item and isinstance(item['raw_payload'], dict):
+            values['raw_payload'] = item['raw_payload']
+        return values, None
+
+    def ingest(self, items):
+        """
+        Ingest a list of alert payloads.
+
+        Args:
+            items (list): Alert dicts in the single ``ingest`` endpoint format
+
+        Returns:
+            dict: ``results`` (one entry per item, in order, with ``index``,
+            ``status`` of created/duplicate/error, ``alert_id`` and ``errors``)
+            and a ``summary`` of counts per status
+        """
+        results = [{'index': index, 'status': None, 'alert_id': None} for index in range(len(items))]
+        pending = {}  # (source_ref, external_source) -> (index, validated values)
+        in_batch_duplicates = []  # (index, key of the first occurrence)
+
+        for index, item in enumerate(items):
+            values, errors = self._validate(item)
+            if errors:
+                results[index].update(status='error', errors=errors)
+                continue
+            key = (values['source_ref'], values['external_source'])
+            if key in pending:
+                in_batch_duplicates.append((index, key))
+            else:
+                pending[key] = (index, values)
+
+        if pending:
+            with transaction.atomic():
+                existing = self._existing_alert_ids(pending)
+                to_create = {key: entry for key, entry in pending.items() if key not in existing}
+                created = self._create_alerts(to_create)
+                raced = to_create.keys() - created.keys()
+                if raced:
+                    # Inserted by a concurrent worker after our lookup
+                    existing.update(self._existing_alert_ids(raced))
+
+                for key, (index, _) in pending.items():
+                    if key in created:
+                        results[index].update(status='created', alert_id=created[key].id)
+                    else:
+                        results[index].update(status='duplicate', alert_id=existing[key])
+
+        for index, key in in_batch_duplicates:
+            first = results[pending[key][0]]
+            results[index].update(status='duplicate', alert_id=first['alert_id'])
+
+        summary = {'total': len(items), 'created': 0, 'duplicate': 0, 'error': 0}
+        for result in results:
+            summary[result['status']] += 1
+        logger.info(
+            f"Batch ingest for company {self.company.id}: {summary['created']} created, "
+            f"{summary['duplicate']} duplicates, {summary['error']} errors"
+        )
+        return {'results': results, 'summary': summary}
+
+    def _existing_alert_ids(self, keys):
+        """Resolve which (source_ref, external_source) keys already exist with one query."""
+        refs = {source_ref for source_ref, _ in keys}
+        sources = {external_source for _, external_source in keys}
+        rows = Alert.objects.filter(
+            company=self.company,
+            source_ref__in=refs,
+            external_source__in=sources
+        ).values_list('source_ref', 'external_source', 'id')
+        # The IN lists match a cross product; keep only the requested pairs
+        return {(ref, source): alert_id for ref, source, alert_id in rows if (ref, source) in keys}
+
+    def _create_alerts(self, to_create):
+        """
+        Bulk insert alerts and link their observables.
+
+        Returns:
+            dict: Alerts actually inserted by this call, by key
+        """
+        if not to_create:
+            return {}
+
+        alerts = {}
+        observable_keys = {}
+        for key, (_, values) in to_create.items():
+            alerts[key] = Alert(company=self.company, created_by=self.user, **values)
+            observable_keys[key] = list(dict.fromkeys(iter_observable_data(values.get('observable_data'))))
+
+        observable_ids = self._get_or_create_observables(
+            {pair for pairs in observable_keys.values() for pair in pairs}
+        )
+        for key, alert in alerts.items():
+            observable_keys[key] = [observable_ids[pair] for pair in observable_keys[key] if pair in observable_ids]
+            # bulk_create and the through-table insert bypass save() and m2m_changed
+            alert.artifact_count = len(observable_keys[key]) + Alert.count_observable_data(alert.observable_data)
+
+        # Rows lost to a concurrent insert are skipped by the unique constraint
+        Alert.objects.bulk_create(alerts.values(), ignore_conflicts=True)
+        inserted_ids = set(Alert.objects.filter(
+            id__in=[alert.id for alert in alerts.values()]
+        ).values_list('id', flat=True))
+        created = {key: alert for key, alert in alerts.items() if alert.id in inserted_ids}
+        if len(created) < len(alerts):
+            logger.info(f"{len(alerts) - len(created)} alerts were inserted concurrently by another worker")
+
+        Through = Alert.observables.through
+        Through.objects.bulk_create([
+            Through(alert_id=alert.id, observable_id=observable_id)
+            for key, alert in created.items()
+            for observable_id in observable_keys[key]
+        ], ignore_conflicts=True)
+
+        # Keep notifications and the audit log firing as they do for Alert.save()
+        for alert in created.values():
+            post_save.send(
+                sender=Alert, instance=alert, created=True,
+                update_fields=None, raw=False, using='default'
+            )
+        return created
+
+    def _get_or_create_observables(self, pairs):
+        """
+        Return observable ids for (type, value) pairs, creating the missing ones.
+
+        Uses one lookup, one bulk insert and, when rows were missing, one
+        re-read to pick up ids of rows another worker inserted first.
+        """
+        if not pairs:
+            return {}
+
+        def lookup():
+            values = {value for _, value in pairs}
+            rows = Observable.objects.filter(
+                company=self.company, value__in=values
+            ).values_list('type', 'value', 'id')
+            return {(obs_type, value): obs_id for obs_type, value, obs_id in rows if (obs_type, value) in pairs}
+
+        ids = lookup()
+        missing = pairs - ids.keys()
+        if missing:
+            Observable.objects.bulk_create([
+                Observable(
+                    type=obs_type,
+                    value=value,
+                    source='alert-ingest',
+                    company=self.company,
+                    created_by=self.user
+                )
+                for obs_type, value in missing
+            ], ignore_conflicts=True)
+            ids = lookup()
+        return ids
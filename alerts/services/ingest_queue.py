@@ -0,0 +1,256 @@
+import json
+import logging
+import math
+import os
+import socket
+import uuid
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from companies.models import Company
+from alerts.services.ingest import AlertBatchIngestor
+
+logger = logging.getLogger('api.alerts')
+
+CONSUMER_GROUP = 'alert-ingest-workers'
+SUMMARY_FIELDS = ('created', 'duplicate', 'error')
+
+_redis_client = None
+
+
+def _get_redis():
+    global _redis_client
+    if _redis_client is None:
+        import redis
+        _redis_client = redis.Redis.from_url(settings.ALERT_INGEST_REDIS_URL, decode_responses=True)
+    return _redis_client
+
+
+class AlertIngestQueueFull(Exception):
+    """Raised when the ingest stream is over ALERT_INGEST_QUEUE_MAX_DEPTH."""
+
+    def __init__(self, depth, retry_after):
+        super().__init__(f"Alert ingest queue is full ({depth} alerts waiting)")
+        self.depth = depth
+        self.retry_after = retry_after
+
+
+class AlertIngestQueue:
+    """
+    Durable Redis stream between the ingest endpoints and the ingest workers.
+
+    Every alert is one stream entry tagged with the tracking id of the request
+    that submitted it, so workers can drain uniform micro-batches regardless
+    of how callers batch their requests. Entries are acknowledged and deleted
+    once their results are recorded, which keeps XLEN equal to the backlog
+    used for back-pressure. Entries of a crashed worker stay pending in the
+    consumer group and are claimed again after ALERT_INGEST_CLAIM_IDLE_MS.
+    """
+
+    def __init__(self, client=None):
+        self.client = client or _get_redis()
+        self.stream = settings.ALERT_INGEST_STREAM_KEY
+
+    def _status_key(self, tracking_id):
+        return f"{self.stream}:status:{tracking_id}"
+
+    def _results_key(self, tracking_id):
+        return f"{self.stream}:results:{tracking_id}"
+
+    def depth(self):
+        """Number of alerts waiting in or being processed from the stream."""
+        return self.client.xlen(self.stream)
+
+    def retry_after(self, depth):
+        """Seconds a rejected client should wait, from the backlog and the drain rate."""
+        seconds = math.ceil(depth / max(settings.ALERT_INGEST_DRAIN_RATE, 1))
+        return min(max(seconds, 1), settings.ALERT_INGEST_MAX_RETRY_AFTER)
+
+    def enqueue(self, company_id, user_id, items):
+        """
+        Append raw alert payloads to the stream.
+
+        Args:
+            company_id: Company the alerts are ingested for
+            user_id: User recorded as created_by
+            items (list): Alert payloads, validated later by the workers
+
+        Returns:
+            str: Tracking id for get_status()
+
+        Raises:
+            AlertIngestQueueFull: The backlog would exceed ALERT_INGEST_QUEUE_MAX_DEPTH
+        """
+        depth = self.depth()
+        if depth + len(items) > settings.ALERT_INGEST_QUEUE_MAX_DEPTH:
+            raise AlertIngestQueueFull(depth, self.retry_after(depth))
+
+        tracking_id = uuid.uuid4().hex
+        ttl = settings.ALERT_INGEST_RESULT_TTL
+        pipe = self.client.pipeline(transaction=False)
+        pipe.hset(self._status_key(tracking_id), mapping={
+            'company_id': str(company_id),
+            'total': len(items),
+            'processed': 0,
+            **dict.fromkeys(SUMMARY_FIELDS, 0)
+        })
+        pipe.expire(self._status_key(tracking_id), ttl)
+        for index, item in enumerate(items):
+            pipe.xadd(self.stream, {
+                'tracking_id': tracking_id,
+                'index': index,
+                'company_id': str(company_id),
+                'user_id': str(user_id),
+                'payload': json.dumps(item, default=str)
+            })
+        pipe.execute()
+        return tracking_id
+
+    def get_status(self, tracking_id):
+        """
+        Progress and per-item results of an enqueued request.
+
+        Returns:
+            dict or None: None when the tracking id is unknown or expired
+        """
+        status_data = self.client.hgetall(self._status_key(tracking_id))
+        if not status_data:
+            return None
+        total, processed = int(status_data['total']), int(status_data['processed'])
+        results = [
+            json.loads(result)
+            for _, result in sorted(
+                self.client.hgetall(self._results_key(tracking_id)).items(),
+                key=lambda pair: int(pair[0])
+            )
+        ]
+        return {
+            'tracking_id': tracking_id,
+            'company_id': status_data['company_id'],
+            'status': 'completed' if processed >= total else ('processing' if processed else 'queued'),
+            'summary': {
+                'total': total,
+                'processed': processed,
+                **{field: int(status_data[field]) for field in SUMMARY_FIELDS}
+            },
+            'results': results
+        }
+
+    def ensure_group(self):
+        """Create the consumer group (and stream) if they do not exist yet."""
+        import redis
+        try:
+            self.client.xgroup_create(self.stream, CONSUMER_GROUP, id='0', mkstream=True)
+        except redis.ResponseError as e:
+            if 'BUSYGROUP' not in str(e):
+                raise
+
+    def read_batch(self, consumer, count, block_ms=0):
+        """
+        Read the next micro-batch for ``consumer``.
+
+        Stale entries left pending by a dead worker are claimed first.
+
+        Returns:
+            list: (entry_id, fields) pairs
+        """
+        _, entries, *_ = self.client.xautoclaim(
+            self.stream, CONSUMER_GROUP, consumer,
+            min_idle_time=settings.ALERT_INGEST_CLAIM_IDLE_MS, start_id='0-0', count=count
+        )
+        entries = [entry for entry in entries if entry[1]]
+        if entries:
+            logger.warning(f"Reclaimed {len(entries)} stale alert ingest entries")
+            return entries
+
+        response = self.client.xreadgroup(
+            CONSUMER_GROUP, consumer, {self.stream: '>'}, count=count, block=block_ms or None
+        )
+        return response[0][1] if response else []
+
+    def process(self, entries):
+        """
+        Ingest a micro-batch and record its per-item results.
+
+        Entries are grouped by company and user so each group is one
+        AlertBatchIngestor call. Entries are only acknowledged after their
+        results are stored; if ingestion fails they stay pending and are
+        retried by the next worker that claims them.
+
+        Args:
+            entries (list): (entry_id, fields) pairs from read_batch()
+
+        Returns:
+            dict: Counts of created/duplicate/error alerts in the batch
+        """
+        groups = {}
+        for entry_id, fields in entries:
+            groups.setdefault((fields['company_id'], fields['user_id']), []).append((entry_id, fields))
+
+        companies = {
+            str(pk): company
+            for pk, company in Company.objects.in_bulk({company_id for company_id, _ in groups}).items()
+        }
+        users = {
+            str(pk): user
+            for pk, user in get_user_model().objects.in_bulk({user_id for _, user_id in groups}).items()
+        }
+
+        totals = dict.fromkeys(SUMMARY_FIELDS, 0)
+        recorded = []
+        for (company_id, user_id), group in groups.items():
+            company, user = companies.get(company_id), users.get(user_id)
+            if company is None or user is None:
+                results = [{'status': 'error', 'alert_id': None,
+                            'errors': {'non_field_errors': ['Company or user no longer exists.']}}] * len(group)
+            else:
+                payloads = [_load_payload(fields['payload']) for _, fields in group]
+                results = AlertBatchIngestor(company, user).ingest(payloads)['results']
+
+            for (entry_id, fields), result in zip(group, results):
+                result = {**result, 'index': int(fields['index'])}
+                totals[result['status']] += 1
+                recorded.append((entry_id, fields['tracking_id'], result))
+
+        self._record(recorded)
+        return totals
+
+    def _record(self, recorded):
+        """Store results, bump request counters, then ack and delete the entries."""
+        ttl = settings.ALERT_INGEST_RESULT_TTL
+        pipe = self.client.pipeline()
+        for _, tracking_id, result in recorded:
+            pipe.hset(self._results_key(tracking_id), result['index'], json.dumps(result, default=str))
+            pipe.expire(self._results_key(tracking_id), ttl)
+            pipe.hincrby(self._status_key(tracking_id), 'processed', 1)
+            pipe.hincrby(self._status_key(tracking_id), result['status'], 1)
+        entry_ids = [entry_id for entry_id, _, _ in recorded]
+        if entry_ids:
+            pipe.xack(self.stream, CONSUMER_GROUP, *entry_ids)
+            pipe.xdel(self.stream, *entry_ids)
+        pipe.execute()
+
+
+def _load_payload(raw):
+    try:
+        return json.loads(raw)
+    except ValueError:
+        # Reported as an invalid item by AlertBatchIngestor
+        return None
+
+
+def schedule_drain(client=None):
+    """
+    Start a drain task unless one was started in the last second.
+
+    Drain tasks keep reading until the stream is empty, so one per second is
+    enough to add workers during a burst without flooding the broker.
+    """
+    client = client or _get_redis()
+    if client.set(f"{settings.ALERT_INGEST_STREAM_KEY}:drain-scheduled", 1, nx=True, ex=1):
+        from sentineliq.tasks.alerts.alert_tasks import drain_alert_ingest_queue
+        drain_alert_ingest_queue.apply_async()
+
+
+def consumer_name():
+    """Stream consumer name unique to this worker process."""
+    return f"{socket.gethostname()}-{os.getpid()}"
@@ -0,0 +1,70 @@
+"""
+Signal handlers keeping Alert.artifact_count in step with the observables M2M.
+
+Counts are adjusted with F() updates instead of recounting the relation, so
+linking observables costs one UPDATE regardless of how many an alert has.
+Deleting an observable cascades its links without sending m2m_changed, so
+that case is handled separately on pre_delete.
+"""
+from django.db.models import F
+from django.db.models.signals import m2m_changed, pre_delete
+from django.dispatch import receiver
+from alerts.models import Alert
+from observables.models import Observable
+
+AlertObservables = Alert.observables.through
+
+
+def _adjust_alert_counts(alert_ids, delta):
+    """Apply ``delta`` to the artifact_count of each alert."""
+    if alert_ids and delta:
+        Alert.objects.filter(id__in=alert_ids).update(artifact_count=F('artifact_count') + delta)
+
+
+@receiver(m2m_changed, sender=AlertObservables)
+def update_artifact_count_on_observables_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Maintain artifact_count when observables are linked or unlinked.
+
+    post_add receives only the ids that were actually added. Removals and
+    clears report the requested ids, so the existing links are read in
+    pre_remove/pre_clear and applied once the delete has happened.
+    """
+    if action == 'post_add' and pk_set:
+        if reverse:
+            _adjust_alert_counts(pk_set, 1)
+        else:
+            _adjust_alert_counts([instance.pk], len(pk_set))
+            instance.artifact_count += len(pk_set)
+
+    elif action in ('pre_remove', 'pre_clear'):
+        links = AlertObservables.objects.filter(**{'observable_id' if reverse else 'alert_id': instance.pk})
+        if action == 'pre_remove':
+            links = links.filter(**{'alert_id__in' if reverse else 'observable_id__in': pk_set})
+        # Alerts losing one observable each, or how many this alert loses
+        instance._pending_artifact_removal = (
+            list(links.values_list('alert_id', flat=True)) if reverse else links.count()
+        )
+
+    elif action in ('post_remove', 'post_clear'):
+        removed = getattr(instance, '_pending_artifact_removal', None)
+        if removed is None:
+            return
+        del instance._pending_artifact_removal
+        if reverse:
+            _adjust_alert_counts(removed, -1)
+        elif removed:
+            _adjust_alert_counts([instance.pk], -removed)
+            instance.artifact_count = max(instance.artifact_count - removed, 0)
+
+
+@receiver(pre_delete, sender=Observable)
+def update_artifact_count_on_observable_delete(sender, instance, **kwargs):
+    """
+    Decrement artifact_count of the alerts a deleted observable is linked to.
+
+    The through rows are removed by the cascade, which does not send
+    m2m_changed; they are read here while they still exist.
+    """
+    alert_ids = list(AlertObservables.objects.filter(observable_id=instance.pk).values_list('alert_id', flat=True))
+    _adjust_alert_counts(alert_ids, -1)
@@ -16,6 +16,27 @@ from rest_framework import status
 logger = logging.getLogger('audit')
 
 
+def get_company_log_data(user):
+    """
+    Tenant keys for the additional_data of a user's audit log entries.
+    
+    The company_id is also copied into the indexed AuditLogEntryIndex
+    columns that audit reports filter on.
+    
+    Args:
+        user: The acting user (or None)
+        
+    Returns:
+        dict: company_id and company_name, empty for users without a company
+    """
+    if user is None or not getattr(user, 'is_authenticated', False):
+        return {}
+    company = getattr(user, 'company', None)
+    if not company:
+        return {}
+    return {'company_id': str(company.id), 'company_name': company.name}
+
+
 def log_api_access(user, method, path, status_code, additional_data=None):
     """
     Log API access (typically GET requests) to the audit log.
@@ -150,10 +171,7 @@ class AuditLogMixin:
             data['entity_type'] = self.entity_type
             
         # Add company info from the user if available
-        if hasattr(request, 'user') and request.user.is_authenticated:
-            if hasattr(request.user, 'company') and request.user.company:
-                data['company_id'] = str(request.user.company.id)
-                data['company_name'] = request.user.company.name
+        data.update(get_company_log_data(getattr(request, 'user', None)))
                 
         return data
     
@@ -349,9 +367,10 @@ def audit_action(action_type=None, entity_type=None):
                     'function_name': func.__name__,
                 }
                 
-                # Add entity info
+                # Add entity and company info
                 if actual_entity_type:
                     extra_data['entity_type'] = actual_entity_type
+                extra_data.update(get_company_log_data(getattr(request, 'user', None)))
                 
                 # Add custom action name
                 if action_type == 'custom':
@@ -16,7 +16,7 @@ from django.utils import timezone
 from django.urls import resolve
 from auditlog.middleware import AuditlogMiddleware
 from auditlog.models import LogEntry
-from api.core.audit import log_api_access, log_api_view
+from api.core.audit import get_company_log_data, log_api_access, log_api_view
 
 logger = logging.getLogger('auditlog')
 
@@ -113,6 +113,9 @@ class EnhancedAuditlogMiddleware(AuditlogMiddleware):
             # Check if we have a user
             user = request.user if hasattr(request, 'user') and request.user.is_authenticated else None
             
+            # Tenant of the request, indexed for audit reports
+            request_data.update(get_company_log_data(user))
+            
             # Record response status
             if 'response_status' not in request_data:
                 request_data['response_status'] = response.status_code
@@ -1,3 +1,6 @@
+import base64
+import binascii
+from datetime import datetime
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
 from django.conf import settings
@@ -64,4 +67,29 @@ class CustomPageSizePagination(StandardResultsSetPagination):
             except (ValueError, TypeError):
                 pass
         
-        return self.page_size 
\ No newline at end of file
+        return self.page_size 
+
+
+def encode_keyset_cursor(timestamp, pk):
+    """
+    Encode the (timestamp, pk) position of the last row of a page as an opaque cursor.
+    """
+    raw = f"{timestamp.isoformat()}|{pk}".encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_keyset_cursor(cursor):
+    """
+    Decode a cursor produced by encode_keyset_cursor.
+
+    Returns:
+        tuple: (timestamp, pk as a string)
+
+    Raises:
+        ValueError: The cursor is malformed
+    """
+    try:
+        timestamp, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split('|', 1)
+        return datetime.fromisoformat(timestamp), pk
+    except (TypeError, UnicodeDecodeError, binascii.Error) as e:
+        raise ValueError(f"Invalid cursor: {e}")
@@ -4,5 +4,6 @@ Utilitários diversos para o projeto SentinelIQ.
 
 from api.core.utils.enum_utils import enum_to_choices, enum_values
 from api.core.utils.tenant_utils import get_tenant_from_request
+from api.core.utils.elastic_utils import get_es_client, get_es_pool_metrics
 
-__all__ = ['enum_to_choices', 'enum_values', 'get_tenant_from_request'] 
\ No newline at end of file
+__all__ = ['enum_to_choices', 'enum_values', 'get_tenant_from_request', 'get_es_client', 'get_es_pool_metrics'] 
\ No newline at end of file
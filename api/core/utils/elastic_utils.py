@@ -0,0 +1,119 @@
+"""
+Process-wide Elasticsearch client registry.
+
+Every call site shares one client (and therefore one connection pool) per
+worker process instead of opening a new pool and TLS session per call.
+"""
+import os
+import threading
+import time
+from django.conf import settings
+from elasticsearch import Elasticsearch
+
+_clients = {}
+_clients_pid = None
+_lock = threading.Lock()
+
+
+def _build_client():
+    """
+    Create an Elasticsearch client from settings.
+
+    Returns:
+        Elasticsearch: Configured client
+    """
+    return Elasticsearch(
+        hosts=settings.ELASTICSEARCH_HOSTS,
+        basic_auth=(settings.ELASTICSEARCH_USERNAME, settings.ELASTICSEARCH_PASSWORD),
+        verify_certs=settings.ELASTICSEARCH_VERIFY_CERTS,
+        connections_per_node=settings.ELASTICSEARCH_CONNECTIONS_PER_NODE,
+        request_timeout=settings.ELASTICSEARCH_REQUEST_TIMEOUT,
+        max_retries=settings.ELASTICSEARCH_MAX_RETRIES,
+        retry_on_timeout=settings.ELASTICSEARCH_RETRY_ON_TIMEOUT
+    )
+
+
+def get_es_client(alias='default'):
+    """
+    Get the shared Elasticsearch client for the current process.
+
+    Clients are created lazily and dropped when the process ID changes, so a
+    forked worker never reuses sockets inherited from its parent. The default
+    client is also registered with elasticsearch_dsl so ``Search`` objects
+    built without ``using=`` share the same pool.
+
+    Args:
+        alias: Name of the client, for callers that need an isolated pool
+
+    Returns:
+        Elasticsearch: Shared client instance
+    """
+    global _clients_pid
+
+    pid = os.getpid()
+    if _clients_pid == pid and alias in _clients:
+        return _clients[alias]['client']
+
+    with _lock:
+        if _clients_pid != pid:
+            # Inherited sockets belong to the parent; never close them from here
+            _clients.clear()
+            _clients_pid = pid
+
+        if alias not in _clients:
+            client = _build_client()
+            _clients[alias] = {'client': client, 'created_at': time.time()}
+
+            from elasticsearch_dsl.connections import connections
+            connections.add_connection(alias, client)
+
+        return _clients[alias]['client']
+
+
+def reset_es_clients():
+    """
+    Forget every client created in this process.
+
+    Connected to Celery's ``worker_process_init`` so each pool worker builds
+    its own connection pool after the fork.
+    """
+    global _clients_pid
+
+    with _lock:
+        _clients.clear()
+        _clients_pid = os.getpid()
+
+
+def get_es_pool_metrics():
+    """
+    Get connection pool utilisation for the clients of this process.
+
+    Returns:
+        dict: Per-client, per-node pool size, connections in use and totals
+    """
+    metrics = {'pid': os.getpid(), 'clients': {}}
+
+    for alias, entry in list(_clients.items()):
+        nodes = []
+        for node in entry['client'].transport.node_pool.all():
+            pool = getattr(node, 'pool', None)
+            if pool is None:
+                continue
+
+            max_size = pool.pool.maxsize if pool.pool is not None else 0
+            idle = pool.pool.qsize() if pool.pool is not None else 0
+            nodes.append({
+                'node': str(node.base_url),
+                'max_connections': max_size,
+                'in_use': max_size - idle,
+                'utilisation': round((max_size - idle) / max_size, 3) if max_size else 0,
+                'connections_opened': pool.num_connections,
+                'requests': pool.num_requests
+            })
+
+        metrics['clients'][alias] = {
+            'created_at': entry['created_at'],
+            'nodes': nodes
+        }
+
+    return metrics
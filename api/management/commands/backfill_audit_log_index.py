@@ -0,0 +1,53 @@
+from auditlog.models import LogEntry
+from django.core.management.base import BaseCommand
+from api.models import AuditLogEntryIndex
+
+
+class Command(BaseCommand):
+    help = 'Copy company_id and entity_type of existing audit log entries into their indexed columns'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Log entries read and indexed per query (default: 5000)'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Count entries that would be indexed without writing them'
+        )
+
+    def handle(self, *args, **options):
+        # Entries written since the index was introduced already have their row
+        entries = LogEntry.objects.filter(audit_index__isnull=True).order_by('id').only(
+            'id', 'additional_data', 'timestamp'
+        )
+        batch_size = max(options['batch_size'], 1)
+        checked = indexed = 0
+        last_id = None
+
+        while True:
+            page = entries if last_id is None else entries.filter(id__gt=last_id)
+            batch = list(page[:batch_size])
+            if not batch:
+                break
+            last_id = batch[-1].id
+            checked += len(batch)
+
+            rows = [row for row in map(AuditLogEntryIndex.from_log_entry, batch) if row is not None]
+            indexed += len(rows)
+            if rows and not options['dry_run']:
+                AuditLogEntryIndex.objects.bulk_create(rows, ignore_conflicts=True)
+            if options['verbosity'] > 1:
+                self.stdout.write(f"Indexed {indexed} of {checked} entries (last id {last_id})")
+
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(
+                f"DRY RUN: {indexed} of {checked} unindexed audit log entries would be indexed"
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f"Checked {checked} audit log entries, indexed {indexed}"
+            ))
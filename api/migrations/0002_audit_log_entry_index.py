@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-16 20:59
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+        ('auditlog', '0017_add_actor_email'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuditLogEntryIndex',
+            fields=[
+                ('log_entry', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='audit_index', serialize=False, to=settings.AUDITLOG_LOGENTRY_MODEL)),
+                ('company_id', models.CharField(blank=True, max_length=64, null=True)),
+                ('entity_type', models.CharField(blank=True, max_length=100, null=True)),
+                ('timestamp', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Audit Log Entry Index',
+                'verbose_name_plural': 'Audit Log Entry Indexes',
+                'indexes': [models.Index(fields=['company_id', 'timestamp'], name='api_auditlo_company_99c2e5_idx'), models.Index(fields=['company_id', 'entity_type', 'timestamp'], name='api_auditlo_company_ff5cf6_idx'), models.Index(fields=['entity_type', 'timestamp'], name='api_auditlo_entity__1100cf_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-16 21:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_audit_log_entry_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mispserver',
+            name='sync_cursor',
+            field=models.JSONField(blank=True, default=dict, verbose_name='Sync Cursor'),
+        ),
+        migrations.AddField(
+            model_name='mispserver',
+            name='sync_watermark',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Sync Watermark'),
+        ),
+        migrations.AlterField(
+            model_name='mispobject',
+            name='event',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='misp_objects', to='api.mispevent', verbose_name='MISP Event'),
+        ),
+    ]
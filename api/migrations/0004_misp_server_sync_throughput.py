@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-16 21:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_misp_server_sync_watermark'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mispserver',
+            name='last_sync_attributes_per_second',
+            field=models.FloatField(blank=True, null=True, verbose_name='Last Sync Attributes/s'),
+        ),
+        migrations.AddField(
+            model_name='mispserver',
+            name='last_sync_duration',
+            field=models.FloatField(blank=True, null=True, verbose_name='Last Sync Duration (s)'),
+        ),
+        migrations.AddField(
+            model_name='mispserver',
+            name='last_sync_events_per_second',
+            field=models.FloatField(blank=True, null=True, verbose_name='Last Sync Events/s'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-16 21:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_misp_server_sync_throughput'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mispserver',
+            name='sync_max_concurrency',
+            field=models.PositiveSmallIntegerField(default=2, verbose_name='Max Concurrent Sync Tasks'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_misp_server_sync_max_concurrency'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='mispevent',
+            name='misp_uuid',
+            field=models.UUIDField(verbose_name='MISP UUID'),
+        ),
+        migrations.AlterField(
+            model_name='mispattribute',
+            name='misp_uuid',
+            field=models.UUIDField(verbose_name='MISP UUID'),
+        ),
+        migrations.AlterField(
+            model_name='mispobject',
+            name='misp_uuid',
+            field=models.UUIDField(verbose_name='MISP UUID'),
+        ),
+        migrations.AddConstraint(
+            model_name='mispevent',
+            constraint=models.UniqueConstraint(fields=('misp_server', 'misp_uuid'), name='unique_event_uuid_per_misp_server'),
+        ),
+        migrations.AddConstraint(
+            model_name='mispattribute',
+            constraint=models.UniqueConstraint(fields=('event', 'misp_uuid'), name='unique_attribute_uuid_per_misp_event'),
+        ),
+        migrations.AddConstraint(
+            model_name='mispobject',
+            constraint=models.UniqueConstraint(fields=('event', 'misp_uuid'), name='unique_object_uuid_per_misp_event'),
+        ),
+    ]
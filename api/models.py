@@ -1,3 +1,53 @@
+from auditlog.models import LogEntry
 from django.db import models
 
-# Create your models here.
+
+class AuditLogEntryIndex(models.Model):
+    """
+    Indexed tenant and entity columns for django-auditlog entries.
+
+    LogEntry only carries company_id and entity_type inside its
+    additional_data JSON, which audit reports cannot filter or group on
+    without scanning the whole table. Each entry that has either key gets
+    one row here, with the entry timestamp copied so tenant and period
+    filters are served by a single index.
+    """
+    log_entry = models.OneToOneField(
+        LogEntry, on_delete=models.CASCADE, primary_key=True, related_name='audit_index'
+    )
+    company_id = models.CharField(max_length=64, null=True, blank=True)
+    entity_type = models.CharField(max_length=100, null=True, blank=True)
+    timestamp = models.DateTimeField()
+
+    class Meta:
+        verbose_name = 'Audit Log Entry Index'
+        verbose_name_plural = 'Audit Log Entry Indexes'
+        indexes = [
+            models.Index(fields=['company_id', 'timestamp']),
+            models.Index(fields=['company_id', 'entity_type', 'timestamp']),
+            models.Index(fields=['entity_type', 'timestamp']),
+        ]
+
+    def __str__(self):
+        return f"Log entry {self.log_entry_id}: {self.entity_type} ({self.company_id})"
+
+    @classmethod
+    def from_log_entry(cls, entry):
+        """
+        Build the unsaved index row of a log entry.
+
+        Returns:
+            AuditLogEntryIndex: Row to save, or None when the entry has no
+            company_id or entity_type to index
+        """
+        data = entry.additional_data if isinstance(entry.additional_data, dict) else {}
+        company_id = data.get('company_id')
+        entity_type = data.get('entity_type')
+        if not company_id and not entity_type:
+            return None
+        return cls(
+            log_entry_id=entry.pk,
+            company_id=str(company_id)[:64] if company_id else None,
+            entity_type=str(entity_type)[:100] if entity_type else None,
+            timestamp=entry.timestamp
+        )
@@ -6,10 +6,12 @@ including authentication signals, model signals, etc.
 """
 
 import logging
+from auditlog.models import LogEntry
 from django.contrib.auth import user_logged_in, user_logged_out, user_login_failed
 from django.contrib.auth.signals import user_login_failed
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
+from api.models import AuditLogEntryIndex
 
 logger = logging.getLogger('api.auth')
 
@@ -66,4 +68,22 @@ def log_user_login_failed(sender, credentials, request, **kwargs):
     logger.warning(f"Login failed for username: {username}")
     
     # Add more custom logic for failed login tracking if needed
-    # E.g., tracking failed login attempts for brute force detection 
\ No newline at end of file
+    # E.g., tracking failed login attempts for brute force detection 
+
+@receiver(post_save, sender=LogEntry)
+def index_audit_log_entry(sender, instance, created, raw=False, **kwargs):
+    """
+    Copy the tenant and entity of a new audit log entry into indexed columns.
+    
+    Args:
+        sender: The model class that sent the signal
+        instance: The saved LogEntry
+        created: Whether the entry was just created
+        kwargs: Additional arguments
+    """
+    if not created or raw:
+        return
+    
+    index = AuditLogEntryIndex.from_log_entry(instance)
+    if index is not None:
+        index.save(force_insert=True)
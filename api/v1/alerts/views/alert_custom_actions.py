@@ -1,12 +1,18 @@
 import logging
 import uuid
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
 from django.db import transaction
 from django.utils import timezone
 from rest_framework import status
 from rest_framework.decorators import action
+from rest_framework.parsers import JSONParser
 from rest_framework.permissions import IsAuthenticated
+from api.core.parsers import NDJSONParser
 from api.core.responses import success_response, error_response, created_response
 from alerts.models import Alert
+from alerts.services import AlertBatchIngestor
+from alerts.services.ingest_queue import AlertIngestQueue, AlertIngestQueueFull, schedule_drain
 from companies.models import Company
 from observables.models import Observable
 from api.v1.alerts.enums import AlertStatusEnum
@@ -262,6 +268,21 @@ class AlertCustomActionsMixin:
                     )
                 ]
             ),
+            202: OpenApiResponse(
+                description="Alerts queued (mode=async)",
+                examples=[
+                    OpenApiExample(
+                        name="queued",
+                        summary="Accepted for processing",
+                        description="Poll ingest-status with the tracking id for per-item results",
+                        value={
+                            "status": "success",
+                            "message": "Alerts accepted for processing.",
+                            "data": {"tracking_id": "9f1c2b7e4a5d4c3b8e6f0a1b2c3d4e5f", "queued": 1}
+                        }
+                    )
+                ]
+            ),
             400: OpenApiResponse(
                 description="Invalid alert data",
                 examples=[
@@ -319,6 +340,21 @@ class AlertCustomActionsMixin:
                         }
                     )
                 ]
+            ),
+            429: OpenApiResponse(
+                description="Ingest queue full (mode=async); retry after the Retry-After header",
+                examples=[
+                    OpenApiExample(
+                        name="queue_full",
+                        summary="Back-pressure",
+                        description="The queued backlog is over ALERT_INGEST_QUEUE_MAX_DEPTH",
+                        value={
+                            "status": "error",
+                            "message": "Alert ingest queue is full. Retry later.",
+                            "code": 429
+                        }
+                    )
+                ]
             )
         }
     )
@@ -381,6 +417,11 @@ class AlertCustomActionsMixin:
         if not alert_data.get('external_source'):
             alert_data['external_source'] = alert_data.get('source', '')
         
+        if self._use_async_ingest(request):
+            if hasattr(alert_data, 'dict'):
+                alert_data = alert_data.dict()
+            return self._enqueue_ingest(company, user, [alert_data])
+        
         # Perform deduplication check using optimized query
         try:
             # Check for duplicates based on source_ref and external_source
@@ -440,6 +481,313 @@ class AlertCustomActionsMixin:
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    @extend_schema(
+        tags=['Alert Management'],
+        summary="Ingest a batch of alerts",
+        description=(
+            "Ingests many alerts from an external system in one request. The body is a JSON array "
+            "or an NDJSON stream (Content-Type: application/x-ndjson) of items in the same format "
+            "accepted by the ingest endpoint. Duplicates on source_ref and external_source are "
+            "resolved for the whole batch at once, new alerts and the observables in their "
+            "observable_data are created in bulk, and the response reports the outcome of every "
+            "item in order. Invalid items do not prevent the rest of the batch from being ingested."
+        ),
+        parameters=[
+            OpenApiParameter(
+                name="company_id",
+                description="Company to ingest into, for users without a company",
+                required=False,
+                type=str
+            ),
+            OpenApiParameter(
+                name="mode",
+                description="'async' to queue the alerts and answer 202 with a tracking id, 'sync' to process them in the request (default: ALERT_INGEST_ASYNC)",
+                required=False,
+                type=str,
+                enum=['sync', 'async']
+            )
+        ],
+        responses={
+            200: OpenApiResponse(
+                description="Batch processed",
+                examples=[
+                    OpenApiExample(
+                        name="batch_result",
+                        summary="Per-item results",
+                        description="One result per submitted item, in submission order",
+                        value={
+                            "status": "success",
+                            "message": "Batch processed: 1 created, 1 duplicates, 1 errors.",
+                            "data": {
+                                "results": [
+                                    {"index": 0, "status": "created", "alert_id": "3fa85f64-5717-4562-b3fc-2c963f66afa6"},
+                                    {"index": 1, "status": "duplicate", "alert_id": "6fa459ea-ee8a-3ca4-894e-db77e160355e"},
+                                    {"index": 2, "status": "error", "alert_id": None, "errors": {"title": ["This field is required."]}}
+                                ],
+                                "summary": {"total": 3, "created": 1, "duplicate": 1, "error": 1}
+                            }
+                        }
+                    )
+                ]
+            ),
+            202: OpenApiResponse(
+                description="Alerts queued (mode=async)",
+                examples=[
+                    OpenApiExample(
+                        name="queued",
+                        summary="Accepted for processing",
+                        description="Poll ingest-status with the tracking id for per-item results",
+                        value={
+                            "status": "success",
+                            "message": "Alerts accepted for processing.",
+                            "data": {"tracking_id": "9f1c2b7e4a5d4c3b8e6f0a1b2c3d4e5f", "queued": 3}
+                        }
+                    )
+                ]
+            ),
+            400: OpenApiResponse(
+                description="Invalid batch",
+                examples=[
+                    OpenApiExample(
+                        name="not_a_list",
+                        summary="Body is not a list",
+                        description="The body must be a JSON array or NDJSON stream",
+                        value={
+                            "status": "error",
+                            "message": "Request body must be a JSON array or NDJSON stream of alerts.",
+                            "code": 400
+                        }
+                    ),
+                    OpenApiExample(
+                        name="batch_too_large",
+                        summary="Batch too large",
+                        description="The batch exceeds ALERT_INGEST_BATCH_MAX_SIZE",
+                        value={
+                            "status": "error",
+                            "message": "Batch contains 5000 alerts; the maximum is 1000.",
+                            "code": 400
+                        }
+                    )
+                ]
+            ),
+            403: OpenApiResponse(
+                description="Permission denied",
+                examples=[
+                    OpenApiExample(
+                        name="company_permission",
+                        summary="Company permission error",
+                        description="User doesn't have permission for the specified company",
+                        value={
+                            "status": "error",
+                            "message": "You don't have permission to ingest alerts for this company.",
+                            "code": 403
+                        }
+                    )
+                ]
+            ),
+            429: OpenApiResponse(
+                description="Ingest queue full (mode=async); retry after the Retry-After header",
+                examples=[
+                    OpenApiExample(
+                        name="queue_full",
+                        summary="Back-pressure",
+                        description="The queued backlog is over ALERT_INGEST_QUEUE_MAX_DEPTH",
+                        value={
+                            "status": "error",
+                            "message": "Alert ingest queue is full. Retry later.",
+                            "code": 429
+                        }
+                    )
+                ]
+            )
+        }
+    )
+    @action(
+        detail=False,
+        methods=['post'],
+        url_path='ingest-batch',
+        permission_classes=[IsAuthenticated],
+        parser_classes=[JSONParser, NDJSONParser]
+    )
+    def ingest_batch(self, request):
+        """
+        Ingests a batch of alerts from external systems.
+
+        Accepts a JSON array or an NDJSON stream and returns a result for
+        each item, so one invalid alert does not reject the whole batch.
+        """
+        user = request.user
+
+        # Get company from user or from the company_id query parameter
+        if getattr(user, 'company', None) is not None:
+            company = user.company
+        elif request.query_params.get('company_id'):
+            company_id = request.query_params['company_id']
+            try:
+                company = Company.objects.get(id=company_id)
+            except (Company.DoesNotExist, ValueError, DjangoValidationError):
+                return error_response(
+                    message=f"Company with ID {company_id} does not exist.",
+                    status_code=status.HTTP_400_BAD_REQUEST
+                )
+            if not user.is_superuser:
+                logger.warning(f"User {user.username} attempted to batch ingest alerts for company {company.id}")
+                return error_response(
+                    message="You don't have permission to ingest alerts for this company.",
+                    status_code=status.HTTP_403_FORBIDDEN
+                )
+        else:
+            return error_response(
+                message="User without a company must provide a company_id query parameter.",
+                status_code=status.HTTP_400_BAD_REQUEST
+            )
+
+        items = request.data
+        if not isinstance(items, list):
+            return error_response(
+                message="Request body must be a JSON array or NDJSON stream of alerts.",
+                status_code=status.HTTP_400_BAD_REQUEST
+            )
+
+        max_size = settings.ALERT_INGEST_BATCH_MAX_SIZE
+        if len(items) > max_size:
+            return error_response(
+                message=f"Batch contains {len(items)} alerts; the maximum is {max_size}.",
+                status_code=status.HTTP_400_BAD_REQUEST
+            )
+
+        if self._use_async_ingest(request):
+            return self._enqueue_ingest(company, user, items)
+
+        try:
+            result = AlertBatchIngestor(
+                company, user, serializer_context={'request': request}
+            ).ingest(items)
+        except Exception as e:
+            logger.error(f"Error ingesting alert batch: {str(e)}")
+            return error_response(
+                message=f"Error ingesting alert batch: {str(e)}",
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+        summary = result['summary']
+        return success_response(
+            data=result,
+            message=(
+                f"Batch processed: {summary['created']} created, "
+                f"{summary['duplicate']} duplicates, {summary['error']} errors."
+            ),
+            status_code=status.HTTP_200_OK
+        )
+
+    def _use_async_ingest(self, request):
+        """
+        Whether ingestion should be queued instead of processed in the request.
+
+        The ``mode`` query parameter (``async`` or ``sync``) overrides the
+        ALERT_INGEST_ASYNC setting.
+        """
+        mode = request.query_params.get('mode')
+        if mode in ('async', 'sync'):
+            return mode == 'async'
+        return settings.ALERT_INGEST_ASYNC
+
+    def _enqueue_ingest(self, company, user, items):
+        """
+        Queue alerts for the ingest workers and answer 202 with a tracking id.
+
+        Answers 429 with Retry-After while the queue is over
+        ALERT_INGEST_QUEUE_MAX_DEPTH.
+        """
+        try:
+            tracking_id = AlertIngestQueue().enqueue(company.id, user.id, items)
+        except AlertIngestQueueFull as e:
+            logger.warning(f"Alert ingest queue full ({e.depth} waiting), rejecting {len(items)} alerts")
+            return error_response(
+                message="Alert ingest queue is full. Retry later.",
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                headers={'Retry-After': str(e.retry_after)}
+            )
+        except Exception as e:
+            logger.error(f"Error queueing alerts for ingestion: {str(e)}")
+            return error_response(
+                message="Alert ingest queue is unavailable.",
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
+
+        try:
+            schedule_drain()
+        except Exception as e:
+            # Entries are durable; the periodic drain picks them up
+            logger.warning(f"Could not start alert ingest drain: {str(e)}")
+
+        return success_response(
+            data={"tracking_id": tracking_id, "queued": len(items)},
+            message="Alerts accepted for processing.",
+            status_code=status.HTTP_202_ACCEPTED
+        )
+
+    @extend_schema(
+        tags=['Alert Management'],
+        summary="Get queued ingestion status",
+        description=(
+            "Returns the progress of alerts submitted with mode=async to the ingest or "
+            "ingest-batch endpoints, including a result for every processed item."
+        ),
+        responses={
+            200: OpenApiResponse(
+                description="Ingestion status",
+                examples=[
+                    OpenApiExample(
+                        name="processing",
+                        summary="Partially processed",
+                        description="Some alerts of the request are still queued",
+                        value={
+                            "status": "success",
+                            "data": {
+                                "tracking_id": "9f1c2b7e4a5d4c3b8e6f0a1b2c3d4e5f",
+                                "status": "processing",
+                                "summary": {"total": 2, "processed": 1, "created": 1, "duplicate": 0, "error": 0},
+                                "results": [
+                                    {"index": 0, "status": "created", "alert_id": "3fa85f64-5717-4562-b3fc-2c963f66afa6"}
+                                ]
+                            }
+                        }
+                    )
+                ]
+            ),
+            404: OpenApiResponse(description="Unknown or expired tracking id")
+        }
+    )
+    @action(
+        detail=False,
+        methods=['get'],
+        url_path='ingest-status/(?P<tracking_id>[0-9a-f]{32})',
+        permission_classes=[IsAuthenticated]
+    )
+    def ingest_status(self, request, tracking_id=None):
+        """
+        Returns the status of a queued ingestion request.
+        """
+        try:
+            ingest_status = AlertIngestQueue().get_status(tracking_id)
+        except Exception as e:
+            logger.error(f"Error reading alert ingest status {tracking_id}: {str(e)}")
+            return error_response(
+                message="Alert ingest queue is unavailable.",
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
+
+        user = request.user
+        company_id = ingest_status.pop('company_id') if ingest_status else None
+        user_company_id = str(user.company.id) if getattr(user, 'company', None) else None
+        if ingest_status is None or (not user.is_superuser and company_id != user_company_id):
+            return error_response(
+                message="Ingestion request not found.",
+                status_code=status.HTTP_404_NOT_FOUND
+            )
+        return success_response(data=ingest_status)
+
     @extend_schema(
         tags=['Alert Management'],
         summary="List observables in alert",
@@ -25,11 +25,11 @@ class AuditLogFilter(django_filters.FilterSet):
     - Período de tempo
     - Empresa
     """
-    entity_type = filters.CharFilter(field_name='additional_data__entity_type')
+    entity_type = filters.CharFilter(field_name='audit_index__entity_type')
     action = filters.NumberFilter(field_name='action')
     entity_id = filters.CharFilter(field_name='object_pk')
     username = filters.CharFilter(field_name='actor__username')
-    company_id = filters.CharFilter(field_name='additional_data__company_id')
+    company_id = filters.CharFilter(field_name='audit_index__company_id')
     
     # Filtros de data
     date_from = filters.DateTimeFilter(field_name='timestamp', lookup_expr='gte')
@@ -115,8 +115,8 @@ class AuditLogFilter(django_filters.FilterSet):
         """
         Filter by entity type.
         """
-        # First try to filter by entity_type in additional_data
-        filtered = queryset.filter(additional_data__entity_type=value)
+        # First try to filter by the indexed entity_type
+        filtered = queryset.filter(audit_index__entity_type=value)
         if filtered.exists():
             return filtered
         
@@ -134,8 +134,8 @@ class AuditLogFilter(django_filters.FilterSet):
         """
         Filter by company ID.
         """
-        # Filter by company_id in additional_data
-        return queryset.filter(additional_data__company_id=value)
+        # Filter by the indexed company_id
+        return queryset.filter(audit_index__company_id=value)
     
     def filter_company_name(self, queryset, name, value):
         """
@@ -91,8 +91,8 @@ class AuditLogViewSet(viewsets.ReadOnlyModelViewSet):
             # Usuários comuns só podem ver logs de sua empresa
             if hasattr(user, 'company') and user.company:
                 company_id = str(user.company.id)
-                # Filtrar logs pelo company_id nos dados adicionais
-                queryset = queryset.filter(additional_data__company_id=company_id)
+                # Filtrar logs pelo company_id indexado
+                queryset = queryset.filter(audit_index__company_id=company_id)
             else:
                 # Se o usuário não tiver empresa, mostrar apenas seus próprios logs
                 queryset = queryset.filter(actor=user)
@@ -338,8 +338,8 @@ class AuditLogList(generics.ListAPIView):
             # Usuários comuns só podem ver logs de sua empresa
             if hasattr(user, 'company') and user.company:
                 company_id = str(user.company.id)
-                # Filtrar logs pelo company_id nos dados adicionais
-                queryset = queryset.filter(additional_data__company_id=company_id)
+                # Filtrar logs pelo company_id indexado
+                queryset = queryset.filter(audit_index__company_id=company_id)
             else:
                 # Se o usuário não tiver empresa, mostrar apenas seus próprios logs
                 queryset = queryset.filter(actor=user)
@@ -6,6 +6,7 @@ from django.db import connection
 from django.conf import settings
 from api.core.throttling import PublicEndpointRateThrottle, StandardUserRateThrottle
 from api.core.responses import success_response, error_response
+from api.core.utils.elastic_utils import get_es_pool_metrics
 from .permissions import CommonPermission
 from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiResponse, inline_serializer, OpenApiExample
 import datetime
@@ -164,6 +165,10 @@ class CommonViewSet(viewsets.GenericViewSet):
             }
         }
         
+        # Connection pool utilisation is only exposed to staff
+        if request.user.is_authenticated and request.user.is_staff:
+            health_data['elasticsearch_pools'] = get_es_pool_metrics()
+        
         response_status = status.HTTP_200_OK if db_ok else status.HTTP_503_SERVICE_UNAVAILABLE
         
         # Use direct Response to maintain the health_data structure for backward compatibility
@@ -2,10 +2,11 @@ import logging
 import uuid
 from rest_framework import status
 from rest_framework.decorators import action
+from django.conf import settings
 from django.db import transaction
-from django.utils import timezone
 from incidents.models import Incident, TimelineEvent, IncidentObservable, IncidentTask
 from alerts.models import Alert
+from api.core.pagination import encode_keyset_cursor, decode_keyset_cursor
 from api.core.responses import success_response, error_response
 from api.core.rbac import HasEntityPermission
 from api.core.audit import audit_action
@@ -228,24 +229,14 @@ class IncidentCustomActionsMixin:
             with transaction.atomic():
                 entry_data = serializer.validated_data
                 
-                # Get current timestamp if not provided
-                timestamp = entry_data.get('timestamp', timezone.now())
-                
-                # Create timeline entry with metadata
-                timeline_entry = {
-                    "id": str(uuid.uuid4()),
-                    "title": entry_data.get('title'),
-                    "content": entry_data.get('content', ''),
-                    "type": entry_data.get('event_type', 'note'),
-                    "timestamp": timestamp.isoformat() if hasattr(timestamp, 'isoformat') else timestamp,
-                    "created_by": str(user.id)
-                }
-                
-                # Add entry to timeline
-                if not incident.timeline:
-                    incident.timeline = []
-                incident.timeline.append(timeline_entry)
-                incident.save(update_fields=['timeline'])
+                # Append a TimelineEvent; the incident row is not rewritten
+                timeline_entry = incident.add_timeline_entry(
+                    title=entry_data.get('title'),
+                    content=entry_data.get('content', ''),
+                    event_type=entry_data.get('event_type', 'note'),
+                    created_by=user,
+                    timestamp=entry_data.get('timestamp')
+                )
                 
                 logger.info(f"Timeline entry added to incident {incident.id} by {user.username}")
                 
@@ -347,21 +338,15 @@ class IncidentCustomActionsMixin:
             with transaction.atomic():
                 incident.assignee = assign_to
                 
-                # Add timeline entry for the assignment
-                timeline_entry = {
-                    "id": str(uuid.uuid4()),
-                    "title": "Incident assigned",
-                    "content": f"Incident assigned to user {assign_to.username}",
-                    "type": "assignment",
-                    "timestamp": timezone.now().isoformat(),
-                    "created_by": str(user.id)
-                }
-                
-                if not incident.timeline:
-                    incident.timeline = []
-                incident.timeline.append(timeline_entry)
+                incident.save(update_fields=['assignee'])
                 
-                incident.save(update_fields=['assignee', 'timeline'])
+                # Add timeline entry for the assignment
+                timeline_entry = incident.add_timeline_entry(
+                    title="Incident assigned",
+                    content=f"Incident assigned to user {assign_to.username}",
+                    event_type="assignment",
+                    created_by=user
+                )
                 
                 logger.info(f"Incident {incident.id} assigned to user {assign_to.username} by {user.username}")
                 
@@ -384,7 +369,25 @@ class IncidentCustomActionsMixin:
     
     @extend_schema(
         summary="Get incident timeline",
-        description="Retrieves the timeline for an incident.",
+        description=(
+            "Retrieves the timeline for an incident, newest first. Results are paginated with "
+            "an opaque cursor: pass the next_cursor of a response as the cursor parameter to "
+            "read the following page."
+        ),
+        parameters=[
+            OpenApiParameter(
+                name="limit",
+                description="Events per page (default: INCIDENT_TIMELINE_PAGE_SIZE, max 500)",
+                required=False,
+                type=int
+            ),
+            OpenApiParameter(
+                name="cursor",
+                description="next_cursor value from the previous page",
+                required=False,
+                type=str
+            )
+        ],
         responses={
             200: TimelineEventSerializer(many=True)
         }
@@ -397,16 +400,37 @@ class IncidentCustomActionsMixin:
         """
         incident = self.get_object()
         
-        # Return timeline from incident model instead of separate TimelineEvent model
-        timeline = incident.timeline or []
+        try:
+            limit = int(request.query_params.get('limit', settings.INCIDENT_TIMELINE_PAGE_SIZE))
+        except ValueError:
+            return error_response(
+                message="limit must be an integer",
+                status_code=status.HTTP_400_BAD_REQUEST
+            )
+        limit = min(max(limit, 1), 500)
         
-        # Sort by timestamp if available
-        timeline = sorted(timeline, key=lambda x: x.get('timestamp', ''), reverse=True)
+        cursor = None
+        if request.query_params.get('cursor'):
+            try:
+                timestamp, event_id = decode_keyset_cursor(request.query_params['cursor'])
+                cursor = (timestamp, uuid.UUID(event_id))
+            except ValueError:
+                return error_response(
+                    message="Invalid timeline cursor",
+                    status_code=status.HTTP_400_BAD_REQUEST
+                )
+        
+        events, next_cursor = incident.get_timeline(limit=limit, cursor=cursor)
         
-        # Return as response
         return success_response(
-            data=timeline,
-            message=f"Retrieved {len(timeline)} timeline events."
+            data=TimelineEventSerializer(events, many=True).data,
+            message=f"Retrieved {len(events)} timeline events.",
+            metadata={
+                'pagination': {
+                    'limit': limit,
+                    'next_cursor': encode_keyset_cursor(*next_cursor) if next_cursor else None
+                }
+            }
         )
     
     @extend_schema(
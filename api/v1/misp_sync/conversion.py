@@ -0,0 +1,299 @@
+import logging
+from collections import defaultdict
+from django.db import transaction
+from django.db.models.signals import post_save
+from alerts.models import Alert
+from incidents.models import Incident, IncidentObservable
+from observables.models import Observable
+from observables.services.bulk_import import MAX_TAG_LENGTH
+from api.v1.alerts.enums import AlertSeverityEnum, AlertStatusEnum
+from api.v1.incidents.enums import IncidentSeverityEnum, IncidentStatusEnum, TimelineEventTypeEnum
+from api.v1.misp_sync.enums import MISPThreatLevelEnum
+from api.v1.misp_sync.models import MISPEvent
+from api.v1.observables.enums import ObservableTypeEnum
+
+logger = logging.getLogger('api')
+
+MISP_SOURCE = "MISP"
+
+# MISP attribute types converted to observables; other attributes are skipped
+ATTRIBUTE_TYPE_MAP = {
+    'ip-src': ObservableTypeEnum.IP.value,
+    'ip-dst': ObservableTypeEnum.IP.value,
+    'domain': ObservableTypeEnum.DOMAIN.value,
+    'hostname': ObservableTypeEnum.HOSTNAME.value,
+    'url': ObservableTypeEnum.URL.value,
+    'md5': ObservableTypeEnum.HASH_MD5.value,
+    'sha1': ObservableTypeEnum.HASH_SHA1.value,
+    'sha256': ObservableTypeEnum.HASH_SHA256.value,
+    'filename': ObservableTypeEnum.FILENAME.value,
+    'email': ObservableTypeEnum.EMAIL.value,
+    'email-src': ObservableTypeEnum.EMAIL.value,
+    'email-dst': ObservableTypeEnum.EMAIL.value,
+}
+
+ALERT_SEVERITY_MAP = {
+    MISPThreatLevelEnum.HIGH: AlertSeverityEnum.CRITICAL,
+    MISPThreatLevelEnum.MEDIUM: AlertSeverityEnum.HIGH,
+    MISPThreatLevelEnum.LOW: AlertSeverityEnum.MEDIUM,
+    MISPThreatLevelEnum.UNDEFINED: AlertSeverityEnum.LOW,
+}
+
+INCIDENT_SEVERITY_MAP = {
+    MISPThreatLevelEnum.HIGH: IncidentSeverityEnum.CRITICAL,
+    MISPThreatLevelEnum.MEDIUM: IncidentSeverityEnum.HIGH,
+    MISPThreatLevelEnum.LOW: IncidentSeverityEnum.MEDIUM,
+    MISPThreatLevelEnum.UNDEFINED: IncidentSeverityEnum.LOW,
+}
+
+
+class MISPEventConverter:
+    """
+    Convert MISP events to alerts or incidents with set-based writes.
+
+    All attributes of the given events are mapped to observables with one
+    existence query and one bulk insert per company, and linked to their
+    alert or incident with a single through-table bulk_create. Bulk writes
+    skip Observable.full_clean() and the per-link signal handlers; the
+    converter sets what they would (artifact_count, one timeline entry per
+    incident) itself.
+
+    Usage:
+        converter = MISPEventConverter()
+        results = converter.to_alerts(MISPEvent.objects.filter(id__in=event_ids))
+    """
+
+    def _events(self, events):
+        return events.select_related('company', 'misp_server__created_by').prefetch_related('attributes')
+
+    def _observable_ids(self, company, user, events):
+        """
+        Return observable ids by (type, value) for the events' attributes.
+
+        Existing observables are read with one query and the missing ones
+        inserted with one bulk_create; a row inserted concurrently by another
+        worker is picked up by the re-read.
+
+        Returns:
+            tuple: ({(type, value): observable id}, {event id: [(type, value), ...]})
+        """
+        defaults = {}
+        keys_by_event = {}
+        for event in events:
+            keys = []
+            for attr in event.attributes.all():
+                obs_type = ATTRIBUTE_TYPE_MAP.get(attr.type)
+                if not obs_type or not attr.value:
+                    continue
+                key = (obs_type, attr.value)
+                keys.append(key)
+                current = defaults.get(key)
+                if current is None:
+                    defaults[key] = {
+                        'description': attr.comment or f"From MISP event: {event.info}",
+                        'is_ioc': attr.to_ids,
+                        'tags': [str(tag)[:MAX_TAG_LENGTH] for tag in attr.tags or []],
+                        'first_seen': attr.timestamp,
+                        'last_seen': attr.timestamp,
+                    }
+                else:
+                    current['is_ioc'] = current['is_ioc'] or attr.to_ids
+                    current['first_seen'] = min(current['first_seen'], attr.timestamp)
+                    current['last_seen'] = max(current['last_seen'], attr.timestamp)
+            keys_by_event[event.id] = list(dict.fromkeys(keys))
+
+        if not defaults:
+            return {}, keys_by_event
+
+        def lookup():
+            rows = Observable.objects.filter(
+                company=company, value__in={value for _, value in defaults}
+            ).values_list('type', 'value', 'id')
+            return {(obs_type, value): obs_id for obs_type, value, obs_id in rows if (obs_type, value) in defaults}
+
+        ids = lookup()
+        missing = defaults.keys() - ids.keys()
+        if missing:
+            Observable.objects.bulk_create([
+                Observable(
+                    type=obs_type,
+                    value=value,
+                    source=MISP_SOURCE,
+                    company=company,
+                    created_by=user,
+                    **defaults[(obs_type, value)]
+                )
+                for obs_type, value in missing
+            ], ignore_conflicts=True)
+            ids = lookup()
+        return ids, keys_by_event
+
+    def to_alerts(self, events):
+        """
+        Convert events to alerts, one alert per event.
+
+        Events already converted (an alert with their source_ref exists) are
+        reported as such and linked to that alert.
+
+        Args:
+            events: MISPEvent queryset
+
+        Returns:
+            dict: Result per event id with ``status``, ``alert_id`` and ``observable_count``
+        """
+        results = {}
+        by_company = defaultdict(list)
+        for event in self._events(events):
+            by_company[event.company_id].append(event)
+
+        for company_events in by_company.values():
+            with transaction.atomic():
+                results.update(self._company_to_alerts(company_events))
+        return results
+
+    def _company_to_alerts(self, events):
+        company = events[0].company
+        refs = {str(event.uuid): event for event in events}
+        existing = dict(Alert.objects.filter(
+            company=company, external_source=MISP_SOURCE, source_ref__in=list(refs)
+        ).values_list('source_ref', 'id'))
+
+        results = {}
+        pending = []
+        for ref, event in refs.items():
+            if ref in existing:
+                results[event.id] = {"status": "already_converted", "alert_id": existing[ref]}
+                event.alert_id = existing[ref]
+            else:
+                pending.append(event)
+
+        observable_ids, keys_by_event = self._observable_ids(company, events[0].misp_server.created_by, pending)
+        alerts = {}
+        links = {}
+        for event in pending:
+            links[event.id] = [observable_ids[key] for key in keys_by_event[event.id] if key in observable_ids]
+            alert = Alert(
+                title=event.info[:200],
+                description=f"Alert created from MISP event: {event.info}\nOrganization: {event.org_name}",
+                severity=ALERT_SEVERITY_MAP.get(event.threat_level_id, AlertSeverityEnum.MEDIUM).value,
+                status=AlertStatusEnum.NEW.value,
+                source=MISP_SOURCE,
+                source_ref=str(event.uuid),
+                external_source=MISP_SOURCE,
+                date=event.timestamp,
+                company=company,
+                created_by=event.misp_server.created_by,
+                tags=event.tags or [],
+                raw_payload=event.raw_data
+            )
+            # bulk_create and the through-table insert bypass save() and m2m_changed
+            alert.artifact_count = len(links[event.id]) + Alert.count_observable_data(alert.observable_data)
+            alerts[event.id] = alert
+
+        # Alerts inserted concurrently for the same event are skipped by the unique constraint
+        Alert.objects.bulk_create(alerts.values(), ignore_conflicts=True)
+        inserted = set(Alert.objects.filter(id__in=[alert.id for alert in alerts.values()]).values_list('id', flat=True))
+        created = {event_id: alert for event_id, alert in alerts.items() if alert.id in inserted}
+
+        Through = Alert.observables.through
+        Through.objects.bulk_create([
+            Through(alert_id=alert.id, observable_id=observable_id)
+            for event_id, alert in created.items()
+            for observable_id in links[event_id]
+        ], ignore_conflicts=True)
+
+        for event in pending:
+            if event.id in created:
+                event.alert_id = created[event.id].id
+                results[event.id] = {
+                    "status": "completed",
+                    "alert_id": event.alert_id,
+                    "observable_count": len(links[event.id])
+                }
+            else:
+                results[event.id] = {"status": "failed", "error": "Alert was created concurrently"}
+        MISPEvent.objects.bulk_update(events, ['alert'])
+
+        # Keep notifications and the audit log firing as they do for Alert.save()
+        for alert in created.values():
+            post_save.send(
+                sender=Alert, instance=alert, created=True,
+                update_fields=None, raw=False, using='default'
+            )
+        logger.info(f"Converted {len(created)} MISP events to alerts for company {company.id}")
+        return results
+
+    def to_incidents(self, events):
+        """
+        Convert events to incidents, one incident per event.
+
+        Incidents are created one by one so their creation signals run;
+        their observables are linked in bulk and recorded with one timeline
+        entry per incident. Events already linked to an incident are skipped.
+
+        Args:
+            events: MISPEvent queryset
+
+        Returns:
+            dict: Result per event id with ``status``, ``incident_id`` and ``observable_count``
+        """
+        results = {}
+        by_company = defaultdict(list)
+        for event in self._events(events):
+            if event.incident_id:
+                results[event.id] = {"status": "already_converted", "incident_id": event.incident_id}
+            else:
+                by_company[event.company_id].append(event)
+
+        for company_events in by_company.values():
+            with transaction.atomic():
+                results.update(self._company_to_incidents(company_events))
+        return results
+
+    def _company_to_incidents(self, events):
+        company = events[0].company
+        observable_ids, keys_by_event = self._observable_ids(company, events[0].misp_server.created_by, events)
+        ioc_keys = {
+            (ATTRIBUTE_TYPE_MAP[attr.type], attr.value)
+            for event in events for attr in event.attributes.all()
+            if attr.to_ids and attr.type in ATTRIBUTE_TYPE_MAP
+        }
+
+        results = {}
+        links = []
+        for event in events:
+            incident = Incident.objects.create(
+                title=f"MISP: {event.info}"[:200],
+                description=f"Incident created from MISP event: {event.info}\nOrganization: {event.org_name}",
+                severity=INCIDENT_SEVERITY_MAP.get(event.threat_level_id, IncidentSeverityEnum.MEDIUM).value,
+                status=IncidentStatusEnum.OPEN.value,
+                tags=event.tags or [],
+                linked_entities=[f"misp:{event.misp_uuid}"],
+                company=company,
+                created_by=event.misp_server.created_by
+            )
+            keys = [key for key in keys_by_event[event.id] if key in observable_ids]
+            links.extend(
+                IncidentObservable(
+                    incident=incident,
+                    observable_id=observable_ids[key],
+                    is_ioc=key in ioc_keys,
+                    company=company
+                )
+                for key in keys
+            )
+            if keys:
+                incident.add_timeline_entry(
+                    title=f"{len(keys)} observables imported from MISP",
+                    content=f"Observables of MISP event {event.info} linked to the incident",
+                    event_type=TimelineEventTypeEnum.UPDATED.value,
+                    metadata={'misp_event_id': str(event.id), 'observable_count': len(keys)}
+                )
+            event.incident = incident
+            results[event.id] = {"status": "completed", "incident_id": incident.id, "observable_count": len(keys)}
+
+        # post_save timeline entries per link are replaced by the entry above
+        IncidentObservable.objects.bulk_create(links, ignore_conflicts=True)
+        MISPEvent.objects.bulk_update(events, ['incident'])
+        logger.info(f"Converted {len(events)} MISP events to incidents for company {company.id}")
+        return results
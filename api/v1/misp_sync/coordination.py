@@ -0,0 +1,102 @@
+import time
+import uuid
+from django.conf import settings
+
+LOCK_KEY = 'misp_sync:lock:{server_id}'
+SLOTS_KEY = 'misp_sync:slots:{server_id}'
+
+# Delete the key only while it still holds the caller's token, so a lock
+# that expired and was taken over is never released by its old owner
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# Drop slots whose holder died (older than the slot TTL), then take one if
+# fewer than ``limit`` are held. Returns 1 when the slot was taken.
+ACQUIRE_SLOT_SCRIPT = """
+local now = tonumber(ARGV[1])
+local ttl = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - ttl)
+if redis.call('ZCARD', KEYS[1]) >= limit then
+    return 0
+end
+redis.call('ZADD', KEYS[1], now, ARGV[4])
+redis.call('EXPIRE', KEYS[1], math.ceil(ttl))
+return 1
+"""
+
+_redis_client = None
+
+
+def _get_redis():
+    global _redis_client
+    if _redis_client is None:
+        import redis
+        _redis_client = redis.Redis.from_url(settings.MISP_SYNC_REDIS_URL, decode_responses=True)
+    return _redis_client
+
+
+class MISPSyncLock:
+    """
+    Exclusive per-server lock held from dispatch until a sync run finishes.
+
+    The lock expires after MISP_SYNC_LOCK_TTL seconds so a run whose
+    finishing task never executes does not block the server forever.
+    """
+
+    def __init__(self, server_id, client=None):
+        self.client = client or _get_redis()
+        self.key = LOCK_KEY.format(server_id=server_id)
+
+    def acquire(self):
+        """
+        Take the lock.
+
+        Returns:
+            str: Token to release the lock with, or None when it is held
+        """
+        token = uuid.uuid4().hex
+        if self.client.set(self.key, token, nx=True, ex=settings.MISP_SYNC_LOCK_TTL):
+            return token
+        return None
+
+    def release(self, token):
+        """Release the lock if it is still held with ``token``."""
+        return bool(self.client.eval(RELEASE_LOCK_SCRIPT, 1, self.key, token))
+
+
+class ServerConcurrencyLimiter:
+    """
+    Counting semaphore bounding the sync tasks running against one MISP server.
+
+    Slots are members of a Redis sorted set scored by acquisition time. A
+    slot left behind by a killed worker is reclaimed after
+    MISP_SYNC_SLOT_TTL seconds.
+    """
+
+    def __init__(self, client=None):
+        self.client = client
+        self._script = None
+
+    def acquire(self, server_id, limit):
+        """
+        Take one of the server's ``limit`` slots.
+
+        Returns:
+            str: Token to release the slot with, or None when all slots are taken
+        """
+        if self._script is None:
+            self._script = (self.client or _get_redis()).register_script(ACQUIRE_SLOT_SCRIPT)
+        token = uuid.uuid4().hex
+        taken = self._script(
+            keys=[SLOTS_KEY.format(server_id=server_id)],
+            args=[time.time(), settings.MISP_SYNC_SLOT_TTL, max(limit, 1), token]
+        )
+        return token if int(taken) else None
+
+    def release(self, server_id, token):
+        (self.client or _get_redis()).zrem(SLOTS_KEY.format(server_id=server_id), token)
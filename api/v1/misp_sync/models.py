@@ -26,6 +26,19 @@ class MISPServer(CoreModel):
     last_sync = models.DateTimeField('Last Sync', null=True, blank=True)
     sync_interval_hours = models.PositiveIntegerField('Sync Interval (hours)', default=24)
     
+    # Incremental sync state: events modified after the watermark are fetched,
+    # the cursor records the committed pages of an unfinished run
+    sync_watermark = models.DateTimeField('Sync Watermark', null=True, blank=True)
+    sync_cursor = models.JSONField('Sync Cursor', default=dict, blank=True)
+    
+    # Sync tasks allowed to query this server at the same time
+    sync_max_concurrency = models.PositiveSmallIntegerField('Max Concurrent Sync Tasks', default=2)
+    
+    # Throughput of the last sync run
+    last_sync_duration = models.FloatField('Last Sync Duration (s)', null=True, blank=True)
+    last_sync_events_per_second = models.FloatField('Last Sync Events/s', null=True, blank=True)
+    last_sync_attributes_per_second = models.FloatField('Last Sync Attributes/s', null=True, blank=True)
+    
     # Relationships and tenant isolation
     company = models.ForeignKey(
         Company,
@@ -70,7 +83,7 @@ class MISPEvent(CoreModel):
     """
     uuid = models.UUIDField('UUID', default=uuid.uuid4, editable=False)
     misp_id = models.PositiveIntegerField('MISP ID')
-    misp_uuid = models.UUIDField('MISP UUID', unique=True)
+    misp_uuid = models.UUIDField('MISP UUID')
     info = models.CharField('Info/Title', max_length=255)
     date = models.DateField('Event Date')
     threat_level_id = models.PositiveSmallIntegerField('Threat Level ID', default=2)
@@ -139,6 +152,11 @@ class MISPEvent(CoreModel):
             models.UniqueConstraint(
                 fields=['misp_id', 'misp_server'],
                 name='unique_event_per_misp_server'
+            ),
+            # Several tenants' servers may share an event; each keeps its own copy
+            models.UniqueConstraint(
+                fields=['misp_server', 'misp_uuid'],
+                name='unique_event_uuid_per_misp_server'
             )
         ]
     
@@ -191,7 +209,7 @@ class MISPAttribute(CoreModel):
     """
     uuid = models.UUIDField('UUID', default=uuid.uuid4, editable=False)
     misp_id = models.PositiveIntegerField('MISP ID')
-    misp_uuid = models.UUIDField('MISP UUID', unique=True)
+    misp_uuid = models.UUIDField('MISP UUID')
     type = models.CharField('Type', max_length=100)
     category = models.CharField('Category', max_length=100)
     value = models.TextField('Value')
@@ -238,6 +256,12 @@ class MISPAttribute(CoreModel):
             models.Index(fields=['misp_id']),
             models.Index(fields=['misp_uuid']),
         ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['event', 'misp_uuid'],
+                name='unique_attribute_uuid_per_misp_event'
+            )
+        ]
     
     def __str__(self):
         return f"{self.type}:{self.value} - {self.event.info}"
@@ -300,7 +324,7 @@ class MISPObject(CoreModel):
     """
     uuid = models.UUIDField('UUID', default=uuid.uuid4, editable=False)
     misp_id = models.PositiveIntegerField('MISP ID')
-    misp_uuid = models.UUIDField('MISP UUID', unique=True)
+    misp_uuid = models.UUIDField('MISP UUID')
     name = models.CharField('Name', max_length=255)
     meta_category = models.CharField('Meta Category', max_length=255)
     description = models.TextField('Description', blank=True)
@@ -316,7 +340,7 @@ class MISPObject(CoreModel):
     event = models.ForeignKey(
         MISPEvent,
         on_delete=models.CASCADE,
-        related_name='objects',
+        related_name='misp_objects',  # 'objects' would shadow MISPEvent.objects
         verbose_name='MISP Event'
     )
     company = models.ForeignKey(
@@ -343,6 +367,12 @@ class MISPObject(CoreModel):
             models.Index(fields=['misp_id']),
             models.Index(fields=['misp_uuid']),
         ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['event', 'misp_uuid'],
+                name='unique_object_uuid_per_misp_event'
+            )
+        ]
     
     def __str__(self):
         return f"{self.name} ({self.misp_id}) - {self.event.info}"
@@ -24,10 +24,14 @@ class MISPServerSerializer(serializers.ModelSerializer):
         model = MISPServer
         fields = [
             'id', 'name', 'url', 'description', 'verify_ssl', 
-            'is_active', 'last_sync', 'sync_interval_hours',
+            'is_active', 'last_sync', 'sync_interval_hours', 'sync_max_concurrency',
+            'last_sync_duration', 'last_sync_events_per_second', 'last_sync_attributes_per_second',
             'company', 'created_by', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at', 'last_sync']
+        read_only_fields = [
+            'id', 'created_at', 'updated_at', 'last_sync',
+            'last_sync_duration', 'last_sync_events_per_second', 'last_sync_attributes_per_second'
+        ]
 
 
 class MISPServerDetailSerializer(MISPServerSerializer):
@@ -47,7 +51,7 @@ class MISPServerCreateSerializer(serializers.ModelSerializer):
         model = MISPServer
         fields = [
             'name', 'url', 'api_key', 'description', 'verify_ssl', 
-            'is_active', 'sync_interval_hours', 'company'
+            'is_active', 'sync_interval_hours', 'sync_max_concurrency', 'company'
         ]
     
     def create(self, validated_data):
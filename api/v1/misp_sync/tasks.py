@@ -1,33 +1,238 @@
 import logging
+from celery import chord, shared_task
+from django.conf import settings
 from django.utils import timezone
 from django.db import transaction
 from api.core.tasks import audit_task
+from api.v1.misp_sync.conversion import MISPEventConverter
+from api.v1.misp_sync.coordination import MISPSyncLock, ServerConcurrencyLimiter
 from api.v1.misp_sync.models import MISPServer, MISPEvent, MISPAttribute, MISPObject
-from api.v1.misp_sync.enums import MISPSyncStatusEnum, MISPThreatLevelEnum
+from api.v1.misp_sync.enums import MISPSyncStatusEnum
 from api.v1.audit_logs.enums import EntityTypeEnum, ActionTypeEnum
 import json
-from datetime import timedelta, datetime
+import math
+import time
+from datetime import timedelta, datetime, timezone as dt_timezone
 from pymisp import PyMISP, MISPEvent as PyMISPEvent
-from alerts.models import Alert
-from api.v1.alerts.enums import AlertSeverityEnum, AlertStatusEnum
-from incidents.models import Incident
-from api.v1.incidents.enums import IncidentSeverityEnum, IncidentStatusEnum
-from observables.models import Observable
-from api.v1.observables.enums import ObservableTypeEnum
 import uuid
 
 logger = logging.getLogger('api')
 
 
+def _misp_timestamp(value):
+    """Convert a MISP epoch timestamp to an aware datetime."""
+    return datetime.fromtimestamp(int(value), tz=dt_timezone.utc)
+
+
+def _search_event_page(misp, since, page, page_size, until=None):
+    """
+    Fetch one page of published events modified at or after ``since``.
+    
+    Args:
+        misp: PyMISP client
+        since: Epoch seconds passed as the MISP ``timestamp`` filter
+        page: 1-based page number
+        page_size: Events per page
+        until: Epoch seconds closing the range, or None for no upper bound
+        
+    Returns:
+        list: Event dicts of the page
+    """
+    response = misp.search(
+        controller='events',
+        timestamp=[since, until] if until is not None else since,
+        published=True,
+        page=page,
+        limit=page_size,
+        pythonify=False
+    )
+    if isinstance(response, dict):
+        if response.get('errors'):
+            raise RuntimeError(f"MISP search failed: {response['errors']}")
+        response = response.get('response', [])
+    return [item.get('Event', item) for item in response]
+
+
+# Columns rewritten when a stored row is seen again; the local uuid and
+# created_at of the first import are kept. Rows are unique per server
+# (events) or per event (attributes, objects), so a stored row never
+# changes owner.
+EVENT_UPDATE_FIELDS = [
+    'misp_id', 'info', 'threat_level_id', 'analysis', 'date', 'published', 'timestamp',
+    'distribution', 'org_name', 'orgc_name', 'raw_data', 'updated_at'
+]
+ATTRIBUTE_UPDATE_FIELDS = [
+    'misp_id', 'type', 'category', 'value', 'to_ids', 'distribution', 'timestamp',
+    'comment', 'raw_data', 'updated_at'
+]
+OBJECT_UPDATE_FIELDS = [
+    'misp_id', 'name', 'meta_category', 'description', 'template_uuid', 'template_version',
+    'timestamp', 'distribution', 'comment', 'deleted', 'raw_data', 'updated_at'
+]
+
+
+def _build_event(server, event_data):
+    return MISPEvent(
+        misp_uuid=event_data.get('uuid'),
+        misp_id=event_data.get('id'),
+        info=event_data.get('info'),
+        threat_level_id=event_data.get('threat_level_id', 2),
+        analysis=event_data.get('analysis', 0),
+        date=event_data.get('date'),
+        published=event_data.get('published', False),
+        timestamp=_misp_timestamp(event_data.get('timestamp')),
+        distribution=event_data.get('distribution', 0),
+        org_name=event_data.get('Org', {}).get('name', ''),
+        orgc_name=event_data.get('Orgc', {}).get('name', ''),
+        raw_data=event_data,
+        misp_server=server,
+        company=server.company,
+    )
+
+
+def _build_attribute(event, attr_data):
+    return MISPAttribute(
+        misp_uuid=attr_data.get('uuid'),
+        misp_id=attr_data.get('id'),
+        type=attr_data.get('type'),
+        category=attr_data.get('category'),
+        value=attr_data.get('value'),
+        to_ids=attr_data.get('to_ids', False),
+        distribution=attr_data.get('distribution', 0),
+        timestamp=_misp_timestamp(attr_data.get('timestamp')),
+        comment=attr_data.get('comment', ''),
+        raw_data=attr_data,
+        event=event,
+        company=event.company,
+    )
+
+
+def _build_object(event, obj_data):
+    return MISPObject(
+        misp_uuid=obj_data.get('uuid'),
+        misp_id=obj_data.get('id'),
+        name=obj_data.get('name'),
+        meta_category=obj_data.get('meta-category'),
+        description=obj_data.get('description', ''),
+        template_uuid=obj_data.get('template_uuid'),
+        template_version=obj_data.get('template_version'),
+        timestamp=_misp_timestamp(obj_data.get('timestamp')),
+        distribution=obj_data.get('distribution', 0),
+        comment=obj_data.get('comment', ''),
+        deleted=obj_data.get('deleted', False),
+        raw_data=obj_data,
+        event=event,
+        company=event.company,
+    )
+
+
+def _upsert_rows(model, rows, update_fields):
+    """
+    Insert or update event children in one statement keyed on (event, misp_uuid).
+    
+    Existing rows are read with a single IN query so they keep their
+    primary key. A UUID repeated within an event keeps its last
+    occurrence, as one upsert statement cannot touch the same row twice.
+    
+    Returns:
+        int: Number of rows written
+    """
+    by_key = {(row.event_id, uuid.UUID(str(row.misp_uuid))): row for row in rows}
+    if not by_key:
+        return 0
+    existing = {
+        (event_id, misp_uuid): row_id
+        for event_id, misp_uuid, row_id in model.objects.filter(
+            event_id__in={event_id for event_id, _ in by_key},
+            misp_uuid__in={misp_uuid for _, misp_uuid in by_key}
+        ).values_list('event_id', 'misp_uuid', 'id')
+    }
+    for key, row in by_key.items():
+        row.misp_uuid = key[1]
+        if key in existing:
+            row.id = existing[key]
+    model.objects.bulk_create(
+        list(by_key.values()),
+        batch_size=settings.MISP_SYNC_BULK_BATCH_SIZE,
+        update_conflicts=True,
+        unique_fields=['event', 'misp_uuid'],
+        update_fields=update_fields
+    )
+    return len(by_key)
+
+
+def _sync_event_page(server, events):
+    """
+    Store one page of events, skipping those that did not change.
+    
+    Events whose MISP timestamp is not newer than the stored copy are
+    skipped. The rest are written set-wise: one lookup and one upsert per
+    model for the whole page, whatever the number of attributes and
+    objects. Must run inside the page's transaction.
+    
+    Returns:
+        dict: Counts of events, attributes and objects written and events skipped
+    """
+    # Only this server's copies count; other servers may store the same event
+    stored = {
+        (server_id, misp_uuid): (event_id, timestamp)
+        for server_id, misp_uuid, event_id, timestamp in MISPEvent.objects.filter(
+            misp_server=server, misp_uuid__in=[event['uuid'] for event in events]
+        ).values_list('misp_server_id', 'misp_uuid', 'id', 'timestamp')
+    }
+    
+    changed = {}
+    skipped = 0
+    for event_data in events:
+        misp_uuid = uuid.UUID(str(event_data['uuid']))
+        event_id, stored_timestamp = stored.get((server.id, misp_uuid), (None, None))
+        if stored_timestamp is not None and stored_timestamp >= _misp_timestamp(event_data['timestamp']):
+            skipped += 1
+            continue
+        event = _build_event(server, event_data)
+        if event_id:
+            event.id = event_id
+        changed[misp_uuid] = (event, event_data)
+    
+    attributes, objects = [], []
+    for event, event_data in changed.values():
+        attributes.extend(_build_attribute(event, attr_data) for attr_data in event_data.get('Attribute', []))
+        objects.extend(_build_object(event, obj_data) for obj_data in event_data.get('Object', []))
+    
+    # Event ids are known up front, so the children can be written right after
+    if changed:
+        MISPEvent.objects.bulk_create(
+            [event for event, _ in changed.values()],
+            batch_size=settings.MISP_SYNC_BULK_BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=['misp_server', 'misp_uuid'],
+            update_fields=EVENT_UPDATE_FIELDS
+        )
+    return {
+        'events': len(changed),
+        'attributes': _upsert_rows(MISPAttribute, attributes, ATTRIBUTE_UPDATE_FIELDS),
+        'objects': _upsert_rows(MISPObject, objects, OBJECT_UPDATE_FIELDS),
+        'skipped': skipped,
+    }
+
+
 @audit_task(entity_type=EntityTypeEnum.MISP_EVENT, action=ActionTypeEnum.SYNC)
 def sync_misp_server(server_id, days_back=7, max_events=1000):
     """
-    Synchronize events from a MISP server.
+    Incrementally synchronize events from a MISP server.
+    
+    Events are requested page by page with the MISP ``timestamp`` filter,
+    starting at the server's sync watermark (or ``days_back`` days ago on
+    the first sync). Each page is written in its own transaction together
+    with the server's sync cursor, so an interrupted run resumes after the
+    last committed page. The watermark moves to the newest event timestamp
+    once every page has been read.
     
     Args:
         server_id: ID of the MISPServer to sync
-        days_back: Number of days to go back for synchronization
-        max_events: Maximum number of events to retrieve
+        days_back: Days to go back when the server has no watermark yet
+        max_events: Maximum number of events to read in this run; the
+            remaining pages are read by the next run
         
     Returns:
         dict: Synchronization result
@@ -39,145 +244,67 @@ def sync_misp_server(server_id, days_back=7, max_events=1000):
         # Update last_sync timestamp
         server.last_sync = timezone.now()
         server.save(update_fields=['last_sync'])
+        started = time.monotonic()
         
-        # Log sync start
-        logger.info(f"Starting MISP sync for server {server.name} (ID: {server.id})")
+        # Resume an unfinished run, or start from the watermark
+        cursor = server.sync_cursor or {}
+        if cursor:
+            since = cursor['since']
+            page = cursor['page'] + 1
+            newest = cursor.get('max_timestamp')
+        else:
+            start = server.sync_watermark or timezone.now() - timedelta(days=days_back)
+            since = int(start.timestamp())
+            page = 1
+            newest = None
+        page_size = max(min(settings.MISP_SYNC_PAGE_SIZE, max_events), 1)
         
-        # Calculate the date range for synchronization
-        from_date = (timezone.now() - timedelta(days=days_back)).strftime('%Y-%m-%d')
+        logger.info(f"Starting MISP sync for server {server.name} (ID: {server.id}) from timestamp {since}, page {page}")
         
         # Initialize PyMISP
         misp = PyMISP(server.url, server.api_key, server.verify_ssl)
         
-        # Fetch events from the MISP server
-        logger.info(f"Fetching events from {server.url} since {from_date}")
-        events = misp.search(controller='events', date_from=from_date, limit=max_events, published=True)
-        
         # Track statistics
-        imported_events = 0
-        imported_objects = 0
-        imported_attributes = 0
+        totals = {'events': 0, 'attributes': 0, 'objects': 0, 'skipped': 0}
+        events_read = pages = 0
+        completed = False
+        
+        while events_read < max_events:
+            events = _search_event_page(misp, since, page, page_size)
+            if not events:
+                completed = True
+                break
+            
+            with transaction.atomic():
+                stats = _sync_event_page(server, events)
+                newest = max([int(event['timestamp']) for event in events] + ([newest] if newest else []))
+                server.sync_cursor = {'since': since, 'page': page, 'max_timestamp': newest}
+                server.save(update_fields=['sync_cursor'])
+            
+            for key, value in stats.items():
+                totals[key] += value
+            events_read += len(events)
+            pages += 1
+            
+            if len(events) < page_size:
+                completed = True
+                break
+            page += 1
+        
+        # Throughput of this run, fetching included
+        duration = max(time.monotonic() - started, 1e-6)
+        server.last_sync_duration = round(duration, 3)
+        server.last_sync_events_per_second = round(totals['events'] / duration, 2)
+        server.last_sync_attributes_per_second = round(totals['attributes'] / duration, 2)
+        metric_fields = ['last_sync_duration', 'last_sync_events_per_second', 'last_sync_attributes_per_second']
         
-        # Process each event
-        if 'response' in events and events['response']:
-            for event_data in events['response']:
-                if 'Event' in event_data:
-                    event_data = event_data['Event']
-                    
-                    # Check if event already exists
-                    event_uuid = event_data.get('uuid')
-                    existing_event = MISPEvent.objects.filter(uuid=event_uuid).first()
-                    
-                    if existing_event:
-                        logger.info(f"Updating existing event {event_data.get('id')} - {event_data.get('info')}")
-                        event = existing_event
-                        # Update event data
-                        event.info = event_data.get('info')
-                        event.threat_level_id = event_data.get('threat_level_id', 2)
-                        event.analysis = event_data.get('analysis', 0)
-                        event.date = event_data.get('date')
-                        event.published = event_data.get('published', False)
-                        event.timestamp = datetime.fromtimestamp(int(event_data.get('timestamp')))
-                        event.distribution = event_data.get('distribution', 0)
-                        event.org_name = event_data.get('Org', {}).get('name', '')
-                        event.orgc_name = event_data.get('Orgc', {}).get('name', '')
-                        event.raw_data = event_data
-                        event.save()
-                    else:
-                        logger.info(f"Creating new event {event_data.get('id')} - {event_data.get('info')}")
-                        # Create new event
-                        event = MISPEvent.objects.create(
-                            misp_id=event_data.get('id'),
-                            misp_uuid=event_uuid,
-                            info=event_data.get('info'),
-                            threat_level_id=event_data.get('threat_level_id', 2),
-                            analysis=event_data.get('analysis', 0),
-                            date=event_data.get('date'),
-                            published=event_data.get('published', False),
-                            timestamp=datetime.fromtimestamp(int(event_data.get('timestamp'))),
-                            distribution=event_data.get('distribution', 0),
-                            org_name=event_data.get('Org', {}).get('name', ''),
-                            orgc_name=event_data.get('Orgc', {}).get('name', ''),
-                            raw_data=event_data,
-                            misp_server=server,
-                            company=server.company
-                        )
-                        
-                    imported_events += 1
-                    
-                    # Process attributes
-                    if 'Attribute' in event_data:
-                        for attr_data in event_data['Attribute']:
-                            attr_uuid = attr_data.get('uuid')
-                            existing_attr = MISPAttribute.objects.filter(uuid=attr_uuid).first()
-                            
-                            if existing_attr:
-                                # Update existing attribute
-                                existing_attr.type = attr_data.get('type')
-                                existing_attr.category = attr_data.get('category')
-                                existing_attr.value = attr_data.get('value')
-                                existing_attr.to_ids = attr_data.get('to_ids', False)
-                                existing_attr.distribution = attr_data.get('distribution', 0)
-                                existing_attr.timestamp = datetime.fromtimestamp(int(attr_data.get('timestamp')))
-                                existing_attr.comment = attr_data.get('comment', '')
-                                existing_attr.raw_data = attr_data
-                                existing_attr.save()
-                            else:
-                                # Create new attribute
-                                MISPAttribute.objects.create(
-                                    misp_id=attr_data.get('id'),
-                                    misp_uuid=attr_uuid,
-                                    type=attr_data.get('type'),
-                                    category=attr_data.get('category'),
-                                    value=attr_data.get('value'),
-                                    to_ids=attr_data.get('to_ids', False),
-                                    distribution=attr_data.get('distribution', 0),
-                                    timestamp=datetime.fromtimestamp(int(attr_data.get('timestamp'))),
-                                    comment=attr_data.get('comment', ''),
-                                    raw_data=attr_data,
-                                    event=event,
-                                    company=server.company
-                                )
-                                imported_attributes += 1
-                    
-                    # Process objects
-                    if 'Object' in event_data:
-                        for obj_data in event_data['Object']:
-                            obj_uuid = obj_data.get('uuid')
-                            existing_obj = MISPObject.objects.filter(uuid=obj_uuid).first()
-                            
-                            if existing_obj:
-                                # Update existing object
-                                existing_obj.name = obj_data.get('name')
-                                existing_obj.meta_category = obj_data.get('meta-category')
-                                existing_obj.description = obj_data.get('description', '')
-                                existing_obj.template_uuid = obj_data.get('template_uuid')
-                                existing_obj.template_version = obj_data.get('template_version')
-                                existing_obj.timestamp = datetime.fromtimestamp(int(obj_data.get('timestamp')))
-                                existing_obj.distribution = obj_data.get('distribution', 0)
-                                existing_obj.comment = obj_data.get('comment', '')
-                                existing_obj.deleted = obj_data.get('deleted', False)
-                                existing_obj.raw_data = obj_data
-                                existing_obj.save()
-                            else:
-                                # Create new object
-                                MISPObject.objects.create(
-                                    misp_id=obj_data.get('id'),
-                                    misp_uuid=obj_uuid,
-                                    name=obj_data.get('name'),
-                                    meta_category=obj_data.get('meta-category'),
-                                    description=obj_data.get('description', ''),
-                                    template_uuid=obj_data.get('template_uuid'),
-                                    template_version=obj_data.get('template_version'),
-                                    timestamp=datetime.fromtimestamp(int(obj_data.get('timestamp'))),
-                                    distribution=obj_data.get('distribution', 0),
-                                    comment=obj_data.get('comment', ''),
-                                    deleted=obj_data.get('deleted', False),
-                                    raw_data=obj_data,
-                                    event=event,
-                                    company=server.company
-                                )
-                                imported_objects += 1
+        if completed:
+            if newest:
+                server.sync_watermark = _misp_timestamp(newest)
+            server.sync_cursor = {}
+            server.save(update_fields=['sync_watermark', 'sync_cursor'] + metric_fields)
+        else:
+            server.save(update_fields=metric_fields)
         
         # Return result
         result = {
@@ -186,15 +313,27 @@ def sync_misp_server(server_id, days_back=7, max_events=1000):
             "server_name": server.name,
             "sync_date": server.last_sync.isoformat(),
             "stats": {
-                "events_imported": imported_events,
-                "attributes_imported": imported_attributes,
-                "objects_imported": imported_objects,
+                "events_imported": totals['events'],
+                "events_skipped": totals['skipped'],
+                "attributes_imported": totals['attributes'],
+                "objects_imported": totals['objects'],
+                "pages": pages,
+                "watermark": server.sync_watermark.isoformat() if server.sync_watermark else None,
+                "resumable": not completed,
+                "duration_seconds": server.last_sync_duration,
+                "events_per_second": server.last_sync_events_per_second,
+                "attributes_per_second": server.last_sync_attributes_per_second,
                 "days_back": days_back,
                 "max_events": max_events
             }
         }
         
-        logger.info(f"MISP sync completed for server {server.name}: {imported_events} events, {imported_attributes} attributes, {imported_objects} objects")
+        logger.info(
+            f"MISP sync {'completed' if completed else 'paused'} for server {server.name}: "
+            f"{totals['events']} events ({totals['skipped']} unchanged), "
+            f"{totals['attributes']} attributes, {totals['objects']} objects in {duration:.1f}s "
+            f"({server.last_sync_events_per_second} events/s, {server.last_sync_attributes_per_second} attributes/s)"
+        )
         return result
         
     except MISPServer.DoesNotExist:
@@ -211,246 +350,338 @@ def sync_misp_server(server_id, days_back=7, max_events=1000):
         }
 
 
-@audit_task(entity_type=EntityTypeEnum.MISP_EVENT, action=ActionTypeEnum.TRANSFORM)
-def convert_misp_event_to_alert(event_id):
+def _shard_windows(since, until):
     """
-    Convert a MISP event to a SentinelIQ alert.
+    Split the epoch range [since, until] into consecutive sync windows.
+    
+    Windows are MISP_SYNC_SHARD_HOURS wide, or wider when that would make
+    more than MISP_SYNC_MAX_SHARDS of them. Bounds are inclusive, as in the
+    MISP ``timestamp`` range filter, so windows do not overlap.
+    
+    Returns:
+        list: (since, until) tuples in ascending order
+    """
+    span = until - since + 1
+    width = max(settings.MISP_SYNC_SHARD_HOURS * 3600, math.ceil(span / max(settings.MISP_SYNC_MAX_SHARDS, 1)), 1)
+    return [(start, min(start + width - 1, until)) for start in range(since, until + 1, width)]
+
+
+@audit_task(entity_type=EntityTypeEnum.MISP_EVENT, action=ActionTypeEnum.SYNC)
+def sync_misp_window(server_id, since, until):
+    """
+    Synchronize the events of a MISP server modified within one time window.
+    
+    Used for the shards of a long sync range. Every page is committed on
+    its own; the server's cursor and watermark are left alone and moved by
+    finish_misp_sync once every window of the run is done. Reading a window
+    again only rewrites the events that changed.
     
     Args:
-        event_id: ID of the MISPEvent to convert
+        server_id: ID of the MISPServer to sync
+        since: Epoch seconds opening the window
+        until: Epoch seconds closing the window
         
     Returns:
-        dict: Conversion result
+        dict: Synchronization result with the newest event timestamp read
     """
     try:
-        # Get the MISP event
-        event = MISPEvent.objects.get(id=event_id)
+        server = MISPServer.objects.get(id=server_id)
+        misp = PyMISP(server.url, server.api_key, server.verify_ssl)
+        page_size = max(settings.MISP_SYNC_PAGE_SIZE, 1)
         
-        # Check if already converted to alert
-        existing_alert = Alert.objects.filter(source="MISP", source_ref=str(event.uuid), company=event.company).first()
-        if existing_alert:
-            logger.info(f"MISP event {event.info} already converted to alert ID {existing_alert.id}")
-            return {
-                "status": "already_converted",
-                "alert_id": existing_alert.id,
-                "event_id": event.id
-            }
-            
-        # Log conversion start
-        logger.info(f"Converting MISP event {event.info} to alert")
+        totals = {'events': 0, 'attributes': 0, 'objects': 0, 'skipped': 0}
+        newest = None
+        page = 1
+        while True:
+            events = _search_event_page(misp, since, page, page_size, until=until)
+            if events:
+                with transaction.atomic():
+                    stats = _sync_event_page(server, events)
+                for key, value in stats.items():
+                    totals[key] += value
+                newest = max([int(event['timestamp']) for event in events] + ([newest] if newest else []))
+            if len(events) < page_size:
+                break
+            page += 1
         
-        with transaction.atomic():
-            # Map MISP threat level to alert severity
-            severity_mapping = {
-                MISPThreatLevelEnum.HIGH: AlertSeverityEnum.CRITICAL,
-                MISPThreatLevelEnum.MEDIUM: AlertSeverityEnum.HIGH,
-                MISPThreatLevelEnum.LOW: AlertSeverityEnum.MEDIUM,
-                MISPThreatLevelEnum.UNDEFINED: AlertSeverityEnum.LOW,
-            }
-            
-            severity = severity_mapping.get(
-                event.threat_level_id, 
-                AlertSeverityEnum.MEDIUM
-            )
-            
-            # Create the alert
-            alert = Alert.objects.create(
-                title=event.info,
-                description=f"Alert created from MISP event: {event.info}\nOrganization: {event.org_name}",
-                severity=severity,
-                status=AlertStatusEnum.NEW,
-                source="MISP",
-                source_ref=str(event.uuid),
-                external_source="MISP",
-                date=event.timestamp,
-                company=event.company,
-                created_by=event.created_by or event.company.users.filter(is_superuser=True).first(),  # Default to company admin
-                tags=event.tags or [],
-                raw_payload=event.raw_data
-            )
-            
-            # Process attributes as observables
-            for attr in event.attributes.all():
-                # Map MISP attribute types to Observable types
-                type_mapping = {
-                    'ip-src': ObservableTypeEnum.IP,
-                    'ip-dst': ObservableTypeEnum.IP,
-                    'domain': ObservableTypeEnum.DOMAIN,
-                    'hostname': ObservableTypeEnum.HOSTNAME,
-                    'url': ObservableTypeEnum.URL,
-                    'md5': ObservableTypeEnum.HASH_MD5,
-                    'sha1': ObservableTypeEnum.HASH_SHA1,
-                    'sha256': ObservableTypeEnum.HASH_SHA256,
-                    'filename': ObservableTypeEnum.FILENAME,
-                    'email': ObservableTypeEnum.EMAIL,
-                    'email-src': ObservableTypeEnum.EMAIL,
-                    'email-dst': ObservableTypeEnum.EMAIL,
-                }
-                
-                # Skip attributes that don't map to observable types
-                if attr.type not in type_mapping:
-                    continue
-                    
-                # Create or get Observable
-                observable, created = Observable.objects.get_or_create(
-                    type=type_mapping[attr.type].value,
-                    value=attr.value,
-                    company=event.company,
-                    defaults={
-                        'description': attr.comment or f"From MISP event: {event.info}",
-                        'is_ioc': attr.to_ids,
-                        'source': "MISP",
-                        'tags': attr.tags or [],
-                        'created_by': event.created_by or event.company.users.filter(is_superuser=True).first()
-                    }
-                )
-                
-                # Link observable to alert
-                alert.observables.add(observable)
-                
-            # Update artifact count
-            alert.update_artifact_count()
-            alert.save()
-            
-            # Log success
-            logger.info(f"Successfully converted MISP event {event.info} to alert ID {alert.id}")
-            
-            return {
-                "status": "completed",
-                "alert_id": alert.id,
-                "event_id": event.id,
-                "observable_count": alert.artifact_count
+        logger.info(
+            f"MISP sync window {since}-{until} done for server {server.name}: {page} pages, "
+            f"{totals['events']} events ({totals['skipped']} unchanged), {totals['attributes']} attributes"
+        )
+        return {
+            "status": MISPSyncStatusEnum.COMPLETED.value,
+            "server_id": str(server.id),
+            "since": since,
+            "until": until,
+            "max_timestamp": newest,
+            "stats": {
+                "events_imported": totals['events'],
+                "events_skipped": totals['skipped'],
+                "attributes_imported": totals['attributes'],
+                "objects_imported": totals['objects'],
+                "pages": page
             }
-    
-    except MISPEvent.DoesNotExist:
-        logger.error(f"MISP event with ID {event_id} not found")
+        }
+        
+    except MISPServer.DoesNotExist:
+        logger.error(f"MISP server with ID {server_id} not found")
         return {
-            "status": "failed",
-            "error": f"MISP event with ID {event_id} not found"
+            "status": MISPSyncStatusEnum.FAILED.value,
+            "error": f"MISP server with ID {server_id} not found"
         }
     except Exception as e:
-        logger.error(f"Error converting MISP event to alert: {str(e)}")
+        logger.exception(f"Error during MISP sync window {since}-{until} for server {server_id}: {str(e)}")
         return {
-            "status": "failed",
+            "status": MISPSyncStatusEnum.FAILED.value,
             "error": str(e)
         }
 
 
-@audit_task(entity_type=EntityTypeEnum.INCIDENT, action=ActionTypeEnum.TRANSFORM)
-def convert_misp_event_to_incident(event_id):
+@shared_task(
+    bind=True,
+    name='api.v1.misp_sync.tasks.sync_misp_shard',
+    acks_late=True,
+    max_retries=None
+)
+def sync_misp_shard(self, server_id, max_concurrency, since=None, until=None):
     """
-    Convert a MISP event directly to a SentinelIQ Incident.
+    Celery task running one shard of a coordinated MISP sync.
+    
+    The shard first takes one of the server's ``max_concurrency`` slots and
+    is retried after MISP_SYNC_SLOT_RETRY_SECONDS while they are all taken,
+    so no more than that many tasks ever query the server at once. A shard
+    without a window is a regular incremental sync_misp_server run.
     
     Args:
-        event_id: ID of the MISPEvent to convert
+        server_id: ID of the MISPServer to sync
+        max_concurrency: The server's sync_max_concurrency
+        since: Epoch seconds opening the shard's window (optional)
+        until: Epoch seconds closing the shard's window (optional)
         
     Returns:
-        dict: Conversion result
+        dict: Result of sync_misp_server or sync_misp_window
     """
+    limiter = ServerConcurrencyLimiter()
+    token = limiter.acquire(server_id, max_concurrency)
+    if token is None:
+        raise self.retry(countdown=settings.MISP_SYNC_SLOT_RETRY_SECONDS)
     try:
-        # Get the MISP event
-        event = MISPEvent.objects.get(id=event_id)
-        
-        # Log conversion start
-        logger.info(f"Converting MISP event {event.info} (ID: {event.id}) to Incident")
+        if since is None:
+            return sync_misp_server(server_id)
+        return sync_misp_window(server_id, since, until)
+    finally:
+        limiter.release(server_id, token)
+
+
+@shared_task(name='api.v1.misp_sync.tasks.finish_misp_sync')
+def finish_misp_sync(results, server_id, lock_token, started=None):
+    """
+    Chord callback closing a coordinated MISP sync run.
+    
+    For a sharded run the server's watermark moves to the newest event read
+    once every window completed; if any failed it stays put and the next
+    run reads the range again. The server lock is released in every case.
+    
+    Args:
+        results: Results of the run's shards
+        server_id: ID of the synced MISPServer
+        lock_token: Token the server lock was acquired with
+        started: Epoch seconds the sharded run was dispatched at, None for
+            a single sync_misp_server run
         
-        # Map MISP threat level to incident severity
-        severity_mapping = {
-            MISPThreatLevelEnum.HIGH: IncidentSeverityEnum.CRITICAL,
-            MISPThreatLevelEnum.MEDIUM: IncidentSeverityEnum.HIGH,
-            MISPThreatLevelEnum.LOW: IncidentSeverityEnum.MEDIUM,
-            MISPThreatLevelEnum.UNDEFINED: IncidentSeverityEnum.LOW,
-        }
+    Returns:
+        dict: Status of the run and the summed statistics of its shards
+    """
+    try:
+        failed = [result for result in results if result.get('status') != MISPSyncStatusEnum.COMPLETED.value]
+        totals = {}
+        for result in results:
+            for key in ('events_imported', 'events_skipped', 'attributes_imported', 'objects_imported'):
+                totals[key] = totals.get(key, 0) + result.get('stats', {}).get(key, 0)
         
-        severity = severity_mapping.get(
-            event.threat_level_id, 
-            IncidentSeverityEnum.MEDIUM
-        )
+        if started is not None:
+            server = MISPServer.objects.get(id=server_id)
+            duration = max(time.time() - started, 1e-6)
+            server.last_sync_duration = round(duration, 3)
+            server.last_sync_events_per_second = round(totals['events_imported'] / duration, 2)
+            server.last_sync_attributes_per_second = round(totals['attributes_imported'] / duration, 2)
+            update_fields = ['last_sync_duration', 'last_sync_events_per_second', 'last_sync_attributes_per_second']
+            
+            newest = [result['max_timestamp'] for result in results if result.get('max_timestamp')]
+            if not failed and newest:
+                watermark = _misp_timestamp(max(newest))
+                if server.sync_watermark is None or watermark > server.sync_watermark:
+                    server.sync_watermark = watermark
+                    update_fields.append('sync_watermark')
+            server.save(update_fields=update_fields)
         
-        # Create Incident
-        incident = Incident.objects.create(
-            title=f"MISP: {event.info}",
-            description=f"Incident created from MISP event: {event.info}\nOrganization: {event.org_name}",
-            severity=severity,
-            status=IncidentStatusEnum.NEW,
-            source="MISP",
-            source_reference=str(event.uuid),
-            company=event.company,
-            raw_data=event.raw_data
+        status = MISPSyncStatusEnum.FAILED.value if failed else MISPSyncStatusEnum.COMPLETED.value
+        logger.info(
+            f"MISP sync run for server {server_id} finished with status {status}: "
+            f"{len(results)} shards, {len(failed)} failed"
         )
+        return {
+            "status": status,
+            "server_id": server_id,
+            "shards": len(results),
+            "failed_shards": len(failed),
+            "stats": totals
+        }
+    finally:
+        MISPSyncLock(server_id).release(lock_token)
+
+
+def dispatch_misp_sync(server, days_back=7):
+    """
+    Start a coordinated sync run for a MISP server unless one is running.
+    
+    The server lock is taken first, so overlapping scheduler runs never sync
+    the same server twice; it is released by finish_misp_sync. A range
+    since the watermark (or ``days_back`` days) longer than one shard is
+    split into windows synced in parallel, within the server's
+    sync_max_concurrency; otherwise, or when an interrupted run left a
+    cursor to resume from, the run is a single sync_misp_server shard.
+    
+    Args:
+        server: MISPServer to sync
+        days_back: Days to go back when the server has no watermark yet
         
-        # Link back to the MISP event
-        event.incident = incident
-        event.save()
-        
-        # Convert attributes to observables
-        attributes = MISPAttribute.objects.filter(event=event)
-        
-        for attr in attributes:
-            # Map MISP attribute types to Observable types
-            type_mapping = {
-                'ip-src': ObservableTypeEnum.IP,
-                'ip-dst': ObservableTypeEnum.IP,
-                'domain': ObservableTypeEnum.DOMAIN,
-                'hostname': ObservableTypeEnum.HOSTNAME,
-                'url': ObservableTypeEnum.URL,
-                'md5': ObservableTypeEnum.HASH_MD5,
-                'sha1': ObservableTypeEnum.HASH_SHA1,
-                'sha256': ObservableTypeEnum.HASH_SHA256,
-                'filename': ObservableTypeEnum.FILENAME,
-                'email': ObservableTypeEnum.EMAIL,
-                'email-src': ObservableTypeEnum.EMAIL,
-                'email-dst': ObservableTypeEnum.EMAIL,
-            }
-            
-            obs_type = type_mapping.get(attr.type)
-            
-            if obs_type:
-                Observable.objects.create(
-                    value=attr.value,
-                    type=obs_type,
-                    tlp="AMBER",
-                    is_ioc=attr.to_ids,
-                    incident=incident,
-                    source="MISP",
-                    source_reference=str(attr.uuid),
-                    company=event.company,
-                    first_seen=attr.timestamp,
-                    last_seen=attr.timestamp,
-                    description=attr.comment if attr.comment else f"From MISP event: {event.info}"
-                )
+    Returns:
+        AsyncResult: Result of the run's chord, or None when the server is locked
+    """
+    lock = MISPSyncLock(server.id)
+    lock_token = lock.acquire()
+    if lock_token is None:
+        logger.info(f"MISP sync for server {server.name} (ID: {server.id}) is already running, skipping")
+        return None
+    
+    try:
+        server_id = str(server.id)
+        now = timezone.now()
+        start = server.sync_watermark or now - timedelta(days=days_back)
+        windows = [] if server.sync_cursor else _shard_windows(int(start.timestamp()), int(now.timestamp()))
         
-        # Return result
-        result = {
-            "status": "completed",
-            "event_id": event.id,
-            "event_info": event.info,
-            "incident_id": incident.id,
-        }
+        if len(windows) > 1:
+            header = [
+                sync_misp_shard.s(server_id, server.sync_max_concurrency, since, until)
+                for since, until in windows
+            ]
+            # Windows do not update last_sync themselves
+            server.last_sync = now
+            server.save(update_fields=['last_sync'])
+            body = finish_misp_sync.s(server_id, lock_token, started=time.time())
+        else:
+            header = [sync_misp_shard.s(server_id, server.sync_max_concurrency)]
+            body = finish_misp_sync.s(server_id, lock_token)
         
-        logger.info(f"MISP event {event.info} converted to Incident successfully (Incident ID: {incident.id})")
-        return result
+        logger.info(f"Dispatching MISP sync for server {server.name} (ID: {server.id}) in {len(header)} shards")
+        return chord(header)(body)
+    except Exception:
+        lock.release(lock_token)
+        raise
+
+
+@shared_task(name='api.v1.misp_sync.tasks.convert_misp_events_to_alerts')
+@audit_task(entity_type=EntityTypeEnum.MISP_EVENT, action=ActionTypeEnum.TRANSFORM)
+def convert_misp_events_to_alerts(event_ids):
+    """
+    Convert a set of MISP events to SentinelIQ alerts in one pass.
+    
+    Args:
+        event_ids: IDs of the MISPEvents to convert
         
-    except MISPEvent.DoesNotExist:
-        logger.error(f"MISP event with ID {event_id} not found")
+    Returns:
+        dict: Conversion result per event ID and counts per status
+    """
+    try:
+        results = MISPEventConverter().to_alerts(MISPEvent.objects.filter(id__in=event_ids))
+        return _conversion_summary(event_ids, results)
+    except Exception as e:
+        logger.exception(f"Error converting MISP events to alerts: {str(e)}")
         return {
             "status": "failed",
-            "error": f"MISP event with ID {event_id} not found"
+            "error": str(e)
         }
+
+
+@shared_task(name='api.v1.misp_sync.tasks.convert_misp_events_to_incidents')
+@audit_task(entity_type=EntityTypeEnum.INCIDENT, action=ActionTypeEnum.TRANSFORM)
+def convert_misp_events_to_incidents(event_ids):
+    """
+    Convert a set of MISP events to SentinelIQ incidents in one pass.
+    
+    Args:
+        event_ids: IDs of the MISPEvents to convert
+        
+    Returns:
+        dict: Conversion result per event ID and counts per status
+    """
+    try:
+        results = MISPEventConverter().to_incidents(MISPEvent.objects.filter(id__in=event_ids))
+        return _conversion_summary(event_ids, results)
     except Exception as e:
-        logger.exception(f"Error during MISP event conversion for event {event_id}: {str(e)}")
+        logger.exception(f"Error converting MISP events to incidents: {str(e)}")
         return {
             "status": "failed",
             "error": str(e)
         }
 
 
+def _conversion_summary(event_ids, results):
+    """Task result for a conversion; IDs matching no event are reported as failed."""
+    results = {str(event_id): result for event_id, result in results.items()}
+    for event_id in map(str, event_ids):
+        results.setdefault(event_id, {"status": "failed", "error": f"MISP event with ID {event_id} not found"})
+    summary = {}
+    for result in results.values():
+        summary[result['status']] = summary.get(result['status'], 0) + 1
+    return {
+        "status": "completed",
+        "results": results,
+        "summary": summary
+    }
+
+
+def _single_conversion(event_id, converted):
+    result = converted['results'][str(event_id)] if 'results' in converted else converted
+    return {**result, "event_id": event_id}
+
+
+def convert_misp_event_to_alert(event_id):
+    """
+    Convert a MISP event to a SentinelIQ alert.
+    
+    Args:
+        event_id: ID of the MISPEvent to convert
+        
+    Returns:
+        dict: Conversion result
+    """
+    return _single_conversion(event_id, convert_misp_events_to_alerts([event_id]))
+
+
+def convert_misp_event_to_incident(event_id):
+    """
+    Convert a MISP event directly to a SentinelIQ Incident.
+    
+    Args:
+        event_id: ID of the MISPEvent to convert
+        
+    Returns:
+        dict: Conversion result
+    """
+    return _single_conversion(event_id, convert_misp_events_to_incidents([event_id]))
+
+
+@shared_task(name='api.v1.misp_sync.tasks.schedule_misp_sync_for_active_servers')
 @audit_task(entity_type=EntityTypeEnum.MISP_EVENT, action=ActionTypeEnum.SYNC)
 def schedule_misp_sync_for_active_servers():
     """
     Schedule synchronization for all active MISP servers based on their sync interval.
     
     This task is intended to be run periodically to check for servers that need synchronization.
+    Each due server gets its own chord of sync shards (see dispatch_misp_sync), so servers
+    are synced in parallel; servers whose previous run still holds the lock are skipped.
     """
     now = timezone.now()
     
@@ -458,19 +689,22 @@ def schedule_misp_sync_for_active_servers():
     active_servers = MISPServer.objects.filter(is_active=True)
     
     sync_scheduled = 0
+    sync_running = 0
     for server in active_servers:
         # Check if server needs sync based on last_sync and sync_interval_hours
         if server.last_sync is None or (now - server.last_sync) > timedelta(hours=server.sync_interval_hours):
-            # Schedule sync task
-            sync_misp_server.delay(server.id)
+            if dispatch_misp_sync(server) is None:
+                sync_running += 1
+                continue
             sync_scheduled += 1
             
             logger.info(f"Scheduled MISP sync for server {server.name} (ID: {server.id})")
     
-    logger.info(f"Scheduled MISP sync for {sync_scheduled} servers")
+    logger.info(f"Scheduled MISP sync for {sync_scheduled} servers ({sync_running} already running)")
     
     return {
         "status": "completed",
         "servers_scheduled": sync_scheduled,
+        "servers_already_running": sync_running,
         "total_active_servers": active_servers.count()
-    } 
\ No newline at end of file
+    }
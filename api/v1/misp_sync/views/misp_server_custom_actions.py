@@ -121,7 +121,7 @@ class MISPServerCustomActionsMixin:
                 # Get event statistics
                 total_events = instance.events.count()
                 total_attributes = sum(event.attributes.count() for event in instance.events.all())
-                total_objects = sum(event.objects.count() for event in instance.events.all())
+                total_objects = sum(event.misp_objects.count() for event in instance.events.all())
                 
                 # Get the latest events
                 latest_events = instance.events.order_by('-timestamp')[:5]
@@ -83,15 +83,18 @@ class AuditSummaryReportView(APIView):
         # Prepare base queryset
         queryset = LogEntry.objects.filter(timestamp__gte=start_date)
         
-        # Apply company filter
+        # Apply company filter on the indexed columns, which also carry the timestamp
         user = request.user
         if not user.is_superuser and hasattr(user, 'company') and user.company:
             company_id = str(user.company.id)
-            queryset = queryset.filter(additional_data__company_id=company_id)
+            queryset = queryset.filter(
+                audit_index__company_id=company_id,
+                audit_index__timestamp__gte=start_date
+            )
         
         # Apply additional filters
         if entity_type:
-            queryset = queryset.filter(additional_data__entity_type=entity_type)
+            queryset = queryset.filter(audit_index__entity_type=entity_type)
             
         if user_id:
             queryset = queryset.filter(actor_id=user_id)
@@ -111,9 +114,9 @@ class AuditSummaryReportView(APIView):
         
         # 2. Distribution by entity type
         entity_counts = queryset.filter(
-            additional_data__entity_type__isnull=False
+            audit_index__entity_type__isnull=False
         ).values(
-            'additional_data__entity_type'
+            'audit_index__entity_type'
         ).annotate(
             count=Count('id')
         ).order_by('-count')
@@ -121,7 +124,7 @@ class AuditSummaryReportView(APIView):
         entity_data = []
         for item in entity_counts:
             entity_data.append({
-                'entity_type': item['additional_data__entity_type'],
+                'entity_type': item['audit_index__entity_type'],
                 'count': item['count']
             })
         
@@ -248,7 +251,10 @@ class UserActivityReportView(APIView):
         user = request.user
         if not user.is_superuser and hasattr(user, 'company') and user.company:
             company_id = str(user.company.id)
-            queryset = queryset.filter(additional_data__company_id=company_id)
+            queryset = queryset.filter(
+                audit_index__company_id=company_id,
+                audit_index__timestamp__gte=start_date
+            )
         
         # Total number of actions
         total_actions = queryset.count()
@@ -282,9 +288,9 @@ class UserActivityReportView(APIView):
         
         # 2. Most accessed entities
         entity_counts = queryset.filter(
-            additional_data__entity_type__isnull=False
+            audit_index__entity_type__isnull=False
         ).values(
-            'additional_data__entity_type'
+            'audit_index__entity_type'
         ).annotate(
             count=Count('id')
         ).order_by('-count')
@@ -292,7 +298,7 @@ class UserActivityReportView(APIView):
         entity_data = []
         for item in entity_counts:
             entity_data.append({
-                'entity_type': item['additional_data__entity_type'],
+                'entity_type': item['audit_index__entity_type'],
                 'count': item['count'],
                 'percentage': round((item['count'] / total_actions) * 100, 2)
             })
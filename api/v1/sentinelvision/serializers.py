@@ -166,7 +166,7 @@ class FeedExecutionRecordSerializer(serializers.ModelSerializer):
         fields = (
             'id', 'feed', 'feed_name', 'executed_by', 'source',
             'status', 'started_at', 'ended_at', 'duration_seconds',
-            'log', 'iocs_processed', 'error_message'
+            'log', 'iocs_processed', 'error_message', 'ingestion_stats'
         )
         read_only_fields = fields 
 
@@ -0,0 +1,144 @@
+# Generated by Django 5.2.18 on 2026-10-16 20:33
+
+import json
+import uuid
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+# Frozen copy of incidents.models.TIMELINE_ENTRY_TYPE_MAP
+ENTRY_TYPE_MAP = {
+    'note': 'note',
+    'update': 'updated',
+    'assignment': 'assigned',
+    'status_change': 'status_changed',
+    'alert_link': 'alert_linked',
+    'task_update': 'task_added',
+    'action': 'action',
+    'system': 'system',
+}
+EVENT_TYPES = {
+    'created', 'updated', 'status_changed', 'assigned', 'alert_linked', 'task_added',
+    'task_completed', 'note', 'action', 'system', 'closed', 'other',
+}
+BATCH_SIZE = 1000
+
+
+def _entry_timestamp(entry, default):
+    try:
+        timestamp = datetime.fromisoformat(str(entry.get('timestamp')))
+    except ValueError:
+        return default
+    if timezone.is_naive(timestamp):
+        timestamp = timezone.make_aware(timestamp, dt_timezone.utc)
+    return timestamp
+
+
+def _entry_uuid(incident_id, entry):
+    try:
+        return uuid.UUID(str(entry.get('id')))
+    except ValueError:
+        # Derived from the content so re-runs map the entry to the same event
+        content = json.dumps(entry, sort_keys=True, default=str)
+        return uuid.uuid5(uuid.NAMESPACE_URL, f"incident-timeline:{incident_id}:{content}")
+
+
+def backfill_timeline_events(apps, schema_editor):
+    """
+    Copy Incident.timeline JSON entries into TimelineEvent rows.
+
+    Entries that already have an event (same id, or recorded as
+    metadata.timeline_entry_id) are skipped, users are resolved in one query
+    per batch and events are written with bulk_create. The JSON column is then
+    trimmed to the INCIDENT_TIMELINE_CACHE_SIZE most recent entries; each
+    original entry is kept in the metadata of its event.
+    """
+    Incident = apps.get_model('incidents', 'Incident')
+    TimelineEvent = apps.get_model('incidents', 'TimelineEvent')
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    cache_size = getattr(settings, 'INCIDENT_TIMELINE_CACHE_SIZE', 20)
+
+    incidents = (
+        Incident.objects.exclude(timeline=[]).exclude(timeline__isnull=True)
+        .only('id', 'company_id', 'created_at', 'timeline')
+    )
+    batch = []
+    for incident in incidents.iterator(chunk_size=BATCH_SIZE):
+        if isinstance(incident.timeline, list) and incident.timeline:
+            batch.append(incident)
+        if len(batch) >= BATCH_SIZE:
+            _backfill_batch(batch, TimelineEvent, Incident, User, cache_size)
+            batch = []
+    if batch:
+        _backfill_batch(batch, TimelineEvent, Incident, User, cache_size)
+
+
+def _backfill_batch(incidents, TimelineEvent, Incident, User, cache_size):
+    existing = TimelineEvent.objects.filter(incident__in=incidents)
+    synced = {str(pk) for pk in existing.values_list('id', flat=True)}
+    synced.update(
+        entry_id for entry_id in existing.values_list('metadata__timeline_entry_id', flat=True) if entry_id
+    )
+
+    user_ids = {
+        int(entry['created_by'])
+        for incident in incidents for entry in incident.timeline
+        if isinstance(entry, dict) and str(entry.get('created_by') or '').isdigit()
+    }
+    users = set(User.objects.filter(pk__in=user_ids).values_list('pk', flat=True))
+
+    events = []
+    for incident in incidents:
+        for entry in incident.timeline:
+            if not isinstance(entry, dict):
+                continue
+            event_id = _entry_uuid(incident.id, entry)
+            entry_id = str(entry.get('id') or event_id)
+            if str(event_id) in synced or entry_id in synced:
+                continue
+
+            entry_type = entry.get('type') or 'note'
+            metadata = {'timeline_entry_id': entry_id, 'original_entry': entry}
+            if entry_type not in EVENT_TYPES:
+                metadata['entry_type'] = entry_type
+            user_id = str(entry.get('created_by') or '')
+            events.append(TimelineEvent(
+                id=event_id,
+                incident_id=incident.id,
+                company_id=incident.company_id,
+                type=entry_type if entry_type in EVENT_TYPES else ENTRY_TYPE_MAP.get(entry_type, 'note'),
+                title=str(entry.get('title') or 'Event')[:200],
+                message=entry.get('content') or '',
+                user_id=int(user_id) if user_id.isdigit() and int(user_id) in users else None,
+                timestamp=_entry_timestamp(entry, incident.created_at),
+                metadata=metadata,
+            ))
+    TimelineEvent.objects.bulk_create(events, batch_size=BATCH_SIZE, ignore_conflicts=True)
+
+    for incident in incidents:
+        incident.timeline = incident.timeline[-cache_size:] if cache_size else []
+    Incident.objects.bulk_update(incidents, ['timeline'], batch_size=BATCH_SIZE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0001_initial'),
+        ('incidents', '0002_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='incident',
+            name='timeline',
+            field=models.JSONField(blank=True, default=list, help_text='Cached summary of the most recent timeline entries; TimelineEvent holds the full timeline', verbose_name='Timeline'),
+        ),
+        migrations.AddIndex(
+            model_name='timelineevent',
+            index=models.Index(fields=['incident', '-timestamp', '-id'], name='timeline_incident_keyset_idx'),
+        ),
+        migrations.RunPython(backfill_timeline_events, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,6 @@
 import uuid
 import json
+from django.conf import settings
 from django.db import models
 from django.contrib.postgres.fields import ArrayField
 from django.contrib.auth import get_user_model
@@ -28,6 +29,34 @@ class UUIDEncoder(json.JSONEncoder):
         return super().default(obj)
 
 
+# Legacy timeline entry types mapped to TimelineEvent types
+TIMELINE_ENTRY_TYPE_MAP = {
+    'note': TimelineEventTypeEnum.NOTE.value,
+    'update': TimelineEventTypeEnum.UPDATED.value,
+    'assignment': TimelineEventTypeEnum.ASSIGNED.value,
+    'status_change': TimelineEventTypeEnum.STATUS_CHANGED.value,
+    'alert_link': TimelineEventTypeEnum.ALERT_LINKED.value,
+    'task_update': TimelineEventTypeEnum.TASK_ADDED.value,
+    'action': TimelineEventTypeEnum.ACTION.value,
+    'system': TimelineEventTypeEnum.SYSTEM.value,
+}
+
+TIMELINE_EVENT_TYPES = {member.value for member in TimelineEventTypeEnum}
+
+
+def timeline_event_type(entry_type):
+    """
+    Returns the TimelineEvent type for a timeline entry type.
+    
+    Accepts TimelineEventTypeEnum values and the legacy JSON timeline types;
+    anything else is recorded as a note.
+    """
+    entry_type = getattr(entry_type, 'value', entry_type)
+    if entry_type in TIMELINE_EVENT_TYPES:
+        return entry_type
+    return TIMELINE_ENTRY_TYPE_MAP.get(entry_type, TimelineEventTypeEnum.NOTE.value)
+
+
 class Incident(CoreModel):
     """
     Security incident model for the Sentineliq system.
@@ -72,8 +101,8 @@ class Incident(CoreModel):
         default=IncidentPAPEnum.AMBER.value
     )
     
-    # Field tracker
-    tracker = FieldTracker(fields=['status', 'assignee', 'severity', 'tlp', 'pap'])
+    # Field tracker; snapshots loaded values on init so saves can be diffed without a query
+    tracker = FieldTracker(fields=['status', 'assignee', 'severity', 'tlp', 'pap', 'description'])
     
     # MITRE ATT&CK Fields
     primary_technique = models.ForeignKey(
@@ -127,7 +156,7 @@ class Incident(CoreModel):
         'Timeline',
         default=list,
         blank=True,
-        help_text='Chronological order of events and actions'
+        help_text='Cached summary of the most recent timeline entries; TimelineEvent holds the full timeline'
     )
     custom_fields = models.JSONField(
         'Custom Fields',
@@ -227,42 +256,79 @@ class Incident(CoreModel):
         self.save(update_fields=['status', 'end_date'])
         return True
     
-    def add_timeline_entry(self, title, content=None, event_type='note', created_by=None):
+    def add_timeline_entry(self, title, content=None, event_type='note', created_by=None,
+                           timestamp=None, metadata=None):
         """
         Adds a new entry to the incident timeline.
         
+        The entry is one TimelineEvent insert. When INCIDENT_TIMELINE_CACHE_SIZE
+        is set, the most recent entries are also cached in the ``timeline``
+        column with a queryset update, so the incident is not saved.
+        
         Args:
             title (str): Title of the timeline entry
             content (str, optional): Content or message
             event_type (str, optional): Type of event
             created_by (User, optional): User who created the entry
+            timestamp (datetime, optional): When the event happened (default: now)
+            metadata (dict, optional): Extra data stored on the event
             
         Returns:
             dict: The newly created timeline entry
         """
-        # Create a new timeline entry
-        entry = {
-            "id": str(uuid.uuid4()),
-            "title": title,
-            "content": content or "",
-            "type": event_type,
-            "timestamp": timezone.now().isoformat(),
-        }
+        event_type = getattr(event_type, 'value', event_type)
+        metadata = dict(metadata or {})
+        if event_type not in TIMELINE_EVENT_TYPES:
+            # Keep the caller's type (evidence, communication...) for the entry format
+            metadata['entry_type'] = event_type
         
-        # Add user info if provided
-        if created_by:
-            entry["created_by"] = str(created_by.id)
-            entry["created_by_name"] = created_by.get_full_name() or created_by.username
+        event = TimelineEvent.objects.create(
+            incident=self,
+            company_id=self.company_id,
+            type=timeline_event_type(event_type),
+            title=title[:200],
+            message=content or "",
+            user=created_by,
+            timestamp=timestamp or timezone.now(),
+            metadata=metadata
+        )
+        entry = event.as_timeline_entry()
         
-        # Add to timeline
-        if not self.timeline:
-            self.timeline = []
-            
-        self.timeline.append(entry)
-        self.save(update_fields=['timeline'])
+        cache_size = getattr(settings, 'INCIDENT_TIMELINE_CACHE_SIZE', 0)
+        if cache_size:
+            self.timeline = ((self.timeline or []) + [entry])[-cache_size:]
+            Incident.objects.filter(pk=self.pk).update(timeline=self.timeline)
         
         return entry
     
+    def get_timeline(self, limit=50, cursor=None):
+        """
+        Returns one page of the timeline, newest first.
+        
+        Pages are read with a keyset on (timestamp, id), so the cost of a page
+        does not depend on how deep into the timeline it is.
+        
+        Args:
+            limit (int): Maximum number of events to return
+            cursor (tuple, optional): (timestamp, id) of the last event of the previous page
+            
+        Returns:
+            tuple: (list of TimelineEvent, cursor for the next page or None)
+        """
+        events = self.timeline_events.select_related('user').order_by('-timestamp', '-id')
+        if cursor:
+            timestamp, event_id = cursor
+            events = events.filter(
+                models.Q(timestamp__lt=timestamp) | models.Q(timestamp=timestamp, id__lt=event_id)
+            )
+        
+        page = list(events[:limit + 1])
+        next_cursor = None
+        if len(page) > limit:
+            page = page[:limit]
+            next_cursor = (page[-1].timestamp, page[-1].id)
+        return page, next_cursor
+    
     def calculate_impact_score(self):
         """
         Calculates an impact score based on severity, number of observables, and tasks.
@@ -430,11 +496,29 @@ class TimelineEvent(CoreModel):
             models.Index(fields=['incident']),
             models.Index(fields=['company']),
             models.Index(fields=['timestamp']),
+            # Keyset pagination of Incident.get_timeline
+            models.Index(fields=['incident', '-timestamp', '-id'], name='timeline_incident_keyset_idx'),
         ]
     
     def __str__(self):
         return f"{self.title} ({self.get_type_display()}) - {self.incident.title}"
     
+    def as_timeline_entry(self):
+        """
+        Returns the event in the timeline entry format of the ``timeline`` cache.
+        """
+        entry = {
+            "id": str(self.id),
+            "title": self.title,
+            "content": self.message or "",
+            "type": (self.metadata or {}).get('entry_type', self.type),
+            "timestamp": self.timestamp.isoformat() if hasattr(self.timestamp, 'isoformat') else self.timestamp,
+        }
+        if self.user_id:
+            entry["created_by"] = str(self.user_id)
+            entry["created_by_name"] = self.user.get_full_name() or self.user.username
+        return entry
+    
     def save(self, *args, **kwargs):
         # Ensure the company is always the same as the incident's
         if self.incident and not self.company_id:
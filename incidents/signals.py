@@ -1,5 +1,6 @@
 import logging
 import json
+from django.db import transaction
 from django.db.models.signals import post_save, m2m_changed, pre_save, post_delete
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
@@ -12,114 +13,133 @@ User = get_user_model()
 logger = logging.getLogger('api.incidents')
 
 
+def _choice_display(field_name, value):
+    """Display label of a choice field value of Incident."""
+    choices = dict(Incident._meta.get_field(field_name).flatchoices)
+    return str(choices.get(value, value))
+
+
+def _incident_change_events(instance, changed):
+    """
+    Builds unsaved TimelineEvents for the changed tracked fields of an incident.
+    
+    Args:
+        instance (Incident): Incident being saved
+        changed (dict): Tracked field name -> previous value
+        
+    Returns:
+        list: TimelineEvent instances to insert
+    """
+    events = []
+    
+    def add(event_type, title, message, metadata):
+        events.append(TimelineEvent(
+            incident=instance,
+            company_id=instance.company_id,
+            type=event_type,
+            title=title[:200],
+            message=message,
+            metadata=metadata
+        ))
+    
+    if 'description' in changed:
+        add(
+            TimelineEventTypeEnum.UPDATED.value,
+            "Description updated",
+            "Incident description was updated",
+            {
+                'field': 'description',
+                'old_value_length': len(changed['description'] or ''),
+                'new_value_length': len(instance.description or '')
+            }
+        )
+    
+    for field_name, label, event_type in (
+        ('status', 'Status', TimelineEventTypeEnum.STATUS_CHANGED.value),
+        ('severity', 'Severity', TimelineEventTypeEnum.UPDATED.value),
+    ):
+        if field_name in changed:
+            old_display = _choice_display(field_name, changed[field_name])
+            new_display = _choice_display(field_name, getattr(instance, field_name))
+            add(
+                event_type,
+                f"{label} changed: {old_display} → {new_display}",
+                f"Incident {field_name} was changed from {old_display} to {new_display}",
+                {'field': field_name, 'old_value': changed[field_name], 'new_value': getattr(instance, field_name)}
+            )
+    
+    if 'assignee' in changed:
+        old_id, new_id = changed['assignee'], instance.assignee_id
+        names = {
+            user.pk: user.get_full_name()
+            for user in User.objects.filter(pk__in=[pk for pk in (old_id, new_id) if pk])
+        }
+        old_assignee = names.get(old_id, "Unassigned")
+        new_assignee = names.get(new_id, "Unassigned")
+        add(
+            TimelineEventTypeEnum.ASSIGNED.value,
+            f"Assignee changed: {old_assignee} → {new_assignee}",
+            f"Incident assignee was changed from {old_assignee} to {new_assignee}",
+            {
+                'field': 'assignee',
+                'old_value': str(old_id) if old_id else None,
+                'new_value': str(new_id) if new_id else None
+            }
+        )
+    
+    for field_name, label in (('tlp', 'TLP'), ('pap', 'PAP')):
+        if field_name in changed:
+            old_display = _choice_display(field_name, changed[field_name])
+            new_display = _choice_display(field_name, getattr(instance, field_name))
+            add(
+                TimelineEventTypeEnum.UPDATED.value,
+                f"{label} changed: {old_display} → {new_display}",
+                f"Incident {label} level was changed from {old_display} to {new_display}",
+                {'field': field_name, 'old_value': changed[field_name], 'new_value': getattr(instance, field_name)}
+            )
+    
+    return events
+
+
 @receiver(pre_save, sender=Incident)
-def track_incident_field_changes(sender, instance, **kwargs):
+def track_incident_field_changes(sender, instance, update_fields=None, **kwargs):
     """
     Tracks changes in incident fields and creates timeline events for significant changes.
+    
+    The previous values come from the field tracker snapshot taken when the
+    instance was loaded, so no extra SELECT is issued. All events of a save
+    are written with one bulk_create once the transaction commits; bulk
+    inserts also skip the per-row audit log entries of TimelineEvent. The
+    write is a robust callback, so a failure is logged without affecting the
+    committed save or the other on_commit callbacks.
     """
     # Skip for new incidents as they'll get the CREATED event instead
-    if not instance.pk:
+    if instance._state.adding:
         return
     
     try:
-        # Get the incident as it exists in the database
-        old_incident = Incident.objects.get(pk=instance.pk)
+        changed = instance.tracker.changed()
+        if update_fields is not None:
+            # Only fields actually written by this save count as changes
+            saved = {Incident._meta.get_field(name).name for name in update_fields}
+            changed = {name: value for name, value in changed.items() if name in saved}
+        if not changed:
+            return
         
-        # Track changes to description
-        if old_incident.description != instance.description:
-            TimelineEvent.objects.create(
-                incident=instance,
-                type=TimelineEventTypeEnum.UPDATED.value,
-                title="Description updated",
-                message=f"Incident description was updated",
-                company=instance.company,
-                metadata={
-                    'field': 'description',
-                    'old_value_length': len(old_incident.description),
-                    'new_value_length': len(instance.description)
-                }
-            )
+        events = _incident_change_events(instance, changed)
+        if not events:
+            return
         
-        # Track status changes
-        if old_incident.status != instance.status:
-            TimelineEvent.objects.create(
-                incident=instance,
-                type=TimelineEventTypeEnum.STATUS_CHANGED.value,
-                title=f"Status changed: {old_incident.get_status_display()} → {instance.get_status_display()}",
-                message=f"Incident status was changed from {old_incident.get_status_display()} to {instance.get_status_display()}",
-                company=instance.company,
-                metadata={
-                    'field': 'status',
-                    'old_value': old_incident.status,
-                    'new_value': instance.status
-                }
-            )
+        incident_id = instance.pk
         
-        # Track severity changes
-        if old_incident.severity != instance.severity:
-            TimelineEvent.objects.create(
-                incident=instance,
-                type=TimelineEventTypeEnum.UPDATED.value,
-                title=f"Severity changed: {old_incident.get_severity_display()} → {instance.get_severity_display()}",
-                message=f"Incident severity was changed from {old_incident.get_severity_display()} to {instance.get_severity_display()}",
-                company=instance.company,
-                metadata={
-                    'field': 'severity',
-                    'old_value': old_incident.severity,
-                    'new_value': instance.severity
-                }
-            )
+        def create_timeline_events():
+            try:
+                TimelineEvent.objects.bulk_create(events)
+            except Exception as e:
+                logger.error(f"Error creating timeline events for incident {incident_id}: {str(e)}")
+                raise
         
-        # Track assignee changes
-        if old_incident.assignee != instance.assignee:
-            old_assignee = old_incident.assignee.get_full_name() if old_incident.assignee else "Unassigned"
-            new_assignee = instance.assignee.get_full_name() if instance.assignee else "Unassigned"
-            
-            TimelineEvent.objects.create(
-                incident=instance,
-                type=TimelineEventTypeEnum.ASSIGNED.value,
-                title=f"Assignee changed: {old_assignee} → {new_assignee}",
-                message=f"Incident assignee was changed from {old_assignee} to {new_assignee}",
-                company=instance.company,
-                metadata={
-                    'field': 'assignee',
-                    'old_value': str(old_incident.assignee.id) if old_incident.assignee else None,
-                    'new_value': str(instance.assignee.id) if instance.assignee else None
-                }
-            )
-            
-        # Track TLP/PAP changes
-        if old_incident.tlp != instance.tlp:
-            TimelineEvent.objects.create(
-                incident=instance,
-                type=TimelineEventTypeEnum.UPDATED.value,
-                title=f"TLP changed: {old_incident.get_tlp_display()} → {instance.get_tlp_display()}",
-                message=f"Incident TLP level was changed from {old_incident.get_tlp_display()} to {instance.get_tlp_display()}",
-                company=instance.company,
-                metadata={
-                    'field': 'tlp',
-                    'old_value': old_incident.tlp,
-                    'new_value': instance.tlp
-                }
-            )
-            
-        if old_incident.pap != instance.pap:
-            TimelineEvent.objects.create(
-                incident=instance,
-                type=TimelineEventTypeEnum.UPDATED.value,
-                title=f"PAP changed: {old_incident.get_pap_display()} → {instance.get_pap_display()}",
-                message=f"Incident PAP level was changed from {old_incident.get_pap_display()} to {instance.get_pap_display()}",
-                company=instance.company,
-                metadata={
-                    'field': 'pap',
-                    'old_value': old_incident.pap,
-                    'new_value': instance.pap
-                }
-            )
-    
-    except Incident.DoesNotExist:
-        # This shouldn't happen, but just in case
-        logger.warning(f"Could not find incident with ID {instance.pk} to track changes")
+        transaction.on_commit(create_timeline_events, robust=True)
     except Exception as e:
         logger.error(f"Error tracking incident field changes for {instance.pk}: {str(e)}")
 
@@ -127,98 +147,27 @@ def track_incident_field_changes(sender, instance, **kwargs):
 @receiver(post_save, sender=Incident)
 def sync_timeline_to_events(sender, instance, created, **kwargs):
     """
-    Syncs the timeline JSONField entries to TimelineEvent model instances.
-    Only creates new entries that don't yet exist in the database.
-    """
-    if created:
-        # If a new incident is created, add a "created" event
-        try:
-            TimelineEvent.objects.create(
-                incident=instance,
-                type=TimelineEventTypeEnum.CREATED.value,
-                title="Incident created",
-                message=f"Incident '{instance.title}' was created",
-                user=instance.created_by,
-                company=instance.company,
-                timestamp=instance.created_at
-            )
-        except Exception as e:
-            logger.error(f"Error creating timeline event for new incident {instance.id}: {str(e)}")
+    Records the "created" timeline event for new incidents.
     
-    # Skip if no timeline data
-    if not instance.timeline or not isinstance(instance.timeline, list):
+    Timeline entries are written as TimelineEvent rows by
+    Incident.add_timeline_entry, so saves no longer scan the ``timeline``
+    JSON column for entries to copy.
+    """
+    if not created:
         return
     
-    # Track which timeline entries we've already processed
     try:
-        # Get IDs of existing timeline events in the database
-        existing_event_ids = set(TimelineEvent.objects.filter(
+        TimelineEvent.objects.create(
             incident=instance,
-            metadata__timeline_entry_id__isnull=False
-        ).values_list('metadata__timeline_entry_id', flat=True))
-        
-        # Process each entry in the timeline JSONField
-        for entry in instance.timeline:
-            entry_id = entry.get('id')
-            
-            # Skip if we've already processed this entry
-            if not entry_id or entry_id in existing_event_ids:
-                continue
-            
-            # Map timeline entry to event type
-            entry_type = entry.get('type', 'note')
-            event_type = TimelineEventTypeEnum.NOTE.value
-            
-            # Map common types
-            if entry_type == 'note':
-                event_type = TimelineEventTypeEnum.NOTE.value
-            elif entry_type == 'assignment':
-                event_type = TimelineEventTypeEnum.ASSIGNED.value
-            elif entry_type == 'status_change':
-                event_type = TimelineEventTypeEnum.STATUS_CHANGED.value
-            elif entry_type == 'alert_link':
-                event_type = TimelineEventTypeEnum.ALERT_LINKED.value
-            elif entry_type == 'task_update':
-                event_type = TimelineEventTypeEnum.TASK_ADDED.value
-            elif entry_type == 'action':
-                event_type = TimelineEventTypeEnum.ACTION.value
-            elif entry_type == 'system':
-                event_type = TimelineEventTypeEnum.SYSTEM.value
-            
-            # Get user if available
-            user = None
-            created_by_id = entry.get('created_by')
-            if created_by_id:
-                try:
-                    user = User.objects.get(id=created_by_id)
-                except User.DoesNotExist:
-                    logger.warning(f"User {created_by_id} referenced in timeline entry not found")
-            
-            # Prepare timestamp
-            entry_timestamp = entry.get('timestamp')
-            if not entry_timestamp:
-                entry_timestamp = timezone.now()
-            
-            # Create timeline event
-            TimelineEvent.objects.create(
-                incident=instance,
-                type=event_type,
-                title=entry.get('title', 'Event'),
-                message=entry.get('content', ''),
-                user=user,
-                company=instance.company,
-                timestamp=entry_timestamp,
-                metadata={
-                    'timeline_entry_id': entry_id,
-                    'original_entry': entry
-                }
-            )
-            
-            # Add to processed set
-            existing_event_ids.add(entry_id)
-            
+            type=TimelineEventTypeEnum.CREATED.value,
+            title="Incident created",
+            message=f"Incident '{instance.title}' was created",
+            user=instance.created_by,
+            company=instance.company,
+            timestamp=instance.created_at
+        )
     except Exception as e:
-        logger.error(f"Error syncing timeline entries for incident {instance.id}: {str(e)}")
+        logger.error(f"Error creating timeline event for new incident {instance.id}: {str(e)}")
 
 
 # Observable related signals
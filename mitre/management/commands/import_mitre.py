@@ -61,6 +61,10 @@ class Command(BaseCommand):
                 f"- Relationships: {result['relationships']}"
             ))
             
+            timings = result.get('timings')
+            if timings:
+                self.stdout.write("Timings (s): " + ", ".join(f"{phase}: {seconds}" for phase, seconds in timings.items()))
+            
         except Exception as e:
             self.stdout.write(self.style.ERROR(f"Error importing MITRE ATT&CK data: {str(e)}"))
             logger.exception("Error in import_mitre command")
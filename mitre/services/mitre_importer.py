@@ -1,5 +1,7 @@
 import json
 import logging
+import time
+from contextlib import contextmanager
 import requests
 from django.db import transaction
 from django.conf import settings
@@ -7,6 +9,7 @@ from mitre.models import (
     MitreTactic, 
     MitreTechnique, 
     MitreMitigation, 
+    MitreMitigationMapping,
     MitreRelationship
 )
 
@@ -19,15 +22,41 @@ class MitreImporter:
     """
     DEFAULT_JSON_URL = "https://raw.githubusercontent.com/mitre/cti/master/enterprise-attack/enterprise-attack.json"
     
+    # STIX object types imported, by index group
+    STIX_TYPES = {
+        "x-mitre-tactic": "tactics",
+        "attack-pattern": "techniques",
+        "course-of-action": "mitigations",
+        "relationship": "relationships",
+    }
+    
     def __init__(self):
         self.stats = {
             "tactics": 0,
             "techniques": 0,
             "subtechniques": 0,
             "mitigations": 0,
-            "relationships": 0
+            "relationships": 0,
+            # Rows that were already stored and were updated in place
+            "updated": {
+                "tactics": 0,
+                "techniques": 0,
+                "subtechniques": 0,
+                "mitigations": 0,
+                "relationships": 0
+            },
+            "timings": {}
         }
     
+    @contextmanager
+    def _phase(self, name):
+        """Record the duration of an import phase in stats['timings'] (seconds)"""
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.stats["timings"][name] = round(time.monotonic() - started, 3)
+    
     def run_full_sync(self, source_type="json", url=None, force=False, skip_relationships=False):
         """
         Run a full sync of MITRE ATT&CK data
@@ -42,6 +71,7 @@ class MitreImporter:
             Dict with statistics on imported items
         """
         logger.info(f"Running MITRE ATT&CK full sync using {source_type} source")
+        started = time.monotonic()
         
         # Reset stats
         self.stats = {
@@ -49,36 +79,56 @@ class MitreImporter:
             "techniques": 0,
             "subtechniques": 0,
             "mitigations": 0,
-            "relationships": 0
+            "relationships": 0,
+            # Rows that were already stored and were updated in place
+            "updated": {
+                "tactics": 0,
+                "techniques": 0,
+                "subtechniques": 0,
+                "mitigations": 0,
+                "relationships": 0
+            },
+            "timings": {}
         }
         
         # Fetch data based on source type
-        if source_type == "json":
-            data = self._fetch_json_data(url)
-        elif source_type == "taxii":
-            data = self._fetch_taxii_data(url)
-        else:
-            raise ValueError(f"Unsupported source type: {source_type}")
+        with self._phase("fetch"):
+            if source_type == "json":
+                data = self._fetch_json_data(url)
+            elif source_type == "taxii":
+                data = self._fetch_taxii_data(url)
+            else:
+                raise ValueError(f"Unsupported source type: {source_type}")
+        
+        # One pass over the bundle; the phases below only read the index
+        with self._phase("index"):
+            index = self._build_index(data)
         
         # Process data within a transaction
         with transaction.atomic():
             # If force is True, delete all existing data
             if force:
                 logger.warning("Deleting all existing MITRE ATT&CK data")
-                MitreRelationship.objects.all().delete()
-                MitreMitigation.objects.all().delete()
-                MitreTechnique.objects.all().delete()
-                MitreTactic.objects.all().delete()
+                with self._phase("delete"):
+                    MitreRelationship.objects.all().delete()
+                    MitreMitigation.objects.all().delete()
+                    MitreTechnique.objects.all().delete()
+                    MitreTactic.objects.all().delete()
             
             # Process objects by type
-            self._process_tactics(data)
-            self._process_techniques(data)
-            self._process_mitigations(data)
+            with self._phase("tactics"):
+                tactic_ids = self._process_tactics(index)
+            with self._phase("techniques"):
+                technique_ids = self._process_techniques(index, tactic_ids)
+            with self._phase("mitigations"):
+                mitigation_ids = self._process_mitigations(index)
             
             # Process relationships if not skipped
             if not skip_relationships:
-                self._process_relationships(data)
+                with self._phase("relationships"):
+                    self._process_relationships(index, technique_ids, mitigation_ids)
         
+        self.stats["timings"]["total"] = round(time.monotonic() - started, 3)
         logger.info(f"MITRE ATT&CK sync completed: {self.stats}")
         return self.stats
     
@@ -102,173 +152,227 @@ class MitreImporter:
         logger.warning("TAXII data fetching not fully implemented")
         raise NotImplementedError("TAXII data fetching not implemented")
     
-    def _process_tactics(self, data):
-        """Process and import tactics from STIX data"""
-        logger.info("Processing MITRE ATT&CK tactics")
+    def _build_index(self, data):
+        """
+        Index a STIX bundle in one pass over its objects.
         
+        Returns:
+            dict: Objects of the types the importer handles grouped under
+            ``tactics``, ``techniques``, ``mitigations`` and ``relationships``,
+            and ``external_ids`` mapping STIX ids to ATT&CK external ids
+        """
+        index = {"tactics": [], "techniques": [], "mitigations": [], "relationships": [], "external_ids": {}}
         for obj in data.get("objects", []):
-            if obj.get("type") == "x-mitre-tactic" and obj.get("name"):
-                external_id = obj.get("external_references", [{}])[0].get("external_id", "")
-                
-                if not external_id:
-                    continue
-                
-                tactic, created = MitreTactic.objects.update_or_create(
-                    external_id=external_id,
-                    defaults={
-                        "name": obj.get("name", ""),
-                        "description": obj.get("description", "")
-                    }
-                )
-                
-                if created:
-                    self.stats["tactics"] += 1
+            group = self.STIX_TYPES.get(obj.get("type"))
+            if group is None:
+                continue
+            index[group].append(obj)
+            external_id = self._external_id(obj)
+            if external_id:
+                index["external_ids"][obj.get("id")] = external_id
+        return index
+    
+    @staticmethod
+    def _external_id(obj):
+        """ATT&CK id of a STIX object, taken from its mitre-attack reference"""
+        references = obj.get("external_references") or [{}]
+        reference = next((ref for ref in references if ref.get("source_name") == "mitre-attack"), references[0])
+        return reference.get("external_id", "")
+    
+    def _resolve_ids(self, model, rows, extra_external_ids=()):
+        """
+        Give rows that are already stored their primary key, with one query.
+        
+        Rows built later against these ids (parents, links) then point at
+        the stored rows. ``rows`` must not repeat an external id.
+        
+        Returns:
+            tuple: (id by external id for the rows and the extra ids found,
+            set of external ids not stored yet)
+        """
+        external_ids = {row.external_id for row in rows} | set(extra_external_ids)
+        existing = dict(model.objects.filter(external_id__in=external_ids).values_list("external_id", "id"))
+        new = set()
+        for row in rows:
+            if row.external_id in existing:
+                row.id = existing[row.external_id]
+            else:
+                new.add(row.external_id)
+        return {**existing, **{row.external_id: row.id for row in rows}}, new
+    
+    def _bulk_upsert(self, model, rows, update_fields, unique_fields=("external_id",)):
+        """Insert or update rows in one statement per MITRE_IMPORT_BATCH_SIZE rows"""
+        model.objects.bulk_create(
+            rows,
+            batch_size=settings.MITRE_IMPORT_BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=list(unique_fields),
+            update_fields=list(update_fields) + ["updated_at"]
+        )
+    
+    @staticmethod
+    def _unique(rows, key=lambda row: row.external_id):
+        """Drop repeated keys, keeping the last occurrence as update_or_create did"""
+        return list({key(row): row for row in rows}.values())
+    
+    def _process_tactics(self, index):
+        """
+        Upsert tactics from the STIX index.
+        
+        Returns:
+            dict: Tactic id by lowercase name and by x_mitre_shortname, the
+            forms kill_chain_phases refer to tactics by
+        """
+        logger.info("Processing MITRE ATT&CK tactics")
+        
+        rows = []
+        aliases = {}
+        for obj in index["tactics"]:
+            external_id = self._external_id(obj)
+            if not (external_id and obj.get("name")):
+                continue
+            rows.append(MitreTactic(
+                external_id=external_id,
+                name=obj.get("name", ""),
+                description=obj.get("description", "")
+            ))
+            aliases[external_id] = {obj["name"].lower(), obj.get("x_mitre_shortname", "").lower()} - {""}
+        
+        rows = self._unique(rows)
+        ids, new = self._resolve_ids(MitreTactic, rows)
+        self._bulk_upsert(MitreTactic, rows, ["name", "description"])
+        self.stats["tactics"] += len(new)
+        self.stats["updated"]["tactics"] += len(rows) - len(new)
+        return {alias: ids[external_id] for external_id, names in aliases.items() for alias in names}
     
-    def _process_techniques(self, data):
-        """Process and import techniques from STIX data"""
+    def _process_techniques(self, index, tactic_ids):
+        """
+        Upsert techniques and sub-techniques and link them to their tactics.
+        
+        Parents are resolved in memory, so sub-techniques are written with
+        their parent_technique in the same statement, and all tactic links
+        are added with one bulk insert.
+        
+        Returns:
+            dict: Technique id by external id
+        """
         logger.info("Processing MITRE ATT&CK techniques")
         
-        # First, create all techniques
-        for obj in data.get("objects", []):
-            if obj.get("type") == "attack-pattern" and obj.get("name"):
-                external_references = obj.get("external_references", [])
-                if not external_references:
-                    continue
-                
-                external_id = external_references[0].get("external_id", "")
-                if not external_id:
-                    continue
-                
-                # Determine if this is a sub-technique
-                is_subtechnique = "." in external_id
-                parent_external_id = None
-                
-                if is_subtechnique:
-                    parent_external_id = external_id.split(".")[0]
-                
-                # Get platforms
-                platforms = obj.get("x_mitre_platforms", [])
-                
-                # Create or update technique
-                technique, created = MitreTechnique.objects.update_or_create(
-                    external_id=external_id,
-                    defaults={
-                        "name": obj.get("name", ""),
-                        "description": obj.get("description", ""),
-                        "platforms": platforms,
-                        "detection": obj.get("x_mitre_detection", ""),
-                        "is_subtechnique": is_subtechnique
-                    }
-                )
-                
-                # Link to tactics based on kill_chain_phases
-                kill_chain_phases = obj.get("kill_chain_phases", [])
-                for phase in kill_chain_phases:
-                    phase_name = phase.get("phase_name", "")
-                    if phase_name:
-                        tactics = MitreTactic.objects.filter(name__iexact=phase_name)
-                        for tactic in tactics:
-                            technique.tactics.add(tactic)
-                
-                if created:
-                    if is_subtechnique:
-                        self.stats["subtechniques"] += 1
-                    else:
-                        self.stats["techniques"] += 1
+        rows = []
+        phases = {}
+        for obj in index["techniques"]:
+            external_id = self._external_id(obj)
+            if not (external_id and obj.get("name")):
+                continue
+            rows.append(MitreTechnique(
+                external_id=external_id,
+                name=obj.get("name", ""),
+                description=obj.get("description", ""),
+                platforms=obj.get("x_mitre_platforms", []),
+                detection=obj.get("x_mitre_detection", ""),
+                is_subtechnique="." in external_id
+            ))
+            phases[external_id] = [phase.get("phase_name", "").lower() for phase in obj.get("kill_chain_phases", [])]
         
-        # Now link sub-techniques to parent techniques
-        for obj in data.get("objects", []):
-            if obj.get("type") == "attack-pattern" and "." in obj.get("external_references", [{}])[0].get("external_id", ""):
-                external_id = obj.get("external_references", [{}])[0].get("external_id", "")
-                parent_external_id = external_id.split(".")[0]
-                
-                try:
-                    technique = MitreTechnique.objects.get(external_id=external_id)
-                    parent = MitreTechnique.objects.get(external_id=parent_external_id)
-                    technique.parent_technique = parent
-                    technique.save()
-                except MitreTechnique.DoesNotExist:
-                    logger.warning(f"Could not link sub-technique {external_id} to parent {parent_external_id}")
+        rows = self._unique(rows)
+        # Parents missing from the bundle may already be stored
+        parents = {row.external_id.split(".")[0] for row in rows if row.is_subtechnique}
+        technique_ids, new = self._resolve_ids(MitreTechnique, rows, parents)
+        for row in rows:
+            if row.is_subtechnique:
+                parent_external_id = row.external_id.split(".")[0]
+                row.parent_technique_id = technique_ids.get(parent_external_id)
+                if row.parent_technique_id is None:
+                    logger.warning(f"Could not link sub-technique {row.external_id} to parent {parent_external_id}")
+        
+        self._bulk_upsert(
+            MitreTechnique, rows,
+            ["name", "description", "platforms", "detection", "is_subtechnique", "parent_technique"]
+        )
+        for row in rows:
+            kind = "subtechniques" if row.is_subtechnique else "techniques"
+            if row.external_id in new:
+                self.stats[kind] += 1
+            else:
+                self.stats["updated"][kind] += 1
+        
+        Through = MitreTechnique.tactics.through
+        Through.objects.bulk_create([
+            Through(mitretechnique_id=technique_ids[external_id], mitretactic_id=tactic_ids[phase])
+            for external_id, names in phases.items()
+            for phase in dict.fromkeys(names)
+            if phase in tactic_ids
+        ], batch_size=settings.MITRE_IMPORT_BATCH_SIZE, ignore_conflicts=True)
+        return technique_ids
     
-    def _process_mitigations(self, data):
-        """Process and import mitigations from STIX data"""
+    def _process_mitigations(self, index):
+        """
+        Upsert mitigations from the STIX index.
+        
+        Returns:
+            dict: Mitigation id by external id
+        """
         logger.info("Processing MITRE ATT&CK mitigations")
         
-        for obj in data.get("objects", []):
-            if obj.get("type") == "course-of-action" and obj.get("name"):
-                external_references = obj.get("external_references", [])
-                if not external_references:
-                    continue
-                
-                external_id = external_references[0].get("external_id", "")
-                if not external_id:
-                    continue
-                
-                mitigation, created = MitreMitigation.objects.update_or_create(
-                    external_id=external_id,
-                    defaults={
-                        "name": obj.get("name", ""),
-                        "description": obj.get("description", "")
-                    }
-                )
-                
-                if created:
-                    self.stats["mitigations"] += 1
+        rows = self._unique([
+            MitreMitigation(
+                external_id=self._external_id(obj),
+                name=obj.get("name", ""),
+                description=obj.get("description", "")
+            )
+            for obj in index["mitigations"]
+            if obj.get("name") and self._external_id(obj)
+        ])
+        mitigation_ids, new = self._resolve_ids(MitreMitigation, rows)
+        self._bulk_upsert(MitreMitigation, rows, ["name", "description"])
+        self.stats["mitigations"] += len(new)
+        self.stats["updated"]["mitigations"] += len(rows) - len(new)
+        return mitigation_ids
     
-    def _process_relationships(self, data):
-        """Process and import relationships between MITRE objects"""
+    def _process_relationships(self, index, technique_ids, mitigation_ids):
+        """
+        Upsert relationships and link mitigations to the techniques they mitigate.
+        
+        Both ends of a "mitigates" relationship are resolved through the
+        index instead of scanning the bundle, and the links are added with
+        one bulk insert.
+        """
         logger.info("Processing MITRE ATT&CK relationships")
         
-        for obj in data.get("objects", []):
-            if obj.get("type") == "relationship":
-                source_ref = obj.get("source_ref", "")
-                target_ref = obj.get("target_ref", "")
-                relationship_type = obj.get("relationship_type", "")
-                
-                if not (source_ref and target_ref and relationship_type):
-                    continue
-                
-                # Process mitigation relationships
-                if relationship_type == "mitigates" and source_ref.startswith("course-of-action"):
-                    self._link_mitigation_to_technique(source_ref, target_ref, data)
-                
-                # Create generic relationship record
-                relationship, created = MitreRelationship.objects.update_or_create(
-                    source_id=source_ref,
-                    target_id=target_ref,
-                    relationship_type=relationship_type,
-                    defaults={
-                        "description": obj.get("description", "")
-                    }
-                )
-                
-                if created:
-                    self.stats["relationships"] += 1
-    
-    def _link_mitigation_to_technique(self, mitigation_ref, technique_ref, data):
-        """Link a mitigation to a technique based on STIX references"""
-        try:
-            # Find the external IDs
-            mitigation_obj = next((obj for obj in data.get("objects", []) 
-                                  if obj.get("id") == mitigation_ref), None)
-            technique_obj = next((obj for obj in data.get("objects", []) 
-                                  if obj.get("id") == technique_ref), None)
-            
-            if not (mitigation_obj and technique_obj):
-                return
-            
-            mitigation_external_id = mitigation_obj.get("external_references", [{}])[0].get("external_id", "")
-            technique_external_id = technique_obj.get("external_references", [{}])[0].get("external_id", "")
+        rows = []
+        links = set()
+        for obj in index["relationships"]:
+            source_ref = obj.get("source_ref", "")
+            target_ref = obj.get("target_ref", "")
+            relationship_type = obj.get("relationship_type", "")
             
-            if not (mitigation_external_id and technique_external_id):
-                return
+            if not (source_ref and target_ref and relationship_type):
+                continue
             
-            # Get or create the MitreMitigationMapping
-            mitigation = MitreMitigation.objects.filter(external_id=mitigation_external_id).first()
-            technique = MitreTechnique.objects.filter(external_id=technique_external_id).first()
+            if relationship_type == "mitigates" and source_ref.startswith("course-of-action"):
+                mitigation_id = mitigation_ids.get(index["external_ids"].get(source_ref))
+                technique_id = technique_ids.get(index["external_ids"].get(target_ref))
+                if mitigation_id and technique_id:
+                    links.add((mitigation_id, technique_id))
             
-            if mitigation and technique:
-                mitigation.techniques.add(technique)
-        except Exception as e:
-            logger.warning(f"Error linking mitigation to technique: {str(e)}")
-            # No need to raise, just log the warning 
\ No newline at end of file
+            rows.append(MitreRelationship(
+                source_id=source_ref,
+                target_id=target_ref,
+                relationship_type=relationship_type,
+                description=obj.get("description", "")
+            ))
+        
+        key_fields = ("source_id", "target_id", "relationship_type")
+        rows = self._unique(rows, key=lambda row: (row.source_id, row.target_id, row.relationship_type))
+        existing = set(MitreRelationship.objects.filter(
+            source_id__in={row.source_id for row in rows}
+        ).values_list(*key_fields))
+        self._bulk_upsert(MitreRelationship, rows, ["description"], unique_fields=key_fields)
+        created = sum(1 for row in rows if (row.source_id, row.target_id, row.relationship_type) not in existing)
+        self.stats["relationships"] += created
+        self.stats["updated"]["relationships"] += len(rows) - created
+        
+        MitreMitigationMapping.objects.bulk_create([
+            MitreMitigationMapping(mitigation_id=mitigation_id, technique_id=technique_id)
+            for mitigation_id, technique_id in links
+        ], batch_size=settings.MITRE_IMPORT_BATCH_SIZE, ignore_conflicts=True)
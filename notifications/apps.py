@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class NotificationsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "notifications"
+
+    def ready(self):
+        """
+        Perform app initialization when Django starts.
+        """
+        # Import signals to ensure they are registered
+        import notifications.signals
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-16 20:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='notificationdeliverystatus',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('sent', 'Sent'), ('delivered', 'Delivered'), ('failed', 'Failed'), ('coalesced', 'Coalesced into digest')], default='pending', max_length=20),
+        ),
+    ]
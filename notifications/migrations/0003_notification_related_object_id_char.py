@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0002_delivery_status_coalesced'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='notification',
+            name='related_object_id',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+    ]
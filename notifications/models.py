@@ -104,7 +104,7 @@ class Notification(CoreModel):
     
     # Optional related objects
     related_object_type = models.CharField(max_length=50, blank=True, null=True)
-    related_object_id = models.IntegerField(blank=True, null=True)
+    related_object_id = models.CharField(max_length=64, blank=True, null=True)
     
     # Optional reference to the rule that triggered this notification
     triggered_by_rule = models.ForeignKey(NotificationRule, on_delete=models.SET_NULL, 
@@ -180,6 +180,7 @@ class NotificationDeliveryStatus(CoreModel):
         ('sent', 'Sent'),
         ('delivered', 'Delivered'),
         ('failed', 'Failed'),
+        ('coalesced', 'Coalesced into digest'),
     )
     
     notification = models.ForeignKey(Notification, on_delete=models.CASCADE, related_name='delivery_statuses')
@@ -0,0 +1,4 @@
+from notifications.services.coalesce import ChannelRateLimiter, schedule_digest_flush
+from notifications.services.delivery import NotificationDeliveryEngine, get_http_session, smtp_pool
+
+__all__ = ['ChannelRateLimiter', 'NotificationDeliveryEngine', 'get_http_session', 'schedule_digest_flush', 'smtp_pool']
@@ -0,0 +1,218 @@
+import math
+import time
+from functools import partial
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+FLUSH_SCHEDULED_CACHE_KEY = 'notifications:digest:{company_id}:{rule_id}:{channel_id}'
+RATE_LIMIT_KEY = 'notifications:rate:{channel_id}'
+
+PRIORITY_ORDER = ['low', 'medium', 'high', 'critical']
+
+# Refill the bucket for the elapsed time, then take ``cost`` tokens or
+# return how long the caller has to wait for them. Returned as a string so
+# fractional waits survive the Lua to Redis number conversion.
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= cost then
+    tokens = tokens - cost
+else
+    wait = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return tostring(wait)
+"""
+
+_redis_client = None
+
+
+def _get_redis():
+    global _redis_client
+    if _redis_client is None:
+        import redis
+        _redis_client = redis.Redis.from_url(settings.NOTIFICATION_REDIS_URL)
+    return _redis_client
+
+
+class ChannelRateLimiter:
+    """
+    Token bucket per notification channel, shared by all workers through Redis.
+
+    Limits come from NOTIFICATION_CHANNEL_RATE_LIMITS per channel type and can
+    be overridden per channel with ``config['rate_limit'] = {'rate': ..., 'burst': ...}``.
+    Channel types without a limit are never throttled.
+    """
+
+    def __init__(self, client=None):
+        self.client = client
+        self._script = None
+
+    def limits(self, channel):
+        """(tokens per second, burst) for a channel, or None when unlimited."""
+        override = (channel.config or {}).get('rate_limit')
+        if override:
+            return float(override['rate']), int(override['burst'])
+        return settings.NOTIFICATION_CHANNEL_RATE_LIMITS.get(channel.channel_type)
+
+    def acquire(self, channel, cost=1):
+        """
+        Take ``cost`` tokens from the channel's bucket.
+
+        Returns:
+            float: 0 when the tokens were taken, otherwise seconds to wait
+        """
+        limits = self.limits(channel)
+        if not limits or cost <= 0:
+            return 0
+        rate, burst = limits
+        if self._script is None:
+            self._script = (self.client or _get_redis()).register_script(TOKEN_BUCKET_SCRIPT)
+        # A call larger than the bucket could never be served; cap it at the burst
+        wait = self._script(
+            keys=[RATE_LIMIT_KEY.format(channel_id=channel.id)],
+            args=[rate, burst, time.time(), min(cost, burst)]
+        )
+        return float(wait)
+
+
+def outbound_calls(channel, recipient_count):
+    """Number of outbound requests the delivery engine makes for one send."""
+    if channel.channel_type in ('slack', 'mattermost'):
+        return 1
+    if channel.channel_type == 'email':
+        return math.ceil(recipient_count / max(settings.NOTIFICATION_EMAIL_BCC_BATCH_SIZE, 1))
+    if channel.channel_type == 'webhook':
+        return recipient_count
+    return 0
+
+
+def schedule_digest_flush(notification, channel_id):
+    """
+    Deliver a rule-triggered notification once its coalescing window ends.
+
+    The first notification of a (company, rule, channel) window schedules
+    flush_notification_digest; the ones that follow within
+    NOTIFICATION_COALESCE_WINDOW seconds only add pending deliveries to it.
+    A window of 0 delivers every notification on its own.
+
+    Args:
+        notification: Notification with triggered_by_rule set and delivery rows queued
+        channel_id: ID of the channel the rows were queued for
+    """
+    from notifications.tasks import deliver_pending_notifications, flush_notification_digest
+
+    window = settings.NOTIFICATION_COALESCE_WINDOW
+    if window <= 0:
+        transaction.on_commit(partial(deliver_pending_notifications.delay, notification.id, channel_id))
+        return
+
+    args = [str(notification.company_id), str(notification.triggered_by_rule_id), str(channel_id)]
+    # The key outlives the window so a lost flush only delays the next one
+    if cache.add(digest_flush_key(*args), 1, window * 2):
+        transaction.on_commit(partial(flush_notification_digest.apply_async, args=args, countdown=window))
+
+
+def digest_flush_key(company_id, rule_id, channel_id):
+    return FLUSH_SCHEDULED_CACHE_KEY.format(company_id=company_id, rule_id=rule_id, channel_id=channel_id)
+
+
+def build_digest(rule, channel, notifications, recipients):
+    """
+    Create one digest notification standing in for several notifications.
+
+    Args:
+        rule: NotificationRule the notifications were triggered by
+        channel: NotificationChannel the digest is sent through
+        notifications (list): Coalesced Notification instances, oldest first
+        recipients (list): Users receiving the digest
+
+    Returns:
+        Notification: Saved digest with its recipients
+    """
+    from notifications.models import Notification
+    from notifications.signals import render_template
+
+    context = {
+        'rule': {'id': rule.id, 'name': rule.name},
+        'channel': {'id': channel.id, 'name': channel.name},
+        'count': len(notifications),
+        'notifications': [
+            {
+                'title': notification.title,
+                'message': notification.message,
+                'priority': notification.priority,
+                'created_at': notification.created_at
+            }
+            for notification in notifications
+        ],
+        'first_at': notifications[0].created_at,
+        'last_at': notifications[-1].created_at,
+    }
+    rendered = render_template(settings.NOTIFICATION_DIGEST_TEMPLATE, context).strip()
+    title, _, _ = rendered.partition('\n')
+
+    digest = Notification.objects.create(
+        title=title[:255],
+        message=rendered,
+        category=notifications[0].category,
+        priority=max((notification.priority for notification in notifications), key=_priority_rank),
+        triggered_by_rule=rule,
+        company_id=rule.company_id,
+        is_company_wide=False
+    )
+    digest.recipients.add(*recipients)
+    return digest
+
+
+def _priority_rank(priority):
+    return PRIORITY_ORDER.index(priority) if priority in PRIORITY_ORDER else 0
+
+
+def group_pending_by_recipient_set(deliveries):
+    """
+    Group pending deliveries of one rule and channel for digesting.
+
+    Recipients that are owed the same notifications share one digest, so an
+    alert storm sent to a whole team becomes a single message per channel.
+
+    Args:
+        deliveries (iterable): Pending NotificationDeliveryStatus rows
+
+    Returns:
+        list: (notifications oldest first, deliveries) per group
+    """
+    by_recipient = {}
+    for delivery in deliveries:
+        by_recipient.setdefault(delivery.recipient_id, []).append(delivery)
+
+    groups = {}
+    for recipient_deliveries in by_recipient.values():
+        key = frozenset(delivery.notification_id for delivery in recipient_deliveries)
+        groups.setdefault(key, []).extend(recipient_deliveries)
+
+    result = []
+    for group in groups.values():
+        notifications = {delivery.notification_id: delivery.notification for delivery in group}
+        result.append((sorted(notifications.values(), key=lambda n: (n.created_at, str(n.id))), group))
+    return result
+
+
+def mark_coalesced(deliveries):
+    """Record that deliveries were folded into a digest."""
+    from notifications.models import NotificationDeliveryStatus
+
+    now = timezone.now()
+    NotificationDeliveryStatus.objects.filter(pk__in=[delivery.pk for delivery in deliveries]).update(
+        status='coalesced', sent_at=now, updated_at=now
+    )
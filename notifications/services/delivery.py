@@ -0,0 +1,374 @@
+import logging
+import smtplib
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist
+from django.utils import timezone
+
+logger = logging.getLogger('api.notifications')
+
+MATTERMOST_PREFERENCE_FIELDS = {
+    'alert': 'mattermost_alerts',
+    'incident': 'mattermost_incidents',
+    'task': 'mattermost_tasks',
+}
+
+_http_session = None
+
+
+def get_http_session():
+    """
+    HTTP session shared by all webhook deliveries of this worker process.
+
+    Reusing the session keeps connections to Slack, Mattermost and webhook
+    endpoints alive between deliveries instead of a TCP/TLS handshake per post.
+    """
+    global _http_session
+    if _http_session is None:
+        adapter = HTTPAdapter(
+            pool_connections=settings.NOTIFICATION_HTTP_POOL_SIZE,
+            pool_maxsize=settings.NOTIFICATION_HTTP_POOL_SIZE
+        )
+        _http_session = requests.Session()
+        _http_session.mount('https://', adapter)
+        _http_session.mount('http://', adapter)
+    return _http_session
+
+
+class SMTPConnectionPool:
+    """
+    Authenticated SMTP connections kept open per worker process.
+
+    Connections are keyed by server and login, checked with NOOP before reuse
+    and reopened when the server has dropped them.
+    """
+
+    def __init__(self):
+        self._connections = {}
+
+    @staticmethod
+    def _key(config):
+        return (
+            config.get('smtp_host', 'smtp.gmail.com'),
+            int(config.get('smtp_port', 587)),
+            config.get('smtp_username')
+        )
+
+    def get(self, config):
+        """Return an open, logged-in connection for a channel config."""
+        key = self._key(config)
+        connection = self._connections.get(key)
+        if connection is not None:
+            try:
+                if connection.noop()[0] == 250:
+                    return connection
+            except smtplib.SMTPException:
+                pass
+            self.discard(config)
+
+        host, port, username = key
+        connection = smtplib.SMTP(host, port, timeout=settings.NOTIFICATION_SMTP_TIMEOUT)
+        if config.get('use_tls', True):
+            connection.starttls()
+        if username:
+            connection.login(username, config.get('smtp_password'))
+        self._connections[key] = connection
+        return connection
+
+    def discard(self, config):
+        """Close and forget the connection for a channel config."""
+        connection = self._connections.pop(self._key(config), None)
+        if connection is not None:
+            try:
+                connection.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+
+    def close_all(self):
+        for connection in self._connections.values():
+            try:
+                connection.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+        self._connections.clear()
+
+
+smtp_pool = SMTPConnectionPool()
+
+
+class NotificationDeliveryEngine:
+    """
+    Delivers notifications to groups of recipients per channel.
+
+    Senders take a notification, a channel and a list of recipients and
+    return ``{recipient_id: error}`` where ``None`` means delivered. Email is
+    sent as one BCC message per NOTIFICATION_EMAIL_BCC_BATCH_SIZE recipients
+    over a pooled connection; Slack and Mattermost post once per channel since
+    the message lands in a shared channel; webhooks post per recipient over
+    the shared HTTP session.
+    """
+
+    def __init__(self, http_session=None, pool=None):
+        self.http = http_session or get_http_session()
+        self.smtp_pool = pool or smtp_pool
+        self.timeout = settings.NOTIFICATION_HTTP_TIMEOUT
+
+    def send(self, channel, notification, recipients):
+        """
+        Send a notification through a channel.
+
+        Args:
+            channel: NotificationChannel instance
+            notification: Notification instance
+            recipients (list): User instances
+
+        Returns:
+            dict: Recipient id -> error message, None when delivered
+        """
+        senders = {
+            'email': self._send_email,
+            'slack': self._send_slack,
+            'mattermost': self._send_mattermost,
+            'webhook': self._send_webhook,
+            'in_app': self._send_in_app,
+        }
+        sender = senders.get(channel.channel_type)
+        if sender is None:
+            return dict.fromkeys(
+                (recipient.id for recipient in recipients),
+                f"Unsupported channel type: {channel.channel_type}"
+            )
+        try:
+            return sender(channel, notification, recipients)
+        except Exception as e:
+            logger.error(f"Error delivering notification via {channel.name}: {str(e)}")
+            return dict.fromkeys((recipient.id for recipient in recipients), str(e))
+
+    def deliver(self, delivery_statuses):
+        """
+        Deliver pending NotificationDeliveryStatus rows and store the outcome.
+
+        Rows are grouped by notification and channel so each group is one
+        send() call; all rows are then written with a single bulk_update.
+
+        Args:
+            delivery_statuses (iterable): Rows with notification, channel and
+                recipient loaded (select_related)
+
+        Returns:
+            dict: Counts of total, delivered and failed deliveries
+        """
+        from notifications.models import NotificationDeliveryStatus
+
+        groups = {}
+        for delivery in delivery_statuses:
+            groups.setdefault((delivery.notification_id, delivery.channel_id), []).append(delivery)
+
+        summary = {'total': 0, 'delivered': 0, 'failed': 0}
+        updated = []
+        for deliveries in groups.values():
+            notification, channel = deliveries[0].notification, deliveries[0].channel
+            errors = self.send(channel, notification, [delivery.recipient for delivery in deliveries])
+
+            now = timezone.now()
+            for delivery in deliveries:
+                error = errors.get(delivery.recipient_id)
+                delivery.sent_at = now
+                delivery.updated_at = now
+                if error is None:
+                    delivery.status = 'delivered'
+                    delivery.delivered_at = now
+                    delivery.error_message = None
+                    summary['delivered'] += 1
+                else:
+                    delivery.status = 'failed'
+                    delivery.error_message = error
+                    summary['failed'] += 1
+                updated.append(delivery)
+
+            logger.info(
+                f"Notification {notification.id} delivered via {channel.channel_type} to "
+                f"{len(deliveries) - sum(1 for error in errors.values() if error)} of {len(deliveries)} recipients"
+            )
+
+        summary['total'] = len(updated)
+        NotificationDeliveryStatus.objects.bulk_update(
+            updated, ['status', 'error_message', 'sent_at', 'delivered_at', 'updated_at'],
+            batch_size=settings.NOTIFICATION_DELIVERY_BATCH_SIZE
+        )
+        return summary
+
+    def _send_email(self, channel, notification, recipients):
+        config = channel.config
+        from_email = config.get('from_email', settings.DEFAULT_FROM_EMAIL)
+        errors = {recipient.id: "Recipient has no email address" for recipient in recipients if not recipient.email}
+        addressed = [recipient for recipient in recipients if recipient.email]
+
+        batch_size = max(settings.NOTIFICATION_EMAIL_BCC_BATCH_SIZE, 1)
+        for start in range(0, len(addressed), batch_size):
+            batch = addressed[start:start + batch_size]
+            msg = MIMEMultipart()
+            msg['From'] = from_email
+            # Recipients only go in the envelope so they do not see each other
+            msg['To'] = batch[0].email if len(batch) == 1 else config.get('to_header', 'undisclosed-recipients:;')
+            msg['Subject'] = notification.title
+            msg.attach(MIMEText(notification.message, 'plain'))
+
+            to_addrs = [recipient.email for recipient in batch]
+            try:
+                refused = self._send_message(config, msg, from_email, to_addrs)
+            except smtplib.SMTPRecipientsRefused as e:
+                refused = e.recipients
+            except (smtplib.SMTPException, OSError) as e:
+                self.smtp_pool.discard(config)
+                errors.update(dict.fromkeys((recipient.id for recipient in batch), str(e)))
+                continue
+
+            for recipient in batch:
+                if recipient.email in refused:
+                    errors[recipient.id] = f"Recipient refused: {refused[recipient.email]}"
+        return {recipient.id: errors.get(recipient.id) for recipient in recipients}
+
+    def _send_message(self, config, msg, from_email, to_addrs):
+        """Send over the pooled connection, reconnecting once if the server dropped it."""
+        try:
+            return self.smtp_pool.get(config).send_message(msg, from_addr=from_email, to_addrs=to_addrs)
+        except smtplib.SMTPServerDisconnected:
+            self.smtp_pool.discard(config)
+            return self.smtp_pool.get(config).send_message(msg, from_addr=from_email, to_addrs=to_addrs)
+
+    def _post(self, url, payload, headers=None):
+        """POST JSON over the shared session; returns an error message or None."""
+        try:
+            response = self.http.post(url, json=payload, headers=headers, timeout=self.timeout)
+        except requests.RequestException as e:
+            return str(e)
+        if 200 <= response.status_code < 300:
+            return None
+        return f"HTTP error: {response.status_code} - {response.text[:200]}"
+
+    def _send_slack(self, channel, notification, recipients):
+        config = channel.config
+        webhook_url = config.get('webhook_url')
+        if not webhook_url:
+            error = "No webhook URL configured for Slack channel"
+        else:
+            error = self._post(webhook_url, {
+                "text": f"*{notification.title}*\n{notification.message}",
+                "username": config.get('username', 'SentinelIQ Bot'),
+                "icon_emoji": config.get('icon_emoji', ':robot_face:')
+            })
+        return dict.fromkeys((recipient.id for recipient in recipients), error)
+
+    def _send_mattermost(self, channel, notification, recipients):
+        config = channel.config
+        webhook_url = config.get('webhook_url')
+        if not webhook_url:
+            return dict.fromkeys(
+                (recipient.id for recipient in recipients),
+                "No webhook URL configured for Mattermost channel"
+            )
+
+        # Recipients who opted out are reported as delivered, as before
+        wanted = [recipient for recipient in recipients if _wants_mattermost(recipient, notification)]
+        errors = dict.fromkeys((recipient.id for recipient in recipients), None)
+        if not wanted:
+            return errors
+
+        headers = {'Content-Type': 'application/json', **config.get('headers', {})}
+        error = self._post(webhook_url, _mattermost_payload(config, notification), headers)
+        errors.update(dict.fromkeys((recipient.id for recipient in wanted), error))
+        return errors
+
+    def _send_webhook(self, channel, notification, recipients):
+        config = channel.config
+        webhook_url = config.get('url') or config.get('webhook_url')
+        if not webhook_url:
+            return dict.fromkeys((recipient.id for recipient in recipients), "No URL configured for webhook channel")
+
+        headers = dict(config.get('headers', {}))
+        company = None
+        if config.get('include_company', False) and notification.company_id:
+            company = {"id": str(notification.company_id), "name": notification.company.name}
+
+        errors = {}
+        for recipient in recipients:
+            payload = {
+                "title": notification.title,
+                "message": notification.message,
+                "category": notification.category,
+                "priority": notification.priority,
+                "timestamp": timezone.now().isoformat(),
+                "recipient": {
+                    "id": str(recipient.id),
+                    "email": recipient.email,
+                    "username": recipient.username
+                }
+            }
+            if company:
+                payload["company"] = company
+            errors[recipient.id] = self._post(webhook_url, payload, headers)
+        return errors
+
+    def _send_in_app(self, channel, notification, recipients):
+        # In-app notifications are already stored in the database
+        return dict.fromkeys((recipient.id for recipient in recipients), None)
+
+
+def _wants_mattermost(recipient, notification):
+    try:
+        preferences = recipient.notification_preferences
+    except ObjectDoesNotExist:
+        return True
+    field = MATTERMOST_PREFERENCE_FIELDS.get(notification.category)
+    if field and not getattr(preferences, field):
+        return False
+    return not (preferences.mattermost_critical_only and notification.priority != 'critical')
+
+
+def _mattermost_payload(config, notification):
+    attachment = {
+        "pretext": f"New {notification.category.title()}: {notification.title}",
+        "text": notification.message,
+        "color": get_color_for_priority(notification.priority),
+        "fields": [
+            {"short": True, "title": "Priority", "value": notification.priority.title()},
+            {"short": True, "title": "Category", "value": notification.category.title()}
+        ]
+    }
+
+    if notification.related_object_type and notification.related_object_id:
+        object_type = notification.related_object_type.title()
+        object_id = notification.related_object_id
+        attachment["fields"].append({"short": True, "title": f"{object_type} ID", "value": str(object_id)})
+
+        base_url = config.get('app_base_url')
+        if config.get('include_actions', True) and base_url:
+            object_url = f"{base_url.rstrip('/')}/{notification.related_object_type}s/{object_id}"
+            attachment["actions"] = [{
+                "name": f"View {object_type}",
+                "integration": {"url": object_url, "context": {"action": "view"}}
+            }]
+
+    return {
+        "text": f"### {notification.title}",
+        "username": config.get('username', 'SentinelIQ Bot'),
+        "icon_url": config.get('icon_url'),
+        "channel": config.get('channel'),
+        "props": {"attachments": [attachment]}
+    }
+
+
+def get_color_for_priority(priority):
+    """Get color code based on notification priority"""
+    color_map = {
+        'low': '#CCCCCC',       # Gray
+        'medium': '#FFCC00',    # Yellow
+        'high': '#FF9900',      # Orange
+        'critical': '#CC0000',  # Red
+    }
+    return color_map.get(priority, '#CCCCCC')
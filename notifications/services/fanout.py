@@ -0,0 +1,80 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import Q
+
+# UserNotificationPreference field suffix per notification category
+CATEGORY_PREFERENCE_SUFFIXES = {
+    'alert': 'alerts',
+    'incident': 'incidents',
+    'task': 'tasks',
+    'report': 'reports',
+}
+
+
+def preference_filter(channel_type, notification):
+    """
+    Q object keeping users whose preferences allow this notification.
+
+    Users without a UserNotificationPreference row are kept, as when
+    delivering to a single recipient. Channels or categories without a
+    matching preference field are not filtered.
+
+    Args:
+        channel_type (str): NotificationChannel.channel_type
+        notification: Notification instance
+
+    Returns:
+        Q: Filter on the user model, joined to notification_preferences
+    """
+    from notifications.models import UserNotificationPreference
+
+    field_names = {field.name for field in UserNotificationPreference._meta.get_fields()}
+    no_preferences = Q(notification_preferences__isnull=True)
+    allowed = Q()
+
+    suffix = CATEGORY_PREFERENCE_SUFFIXES.get(notification.category)
+    category_field = f"{channel_type}_{suffix}"
+    if suffix and category_field in field_names:
+        allowed &= Q(**{f"notification_preferences__{category_field}": True})
+
+    critical_field = f"{channel_type}_critical_only"
+    if critical_field in field_names and notification.priority != 'critical':
+        allowed &= Q(**{f"notification_preferences__{critical_field}": False})
+
+    if not allowed:
+        return Q()
+    return no_preferences | allowed
+
+
+def iter_recipient_chunks(notification, channel, chunk_size=None):
+    """
+    Page the recipients of a company-wide notification.
+
+    Each page is one keyset query on the user id that joins the recipients'
+    preferences, so opted-out users are never loaded.
+
+    Args:
+        notification: Notification instance (is_company_wide)
+        channel: NotificationChannel instance
+        chunk_size (int, optional): Users per page (default: NOTIFICATION_FANOUT_CHUNK_SIZE)
+
+    Yields:
+        list: Recipient user ids
+    """
+    chunk_size = chunk_size or settings.NOTIFICATION_FANOUT_CHUNK_SIZE
+    recipients = get_user_model().objects.filter(
+        preference_filter(channel.channel_type, notification),
+        company_id=notification.company_id,
+        is_active=True
+    ).order_by('id')
+
+    last_id = None
+    while True:
+        page = recipients if last_id is None else recipients.filter(id__gt=last_id)
+        chunk = list(page.values_list('id', flat=True)[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        if len(chunk) < chunk_size:
+            return
+        last_id = chunk[-1]
@@ -0,0 +1,110 @@
+from collections import namedtuple
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Prefetch
+
+RULE_MATCHER_CACHE_KEY = 'notifications:rule_matcher:{company_id}'
+
+CompiledRule = namedtuple(
+    'CompiledRule', ['id', 'position', 'name', 'conditions', 'message_template', 'channel_ids']
+)
+
+_MISSING = object()
+
+
+class RuleMatcher:
+    """
+    In-memory matcher for the active notification rules of one company.
+
+    Rules are indexed by event type and, within an event type, by the value
+    of one of their condition fields, so matching an object only reads the
+    indexed fields once and checks the remaining conditions of the few rules
+    that can still apply. A condition holds when the field exists and its
+    string form equals the expected value.
+    """
+
+    def __init__(self, rules):
+        self._unconditional = {}
+        self._by_field = {}
+        for rule, event_type in rules:
+            if not rule.conditions:
+                self._unconditional.setdefault(event_type, []).append(rule)
+                continue
+            field, expected = rule.conditions[0]
+            self._by_field.setdefault(event_type, {}).setdefault(field, {}).setdefault(expected, []).append(rule)
+
+    def has_rules(self, event_type):
+        """Whether any active rule listens to ``event_type``."""
+        return event_type in self._unconditional or event_type in self._by_field
+
+    def match(self, event_type, obj):
+        """
+        Rules of ``event_type`` whose conditions hold for ``obj``.
+
+        Returns:
+            list: CompiledRule tuples in rule order (newest first)
+        """
+        candidates = list(self._unconditional.get(event_type, ()))
+        for field, rules_by_value in self._by_field.get(event_type, {}).items():
+            value = getattr(obj, field, _MISSING)
+            if value is not _MISSING:
+                candidates.extend(rules_by_value.get(str(value), ()))
+
+        matched = [rule for rule in candidates if _conditions_hold(rule.conditions[1:], obj)]
+        return sorted(matched, key=lambda rule: rule.position)
+
+
+def _conditions_hold(conditions, obj):
+    for field, expected in conditions:
+        value = getattr(obj, field, _MISSING)
+        if value is _MISSING or str(value) != expected:
+            return False
+    return True
+
+
+def build_rule_matcher(company_id):
+    """
+    Compile the active rules of a company with their enabled channel ids.
+
+    Returns:
+        RuleMatcher: Matcher for all event types of the company
+    """
+    from notifications.models import NotificationChannel, NotificationRule
+
+    rules = NotificationRule.objects.filter(company_id=company_id, is_active=True).prefetch_related(
+        Prefetch('channels', queryset=NotificationChannel.objects.filter(is_enabled=True).only('id'))
+    )
+    compiled = []
+    for position, rule in enumerate(rules):
+        conditions = tuple(sorted((field, str(value)) for field, value in (rule.conditions or {}).items()))
+        compiled.append((
+            CompiledRule(
+                id=rule.id,
+                position=position,
+                name=rule.name,
+                conditions=conditions,
+                message_template=rule.message_template,
+                channel_ids=tuple(channel.id for channel in rule.channels.all())
+            ),
+            rule.event_type
+        ))
+    return RuleMatcher(compiled)
+
+
+def get_rule_matcher(company_id):
+    """
+    Get the cached rule matcher of a company.
+
+    Returns:
+        RuleMatcher: See build_rule_matcher()
+    """
+    return cache.get_or_set(
+        RULE_MATCHER_CACHE_KEY.format(company_id=company_id),
+        lambda: build_rule_matcher(company_id),
+        settings.NOTIFICATION_RULE_CACHE_TTL
+    )
+
+
+def invalidate_rule_matcher(company_id):
+    """Drop the cached matcher after a company's rules or channels change."""
+    cache.delete(RULE_MATCHER_CACHE_KEY.format(company_id=company_id))
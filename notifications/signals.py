@@ -1,48 +1,24 @@
 import logging
-from django.db.models.signals import post_save, post_delete
+from functools import partial
+from django.db.models.signals import post_save, post_delete, m2m_changed
 from django.dispatch import receiver
 from django.conf import settings
 from django.template import Template, Context
 from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction
 from django.db.models import Q
 
 from alerts.models import Alert
 from incidents.models import Incident
 from tasks.models import Task
-from .models import NotificationRule, Notification
-from .tasks import send_notification
+from .models import NotificationChannel, NotificationRule, Notification
+from .services.coalesce import schedule_digest_flush
+from .services.rules import get_rule_matcher, invalidate_rule_matcher
+from .tasks import evaluate_notification_rules, queue_deliveries
 
 logger = logging.getLogger('api.notifications')
 
 
-def evaluate_conditions(conditions, obj):
-    """
-    Evaluate if all conditions are met for the object.
-    
-    Args:
-        conditions (dict): Dictionary of field-value conditions
-        obj: Object to evaluate against
-        
-    Returns:
-        bool: True if all conditions are met, False otherwise
-    """
-    if not conditions:
-        return True
-        
-    # Simple field-value equality checks
-    for field, expected_value in conditions.items():
-        if hasattr(obj, field):
-            actual_value = getattr(obj, field)
-            # Convert both to strings for comparison
-            if str(actual_value) != str(expected_value):
-                return False
-        else:
-            # Field doesn't exist on object
-            return False
-            
-    return True
-
-
 def render_template(template_str, context_dict):
     """
     Render a template string with a context dictionary.
@@ -63,35 +39,11 @@ def render_template(template_str, context_dict):
         return template_str  # Return original as fallback
 
 
-def get_notification_rules(event_type, company_id):
-    """
-    Get active notification rules for a given event type and company.
-    
-    Args:
-        event_type (str): Event type identifier
-        company_id: Company ID
-        
-    Returns:
-        QuerySet: Matching notification rules
-    """
-    return NotificationRule.objects.filter(
-        event_type=event_type,
-        company_id=company_id,
-        is_active=True
-    )
-
-
 def process_alert_notification(alert, event_type):
     """Process notification rules for alert events"""
     try:
-        # Get matching rules
-        rules = get_notification_rules(event_type, alert.company.id)
-        
-        for rule in rules:
-            # Evaluate conditions
-            if not evaluate_conditions(rule.conditions, alert):
-                continue
-                
+        # Match against the company's compiled, cached rule set
+        for rule in get_rule_matcher(alert.company_id).match(event_type, alert):
             # Prepare context for template rendering
             context = {
                 'alert': {
@@ -114,35 +66,30 @@ def process_alert_notification(alert, event_type):
                 category='alert',
                 priority=getattr(alert, 'severity', 'medium'),
                 related_object_type='alert',
-                related_object_id=alert.id,
-                triggered_by_rule=rule,
+                related_object_id=str(alert.id),
+                triggered_by_rule_id=rule.id,
                 company=alert.company,
                 is_company_wide=False  # Default to specific recipients
             )
             
-            # Queue notification delivery for each channel
-            for channel in rule.channels.filter(is_enabled=True):
-                # Determine recipients based on role/department/etc.
-                recipients = []
-                
-                # Add alert assignee if any
-                if hasattr(alert, 'assignee') and alert.assignee:
-                    recipients.append(alert.assignee)
-                
-                # Add company admins
-                admin_users = alert.company.user_set.filter(role__contains='admin')
-                recipients.extend(admin_users)
-                
-                # Add recipients to notification
-                for recipient in set(recipients):  # Use set to deduplicate
-                    notification.recipients.add(recipient)
-                    
-                    # Queue async task to send notification
-                    send_notification.delay(
-                        notification_id=notification.id,
-                        channel_id=channel.id,
-                        recipient_id=recipient.id
-                    )
+            # Determine recipients based on role/department/etc.
+            recipients = []
+            
+            # Add alert assignee if any
+            if hasattr(alert, 'assignee') and alert.assignee:
+                recipients.append(alert.assignee)
+            
+            # Add company admins
+            admin_users = alert.company.users.filter(role__contains='admin')
+            recipients.extend(admin_users)
+            
+            # Add recipients to notification and queue one delivery row per channel
+            recipients = set(recipients)  # Use set to deduplicate
+            notification.recipients.add(*recipients)
+            for channel_id in rule.channel_ids:
+                queue_deliveries(notification, channel_id, recipients)
+                # Coalesced with the rule's other notifications of the window
+                schedule_digest_flush(notification, channel_id)
                     
     except Exception as e:
         logger.error(f"Error processing alert notification: {str(e)}")
@@ -151,14 +98,8 @@ def process_alert_notification(alert, event_type):
 def process_incident_notification(incident, event_type):
     """Process notification rules for incident events"""
     try:
-        # Get matching rules
-        rules = get_notification_rules(event_type, incident.company.id)
-        
-        for rule in rules:
-            # Evaluate conditions
-            if not evaluate_conditions(rule.conditions, incident):
-                continue
-                
+        # Match against the company's compiled, cached rule set
+        for rule in get_rule_matcher(incident.company_id).match(event_type, incident):
             # Prepare context for template rendering
             context = {
                 'incident': {
@@ -181,37 +122,32 @@ def process_incident_notification(incident, event_type):
                 category='incident',
                 priority=getattr(incident, 'severity', 'medium'),
                 related_object_type='incident',
-                related_object_id=incident.id,
-                triggered_by_rule=rule,
+                related_object_id=str(incident.id),
+                triggered_by_rule_id=rule.id,
                 company=incident.company,
                 is_company_wide=False
             )
             
-            # Queue notification delivery for each channel
-            for channel in rule.channels.filter(is_enabled=True):
-                # Determine recipients
-                recipients = []
-                
-                # Add incident assignee if any
-                if hasattr(incident, 'assignee') and incident.assignee:
-                    recipients.append(incident.assignee)
-                
-                # Add company admins and security analysts
-                admin_users = incident.company.user_set.filter(
-                    Q(role__contains='admin') | Q(role__contains='analyst')
-                )
-                recipients.extend(admin_users)
-                
-                # Add recipients to notification
-                for recipient in set(recipients):
-                    notification.recipients.add(recipient)
-                    
-                    # Queue async task to send notification
-                    send_notification.delay(
-                        notification_id=notification.id,
-                        channel_id=channel.id,
-                        recipient_id=recipient.id
-                    )
+            # Determine recipients
+            recipients = []
+            
+            # Add incident assignee if any
+            if hasattr(incident, 'assignee') and incident.assignee:
+                recipients.append(incident.assignee)
+            
+            # Add company admins and security analysts
+            admin_users = incident.company.users.filter(
+                Q(role__contains='admin') | Q(role__contains='analyst')
+            )
+            recipients.extend(admin_users)
+            
+            # Add recipients to notification and queue one delivery row per channel
+            recipients = set(recipients)  # Use set to deduplicate
+            notification.recipients.add(*recipients)
+            for channel_id in rule.channel_ids:
+                queue_deliveries(notification, channel_id, recipients)
+                # Coalesced with the rule's other notifications of the window
+                schedule_digest_flush(notification, channel_id)
                     
     except Exception as e:
         logger.error(f"Error processing incident notification: {str(e)}")
@@ -220,14 +156,8 @@ def process_incident_notification(incident, event_type):
 def process_task_notification(task, event_type):
     """Process notification rules for task events"""
     try:
-        # Get matching rules
-        rules = get_notification_rules(event_type, task.company.id)
-        
-        for rule in rules:
-            # Evaluate conditions
-            if not evaluate_conditions(rule.conditions, task):
-                continue
-                
+        # Match against the company's compiled, cached rule set
+        for rule in get_rule_matcher(task.company_id).match(event_type, task):
             # Prepare context for template rendering
             context = {
                 'task': {
@@ -258,74 +188,90 @@ def process_task_notification(task, event_type):
                 category='task',
                 priority=getattr(task, 'priority', 'medium'),
                 related_object_type='task',
-                related_object_id=task.id,
-                triggered_by_rule=rule,
+                related_object_id=str(task.id),
+                triggered_by_rule_id=rule.id,
                 company=task.company,
                 is_company_wide=False
             )
             
-            # Queue notification delivery for each channel
-            for channel in rule.channels.filter(is_enabled=True):
-                # Determine recipients
-                recipients = []
-                
-                # Add task assignee if any
-                if hasattr(task, 'assignee') and task.assignee:
-                    recipients.append(task.assignee)
-                
-                # Add incident owner if this task is part of an incident
-                if hasattr(task, 'incident') and task.incident and hasattr(task.incident, 'owner') and task.incident.owner:
-                    recipients.append(task.incident.owner)
-                
-                # Add recipients to notification
-                for recipient in set(recipients):
-                    notification.recipients.add(recipient)
-                    
-                    # Queue async task to send notification
-                    send_notification.delay(
-                        notification_id=notification.id,
-                        channel_id=channel.id,
-                        recipient_id=recipient.id
-                    )
+            # Determine recipients
+            recipients = []
+            
+            # Add task assignee if any
+            if hasattr(task, 'assignee') and task.assignee:
+                recipients.append(task.assignee)
+            
+            # Add incident owner if this task is part of an incident
+            if hasattr(task, 'incident') and task.incident and hasattr(task.incident, 'owner') and task.incident.owner:
+                recipients.append(task.incident.owner)
+            
+            # Add recipients to notification and queue one delivery row per channel
+            recipients = set(recipients)  # Use set to deduplicate
+            notification.recipients.add(*recipients)
+            for channel_id in rule.channel_ids:
+                queue_deliveries(notification, channel_id, recipients)
+                # Coalesced with the rule's other notifications of the window
+                schedule_digest_flush(notification, channel_id)
                     
     except Exception as e:
         logger.error(f"Error processing task notification: {str(e)}")
 
 
+def schedule_rule_evaluation(object_type, instance, event_types):
+    """
+    Queue notification rule evaluation for an object once the save commits.
+    
+    Only a cache lookup happens on the request path: event types without any
+    active rule for the company are dropped, and when none remain no task is
+    queued at all.
+    
+    Args:
+        object_type (str): 'alert', 'incident' or 'task'
+        instance: Saved object
+        event_types (list): Event types raised by the save
+    """
+    matcher = get_rule_matcher(instance.company_id)
+    event_types = [event_type for event_type in event_types if matcher.has_rules(event_type)]
+    if event_types:
+        transaction.on_commit(partial(
+            evaluate_notification_rules.delay, object_type, str(instance.pk), event_types
+        ))
+
+
 @receiver(post_save, sender=Alert)
 def alert_event_handler(sender, instance, created, **kwargs):
     """Handle alert events for notifications"""
     try:
-        if created:
-            # New alert created
-            process_alert_notification(instance, 'alert_created')
-        else:
-            # Alert updated
-            process_alert_notification(instance, 'alert_updated')
-            
-            # Check if alert was just escalated to an incident
-            if instance.incidents.exists() and not instance.tracker.previous('incidents'):
-                process_alert_notification(instance, 'alert_escalated')
-                
+        schedule_rule_evaluation('alert', instance, ['alert_created' if created else 'alert_updated'])
     except Exception as e:
         logger.error(f"Error in alert event handler: {str(e)}")
 
 
+@receiver(m2m_changed, sender=Incident.related_alerts.through)
+def alert_escalated_handler(sender, instance, action, reverse, pk_set, **kwargs):
+    """Handle alerts being linked to an incident (escalation)"""
+    if action != 'post_add' or not pk_set:
+        return
+    try:
+        alerts = [instance] if reverse else Alert.objects.filter(pk__in=pk_set)
+        for alert in alerts:
+            schedule_rule_evaluation('alert', alert, ['alert_escalated'])
+    except Exception as e:
+        logger.error(f"Error in alert escalation handler: {str(e)}")
+
+
 @receiver(post_save, sender=Incident)
 def incident_event_handler(sender, instance, created, **kwargs):
     """Handle incident events for notifications"""
     try:
         if created:
-            # New incident created
-            process_incident_notification(instance, 'incident_created')
+            event_types = ['incident_created']
         else:
-            # Incident updated
-            process_incident_notification(instance, 'incident_updated')
-            
+            event_types = ['incident_updated']
             # Check if incident was just closed
             if instance.status == 'closed' and instance.tracker.previous('status') != 'closed':
-                process_incident_notification(instance, 'incident_closed')
-                
+                event_types.append('incident_closed')
+        schedule_rule_evaluation('incident', instance, event_types)
     except Exception as e:
         logger.error(f"Error in incident event handler: {str(e)}")
 
@@ -335,15 +281,28 @@ def task_event_handler(sender, instance, created, **kwargs):
     """Handle task events for notifications"""
     try:
         if created:
-            # New task created
-            process_task_notification(instance, 'task_created')
+            event_types = ['task_created']
         else:
-            # Task updated
-            process_task_notification(instance, 'task_updated')
-            
+            event_types = ['task_updated']
             # Check if task was just completed
             if instance.status == 'completed' and instance.tracker.previous('status') != 'completed':
-                process_task_notification(instance, 'task_completed')
-                
+                event_types.append('task_completed')
+        schedule_rule_evaluation('task', instance, event_types)
     except Exception as e:
-        logger.error(f"Error in task event handler: {str(e)}") 
\ No newline at end of file
+        logger.error(f"Error in task event handler: {str(e)}")
+
+
+@receiver(post_save, sender=NotificationRule)
+@receiver(post_delete, sender=NotificationRule)
+@receiver(post_save, sender=NotificationChannel)
+@receiver(post_delete, sender=NotificationChannel)
+def invalidate_company_rule_matcher(sender, instance, **kwargs):
+    """Drop the compiled rule set of a company when its rules or channels change."""
+    invalidate_rule_matcher(instance.company_id)
+
+
+@receiver(m2m_changed, sender=NotificationRule.channels.through)
+def invalidate_rule_matcher_on_channels_change(sender, instance, action, reverse, **kwargs):
+    """Drop the compiled rule set when channels are attached to or detached from rules."""
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        invalidate_rule_matcher(instance.company_id)
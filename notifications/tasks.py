@@ -1,22 +1,274 @@
 import logging
-from datetime import datetime
-import requests
-import smtplib
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
+import math
 
 from celery import shared_task
 from django.conf import settings
-from django.utils import timezone
 from django.contrib.auth import get_user_model
-from django.core.exceptions import ObjectDoesNotExist
+from django.core.cache import cache
 
-from .models import NotificationChannel, Notification, NotificationDeliveryStatus
+from .models import NotificationChannel, Notification, NotificationDeliveryStatus, NotificationRule
+from .services.coalesce import (
+    ChannelRateLimiter,
+    build_digest,
+    digest_flush_key,
+    group_pending_by_recipient_set,
+    mark_coalesced,
+    outbound_calls
+)
+from .services.delivery import NotificationDeliveryEngine
+from .services.fanout import iter_recipient_chunks
 
 User = get_user_model()
 logger = logging.getLogger('api.notifications')
 
 
+def queue_deliveries(notification, channel, recipients):
+    """
+    Create pending delivery rows for recipients and return them.
+    
+    Existing rows (e.g. from a retried task) are kept as they are.
+    
+    Args:
+        notification: Notification instance
+        channel: NotificationChannel instance or id
+        recipients (iterable): User instances or ids
+    """
+    channel_id = getattr(channel, 'pk', channel)
+    recipient_ids = {getattr(recipient, 'pk', recipient) for recipient in recipients}
+    NotificationDeliveryStatus.objects.bulk_create(
+        [
+            NotificationDeliveryStatus(
+                notification=notification, channel_id=channel_id, recipient_id=recipient_id, status='pending'
+            )
+            for recipient_id in recipient_ids
+        ],
+        batch_size=settings.NOTIFICATION_DELIVERY_BATCH_SIZE,
+        ignore_conflicts=True
+    )
+
+
+def pending_deliveries(notification_id=None, channel_id=None):
+    """Pending delivery rows with everything the delivery engine reads."""
+    deliveries = NotificationDeliveryStatus.objects.filter(status='pending').select_related(
+        'notification', 'notification__company', 'channel', 'recipient', 'recipient__notification_preferences'
+    )
+    if notification_id:
+        deliveries = deliveries.filter(notification_id=notification_id)
+    if channel_id:
+        deliveries = deliveries.filter(channel_id=channel_id)
+    return deliveries.order_by('notification_id', 'channel_id')
+
+
+@shared_task(
+    autoretry_for=(Exception,),
+    retry_kwargs={'max_retries': 3, 'countdown': 60},
+    acks_late=True
+)
+def deliver_pending_notifications(notification_id=None, channel_id=None):
+    """
+    Celery task to deliver pending notifications in batches.
+    
+    Pending rows are read NOTIFICATION_DELIVERY_BATCH_SIZE at a time and
+    handed to the delivery engine, which groups them per notification and
+    channel and stores their outcome with one bulk_update per batch.
+    
+    Args:
+        notification_id: Only deliver this notification (optional)
+        channel_id: Only deliver through this channel (optional)
+    
+    Returns:
+        dict: Counts of total, delivered and failed deliveries
+    """
+    engine = NotificationDeliveryEngine()
+    totals = {'total': 0, 'delivered': 0, 'failed': 0}
+    batch_size = settings.NOTIFICATION_DELIVERY_BATCH_SIZE
+    while True:
+        # Delivered rows leave the pending set, so each pass reads the next batch
+        batch = list(pending_deliveries(notification_id, channel_id)[:batch_size])
+        if not batch:
+            break
+        for key, value in engine.deliver(batch).items():
+            totals[key] += value
+        if len(batch) < batch_size:
+            break
+    
+    logger.info(
+        f"Delivered {totals['delivered']} of {totals['total']} pending notifications "
+        f"({totals['failed']} failed)"
+    )
+    return totals
+
+
+@shared_task(
+    autoretry_for=(Exception,),
+    retry_kwargs={'max_retries': 3, 'countdown': 60},
+    acks_late=True
+)
+def flush_notification_digest(company_id, rule_id, channel_id):
+    """
+    Celery task to deliver what a rule queued on a channel during one window.
+    
+    Pending deliveries are grouped by recipient; recipients owed the same
+    notifications form one group. A group owed a single notification gets
+    it as is, larger groups get one digest rendered from
+    NOTIFICATION_DIGEST_TEMPLATE and their original rows are marked
+    'coalesced'. Every group first takes its outbound requests from the
+    channel's token bucket; when the bucket is empty the rest of the
+    window is left pending and the task reschedules itself.
+    
+    Args:
+        company_id: ID of the company
+        rule_id: ID of the rule that triggered the notifications
+        channel_id: ID of the channel to deliver through
+    
+    Returns:
+        dict: Counts of total, delivered, failed, coalesced and deferred deliveries
+    """
+    key = digest_flush_key(company_id, rule_id, channel_id)
+    # Notifications committed from here on belong to the next window
+    cache.delete(key)
+    
+    totals = {'total': 0, 'delivered': 0, 'failed': 0, 'coalesced': 0, 'deferred': 0}
+    rule = NotificationRule.objects.filter(id=rule_id).first()
+    channel = NotificationChannel.objects.filter(id=channel_id).first()
+    if rule is None or channel is None:
+        logger.warning(f"Skipping notification digest for deleted rule {rule_id} or channel {channel_id}")
+        return totals
+    
+    deliveries = pending_deliveries(channel_id=channel_id).filter(
+        notification__company_id=company_id, notification__triggered_by_rule_id=rule_id
+    )
+    groups = group_pending_by_recipient_set(deliveries)
+    engine = NotificationDeliveryEngine()
+    limiter = ChannelRateLimiter()
+    
+    for index, (notifications, group) in enumerate(groups):
+        recipients = list({delivery.recipient_id: delivery.recipient for delivery in group}.values())
+        wait = limiter.acquire(channel, outbound_calls(channel, len(recipients)))
+        if wait:
+            countdown = math.ceil(wait)
+            cache.set(key, 1, countdown * 2)
+            flush_notification_digest.apply_async(args=[company_id, rule_id, channel_id], countdown=countdown)
+            totals['deferred'] = sum(len(pending) for _, pending in groups[index:])
+            logger.info(
+                f"Rate limit reached on channel {channel_id}, deferring {totals['deferred']} "
+                f"deliveries of rule {rule_id} by {countdown}s"
+            )
+            break
+        
+        if len(notifications) > 1:
+            digest = build_digest(rule, channel, notifications, recipients)
+            queue_deliveries(digest, channel, recipients)
+            mark_coalesced(group)
+            totals['coalesced'] += len(group)
+            group = list(pending_deliveries(digest.id, channel_id))
+        
+        for field, value in engine.deliver(group).items():
+            totals[field] += value
+    
+    logger.info(
+        f"Flushed notification digest of rule {rule_id} on channel {channel_id}: "
+        f"{totals['delivered']} delivered, {totals['failed']} failed, {totals['coalesced']} coalesced"
+    )
+    return totals
+
+
+@shared_task
+def evaluate_notification_rules(object_type, object_id, event_types):
+    """
+    Celery task to evaluate notification rules for a saved object.
+    
+    Queued on commit by the post_save handlers in notifications.signals so
+    rule matching, notification creation and recipient resolution run off
+    the request path.
+    
+    Args:
+        object_type: 'alert', 'incident' or 'task'
+        object_id: Primary key of the object
+        event_types: Event types raised by the save, in order
+    """
+    from alerts.models import Alert
+    from incidents.models import Incident
+    from tasks.models import Task
+    from .signals import process_alert_notification, process_incident_notification, process_task_notification
+    
+    handlers = {
+        'alert': (Alert, process_alert_notification),
+        'incident': (Incident, process_incident_notification),
+        'task': (Task, process_task_notification),
+    }
+    model, process = handlers[object_type]
+    instance = model.objects.select_related('company').filter(pk=object_id).first()
+    if instance is None:
+        logger.warning(f"Skipping notification rules for deleted {object_type} {object_id}")
+        return
+    
+    for event_type in event_types:
+        process(instance, event_type)
+
+
+@shared_task(
+    autoretry_for=(Exception,),
+    retry_kwargs={'max_retries': 3, 'countdown': 60},
+    acks_late=True
+)
+def fan_out_notification(notification_id, channel_id):
+    """
+    Celery task to fan a company-wide notification out to its recipients.
+    
+    Recipients allowed by their preferences are paged in chunks of
+    NOTIFICATION_FANOUT_CHUNK_SIZE. Each chunk gets its delivery rows with
+    one bulk_create and one deliver_notification_chunk task, instead of a
+    task per user.
+    
+    Args:
+        notification_id: ID of the company-wide notification
+        channel_id: ID of the channel to use for delivery
+    
+    Returns:
+        dict: Number of recipients and chunk tasks queued
+    """
+    notification = Notification.objects.get(id=notification_id)
+    channel = NotificationChannel.objects.get(id=channel_id)
+    
+    recipients = chunks = 0
+    for recipient_ids in iter_recipient_chunks(notification, channel):
+        queue_deliveries(notification, channel, recipient_ids)
+        deliver_notification_chunk.delay(notification_id, channel_id, recipient_ids)
+        recipients += len(recipient_ids)
+        chunks += 1
+    
+    logger.info(
+        f"Fanned out notification {notification_id} via channel {channel_id} to "
+        f"{recipients} recipients in {chunks} chunks"
+    )
+    return {'recipients': recipients, 'chunks': chunks}
+
+
+@shared_task(
+    autoretry_for=(Exception,),
+    retry_kwargs={'max_retries': 3, 'countdown': 60},
+    acks_late=True
+)
+def deliver_notification_chunk(notification_id, channel_id, recipient_ids):
+    """
+    Celery task to deliver one fan-out chunk.
+    
+    The pending rows of the chunk are loaded with their notification,
+    channel and recipient in one query and delivered as a batch.
+    
+    Args:
+        notification_id: ID of the notification
+        channel_id: ID of the channel
+        recipient_ids: Recipient user IDs of the chunk
+    
+    Returns:
+        dict: Counts of total, delivered and failed deliveries
+    """
+    deliveries = pending_deliveries(notification_id, channel_id).filter(recipient_id__in=recipient_ids)
+    return NotificationDeliveryEngine().deliver(list(deliveries))
+
+
 @shared_task(
     autoretry_for=(Exception,),
     retry_kwargs={'max_retries': 3, 'countdown': 60},
@@ -32,68 +284,21 @@ def send_notification(notification_id, channel_id, recipient_id=None):
         recipient_id: ID of the recipient user (optional)
     """
     try:
-        # Get the notification, channel and recipient
         notification = Notification.objects.get(id=notification_id)
         channel = NotificationChannel.objects.get(id=channel_id)
-        recipient = User.objects.get(id=recipient_id) if recipient_id else None
         
-        # If no recipient specified and notification is company-wide,
-        # Send to all users in the company
-        if not recipient and notification.is_company_wide:
-            company_users = User.objects.filter(company=notification.company)
-            for user in company_users:
-                # Create separate delivery status for each user
-                send_notification.delay(notification_id, channel_id, user.id)
-            return
+        if not recipient_id and notification.is_company_wide:
+            # Send to all users in the company in chunked tasks
+            fan_out_notification(notification_id, channel_id)
+            return True
         
-        if not recipient:
+        if not recipient_id:
             logger.error(f"No recipient specified for notification {notification_id}")
             return
         
-        # Create or get delivery status
-        delivery_status, created = NotificationDeliveryStatus.objects.get_or_create(
-            notification=notification,
-            channel=channel,
-            recipient=recipient,
-            defaults={'status': 'pending'}
-        )
-        
-        # Send based on channel type
-        success = False
-        error_message = None
-        
-        if channel.channel_type == 'email':
-            success, error_message = _send_email_notification(channel, notification, recipient)
-        elif channel.channel_type == 'slack':
-            success, error_message = _send_slack_notification(channel, notification, recipient)
-        elif channel.channel_type == 'mattermost':
-            success, error_message = _send_mattermost_notification(channel, notification, recipient)
-        elif channel.channel_type == 'webhook':
-            success, error_message = _send_webhook_notification(channel, notification, recipient)
-        elif channel.channel_type == 'in_app':
-            # In-app notifications are already created in the database,
-            # so we just mark them as delivered
-            success = True
-        else:
-            error_message = f"Unsupported channel type: {channel.channel_type}"
-            
-        # Update delivery status
-        if success:
-            delivery_status.status = 'delivered'
-            delivery_status.delivered_at = timezone.now()
-        else:
-            delivery_status.status = 'failed'
-            delivery_status.error_message = error_message
-            
-        delivery_status.sent_at = timezone.now()
-        delivery_status.save()
-        
-        logger.info(
-            f"Notification {notification_id} sent to {recipient.email} via {channel.channel_type}: "
-            f"{'Success' if success else 'Failed'}"
-        )
-        
-        return success
+        queue_deliveries(notification, channel, [recipient_id])
+        summary = deliver_pending_notifications(notification_id, channel_id)
+        return summary['failed'] == 0
         
     except Exception as e:
         logger.error(f"Error sending notification {notification_id}: {str(e)}")
@@ -121,9 +326,6 @@ def send_test_notification(channel_id, message="This is a test notification from
             company=channel.company
         )
         
-        success = False
-        error_message = None
-        
         # Get first admin user from the company for testing
         test_recipient = User.objects.filter(
             company=channel.company, 
@@ -133,20 +335,11 @@ def send_test_notification(channel_id, message="This is a test notification from
         if not test_recipient:
             return False, "No active users found for testing"
         
-        if channel.channel_type == 'email':
-            success, error_message = _send_email_notification(channel, test_notification, test_recipient)
-        elif channel.channel_type == 'slack':
-            success, error_message = _send_slack_notification(channel, test_notification, test_recipient)
-        elif channel.channel_type == 'mattermost':
-            success, error_message = _send_mattermost_notification(channel, test_notification, test_recipient)
-        elif channel.channel_type == 'webhook':
-            success, error_message = _send_webhook_notification(channel, test_notification, test_recipient)
-        elif channel.channel_type == 'in_app':
-            # No actual sending for in-app test
-            success = True
-        else:
-            error_message = f"Unsupported channel type: {channel.channel_type}"
-            
+        error_message = NotificationDeliveryEngine().send(
+            channel, test_notification, [test_recipient]
+        ).get(test_recipient.id)
+        success = error_message is None
+        
         logger.info(
             f"Test notification sent via {channel.name} ({channel.channel_type}): "
             f"{'Success' if success else f'Failed: {error_message}'}"
@@ -157,227 +350,3 @@ def send_test_notification(channel_id, message="This is a test notification from
     except Exception as e:
         logger.error(f"Error sending test notification: {str(e)}")
         return False, str(e)
-
-
-def _send_email_notification(channel, notification, recipient):
-    """Send notification via email"""
-    try:
-        config = channel.config
-        
-        # Create email message
-        msg = MIMEMultipart()
-        msg['From'] = config.get('from_email', settings.DEFAULT_FROM_EMAIL)
-        msg['To'] = recipient.email
-        msg['Subject'] = notification.title
-        
-        # Add message body
-        msg.attach(MIMEText(notification.message, 'plain'))
-        
-        # Connect to SMTP server
-        with smtplib.SMTP(config.get('smtp_host', 'smtp.gmail.com'), 
-                          config.get('smtp_port', 587)) as server:
-            server.starttls()
-            server.login(
-                config.get('smtp_username'), 
-                config.get('smtp_password')
-            )
-            server.send_message(msg)
-            
-        return True, None
-        
-    except Exception as e:
-        return False, str(e)
-
-
-def _send_slack_notification(channel, notification, recipient):
-    """Send notification via Slack"""
-    try:
-        config = channel.config
-        webhook_url = config.get('webhook_url')
-        
-        if not webhook_url:
-            return False, "No webhook URL configured for Slack channel"
-            
-        # Prepare payload
-        payload = {
-            "text": f"*{notification.title}*\n{notification.message}",
-            "username": config.get('username', 'SentinelIQ Bot'),
-            "icon_emoji": config.get('icon_emoji', ':robot_face:')
-        }
-        
-        # Send to Slack
-        response = requests.post(webhook_url, json=payload)
-        
-        if response.status_code == 200:
-            return True, None
-        else:
-            return False, f"Slack API error: {response.status_code} - {response.text}"
-            
-    except Exception as e:
-        return False, str(e)
-
-
-def _send_mattermost_notification(channel, notification, recipient):
-    """Send notification via Mattermost"""
-    try:
-        config = channel.config
-        webhook_url = config.get('webhook_url')
-        
-        if not webhook_url:
-            return False, "No webhook URL configured for Mattermost channel"
-        
-        # Get recipient notification preferences (if available)
-        try:
-            preferences = recipient.notification_preferences
-            
-            # Check if recipient wants to receive this type of notification via Mattermost
-            if notification.category == 'alert' and not preferences.mattermost_alerts:
-                return True, "Skipped: Recipient has disabled Mattermost alerts"
-            elif notification.category == 'incident' and not preferences.mattermost_incidents:
-                return True, "Skipped: Recipient has disabled Mattermost incidents"
-            elif notification.category == 'task' and not preferences.mattermost_tasks:
-                return True, "Skipped: Recipient has disabled Mattermost tasks"
-                
-            # Check for critical-only setting
-            if preferences.mattermost_critical_only and notification.priority != 'critical':
-                return True, "Skipped: Recipient only wants critical notifications via Mattermost"
-                
-        except ObjectDoesNotExist:
-            # If preferences don't exist, proceed with default behavior
-            pass
-            
-        # Determine color based on priority
-        color = _get_color_for_priority(notification.priority)
-            
-        # Prepare payload with rich formatting
-        payload = {
-            "text": f"### {notification.title}",
-            "username": config.get('username', 'SentinelIQ Bot'),
-            "icon_url": config.get('icon_url'),
-            "channel": config.get('channel'),
-            "props": {
-                "attachments": [{
-                    "pretext": f"New {notification.category.title()}: {notification.title}",
-                    "text": notification.message,
-                    "color": color,
-                    "fields": [
-                        {
-                            "short": True,
-                            "title": "Priority",
-                            "value": notification.priority.title()
-                        },
-                        {
-                            "short": True,
-                            "title": "Category",
-                            "value": notification.category.title()
-                        }
-                    ]
-                }]
-            }
-        }
-        
-        # Add related object info if available
-        if notification.related_object_type and notification.related_object_id:
-            object_type = notification.related_object_type.title()
-            object_id = notification.related_object_id
-            
-            # Add field for related object
-            payload["props"]["attachments"][0]["fields"].append({
-                "short": True,
-                "title": f"{object_type} ID",
-                "value": str(object_id)
-            })
-            
-            # Add action button if configured
-            if config.get('include_actions', True):
-                base_url = config.get('app_base_url')
-                if base_url:
-                    object_url = f"{base_url.rstrip('/')}/{notification.related_object_type}s/{object_id}"
-                    
-                    payload["props"]["attachments"][0]["actions"] = [{
-                        "name": f"View {object_type}",
-                        "integration": {
-                            "url": object_url,
-                            "context": {
-                                "action": "view"
-                            }
-                        }
-                    }]
-        
-        # Send to Mattermost
-        headers = {
-            'Content-Type': 'application/json'
-        }
-        
-        # Add custom headers if specified
-        if 'headers' in config:
-            headers.update(config['headers'])
-            
-        response = requests.post(webhook_url, json=payload, headers=headers)
-        
-        if response.status_code in range(200, 300):
-            return True, None
-        else:
-            return False, f"Mattermost API error: {response.status_code} - {response.text}"
-            
-    except Exception as e:
-        return False, str(e)
-
-
-def _send_webhook_notification(channel, notification, recipient):
-    """Send notification via webhook"""
-    try:
-        config = channel.config
-        webhook_url = config.get('url')
-        
-        if not webhook_url:
-            return False, "No URL configured for webhook channel"
-            
-        # Prepare payload
-        payload = {
-            "title": notification.title,
-            "message": notification.message,
-            "category": notification.category,
-            "priority": notification.priority,
-            "timestamp": timezone.now().isoformat(),
-            "recipient": {
-                "id": str(recipient.id),
-                "email": recipient.email,
-                "username": recipient.username
-            }
-        }
-        
-        # Add additional fields if configured
-        if config.get('include_company', False) and hasattr(notification, 'company'):
-            payload["company"] = {
-                "id": str(notification.company.id),
-                "name": notification.company.name
-            }
-            
-        # Add headers if configured
-        headers = {}
-        if 'headers' in config:
-            headers.update(config['headers'])
-            
-        # Send webhook
-        response = requests.post(webhook_url, json=payload, headers=headers)
-        
-        # Check response
-        if response.status_code >= 200 and response.status_code < 300:
-            return True, None
-        else:
-            return False, f"HTTP error: {response.status_code} - {response.text}"
-            
-    except Exception as e:
-        return False, str(e)
-
-
-def _get_color_for_priority(priority):
-    """Get color code based on notification priority"""
-    color_map = {
-        'low': '#CCCCCC',       # Gray
-        'medium': '#FFCC00',    # Yellow
-        'high': '#FF9900',      # Orange
-        'critical': '#CC0000',  # Red
-    }
-    return color_map.get(priority, '#3366FF')  # Default blue 
\ No newline at end of file
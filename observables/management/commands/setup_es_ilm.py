@@ -1,7 +1,7 @@
 import logging
-from elasticsearch import Elasticsearch, NotFoundError
+from elasticsearch import NotFoundError
+from api.core.utils.elastic_utils import get_es_client
 from django.core.management.base import BaseCommand
-from django.conf import settings
 
 logger = logging.getLogger('api.observables')
 
@@ -12,11 +12,7 @@ class Command(BaseCommand):
         self.stdout.write('Setting up Elasticsearch ILM policy for observables...')
         
         # Connect to Elasticsearch
-        es_client = Elasticsearch(
-            hosts=settings.ELASTICSEARCH_HOSTS,
-            basic_auth=(settings.ELASTICSEARCH_USERNAME, settings.ELASTICSEARCH_PASSWORD),
-            verify_certs=settings.ELASTICSEARCH_VERIFY_CERTS
-        )
+        es_client = get_es_client()
         
         # Check if ES is available
         if not es_client.ping():
@@ -0,0 +1,692 @@
+import csv
+import json
+import logging
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime, timezone as dt_timezone
+from itertools import islice
+from django.db import connections, transaction, OperationalError
+from django.utils import timezone
+from api.v1.observables.enums import ObservableCategoryEnum, ObservableTypeEnum, ObservableTLPEnum
+
+try:
+    import ijson
+except ImportError:  # Optional: stream MISP exports instead of loading them whole
+    ijson = None
+
+logger = logging.getLogger('observables.import')
+
+VALID_TYPES = {member.value for member in ObservableTypeEnum}
+VALID_CATEGORIES = {member.value for member in ObservableCategoryEnum}
+VALID_TLPS = {member.value for member in ObservableTLPEnum}
+TLP_NAMES = {'white': 0, 'clear': 0, 'green': 1, 'amber': 2, 'red': 3}
+
+MAX_TAG_LENGTH = 50
+MAX_SOURCE_LENGTH = 100
+
+# Fields rewritten when an imported observable already exists
+MERGE_FIELDS = ['description', 'tags', 'first_seen', 'last_seen', 'confidence', 'is_ioc', 'updated_at']
+
+MISP_TYPE_MAP = {
+    'ip-src': 'ip',
+    'ip-dst': 'ip',
+    'hostname': 'hostname',
+    'domain': 'domain',
+    'email': 'email',
+    'url': 'url',
+    'uri': 'uri',
+    'md5': 'hash-md5',
+    'sha1': 'hash-sha1',
+    'sha256': 'hash-sha256',
+    'filename': 'filename',
+    'attachment': 'filename',
+    'email-subject': 'email-subject',
+    'mutex': 'mutex',
+    'regkey': 'regkey',
+    'vulnerability': 'vulnerability',
+    'threat-actor': 'threat-actor',
+    'btc': 'btc',
+    'ssdeep': 'ssdeep',
+    'email-src': 'email',
+    'email-dst': 'email',
+    'email-attachment': 'email-attachment',
+    'mac-address': 'mac-address',
+    'authentihash': 'authentihash',
+    'ja3-fingerprint-md5': 'ja3-fingerprint-md5'
+}
+
+MISP_CATEGORY_MAP = {
+    'Artifacts dropped': ObservableCategoryEnum.ARTIFACTS.value,
+    'Payload delivery': ObservableCategoryEnum.PAYLOAD_DELIVERY.value,
+    'Network activity': ObservableCategoryEnum.NETWORK_ACTIVITY.value,
+    'Payload installation': ObservableCategoryEnum.PAYLOAD_INSTALLATION.value,
+    'Persistence mechanism': ObservableCategoryEnum.PERSISTENCE.value,
+    'Payload type': ObservableCategoryEnum.PAYLOAD_TYPE.value,
+    'Attribution': ObservableCategoryEnum.ATTRIBUTION.value,
+    'External analysis': ObservableCategoryEnum.EXTERNAL_ANALYSIS.value,
+    'Financial fraud': ObservableCategoryEnum.FINANCIAL_FRAUD.value,
+    'Support Tool': ObservableCategoryEnum.SUPPORT_TOOL.value,
+    'Social network': ObservableCategoryEnum.SOCIAL_NETWORK.value,
+    'Person': ObservableCategoryEnum.PERSON.value,
+    'Targeting data': ObservableCategoryEnum.TARGETING.value,
+    'Antivirus detection': ObservableCategoryEnum.ANTIVIRUS.value,
+    'Internal reference': ObservableCategoryEnum.INTERNAL_REFERENCE.value,
+    'Other': ObservableCategoryEnum.OTHER.value
+}
+
+STIX_TYPE_MAP = {
+    'ipv4-addr': 'ip',
+    'ipv6-addr': 'ip',
+    'domain-name': 'domain',
+    'url': 'url',
+    'email-addr': 'email',
+    'file': 'filename',
+    'md5': 'hash-md5',
+    'sha-1': 'hash-sha1',
+    'sha-256': 'hash-sha256',
+    'registry-key': 'regkey',
+    'mutex': 'mutex',
+    'process': 'process',
+    'mac-addr': 'mac-address',
+    'autonomous-system': 'as',
+    'user-agent': 'user-agent'
+}
+
+STIX_PATTERN_RE = re.compile(r'\[([\w-]+):value\s*=\s*[\'"]([^\'"]+)[\'"]')
+
+
+def _parse_datetime(value, formats=()):
+    """Parse an ISO (or one of ``formats``) date string into an aware datetime."""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        for date_format in formats:
+            try:
+                parsed = datetime.strptime(value, date_format)
+                break
+            except ValueError:
+                continue
+        else:
+            return None
+    return timezone.make_aware(parsed) if timezone.is_naive(parsed) else parsed
+
+
+def _parse_tags(raw):
+    if not raw:
+        return []
+    if raw.startswith('['):
+        try:
+            return json.loads(raw)
+        except json.JSONDecodeError:
+            pass
+    return [tag.strip() for tag in raw.split(',') if tag.strip()]
+
+
+def _parse_tlp(raw):
+    try:
+        tlp = int(raw)
+        return tlp if tlp in VALID_TLPS else ObservableTLPEnum.AMBER.value
+    except (TypeError, ValueError):
+        return TLP_NAMES.get(str(raw).lower(), ObservableTLPEnum.AMBER.value)
+
+
+def iter_csv_records(file_path, source, default_category):
+    """
+    Stream observable records from a CSV file.
+
+    Columns: value,type and optionally description,tags,tlp,category,is_ioc,
+    first_seen,last_seen,confidence,source.
+
+    Args:
+        file_path (str): Path to the CSV file
+        source (str): Default source, also added as a tag
+        default_category (str): Category for rows without a valid one
+
+    Yields:
+        dict: Observable record
+    """
+    with open(file_path, 'r', newline='') as csv_file:
+        reader = csv.DictReader(csv_file)
+        for field in ('value', 'type'):
+            if field not in (reader.fieldnames or []):
+                raise ValueError(f"CSV file missing required column: {field}")
+
+        for row in reader:
+            tags = _parse_tags(row.get('tags'))
+            if source and source not in tags:
+                tags.append(source)
+
+            confidence = 50
+            try:
+                confidence = int(row.get('confidence') or 50)
+            except ValueError:
+                pass
+            if not 0 <= confidence <= 100:
+                confidence = 50
+
+            category = (row.get('category') or default_category).lower()
+            yield {
+                'value': (row.get('value') or '').strip(),
+                'type': (row.get('type') or '').strip(),
+                'description': row.get('description') or '',
+                'tags': tags,
+                'tlp': _parse_tlp(row.get('tlp', ObservableTLPEnum.AMBER.value)),
+                'category': category if category in VALID_CATEGORIES else default_category,
+                'is_ioc': (row.get('is_ioc') or '').lower() in ('true', 'yes', '1'),
+                'source': row.get('source') or source,
+                'confidence': confidence,
+                'first_seen': _parse_datetime(row.get('first_seen'), ('%Y-%m-%d',)),
+                'last_seen': _parse_datetime(row.get('last_seen'), ('%Y-%m-%d',))
+            }
+
+
+def _misp_events_prefix(json_file):
+    """
+    Return the ijson prefix of the events in a MISP export.
+
+    Exports list events under ``response``; a single event may also be
+    exported as ``{"response": {"Event": ...}}`` or as a bare ``{"Event": ...}``.
+    """
+    for prefix, event, _ in ijson.parse(json_file):
+        if prefix == 'response' and event == 'start_array':
+            return 'response.item'
+        if prefix == 'response' and event == 'start_map':
+            return 'response'
+        if prefix == 'Event' and event == 'start_map':
+            return ''
+    return None
+
+
+def _iter_misp_events(json_file):
+    if ijson is not None:
+        # Events are parsed one at a time; the whole export never sits in memory
+        prefix = _misp_events_prefix(json_file)
+        json_file.seek(0)
+        if prefix is not None:
+            yield from ijson.items(json_file, prefix, use_float=True)
+        return
+
+    data = json.load(json_file)
+    events = data.get('response', data)
+    if isinstance(events, dict):
+        events = [events] if 'Event' in events else []
+    yield from events
+
+
+def _tag_names(tag_list, tags):
+    for tag_data in tag_list or []:
+        tag_name = tag_data.get('name', '').replace('misp-galaxy:', '')
+        if tag_name and tag_name not in tags:
+            tags.append(tag_name)
+    return tags
+
+
+def iter_misp_records(file_path, source):
+    """
+    Stream observable records from a MISP JSON export.
+
+    Events are parsed incrementally when ``ijson`` is installed; otherwise the
+    export is loaded with the json module.
+
+    Args:
+        file_path (str): Path to the MISP export
+        source (str): Import source, added as a tag
+
+    Yields:
+        dict: Observable record, or a record with an ``error`` key for
+        attributes that cannot be imported
+    """
+    with open(file_path, 'rb') as json_file:
+        for event in _iter_misp_events(json_file):
+            event_data = event.get('Event', {})
+            event_info = event_data.get('info', 'MISP Event')
+            event_source = f"MISP:{event_data.get('id', 'unknown')}"
+            event_tags = _tag_names(event_data.get('Tag'), [])
+
+            for attribute in event_data.get('Attribute', []):
+                attr_type = attribute.get('type', '')
+                obs_type = MISP_TYPE_MAP.get(attr_type)
+                if attr_type and not obs_type:
+                    yield {'error': f"Skipping unsupported MISP type: {attr_type}"}
+                    continue
+
+                tags = _tag_names(attribute.get('Tag'), list(event_tags))
+                for tag in (source, event_source):
+                    if tag and tag not in tags:
+                        tags.append(tag)
+
+                description = attribute.get('comment', '')
+                if event_info:
+                    description = f"{description} (Event: {event_info})" if description else f"From MISP event: {event_info}"
+
+                first_seen = _parse_datetime(attribute.get('first_seen'))
+                if not first_seen and attribute.get('timestamp'):
+                    try:
+                        first_seen = datetime.fromtimestamp(int(attribute['timestamp']), tz=dt_timezone.utc)
+                    except (ValueError, TypeError):
+                        pass
+
+                tlp = ObservableTLPEnum.AMBER.value
+                for tag in tags:
+                    if tag.startswith('tlp:') and tag.split(':')[1].lower() in TLP_NAMES:
+                        tlp = TLP_NAMES[tag.split(':')[1].lower()]
+                        break
+
+                yield {
+                    'value': attribute.get('value', ''),
+                    'type': obs_type or '',
+                    'description': description,
+                    'tags': tags,
+                    'tlp': tlp,
+                    'category': MISP_CATEGORY_MAP.get(attribute.get('category', ''), ObservableCategoryEnum.OTHER.value),
+                    'is_ioc': bool(attribute.get('to_ids', False)),
+                    'source': event_source,
+                    'confidence': 70,
+                    'first_seen': first_seen,
+                    'last_seen': None
+                }
+
+
+def parse_stix_pattern(pattern):
+    """
+    Parse a STIX pattern and extract observable type and value.
+    Example pattern: [url:value = 'http://example.com']
+
+    Returns:
+        tuple: (observable type, value), or (None, None) if unparseable
+    """
+    match = STIX_PATTERN_RE.search(pattern)
+    if not match:
+        return None, None
+
+    stix_type, value = match.group(1), match.group(2)
+    if stix_type == 'file' and 'MD5' in pattern:
+        return 'hash-md5', value
+    elif stix_type == 'file' and 'SHA-1' in pattern:
+        return 'hash-sha1', value
+    elif stix_type == 'file' and 'SHA-256' in pattern:
+        return 'hash-sha256', value
+    return STIX_TYPE_MAP.get(stix_type), value
+
+
+def iter_stix_records(file_path, source):
+    """
+    Stream observable records from the indicators of a STIX 2.x bundle.
+
+    Args:
+        file_path (str): Path to the STIX bundle
+        source (str): Import source, added as a tag
+
+    Yields:
+        dict: Observable record, or a record with an ``error`` key
+    """
+    with open(file_path, 'r') as json_file:
+        objects = json.load(json_file).get('objects', [])
+
+    for obj in objects:
+        if obj.get('type') != 'indicator':
+            continue
+
+        pattern = obj.get('pattern', '')
+        obs_type, obs_value = parse_stix_pattern(pattern)
+        if not obs_type or not obs_value:
+            yield {'error': f"Skipping unparseable STIX pattern: {pattern}"}
+            continue
+
+        name = obj.get('name', '')
+        description = obj.get('description', '')
+        if name:
+            description = f"{name}: {description}" if description else name
+
+        tags = list(obj.get('labels', []))
+        if source and source not in tags:
+            tags.append(source)
+        tags.append('stix2')
+
+        category = ObservableCategoryEnum.NETWORK_ACTIVITY.value
+        if obs_type.startswith('hash'):
+            category = ObservableCategoryEnum.ARTIFACTS.value
+        elif obs_type in ('process', 'windows-registry-key'):
+            category = ObservableCategoryEnum.PAYLOAD_INSTALLATION.value
+
+        yield {
+            'value': obs_value,
+            'type': obs_type,
+            'description': description,
+            'tags': tags,
+            'tlp': ObservableTLPEnum.AMBER.value,
+            'category': category,
+            'is_ioc': True,
+            'source': f"STIX:{obj.get('id', 'unknown')}",
+            'confidence': 70,
+            'first_seen': _parse_datetime(obj.get('created')),
+            'last_seen': _parse_datetime(obj.get('modified'))
+        }
+
+
+def validate_records(records, overwrite_description=True):
+    """
+    Validate a batch of records against the Observable field constraints.
+
+    Replaces a full_clean() per row with set lookups over the batch;
+    relationship checks in Observable.clean() do not apply to imports, which
+    never link alerts or incidents.
+
+    Args:
+        records (list): Records produced by the iter_*_records functions
+        overwrite_description (bool): Let later duplicates replace the description
+
+    Returns:
+        tuple: (valid records deduplicated by (type, value) with later rows
+        merged into earlier ones, list of error messages)
+    """
+    valid = {}
+    errors = []
+    for record in records:
+        if 'error' in record:
+            errors.append(record['error'])
+            continue
+
+        value, obs_type = record['value'], record['type']
+        if not value or not obs_type:
+            errors.append("Skipping - missing value or type")
+            continue
+        if obs_type not in VALID_TYPES:
+            errors.append(f"Invalid observable type '{obs_type}' for {value}")
+            continue
+
+        record['tags'] = [str(tag)[:MAX_TAG_LENGTH] for tag in record['tags']]
+        record['source'] = (record['source'] or '')[:MAX_SOURCE_LENGTH]
+        if record['category'] not in VALID_CATEGORIES:
+            record['category'] = ObservableCategoryEnum.OTHER.value
+        if record['tlp'] not in VALID_TLPS:
+            record['tlp'] = ObservableTLPEnum.AMBER.value
+        if not 0 <= record['confidence'] <= 100:
+            errors.append(f"Confidence out of range for {obs_type}: {value}")
+            continue
+
+        key = (obs_type, value)
+        if key in valid:
+            _merge_record(valid[key], record, overwrite_description)
+        else:
+            valid[key] = record
+    return list(valid.values()), errors
+
+
+def _merge_record(target, record, overwrite_description):
+    """Merge ``record`` into ``target`` with the import's update rules."""
+    target['tags'] = target['tags'] + [tag for tag in record['tags'] if tag not in target['tags']]
+    if record['description'] and (overwrite_description or not target['description']):
+        target['description'] = record['description']
+    if record['first_seen'] and (not target['first_seen'] or record['first_seen'] < target['first_seen']):
+        target['first_seen'] = record['first_seen']
+    if record['last_seen'] and (not target['last_seen'] or record['last_seen'] > target['last_seen']):
+        target['last_seen'] = record['last_seen']
+    target['confidence'] = max(target['confidence'], record['confidence'])
+    target['is_ioc'] = target['is_ioc'] or record['is_ioc']
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class ObservableBulkImporter:
+    """
+    Import observables in chunks with set-based reads and writes.
+
+    Each chunk is validated in one pass, existing (type, value) keys are
+    fetched with one locked query, and rows are written with one
+    bulk_create that either skips (``on_conflict='ignore'``) or upserts
+    (``on_conflict='update'``) on unique_observable_per_company. Every chunk
+    commits on its own; a checkpoint file records how many input records
+    are done so an interrupted import can resume.
+
+    Usage:
+        importer = ObservableBulkImporter(company, user)
+        stats = importer.run(iter_csv_records(path, 'import', 'other'), checkpoint_path=path + '.checkpoint')
+    """
+
+    def __init__(self, company, user, chunk_size=5000, on_conflict='update',
+                 overwrite_description=True, dry_run=False):
+        """
+        Initialize the importer.
+
+        Args:
+            company: Company the observables belong to
+            user: User set as created_by on new observables
+            chunk_size (int): Records per chunk and transaction
+            on_conflict (str): 'update' merges into existing observables,
+                'ignore' leaves them untouched
+            overwrite_description (bool): Replace existing descriptions
+                instead of only filling empty ones
+            dry_run (bool): Validate and count without writing
+        """
+        if on_conflict not in ('update', 'ignore'):
+            raise ValueError(f"Unsupported on_conflict mode: {on_conflict}")
+
+        self.company = company
+        self.user = user
+        self.chunk_size = chunk_size
+        self.on_conflict = on_conflict
+        self.overwrite_description = overwrite_description
+        self.dry_run = dry_run
+
+    def import_chunk(self, records):
+        """
+        Validate and write one chunk of records in a single transaction.
+
+        Args:
+            records (list): Records produced by the iter_*_records functions
+
+        Returns:
+            dict: created/updated/skipped/errors counts and error messages
+        """
+        from observables.models import Observable
+
+        valid, errors = validate_records(records, self.overwrite_description)
+        stats = {'created': 0, 'updated': 0, 'skipped': 0, 'errors': len(errors), 'error_messages': errors}
+        if not valid:
+            return stats
+
+        # Sorted keys make concurrent chunks lock rows in the same order
+        valid.sort(key=lambda record: (record['type'], record['value']))
+
+        with transaction.atomic():
+            existing_query = Observable.objects.filter(
+                company=self.company,
+                type__in={record['type'] for record in valid},
+                value__in=[record['value'] for record in valid]
+            ).only('type', 'value', *MERGE_FIELDS)
+            if not self.dry_run and self.on_conflict == 'update':
+                existing_query = existing_query.select_for_update()
+            existing = {(obs.type, obs.value): obs for obs in existing_query}
+
+            rows = []
+            for record in valid:
+                current = existing.get((record['type'], record['value']))
+                if current is None:
+                    stats['created'] += 1
+                elif self.on_conflict == 'ignore':
+                    stats['skipped'] += 1
+                    continue
+                else:
+                    stats['updated'] += 1
+                    merged = {field: getattr(current, field) for field in MERGE_FIELDS}
+                    _merge_record(merged, record, self.overwrite_description)
+                    record = {**record, **merged}
+
+                rows.append(Observable(
+                    company=self.company,
+                    created_by=self.user,
+                    **{field: record[field] for field in (
+                        'type', 'value', 'description', 'tags', 'tlp', 'category',
+                        'is_ioc', 'source', 'confidence', 'first_seen', 'last_seen'
+                    )}
+                ))
+
+            if self.dry_run:
+                return stats
+
+            if self.on_conflict == 'ignore':
+                Observable.objects.bulk_create(rows, ignore_conflicts=True)
+            else:
+                Observable.objects.bulk_create(
+                    rows,
+                    update_conflicts=True,
+                    unique_fields=['type', 'value', 'company'],
+                    update_fields=MERGE_FIELDS
+                )
+        return stats
+
+    def _import_chunk_with_retry(self, records, attempts=3):
+        for attempt in range(1, attempts + 1):
+            try:
+                return self.import_chunk(records)
+            except OperationalError as e:
+                # Deadlocks between parallel chunks touching the same keys
+                if attempt == attempts:
+                    raise
+                logger.warning(f"Retrying import chunk after database error: {str(e)}")
+                time.sleep(attempt)
+
+    def run(self, records, checkpoint_path=None, resume=False, workers=1, progress=None):
+        """
+        Import a stream of records chunk by chunk.
+
+        Args:
+            records: Iterable of records (consumed lazily)
+            checkpoint_path (str): File recording the number of records done
+            resume (bool): Skip the records a previous run checkpointed
+            workers (int): Worker processes; 1 imports in this process
+            progress (callable): Called with the running totals after each chunk
+
+        Returns:
+            dict: Totals of processed/created/updated/skipped/errors and elapsed seconds
+        """
+        started = time.monotonic()
+        totals = {'processed': 0, 'created': 0, 'updated': 0, 'skipped': 0, 'errors': 0, 'error_messages': []}
+
+        done = 0
+        if resume and checkpoint_path and os.path.exists(checkpoint_path):
+            with open(checkpoint_path) as f:
+                checkpoint = json.load(f)
+            done = checkpoint['records_done']
+            totals.update({key: checkpoint.get(key, 0) for key in ('created', 'updated', 'skipped', 'errors')})
+            totals['processed'] = done
+            records = islice(records, done, None)
+            logger.info(f"Resuming import after {done} records")
+
+        def add(chunk_stats, chunk_len):
+            totals['processed'] += chunk_len
+            for key in ('created', 'updated', 'skipped', 'errors'):
+                totals[key] += chunk_stats[key]
+            totals['error_messages'].extend(chunk_stats['error_messages'][:100 - len(totals['error_messages'])])
+
+        def save_checkpoint():
+            if checkpoint_path and not self.dry_run:
+                with open(checkpoint_path, 'w') as f:
+                    json.dump({
+                        'records_done': totals['processed'],
+                        **{key: totals[key] for key in ('created', 'updated', 'skipped', 'errors')},
+                        'saved_at': timezone.now().isoformat()
+                    }, f)
+            if progress:
+                progress(totals)
+
+        chunks = _chunks(records, self.chunk_size)
+        if workers <= 1:
+            for chunk in chunks:
+                add(self._import_chunk_with_retry(chunk), len(chunk))
+                save_checkpoint()
+        else:
+            self._run_parallel(chunks, workers, add, save_checkpoint)
+
+        if checkpoint_path and not self.dry_run and os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+
+        totals['seconds'] = round(time.monotonic() - started, 3)
+        return totals
+
+    def _run_parallel(self, chunks, workers, add, save_checkpoint):
+        """
+        Import chunks in a process pool.
+
+        The checkpoint only advances over a contiguous prefix of finished
+        chunks, so resuming never skips a chunk that was still in flight.
+        """
+        # Forked workers must not share the parent's database connections
+        connections.close_all()
+        options = {
+            'company_id': self.company.pk,
+            'user_id': self.user.pk,
+            'chunk_size': self.chunk_size,
+            'on_conflict': self.on_conflict,
+            'overwrite_description': self.overwrite_description,
+            'dry_run': self.dry_run
+        }
+
+        finished = {}
+        in_flight = {}
+        next_index = 0
+
+        def collect(return_when):
+            done, _ = wait(in_flight, return_when=return_when)
+            for future in done:
+                index, chunk_len = in_flight.pop(future)
+                finished[index] = (future.result(), chunk_len)
+
+        def drain():
+            nonlocal next_index
+            while next_index in finished:
+                chunk_stats, chunk_len = finished.pop(next_index)
+                add(chunk_stats, chunk_len)
+                next_index += 1
+                save_checkpoint()
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+            for index, chunk in enumerate(chunks):
+                future = executor.submit(_import_chunk_in_worker, options, chunk)
+                in_flight[future] = (index, len(chunk))
+
+                # Bound memory: only a couple of chunks per worker are buffered
+                if len(in_flight) >= workers * 2:
+                    collect(FIRST_COMPLETED)
+                    drain()
+
+            while in_flight:
+                collect(FIRST_COMPLETED)
+                drain()
+
+
+def _init_worker():
+    import django
+    from django.apps import apps
+
+    # Spawned workers start without Django; forked ones must drop inherited connections
+    if not apps.ready:
+        django.setup()
+    connections.close_all()
+
+
+def _import_chunk_in_worker(options, records):
+    from companies.models import Company
+    from django.contrib.auth import get_user_model
+
+    importer = ObservableBulkImporter(
+        Company.objects.get(pk=options['company_id']),
+        get_user_model().objects.get(pk=options['user_id']),
+        chunk_size=options['chunk_size'],
+        on_conflict=options['on_conflict'],
+        overwrite_description=options['overwrite_description'],
+        dry_run=options['dry_run']
+    )
+    return importer._import_chunk_with_retry(records)
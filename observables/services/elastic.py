@@ -2,8 +2,7 @@ import json
 import logging
 import hashlib
 from datetime import datetime, timedelta
-from elasticsearch import Elasticsearch
-from django.conf import settings
+from api.core.utils.elastic_utils import get_es_client
 from django.utils import timezone
 
 logger = logging.getLogger('api')
@@ -24,11 +23,7 @@ class BaseElasticIndexer:
         Args:
             company_id: UUID of the company for tenant isolation
         """
-        self.es_client = Elasticsearch(
-            hosts=settings.ELASTICSEARCH_HOSTS,
-            basic_auth=(settings.ELASTICSEARCH_USERNAME, settings.ELASTICSEARCH_PASSWORD),
-            verify_certs=settings.ELASTICSEARCH_VERIFY_CERTS
-        )
+        self.es_client = get_es_client()
         self.company_id = company_id
         
     @property
@@ -212,11 +207,7 @@ class ElasticLookupService:
         Args:
             company_id: UUID of the company for tenant isolation
         """
-        self.es_client = Elasticsearch(
-            hosts=settings.ELASTICSEARCH_HOSTS,
-            basic_auth=(settings.ELASTICSEARCH_USERNAME, settings.ELASTICSEARCH_PASSWORD),
-            verify_certs=settings.ELASTICSEARCH_VERIFY_CERTS
-        )
+        self.es_client = get_es_client()
         self.company_id = company_id
         self.indexer = BaseElasticIndexer(company_id)
     
@@ -44,34 +44,20 @@ class ReportGenerator:
             
             # Generate timeline entries
             timeline_entries = []
-            if incident.timeline and isinstance(incident.timeline, list):
-                for entry in sorted(incident.timeline, key=lambda x: x.get('timestamp', ''), reverse=False):
-                    # Get user display name for the timeline entry
-                    created_by_id = entry.get('created_by')
-                    created_by = "System"
-                    
-                    if created_by_id:
-                        try:
-                            user = User.objects.get(id=created_by_id)
-                            created_by = f"{user.first_name} {user.last_name}" if user.first_name else user.username
-                        except User.DoesNotExist:
-                            created_by = f"User {created_by_id} (deleted)"
-                    
-                    entry_time = entry.get('timestamp', '')
-                    try:
-                        # Try to format timestamp nicely
-                        entry_time = datetime.fromisoformat(entry_time).strftime('%Y-%m-%d %H:%M:%S')
-                    except (ValueError, TypeError):
-                        # Use as is if parsing fails
-                        pass
-                    
-                    timeline_entries.append({
-                        'title': entry.get('title', 'Event'),
-                        'content': entry.get('content', ''),
-                        'type': entry.get('type', 'note'),
-                        'created_by': created_by,
-                        'timestamp': entry_time
-                    })
+            timeline_events = incident.timeline_events.select_related('user').order_by('timestamp', 'id')
+            for event in timeline_events.iterator():
+                # Get user display name for the timeline entry
+                created_by = "System"
+                if event.user:
+                    created_by = f"{event.user.first_name} {event.user.last_name}" if event.user.first_name else event.user.username
+                
+                timeline_entries.append({
+                    'title': event.title or 'Event',
+                    'content': event.message or '',
+                    'type': event.metadata.get('entry_type', event.type),
+                    'created_by': created_by,
+                    'timestamp': event.timestamp.strftime('%Y-%m-%d %H:%M:%S')
+                })
             
             # Build markdown content
             report = f"""# Incident Report: {incident.title}
@@ -23,6 +23,16 @@ def init_sentry_worker(**kwargs):
     logger.info("Sentry initialized for Celery worker")
 
 
+@signals.worker_process_init.connect
+def reset_elasticsearch_clients(**kwargs):
+    """
+    Drop Elasticsearch clients inherited from the parent process.
+    Each prefork pool worker then opens its own connection pool.
+    """
+    from api.core.utils.elastic_utils import reset_es_clients
+    reset_es_clients()
+
+
 @signals.beat_init.connect
 def init_sentry_beat(**kwargs):
     """
@@ -574,6 +574,15 @@ CELERY_BEAT_SCHEDULE = {
         'schedule': timedelta(seconds=1),  # Change from 10 seconds to 60 minutes
         'options': {'queue': 'sentineliq_soar_setup'}
     },
+    'schedule-misp-sync': {
+        'task': 'api.v1.misp_sync.tasks.schedule_misp_sync_for_active_servers',
+        'schedule': timedelta(minutes=15),  # Servers are synced once their sync interval has passed
+    },
+    'drain-alert-ingest-queue': {
+        'task': 'sentineliq.tasks.alerts.drain_alert_ingest_queue',
+        'schedule': timedelta(minutes=1),  # Picks up entries left by crashed workers
+        'options': {'queue': 'sentineliq_soar_alert_ingest'}
+    },
     'auto-run-migrations': {
         'task': 'api.core.tasks.run_migrations',
         'schedule': timedelta(hours=24),  # Run once a day
@@ -590,11 +599,89 @@ EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER', '')
 EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD', '')
 DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', 'noreply@sentineliq.com')
 
+# Notification delivery settings
+NOTIFICATION_DELIVERY_BATCH_SIZE = int(os.getenv('NOTIFICATION_DELIVERY_BATCH_SIZE', 500))  # Delivery rows per bulk_update
+NOTIFICATION_FANOUT_CHUNK_SIZE = int(os.getenv('NOTIFICATION_FANOUT_CHUNK_SIZE', 500))  # Recipients per company-wide delivery task
+NOTIFICATION_EMAIL_BCC_BATCH_SIZE = int(os.getenv('NOTIFICATION_EMAIL_BCC_BATCH_SIZE', 50))  # Recipients per email
+NOTIFICATION_SMTP_TIMEOUT = int(os.getenv('NOTIFICATION_SMTP_TIMEOUT', 30))  # Seconds
+NOTIFICATION_HTTP_TIMEOUT = float(os.getenv('NOTIFICATION_HTTP_TIMEOUT', 10))  # Seconds
+NOTIFICATION_HTTP_POOL_SIZE = int(os.getenv('NOTIFICATION_HTTP_POOL_SIZE', 10))  # Pooled connections per host and process
+NOTIFICATION_RULE_CACHE_TTL = int(os.getenv('NOTIFICATION_RULE_CACHE_TTL', 3600))  # Seconds a compiled rule set is cached per company
+NOTIFICATION_COALESCE_WINDOW = int(os.getenv('NOTIFICATION_COALESCE_WINDOW', 60))  # Seconds rule notifications are collected into one digest (0 disables)
+NOTIFICATION_DIGEST_TEMPLATE = os.getenv(
+    'NOTIFICATION_DIGEST_TEMPLATE',
+    '{{ rule.name }}: {{ count }} notifications\n'
+    '{% for notification in notifications %}- [{{ notification.priority|upper }}] {{ notification.title }}\n{% endfor %}'
+)  # First line becomes the digest title
+NOTIFICATION_REDIS_URL = os.getenv('NOTIFICATION_REDIS_URL', CELERY_RESULT_BACKEND)  # Token buckets shared by all workers
+NOTIFICATION_CHANNEL_RATE_LIMITS = {  # (requests per second, burst) per channel type, overridable in channel config 'rate_limit'
+    'email': (5, 20),
+    'slack': (1, 5),
+    'mattermost': (5, 20),
+    'webhook': (10, 50),
+}
+
 # Elasticsearch settings
 ELASTICSEARCH_HOSTS = os.getenv('ELASTICSEARCH_HOSTS', 'http://elasticsearch:9200').split(',')
 ELASTICSEARCH_USERNAME = os.getenv('ELASTICSEARCH_USERNAME', 'elastic')
 ELASTICSEARCH_PASSWORD = os.getenv('ELASTICSEARCH_PASSWORD', 'changeme')
 ELASTICSEARCH_VERIFY_CERTS = os.getenv('ELASTICSEARCH_VERIFY_CERTS', 'False') == 'True'
+ELASTICSEARCH_CONNECTIONS_PER_NODE = int(os.getenv('ELASTICSEARCH_CONNECTIONS_PER_NODE', 10))  # Pooled connections per node and process
+ELASTICSEARCH_REQUEST_TIMEOUT = int(os.getenv('ELASTICSEARCH_REQUEST_TIMEOUT', 30))  # Seconds
+ELASTICSEARCH_MAX_RETRIES = int(os.getenv('ELASTICSEARCH_MAX_RETRIES', 3))
+ELASTICSEARCH_RETRY_ON_TIMEOUT = os.getenv('ELASTICSEARCH_RETRY_ON_TIMEOUT', 'True') == 'True'
+
+# SentinelVision feed ingestion settings
+FEED_INGESTION_CHUNK_SIZE = int(os.getenv('FEED_INGESTION_CHUNK_SIZE', 64 * 1024))  # Bytes read per network call
+# Fetch global feeds once into a shared feed_<feed_id> index instead of once per company
+SENTINELVISION_SHARED_FEED_INDEX = os.getenv('SENTINELVISION_SHARED_FEED_INDEX', 'False') == 'True'
+# Send conditional requests and only write indicators added/removed since the last sync
+SENTINELVISION_FEED_DELTA_SYNC = os.getenv('SENTINELVISION_FEED_DELTA_SYNC', 'True') == 'True'
+SENTINELVISION_ENRICHMENT_CHUNK_SIZE = int(os.getenv('SENTINELVISION_ENRICHMENT_CHUNK_SIZE', 2000))  # IOC values per feed terms query
+SENTINELVISION_FEED_INDEX_MAP_TTL = int(os.getenv('SENTINELVISION_FEED_INDEX_MAP_TTL', 300))  # Seconds to cache the feed index map
+# Bloom filters consulted before feed lookups in Elasticsearch
+SENTINELVISION_IOC_FILTER_ENABLED = os.getenv('SENTINELVISION_IOC_FILTER_ENABLED', 'True') == 'True'
+SENTINELVISION_IOC_FILTER_REDIS_URL = os.getenv('SENTINELVISION_IOC_FILTER_REDIS_URL', CELERY_RESULT_BACKEND)
+SENTINELVISION_IOC_FILTER_ERROR_RATE = float(os.getenv('SENTINELVISION_IOC_FILTER_ERROR_RATE', 0.001))
+SENTINELVISION_IOC_FILTER_REFRESH_SECONDS = int(os.getenv('SENTINELVISION_IOC_FILTER_REFRESH_SECONDS', 60))  # How often workers check for a rebuilt filter
+
+# Elasticsearch bulk indexing settings
+ELASTICSEARCH_BULK_CHUNK_SIZE = int(os.getenv('ELASTICSEARCH_BULK_CHUNK_SIZE', 2000))  # Max documents per bulk request
+ELASTICSEARCH_BULK_MAX_CHUNK_BYTES = int(os.getenv('ELASTICSEARCH_BULK_MAX_CHUNK_BYTES', 10 * 1024 * 1024))  # Max bytes per bulk request
+ELASTICSEARCH_BULK_MAX_IN_FLIGHT = int(os.getenv('ELASTICSEARCH_BULK_MAX_IN_FLIGHT', 4))  # Concurrent bulk requests
+ELASTICSEARCH_BULK_MAX_RETRIES = int(os.getenv('ELASTICSEARCH_BULK_MAX_RETRIES', 3))  # Retries for items rejected with 429
+
+# Alert ingestion settings
+ALERT_INGEST_BATCH_MAX_SIZE = int(os.getenv('ALERT_INGEST_BATCH_MAX_SIZE', 1000))  # Max alerts per /alerts/ingest-batch/ request
+# Accept-and-enqueue mode: ingest endpoints answer 202 and workers drain a Redis stream
+ALERT_INGEST_ASYNC = os.getenv('ALERT_INGEST_ASYNC', 'False') == 'True'  # Default mode; ?mode=async|sync overrides per request
+ALERT_INGEST_REDIS_URL = os.getenv('ALERT_INGEST_REDIS_URL', CELERY_RESULT_BACKEND)
+ALERT_INGEST_STREAM_KEY = os.getenv('ALERT_INGEST_STREAM_KEY', 'sentineliq:alert-ingest')
+ALERT_INGEST_QUEUE_MAX_DEPTH = int(os.getenv('ALERT_INGEST_QUEUE_MAX_DEPTH', 50000))  # Alerts waiting before requests get 429
+ALERT_INGEST_DRAIN_RATE = int(os.getenv('ALERT_INGEST_DRAIN_RATE', 500))  # Expected alerts/second drained, used for Retry-After
+ALERT_INGEST_MAX_RETRY_AFTER = int(os.getenv('ALERT_INGEST_MAX_RETRY_AFTER', 300))  # Seconds
+ALERT_INGEST_MICRO_BATCH_SIZE = int(os.getenv('ALERT_INGEST_MICRO_BATCH_SIZE', 200))  # Stream entries per worker transaction
+ALERT_INGEST_DRAIN_SECONDS = int(os.getenv('ALERT_INGEST_DRAIN_SECONDS', 50))  # Max time one drain task keeps reading
+ALERT_INGEST_CLAIM_IDLE_MS = int(os.getenv('ALERT_INGEST_CLAIM_IDLE_MS', 5 * 60 * 1000))  # Reclaim entries of dead workers after this idle time
+ALERT_INGEST_RESULT_TTL = int(os.getenv('ALERT_INGEST_RESULT_TTL', 24 * 3600))  # Seconds tracking results are kept
+
+# Incident timeline settings
+# Most recent entries cached in Incident.timeline (0 disables the cache; TimelineEvent holds the full timeline)
+INCIDENT_TIMELINE_CACHE_SIZE = int(os.getenv('INCIDENT_TIMELINE_CACHE_SIZE', 20))
+INCIDENT_TIMELINE_PAGE_SIZE = int(os.getenv('INCIDENT_TIMELINE_PAGE_SIZE', 50))  # Default events per timeline page
+
+# MISP synchronisation settings
+MISP_SYNC_PAGE_SIZE = int(os.getenv('MISP_SYNC_PAGE_SIZE', 100))  # Events per MISP search page, committed together
+MISP_SYNC_BULK_BATCH_SIZE = int(os.getenv('MISP_SYNC_BULK_BATCH_SIZE', 1000))  # Rows per bulk upsert statement
+MISP_SYNC_SHARD_HOURS = int(os.getenv('MISP_SYNC_SHARD_HOURS', 24))  # Width of the time windows a long sync range is split into
+MISP_SYNC_MAX_SHARDS = int(os.getenv('MISP_SYNC_MAX_SHARDS', 32))  # Windows per server run; wider windows beyond that
+MISP_SYNC_REDIS_URL = os.getenv('MISP_SYNC_REDIS_URL', CELERY_RESULT_BACKEND)  # Server locks and concurrency slots
+MISP_SYNC_LOCK_TTL = int(os.getenv('MISP_SYNC_LOCK_TTL', 6 * 3600))  # Seconds a server stays locked by an unfinished run
+MISP_SYNC_SLOT_TTL = int(os.getenv('MISP_SYNC_SLOT_TTL', CELERY_TASK_TIME_LIMIT))  # Seconds before a slot of a dead worker is reclaimed
+MISP_SYNC_SLOT_RETRY_SECONDS = int(os.getenv('MISP_SYNC_SLOT_RETRY_SECONDS', 30))  # Wait before retrying when all slots are taken
+
+# MITRE ATT&CK import settings
+MITRE_IMPORT_BATCH_SIZE = int(os.getenv('MITRE_IMPORT_BATCH_SIZE', 1000))  # Rows per bulk upsert statement
 
 # Sentry Configuration
 # The DSN should be set in the environment variable SENTRY_DSN
@@ -27,6 +27,7 @@ TASK_MODULES = [
     
     # External app modules
     'api.core.tasks',
+    'api.v1.misp_sync.tasks',
     'mitre.tasks',
     'sentinelvision.tasks',
     'sentinelvision.tasks.feed_tasks',
@@ -11,4 +11,5 @@ __all__ = [
     'process_alert',
     'send_alert_notification',
     'cleanup_expired_alerts',
+    'drain_alert_ingest_queue',
 ] 
\ No newline at end of file
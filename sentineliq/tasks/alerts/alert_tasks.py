@@ -6,6 +6,8 @@ managing security alerts in the system.
 """
 
 import logging
+import time
+from django.conf import settings
 from django.utils import timezone
 from django.db import transaction
 
@@ -306,4 +308,49 @@ def bulk_recalculate_severity(self, alert_ids=None, company_id=None, **kwargs):
         return {
             'status': 'error',
             'error': str(e),
-        } 
\ No newline at end of file
+        } 
+
+
+@register_task(
+    name='sentineliq.tasks.alerts.drain_alert_ingest_queue',
+    queue='sentineliq_soar_alert_ingest',
+    base=BaseTask,
+    # Failed micro-batches stay pending in the stream and are reclaimed instead
+    autoretry_for=(),
+)
+def drain_alert_ingest_queue(self, max_seconds=None, **kwargs):
+    """
+    Drain the queued alert ingest stream in micro-batches.
+
+    Started when alerts are enqueued and periodically by beat. Runs until
+    the stream is empty or ``max_seconds`` have passed.
+
+    Args:
+        max_seconds: Time budget (default: ALERT_INGEST_DRAIN_SECONDS)
+        **kwargs: Additional parameters
+
+    Returns:
+        dict: Micro-batches processed and created/duplicate/error counts
+    """
+    from alerts.services.ingest_queue import AlertIngestQueue, consumer_name
+
+    queue = AlertIngestQueue()
+    queue.ensure_group()
+    consumer = consumer_name()
+    deadline = time.monotonic() + (max_seconds or settings.ALERT_INGEST_DRAIN_SECONDS)
+
+    totals = {'batches': 0, 'created': 0, 'duplicate': 0, 'error': 0}
+    while time.monotonic() < deadline:
+        entries = queue.read_batch(consumer, settings.ALERT_INGEST_MICRO_BATCH_SIZE, block_ms=1000)
+        if not entries:
+            break
+        for key, count in queue.process(entries).items():
+            totals[key] += count
+        totals['batches'] += 1
+
+    if totals['batches']:
+        logger.info(
+            f"Alert ingest drain: {totals['batches']} batches, {totals['created']} created, "
+            f"{totals['duplicate']} duplicates, {totals['error']} errors"
+        )
+    return {'status': 'success', **totals}
@@ -644,43 +644,43 @@ def monthly_statistics(self):
         
         # 3. Collect system usage statistics
         try:
-            from api.v1.audit_logs.models import AuditLog
+            from auditlog.models import LogEntry
+            from api.models import AuditLogEntryIndex
+            
+            audit_logs = LogEntry.objects.filter(
+                timestamp__gte=start_date,
+                timestamp__lt=end_date
+            )
             
             audit_stats = {
-                'total_actions': AuditLog.objects.filter(
-                    created_at__gte=start_date,
-                    created_at__lt=end_date
-                ).count(),
+                'total_actions': audit_logs.count(),
                 'by_actor_type': {},
                 'by_action': {},
                 'by_entity_type': {},
             }
             
             # Get actions by actor type
-            actor_counts = AuditLog.objects.filter(
-                created_at__gte=start_date,
-                created_at__lt=end_date
-            ).values('actor').annotate(count=Count('id'))
-            
-            for item in actor_counts:
-                actor = item['actor'] or 'unknown'
-                audit_stats['by_actor_type'][actor] = item['count']
+            actor_counts = audit_logs.aggregate(
+                user=Count('id', filter=Q(actor__isnull=False)),
+                system=Count('id', filter=Q(actor__isnull=True))
+            )
+            audit_stats['by_actor_type'] = {
+                actor: count for actor, count in actor_counts.items() if count
+            }
                 
             # Get actions by action type
-            action_counts = AuditLog.objects.filter(
-                created_at__gte=start_date,
-                created_at__lt=end_date
-            ).values('action').annotate(count=Count('id'))
+            action_names = dict(LogEntry.Action.choices)
+            action_counts = audit_logs.values('action').annotate(count=Count('id'))
             
             for item in action_counts:
-                action = item['action'] or 'unknown'
+                action = action_names.get(item['action'], 'unknown')
                 audit_stats['by_action'][action] = item['count']
                 
-            # Get actions by entity type
-            entity_counts = AuditLog.objects.filter(
-                created_at__gte=start_date,
-                created_at__lt=end_date
-            ).values('entity_type').annotate(count=Count('id'))
+            # Get actions by entity type from the indexed columns
+            entity_counts = AuditLogEntryIndex.objects.filter(
+                timestamp__gte=start_date,
+                timestamp__lt=end_date
+            ).values('entity_type').annotate(count=Count('log_entry'))
             
             for item in entity_counts:
                 entity_type = item['entity_type'] or 'unknown'
@@ -689,7 +689,7 @@ def monthly_statistics(self):
             stats['metrics']['audit_logs'] = audit_stats
                 
         except ImportError:
-            logger.warning("AuditLog module not available, skipping audit statistics")
+            logger.warning("Audit log module not available, skipping audit statistics")
         
         # Store the statistics in a file
         stat_filename = f"monthly_stats_{start_date.strftime('%Y-%m')}.json"
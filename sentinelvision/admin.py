@@ -329,7 +329,8 @@ class FeedRegistryAdmin(admin.ModelAdmin):
     list_filter = ('feed_type', 'company', 'enabled', 'sync_status')
     search_fields = ('name', 'description', 'source_url')
     readonly_fields = ('last_sync', 'next_sync', 'sync_status', 'total_iocs', 'last_import_count', 
-                      'total_imports', 'error_count', 'last_error', 'last_log', 'created_at', 'updated_at')
+                      'total_imports', 'error_count', 'last_error', 'last_log', 'ioc_filter_info',
+                      'created_at', 'updated_at')
     fieldsets = (
         (None, {
             'fields': ('name', 'description', 'feed_type', 'source_url', 'enabled', 'company')
@@ -343,11 +344,41 @@ class FeedRegistryAdmin(admin.ModelAdmin):
         ('Statistics', {
             'fields': ('total_iocs', 'last_import_count', 'total_imports', 'error_count')
         }),
+        ('Delta Sync', {
+            'fields': ('etag', 'last_modified_header', 'content_digest'),
+            'classes': ('collapse',)
+        }),
+        ('IOC Pre-filter', {
+            'fields': ('ioc_filter_info',),
+            'classes': ('collapse',)
+        }),
         ('Metadata', {
             'fields': ('created_at', 'updated_at')
         }),
     )
-    actions = ['enable_feeds', 'disable_feeds', 'trigger_feed_sync', 'update_all_feeds', 'update_with_dispatcher', 'update_specific_feed_type']
+    actions = ['enable_feeds', 'disable_feeds', 'trigger_feed_sync', 'reset_sync_state', 'update_all_feeds', 'update_with_dispatcher', 'update_specific_feed_type']
+    
+    def ioc_filter_info(self, obj):
+        """Show size, false positive rates and counters of the feed's Bloom filter"""
+        from sentinelvision.services.ioc_filter import get_ioc_filter_stats
+        
+        try:
+            stats = get_ioc_filter_stats(obj.feed_type)
+        except Exception as e:
+            return f"Unavailable: {str(e)}"
+        if not stats:
+            return "Not built yet"
+        
+        return format_html(
+            "{} values in {} KB, built {}<br>"
+            "False positive rate: target {}, estimated {}, observed {}<br>"
+            "Hits: {}, misses: {}, false positives: {}",
+            stats['count'], round(stats['size_bytes'] / 1024, 1), stats['built_at'],
+            f"{stats['error_rate']:.3%}", f"{stats['estimated_error_rate']:.3%}",
+            f"{stats['observed_error_rate']:.3%}",
+            stats['hits'], stats['misses'], stats['false_positives']
+        )
+    ioc_filter_info.short_description = "IOC pre-filter"
     
     def enable_feeds(self, request, queryset):
         """Admin action to enable selected feeds"""
@@ -376,6 +407,12 @@ class FeedRegistryAdmin(admin.ModelAdmin):
         self.message_user(request, f"Triggered sync for {count} feeds.")
     trigger_feed_sync.short_description = "Trigger sync for selected feeds"
     
+    def reset_sync_state(self, request, queryset):
+        """Admin action to force a full comparison on the next sync"""
+        updated = queryset.update(etag='', last_modified_header='', content_digest='')
+        self.message_user(request, f"Reset delta sync state for {updated} feeds.")
+    reset_sync_state.short_description = "Reset delta sync state for selected feeds"
+    
     def update_all_feeds(self, request, queryset):
         """Admin action to update all feed types for selected companies"""
         from sentinelvision.feeds import get_all_feed_tasks
@@ -13,9 +13,9 @@ class SentinelvisionConfig(AppConfig):
         # Import signals to ensure they are registered
         import sentinelvision.signals
         
-        # Import and run feed discovery to ensure all feeds are registered
-        from sentinelvision.feeds import discover_feeds, ensure_feeds_in_database
-        discover_feeds()
-        
-        # Ensure all discovered feeds have database records
-        ensure_feeds_in_database()
+        # Feed classes are FeedModule subclasses, so the app registry must know
+        # them; they are imported from the manifest without scanning the package.
+        # Feed tasks are created on first use and feed records on post_migrate.
+        from sentinelvision.feeds import get_all_feeds
+        for feed_class in get_all_feeds().values():
+            sentinelvision.signals.connect_feed_signals(feed_class)
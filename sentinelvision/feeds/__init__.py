@@ -1,35 +1,82 @@
-import os
-import importlib
-import inspect
-import pkgutil
-import sys
 import logging
-from typing import Dict, Type, List
-from django.apps import apps
-from functools import wraps
+from importlib.metadata import entry_points
+from django.utils.module_loading import import_string
 from celery import shared_task
-from sentinelvision.models import FeedModule
+from sentinelvision.feeds.manifest import FEED_MANIFEST
+from sentinelvision.services.ioc_filter import batch_ioc_filter_builds
 
-# Feed registry to store all available feed classes
+# Entry point group third-party packages use to contribute feeds
+FEED_ENTRY_POINT_GROUP = 'sentinelvision.feeds'
+
+# Feed registry to store all loaded feed classes
 FEED_REGISTRY = {}
 
 # Task registry to store all feed tasks
 TASK_REGISTRY = {}
 
+# Dotted class paths of every known feed, resolved once per process
+_feed_sources = None
+
 def register_feed(feed_class):
     """
     Register a feed class in the registry.
     
+    The Celery task of the feed is created on first use by get_feed_task().
+    
     Args:
         feed_class: The feed class to register
     """
     feed_id = getattr(feed_class, 'feed_id', feed_class.__name__.lower())
     FEED_REGISTRY[feed_id] = feed_class
+    return feed_class
+
+def get_feed_sources():
+    """
+    Get the dotted class path of every known feed without importing them.
     
-    # Automatically create and register a task for this feed
-    register_feed_task(feed_id, feed_class)
+    Feeds come from the static manifest (regenerate it with
+    ``manage.py build_feed_manifest``) and from packages that declare a
+    ``sentinelvision.feeds`` entry point.
     
-    return feed_class
+    Returns:
+        Dict of dotted class paths with feed IDs as keys
+    """
+    global _feed_sources
+    if _feed_sources is None:
+        sources = dict(FEED_MANIFEST)
+        for entry_point in entry_points(group=FEED_ENTRY_POINT_GROUP):
+            sources.setdefault(entry_point.name, entry_point.value.replace(':', '.'))
+        _feed_sources = sources
+    return _feed_sources
+
+def load_feed_class(feed_id):
+    """
+    Import and register a feed class from its declared path.
+    
+    Args:
+        feed_id: The ID of the feed
+        
+    Returns:
+        The feed class or None if unknown or not importable
+    """
+    if feed_id in FEED_REGISTRY:
+        return FEED_REGISTRY[feed_id]
+    
+    class_path = get_feed_sources().get(feed_id)
+    if not class_path:
+        return None
+    
+    try:
+        feed_class = import_string(class_path)
+    except ImportError as e:
+        logging.getLogger('sentinelvision.feeds').error(
+            f"Error loading feed module {class_path}: {str(e)}",
+            exc_info=True
+        )
+        return None
+    
+    # Classes outside this package are not decorated with @register_feed
+    return register_feed(feed_class)
 
 def register_feed_task(feed_id, feed_class):
     """
@@ -42,6 +89,7 @@ def register_feed_task(feed_id, feed_class):
     task_name = f"sentinelvision.feeds.{feed_id}.update"
     
     # Define the feed task dynamically with correct docstring
+    @batch_ioc_filter_builds()
     def feed_task_function(self, company_id=None):
         """Dynamically created task for updating a specific feed type."""
         import logging
@@ -75,6 +123,7 @@ def register_feed_task(feed_id, feed_class):
                 }
             
             results = []
+            shared_results = {}
             
             # Process for each company
             for company in companies:
@@ -104,8 +153,8 @@ def register_feed_task(feed_id, feed_class):
                 # Mark as syncing
                 feed_registry.mark_sync_started()
                 
-                # Run the update
-                result = feed_instance.update_feed()
+                # Run the update (global feeds are fetched once for all companies)
+                result = run_feed_update(feed_instance, shared_results)
                 
                 # Update registry status
                 if result.get('status') == 'success':
@@ -119,7 +168,8 @@ def register_feed_task(feed_id, feed_class):
                             'feed_type': feed_id,
                             'company_name': company.name,
                             'company_id': str(company.id),
-                            'processed_count': processed_count
+                            'processed_count': processed_count,
+                            'ingestion_stats': result.get('ingestion_stats', {})
                         }
                     )
                 else:
@@ -140,7 +190,8 @@ def register_feed_task(feed_id, feed_class):
                 results.append({
                     'company': company.name,
                     'status': result.get('status'),
-                    'processed_count': result.get('processed_count', 0)
+                    'processed_count': result.get('processed_count', 0),
+                    'ingestion_stats': result.get('ingestion_stats', {})
                 })
             
             return {
@@ -211,7 +262,42 @@ def get_feed_class(feed_id):
     Returns:
         The feed class or None if not found
     """
-    return FEED_REGISTRY.get(feed_id)
+    return load_feed_class(feed_id)
+
+def run_feed_update(feed_instance, shared_results=None):
+    """
+    Run a feed update, fetching shared global feeds only once per run.
+    
+    Global feeds stored in a shared index hold identical data for every
+    company, so when a task iterates over companies the first update result
+    is reused for the rest instead of downloading and indexing the feed again.
+    
+    Args:
+        feed_instance: The (company-specific) feed instance to update
+        shared_results: Dict owned by the caller that caches shared feed results
+        
+    Returns:
+        dict: Result of the update operation
+    """
+    feed_class = type(feed_instance)
+    if shared_results is None or not feed_class.uses_shared_index():
+        return feed_instance.update_feed()
+    
+    feed_id = getattr(feed_class, 'feed_id', feed_class.__name__.lower())
+    if feed_id not in shared_results:
+        shared_instance, created = feed_class.objects.get_or_create(
+            company=None,
+            defaults={
+                'name': feed_class._meta.verbose_name,
+                'description': feed_class.__doc__.strip() if feed_class.__doc__ else '',
+                'feed_url': feed_instance.feed_url,
+                'interval_hours': feed_instance.interval_hours,
+                'is_active': True
+            }
+        )
+        shared_results[feed_id] = shared_instance.update_feed()
+    
+    return shared_results[feed_id]
 
 def get_feed_task(feed_id):
     """
@@ -223,7 +309,12 @@ def get_feed_task(feed_id):
     Returns:
         The Celery task function or None if not found
     """
-    return TASK_REGISTRY.get(feed_id)
+    if feed_id not in TASK_REGISTRY:
+        feed_class = load_feed_class(feed_id)
+        if feed_class is None:
+            return None
+        register_feed_task(feed_id, feed_class)
+    return TASK_REGISTRY[feed_id]
 
 def get_all_feeds():
     """
@@ -232,6 +323,8 @@ def get_all_feeds():
     Returns:
         Dict of feed classes with their IDs as keys
     """
+    for feed_id in get_feed_sources():
+        load_feed_class(feed_id)
     return FEED_REGISTRY
 
 def get_all_feed_tasks():
@@ -241,6 +334,8 @@ def get_all_feed_tasks():
     Returns:
         Dict of feed task functions with feed IDs as keys
     """
+    for feed_id in get_all_feeds():
+        get_feed_task(feed_id)
     return TASK_REGISTRY
 
 def ensure_feeds_in_database():
@@ -260,13 +355,6 @@ def ensure_feeds_in_database():
     # Get all registered feeds
     feeds = get_all_feeds()
     
-    # Define which feeds should be global
-    global_feeds = [
-        'alienvault_reputation',
-        'blocklist_de',
-        'ssl_blacklist'
-    ]
-    
     # Get default company (if needed for non-global feeds)
     default_company = None
     try:
@@ -287,7 +375,7 @@ def ensure_feeds_in_database():
             
             if not existing_feed:
                 # Determine if this should be a global feed
-                is_global_feed = feed_id in global_feeds
+                is_global_feed = getattr(feed_class, 'global_feed', False)
                 company = None if is_global_feed else default_company
                 
                 # Create a database entry for the feed
@@ -338,120 +426,19 @@ def ensure_feeds_in_database():
 
 def discover_feeds():
     """
-    Dynamically discover and register all feed modules.
-    This searches for feed modules in the sentinelvision/feeds/ directory.
-    """
-    logger = logging.getLogger('sentinelvision.feeds')
-    
-    # Get the directory of the current file
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    package_name = __name__
-    
-    # Log discovery start
-    logger.info(f"Discovering feed modules in {current_dir}")
+    Load every known feed and create its Celery task.
     
-    # Method 1: Find all Python files ending with _feed.py
-    discovered_modules = set()
-    for filename in os.listdir(current_dir):
-        if filename.endswith('_feed.py') and not filename.startswith('__'):
-            module_name = filename[:-3]  # Remove .py extension
-            module_path = f"{package_name}.{module_name}"
-            discovered_modules.add(module_path)
-            
-            try:
-                # Import the module
-                module = importlib.import_module(module_path)
-                
-                # Find feed classes in the module
-                for name, obj in inspect.getmembers(module):
-                    if (inspect.isclass(obj) and 
-                        obj.__module__ == module_path and 
-                        issubclass(obj, FeedModule) and 
-                        obj != FeedModule and
-                        not obj._meta.abstract):
-                        
-                        # Register the feed class if not already registered
-                        feed_id = getattr(obj, 'feed_id', obj.__name__.lower())
-                        if feed_id not in FEED_REGISTRY:
-                            register_feed(obj)
-                            logger.info(f"Registered feed module: {feed_id} ({obj.__name__})")
-                        
-            except Exception as e:
-                logger.error(
-                    f"Error loading feed module {module_name}: {str(e)}",
-                    exc_info=True
-                )
+    Web processes resolve feeds lazily through get_feed_class() and
+    get_feed_task(); Celery workers call this at startup so every feed task
+    is registered before messages are consumed.
     
-    # Method 2: Use pkgutil to find all modules in the package
-    for _, name, is_pkg in pkgutil.iter_modules([current_dir]):
-        if not is_pkg and name.endswith('_feed') and not name.startswith('__'):
-            module_path = f"{package_name}.{name}"
-            
-            # Skip if already imported via Method 1
-            if module_path in discovered_modules:
-                continue
-                
-            try:
-                # Import the module
-                module = importlib.import_module(module_path)
-                
-                # Find feed classes in the module
-                for class_name, obj in inspect.getmembers(module):
-                    if (inspect.isclass(obj) and 
-                        obj.__module__ == module_path and 
-                        issubclass(obj, FeedModule) and 
-                        obj != FeedModule and
-                        not obj._meta.abstract):
-                        
-                        # Register the feed class if not already registered
-                        feed_id = getattr(obj, 'feed_id', obj.__name__.lower())
-                        if feed_id not in FEED_REGISTRY:
-                            register_feed(obj)
-                            logger.info(f"Registered feed module via pkgutil: {feed_id} ({obj.__name__})")
-                    
-            except Exception as e:
-                logger.error(
-                    f"Error loading feed module {name} via pkgutil: {str(e)}",
-                    exc_info=True
-                )
+    Returns:
+        Dict of feed classes with their IDs as keys
+    """
+    logger = logging.getLogger('sentinelvision.feeds')
     
-    # Method 3: Attempt to directly import known feed modules if they weren't found
-    known_feeds = ['ssl_blacklist_feed', 'alienvault_reputation_feed', 'blocklist_de_feed']
-    for feed_module in known_feeds:
-        module_path = f"{package_name}.{feed_module}"
-        
-        # Skip if already imported
-        if module_path in discovered_modules:
-            continue
-            
-        try:
-            # Import the module
-            module = importlib.import_module(module_path)
-            
-            # Find feed classes in the module
-            for class_name, obj in inspect.getmembers(module):
-                if (inspect.isclass(obj) and 
-                    obj.__module__ == module_path and 
-                    issubclass(obj, FeedModule) and 
-                    obj != FeedModule and
-                    not obj._meta.abstract):
-                    
-                    # Register the feed class if not already registered
-                    feed_id = getattr(obj, 'feed_id', obj.__name__.lower())
-                    if feed_id not in FEED_REGISTRY:
-                        register_feed(obj)
-                        logger.info(f"Registered known feed module: {feed_id} ({obj.__name__})")
-                
-        except Exception as e:
-            logger.error(
-                f"Error loading known feed module {feed_module}: {str(e)}",
-                exc_info=True
-            )
+    get_all_feed_tasks()
     
-    # Log discovery results
     logger.info(f"Feed module discovery complete. Found {len(FEED_REGISTRY)} feed modules: {', '.join(FEED_REGISTRY.keys())}")
     
     return FEED_REGISTRY
-
-# Run feed discovery during module import
-discover_feeds()
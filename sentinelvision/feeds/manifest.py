@@ -0,0 +1,8 @@
+# Generated by `python manage.py build_feed_manifest`; do not edit by hand.
+# Maps each feed ID to the dotted path of its feed class.
+
+FEED_MANIFEST = {
+    'alienvault_reputation': 'sentinelvision.feeds.alienvault_reputation_feed.AlienVaultReputationFeed',
+    'blocklist_de': 'sentinelvision.feeds.blocklist_de_feed.BlocklistDeFeed',
+    'ssl_blacklist': 'sentinelvision.feeds.ssl_blacklist_feed.SSLBlacklistFeed',
+}
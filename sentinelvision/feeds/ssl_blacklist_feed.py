@@ -1,16 +1,8 @@
-import requests
 import csv
-import io
-from io import StringIO
-import json
-import uuid
 from datetime import datetime
 from django.db import models
 from django.utils import timezone
-from django.conf import settings
-from elasticsearch import Elasticsearch
 from sentinelvision.models import FeedModule
-from observables.models import Observable
 from api.v1.observables.enums import ObservableCategoryEnum
 from sentinelvision.feeds import register_feed
 from sentinelvision.logging import get_structured_logger
@@ -26,6 +18,14 @@ class SSLBlacklistFeed(FeedModule):
     # Module identification
     feed_id = 'ssl_blacklist'
     module_type = 'feed'
+    global_feed = True
+
+    # IOC lookup
+    ioc_types = ('hash-sha1', 'sha1')
+    observable_type = 'hash-sha1'
+    observable_source = 'abuse.ch (SSL Blacklist)'
+    default_confidence = 70
+    ioc_result_fields = ('listing_reason',)
     
     # Add feedmodule_ptr with a default value to fix migration
     feedmodule_ptr = models.OneToOneField(
@@ -88,105 +88,29 @@ class SSLBlacklistFeed(FeedModule):
         """
         try:
             # Initialize Elasticsearch client
-            es_hosts = settings.ELASTICSEARCH_HOSTS
-            es_username = settings.ELASTICSEARCH_USERNAME
-            es_password = settings.ELASTICSEARCH_PASSWORD
-            es_verify_certs = settings.ELASTICSEARCH_VERIFY_CERTS
-            
-            es_client = Elasticsearch(
-                es_hosts,
-                basic_auth=(es_username, es_password),
-                verify_certs=es_verify_certs
-            )
+            es_client = self.get_es_client()
             
             # Ensure index exists with proper mapping
-            self._ensure_index_exists(es_client)
+            self._ensure_index_exists(es_client, self.get_index_name())
             
-            # Fetch data from feed
+            # Stream the feed into Elasticsearch
             logger.info(f"Fetching SSL blacklist data from {self.feed_url}")
-            response = requests.get(
-                self.feed_url,
-                headers=self.get_feed_headers(),
-                timeout=60
+            stats = self.ingest_feed(
+                es_client,
+                self.get_index_name(),
+                headers=self.get_feed_headers()
             )
-            response.raise_for_status()
-            
-            # Parse the CSV data
-            csv_data = io.StringIO(response.text)
-            
-            # Skip comment lines (starting with #)
-            csv_lines = []
-            for line in csv_data:
-                if not line.startswith('#'):
-                    csv_lines.append(line)
+            processed_count = stats.rows_parsed
             
-            # If we didn't get any valid lines, return early
-            if not csv_lines:
-                logger.warning(f"No valid data found in SSL blacklist feed")
+            # If we didn't get any valid rows, return early
+            if not processed_count and not stats.not_modified:
+                logger.warning("No valid data found in SSL blacklist feed")
                 return {
                     'status': 'warning',
                     'error': "No valid data found in feed",
-                    'processed_count': 0
-                }
-                
-            csv_data = io.StringIO('\n'.join(csv_lines))
-            
-            reader = csv.DictReader(csv_data, delimiter=',', 
-                                    fieldnames=['Listingdate', 'SHA1', 'Listingreason'])
-            
-            # Process each entry and ingest to Elasticsearch
-            processed_count = 0
-            bulk_data = []
-            
-            for row in reader:
-                if 'SHA1' not in row or not row['SHA1']:
-                    continue
-                
-                # Extract and clean data
-                sha1_hash = row.get('SHA1', '').strip()
-                listing_date = row.get('Listingdate', '')
-                listing_reason = row.get('Listingreason', 'Unknown')
-                
-                if not sha1_hash:
-                    continue
-                
-                # Prepare document for Elasticsearch
-                es_doc = {
-                    'value': sha1_hash,
-                    'type': 'hash-sha1',  # Updated to match new Observable.Type
-                    'category': ObservableCategoryEnum.NETWORK_ACTIVITY.value,
-                    'source': 'abuse.ch',
-                    'feed_type': 'ssl_blacklist',
-                    'description': f"SSL Certificate Blacklist - {listing_reason}",
-                    'first_seen': listing_date,
-                    'last_updated': datetime.now().isoformat(),
-                    'listing_reason': listing_reason,
-                    'tags': ['abuse.ch', 'ssl_blacklist', listing_reason.lower().replace(' ', '_')],
-                    'tenant_id': str(self.company.id),
-                    'tenant_name': self.company.name,
-                    'is_potential_ioc': True,
-                    'is_confirmed_ioc': False,  # Only confirmed when used in a case
-                    'confidence': 70  # Moderate confidence score for feed data
+                    'processed_count': 0,
+                    'ingestion_stats': stats.as_dict()
                 }
-                
-                # Add to bulk indexing request
-                doc_id = f"{sha1_hash}-{self.company.id}"
-                bulk_data.append({"index": {"_index": self.es_index_name, "_id": doc_id}})
-                bulk_data.append(es_doc)
-                
-                processed_count += 1
-                
-                # Execute bulk request in batches of 500
-                if len(bulk_data) >= 1000:
-                    if bulk_data:
-                        es_client.bulk(operations=bulk_data, refresh=True)
-                        bulk_data = []
-                        logger.info(f"Indexed batch of SSL blacklist records to Elasticsearch")
-            
-            # Index any remaining documents
-            if bulk_data:
-                es_client.bulk(operations=bulk_data, refresh=True)
-                logger.info(f"Indexed final batch of SSL blacklist records to Elasticsearch")
             
             # Update status with success
             self.update_status(success=True)
@@ -195,7 +119,8 @@ class SSLBlacklistFeed(FeedModule):
                 'status': 'success',
                 'processed_count': processed_count,
                 'timestamp': timezone.now().isoformat(),
-                'message': f"Successfully ingested {processed_count} SSL blacklist records to Elasticsearch"
+                'message': f"Successfully ingested {processed_count} SSL blacklist records to Elasticsearch",
+                'ingestion_stats': stats.as_dict()
             }
             
         except Exception as e:
@@ -208,15 +133,60 @@ class SSLBlacklistFeed(FeedModule):
                 'timestamp': timezone.now().isoformat()
             }
     
-    def _ensure_index_exists(self, es_client):
+    def parse_feed_lines(self, lines):
+        """
+        Parse SSL blacklist CSV lines into Elasticsearch documents.
+        
+        Args:
+            lines: Iterator of decoded feed lines
+            
+        Yields:
+            tuple: (document ID, document body)
+        """
+        # Skip comment lines (starting with #)
+        csv_lines = (line for line in lines if line and not line.startswith('#'))
+        
+        reader = csv.DictReader(csv_lines, delimiter=',',
+                                fieldnames=['Listingdate', 'SHA1', 'Listingreason'])
+        
+        for row in reader:
+            # Extract and clean data
+            sha1_hash = (row.get('SHA1') or '').strip()
+            listing_date = row.get('Listingdate', '')
+            listing_reason = row.get('Listingreason') or 'Unknown'
+            
+            if not sha1_hash:
+                continue
+            
+            # Prepare document for Elasticsearch
+            es_doc = {
+                'value': sha1_hash,
+                'type': 'hash-sha1',  # Updated to match new Observable.Type
+                'category': ObservableCategoryEnum.NETWORK_ACTIVITY.value,
+                'source': 'abuse.ch',
+                'feed_type': 'ssl_blacklist',
+                'description': f"SSL Certificate Blacklist - {listing_reason}",
+                'first_seen': listing_date,
+                'last_updated': datetime.now().isoformat(),
+                'listing_reason': listing_reason,
+                'tags': ['abuse.ch', 'ssl_blacklist', listing_reason.lower().replace(' ', '_')],
+                'is_potential_ioc': True,
+                'confidence': 70,  # Moderate confidence score for feed data
+                **self.get_tenant_fields()
+            }
+            
+            yield self.get_document_id(sha1_hash), es_doc
+    
+    def _ensure_index_exists(self, es_client, index_name):
         """
         Ensure the Elasticsearch index exists with the proper mapping.
         
         Args:
             es_client: Elasticsearch client instance
+            index_name (str): Index to create if missing
         """
         # Check if index exists
-        if not es_client.indices.exists(index=self.es_index_name):
+        if not es_client.indices.exists(index=index_name):
             # Define index mapping
             mapping = {
                 "mappings": {
@@ -235,6 +205,9 @@ class SSLBlacklistFeed(FeedModule):
                         "tenant_name": {"type": "keyword"},
                         "is_potential_ioc": {"type": "boolean"},
                         "is_confirmed_ioc": {"type": "boolean"},
+                        "is_expired": {"type": "boolean"},
+                        "expired_at": {"type": "date"},
+                        "content_hash": {"type": "keyword", "index": False},
                         "confidence": {"type": "integer"}
                     }
                 },
@@ -245,110 +218,7 @@ class SSLBlacklistFeed(FeedModule):
             }
             
             # Create the index
-            es_client.indices.create(index=self.es_index_name, body=mapping)
-            logger.info(f"Created Elasticsearch index {self.es_index_name} for SSL blacklist data")
+            es_client.indices.create(index=index_name, body=mapping)
+            logger.info(f"Created Elasticsearch index {index_name} for SSL blacklist data")
         else:
-            logger.info(f"Elasticsearch index {self.es_index_name} already exists")
-    
-    @classmethod
-    def check_ioc_status(cls, value, company_id):
-        """
-        Check if a value exists as a potential IOC in Elasticsearch.
-        This method should be called when creating a case to determine if the
-        observable is a known IOC from the SSL Blacklist feed.
-        
-        Args:
-            value (str): The observable value to check (SHA1 hash)
-            company_id: The company ID to check for
-            
-        Returns:
-            dict: Information about the IOC if found, None otherwise
-        """
-        try:
-            # Get an instance of the feed for this company to get the index name
-            feed_instance = cls.objects.filter(company_id=company_id).first()
-            if not feed_instance:
-                logger.warning(f"No SSL Blacklist feed configured for company {company_id}")
-                return None
-                
-            # Initialize Elasticsearch client
-            es_hosts = settings.ELASTICSEARCH_HOSTS
-            es_username = settings.ELASTICSEARCH_USERNAME
-            es_password = settings.ELASTICSEARCH_PASSWORD
-            es_verify_certs = settings.ELASTICSEARCH_VERIFY_CERTS
-            
-            es_client = Elasticsearch(
-                es_hosts,
-                basic_auth=(es_username, es_password),
-                verify_certs=es_verify_certs
-            )
-            
-            # Search for the value in Elasticsearch
-            doc_id = f"{value}-{company_id}"
-            
-            try:
-                doc = es_client.get(index=feed_instance.es_index_name, id=doc_id)
-                
-                if doc and doc.get('found'):
-                    source = doc.get('_source', {})
-                    
-                    # If found in a case context, mark as confirmed IOC
-                    if not source.get('is_confirmed_ioc'):
-                        # Update the document to mark as confirmed IOC
-                        source['is_confirmed_ioc'] = True
-                        source['last_updated'] = datetime.now().isoformat()
-                        
-                        es_client.index(
-                            index=feed_instance.es_index_name,
-                            id=doc_id,
-                            document=source
-                        )
-                        
-                        logger.info(f"Marked SSL Blacklist IOC as confirmed: {value}")
-                        
-                        # Also create/update Observable record in database
-                        try:
-                            observable, created = Observable.objects.get_or_create(
-                                type='hash-sha1',  # Using the new naming format
-                                value=value,
-                                company_id=company_id,
-                                defaults={
-                                    'description': source.get('description', ''),
-                                    'category': ObservableCategoryEnum.NETWORK_ACTIVITY.value,
-                                    'tags': source.get('tags', []),
-                                    'is_ioc': True,
-                                    'source': 'abuse.ch (SSL Blacklist)',
-                                    'confidence': source.get('confidence', 70),
-                                    'first_seen': datetime.fromisoformat(source.get('first_seen')).date() if source.get('first_seen') else timezone.now()
-                                }
-                            )
-                            
-                            if not created and not observable.is_ioc:
-                                observable.is_ioc = True
-                                observable.save(update_fields=['is_ioc'])
-                                
-                        except Exception as e:
-                            logger.error(f"Error creating/updating Observable from SSL Blacklist: {str(e)}", exc_info=True)
-                    
-                    return {
-                        'value': source.get('value'),
-                        'type': source.get('type'),
-                        'category': source.get('category'),
-                        'feed_type': source.get('feed_type'),
-                        'description': source.get('description'),
-                        'first_seen': source.get('first_seen'),
-                        'listing_reason': source.get('listing_reason'),
-                        'tags': source.get('tags', []),
-                        'confidence': source.get('confidence', 70),
-                        'is_ioc': True
-                    }
-                
-            except Exception as e:
-                # Document not found or other ES error
-                logger.debug(f"SSL Blacklist IOC not found: {value} - {str(e)}")
-                
-            return None
-            
-        except Exception as e:
-            logger.error(f"Error checking SSL Blacklist IOC status: {str(e)}", exc_info=True)
-            return None 
\ No newline at end of file
+            logger.info(f"Elasticsearch index {index_name} already exists")
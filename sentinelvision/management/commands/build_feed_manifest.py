@@ -0,0 +1,60 @@
+import importlib
+import inspect
+import os
+import pkgutil
+from django.core.management.base import BaseCommand, CommandError
+
+MANIFEST_HEADER = """# Generated by `python manage.py build_feed_manifest`; do not edit by hand.
+# Maps each feed ID to the dotted path of its feed class.
+"""
+
+
+class Command(BaseCommand):
+    help = 'Regenerate sentinelvision/feeds/manifest.py from the *_feed.py modules'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Exit with an error if the manifest is out of date instead of writing it'
+        )
+
+    def handle(self, *args, **options):
+        import sentinelvision.feeds as feeds_package
+        from sentinelvision.models import FeedModule
+
+        package_dir = os.path.dirname(os.path.abspath(feeds_package.__file__))
+        manifest = {}
+
+        for _, name, is_pkg in pkgutil.iter_modules([package_dir]):
+            if is_pkg or not name.endswith('_feed'):
+                continue
+
+            module_path = f"{feeds_package.__name__}.{name}"
+            module = importlib.import_module(module_path)
+            for class_name, obj in inspect.getmembers(module, inspect.isclass):
+                if (obj.__module__ == module_path and
+                        issubclass(obj, FeedModule) and
+                        not obj._meta.abstract):
+                    feed_id = getattr(obj, 'feed_id', obj.__name__.lower())
+                    manifest[feed_id] = f"{module_path}.{class_name}"
+
+        lines = [MANIFEST_HEADER, "FEED_MANIFEST = {"]
+        lines += [f"    '{feed_id}': '{class_path}'," for feed_id, class_path in sorted(manifest.items())]
+        lines.append("}\n")
+        content = '\n'.join(lines)
+
+        manifest_path = os.path.join(package_dir, 'manifest.py')
+        with open(manifest_path) as f:
+            current = f.read()
+
+        if options['check']:
+            if current != content:
+                raise CommandError("Feed manifest is out of date; run build_feed_manifest")
+            self.stdout.write(self.style.SUCCESS(f"Feed manifest is up to date ({len(manifest)} feeds)"))
+            return
+
+        if current != content:
+            with open(manifest_path, 'w') as f:
+                f.write(content)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {len(manifest)} feeds to {manifest_path}"))
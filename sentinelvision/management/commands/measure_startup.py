@@ -0,0 +1,128 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from django.core.management.base import BaseCommand, CommandError
+
+PHASES = ('import', 'models', 'ready')
+
+
+def profile_django_setup():
+    """
+    Run django.setup() with each app's loading phases timed.
+
+    Must run in a process where Django has not been set up yet.
+
+    Returns:
+        dict: Total setup seconds and per-app ``import``/``models``/``ready`` seconds
+    """
+    import django
+    from django.apps.config import AppConfig
+
+    apps_timings = {}
+    create = AppConfig.create.__func__
+
+    def timed(label, phase, func):
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                apps_timings[label][phase] += time.perf_counter() - started
+        return wrapper
+
+    def timed_create(cls, entry):
+        started = time.perf_counter()
+        app_config = create(cls, entry)
+        apps_timings[app_config.label] = dict.fromkeys(PHASES, 0.0)
+        apps_timings[app_config.label]['import'] = time.perf_counter() - started
+        app_config.import_models = timed(app_config.label, 'models', app_config.import_models)
+        app_config.ready = timed(app_config.label, 'ready', app_config.ready)
+        return app_config
+
+    AppConfig.create = classmethod(timed_create)
+    started = time.perf_counter()
+    try:
+        django.setup()
+    finally:
+        AppConfig.create = classmethod(create)
+
+    return {'total': time.perf_counter() - started, 'apps': apps_timings}
+
+
+class Command(BaseCommand):
+    help = 'Measure how long Django setup spends importing and readying each app'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=3,
+            help='Number of fresh processes to measure; the median is reported (default: 3)'
+        )
+        parser.add_argument(
+            '--json',
+            action='store_true',
+            help='Output in JSON format'
+        )
+        parser.add_argument(
+            '--max-total-ms',
+            type=float,
+            help='Exit with an error if the median setup time exceeds this budget'
+        )
+
+    def _measure_once(self):
+        with tempfile.NamedTemporaryFile(suffix='.json') as output:
+            completed = subprocess.run(
+                [sys.executable, '-m', __name__, output.name],
+                env=os.environ.copy(),
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+                text=True
+            )
+            if completed.returncode != 0:
+                raise CommandError(f"Django setup failed:\n{completed.stderr[-2000:]}")
+            return json.load(open(output.name))
+
+    def handle(self, *args, **options):
+        runs = [self._measure_once() for _ in range(max(options['repeat'], 1))]
+
+        total_ms = statistics.median(run['total'] for run in runs) * 1000
+        apps = []
+        for label in runs[0]['apps']:
+            timings = {
+                phase: round(statistics.median(run['apps'].get(label, {}).get(phase, 0.0) for run in runs) * 1000, 2)
+                for phase in PHASES
+            }
+            apps.append({'app': label, **timings, 'total_ms': round(sum(timings.values()), 2)})
+        apps.sort(key=lambda app: app['ready'], reverse=True)
+
+        if options['json']:
+            self.stdout.write(json.dumps({
+                'runs': len(runs),
+                'total_ms': round(total_ms, 2),
+                'apps': apps
+            }, indent=2))
+        else:
+            self.stdout.write(f"Django setup: {total_ms:.1f} ms (median of {len(runs)} runs)\n")
+            self.stdout.write(f"{'App':<30} {'import ms':>10} {'models ms':>10} {'ready ms':>10}")
+            for app in apps:
+                self.stdout.write(
+                    f"{app['app']:<30} {app['import']:>10.1f} {app['models']:>10.1f} {app['ready']:>10.1f}"
+                )
+
+        if options['max_total_ms'] is not None and total_ms > options['max_total_ms']:
+            raise CommandError(
+                f"Django setup took {total_ms:.1f} ms, over the {options['max_total_ms']:.1f} ms budget"
+            )
+
+
+if __name__ == '__main__':
+    # Child process started by the command: profile a cold setup
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'sentineliq.settings')
+    result = profile_django_setup()
+    with open(sys.argv[1], 'w') as f:
+        json.dump(result, f)
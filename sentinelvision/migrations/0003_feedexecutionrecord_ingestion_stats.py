@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-16 19:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sentinelvision', '0002_auto_20250503_1515'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='feedexecutionrecord',
+            name='ingestion_stats',
+            field=models.JSONField(blank=True, default=dict, help_text='Per-stage counters (bytes read, rows parsed, docs flushed, timings)', verbose_name='Ingestion Stats'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-16 19:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sentinelvision', '0003_feedexecutionrecord_ingestion_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='feedregistry',
+            name='content_digest',
+            field=models.CharField(blank=True, help_text='SHA-256 of the last payload; clear it to force a full sync', max_length=64, verbose_name='Content Digest'),
+        ),
+        migrations.AddField(
+            model_name='feedregistry',
+            name='etag',
+            field=models.CharField(blank=True, max_length=255, verbose_name='ETag'),
+        ),
+        migrations.AddField(
+            model_name='feedregistry',
+            name='last_modified_header',
+            field=models.CharField(blank=True, max_length=100, verbose_name='Last-Modified'),
+        ),
+    ]
@@ -77,6 +77,12 @@ class FeedExecutionRecord(CoreModel):
         blank=True,
         help_text='Error message if execution failed'
     )
+    ingestion_stats = models.JSONField(
+        'Ingestion Stats',
+        default=dict,
+        blank=True,
+        help_text='Per-stage counters (bytes read, rows parsed, docs flushed, timings)'
+    )
     
     class Meta:
         verbose_name = 'Feed Execution Record'
@@ -96,19 +102,21 @@ class FeedExecutionRecord(CoreModel):
         self.status = ExecutionStatusEnum.RUNNING
         self.save(update_fields=['status'])
     
-    def mark_success(self, iocs_processed=0, log=''):
+    def mark_success(self, iocs_processed=0, log='', ingestion_stats=None):
         """
         Mark the execution as successful.
         
         Args:
             iocs_processed (int): Number of IOCs processed
             log (str): Execution log
+            ingestion_stats (dict): Optional per-stage ingestion counters
         """
         self.status = ExecutionStatusEnum.SUCCESS
         self.ended_at = timezone.now()
         self.iocs_processed = iocs_processed
         self.log = log
-        self.save(update_fields=['status', 'ended_at', 'iocs_processed', 'log'])
+        self.ingestion_stats = ingestion_stats or {}
+        self.save(update_fields=['status', 'ended_at', 'iocs_processed', 'log', 'ingestion_stats'])
     
     def mark_failed(self, error_message='', log=''):
         """
@@ -1,4 +1,8 @@
+from datetime import datetime
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
+from api.core.utils.elastic_utils import get_es_client
 from sentinelvision.models import BaseModule
 from sentinelvision.logging import get_structured_logger
 
@@ -17,6 +21,19 @@ class FeedModule(BaseModule):
     last_successful_fetch = models.DateTimeField('Last Successful Fetch', null=True, blank=True)
     total_iocs_imported = models.PositiveIntegerField('Total IOCs Imported', default=0)
     
+    # Public feeds whose data is identical for every tenant. With
+    # SENTINELVISION_SHARED_FEED_INDEX enabled they are fetched and indexed once
+    # into a shared index, with tenant state kept in the feed overlay index.
+    global_feed = False
+    
+    # IOC lookups: observable types the feed holds (empty for any type) and
+    # how hits are reported and turned into observables
+    ioc_types = ()
+    observable_type = 'other'
+    observable_source = ''
+    default_confidence = 50
+    ioc_result_fields = ()
+    
     class Meta:
         verbose_name = 'Feed Module'
         verbose_name_plural = 'Feed Modules'
@@ -96,7 +113,358 @@ class FeedModule(BaseModule):
             dict: Result of the update operation
         """
         raise NotImplementedError("Feed types must implement update_feed()")
+
+    def parse_feed_lines(self, lines):
+        """
+        Parse raw feed lines into Elasticsearch documents.
+        Feed types that use the streaming ingestion pipeline must implement this
+        as a generator so rows are indexed while the download is in progress.
+
+        Args:
+            lines: Iterator of decoded feed lines
+
+        Yields:
+            tuple: (document ID, document body)
+        """
+        raise NotImplementedError("Feed types must implement parse_feed_lines()")
+
+    @classmethod
+    def uses_shared_index(cls):
+        """
+        Check whether this feed type is stored once in a shared index.
+        
+        Returns:
+            bool: True for global feeds when the shared index mode is enabled
+        """
+        return cls.global_feed and settings.SENTINELVISION_SHARED_FEED_INDEX
+    
+    @classmethod
+    def get_shared_index_name(cls):
+        """
+        Get the shared Elasticsearch index for this feed type.
+        
+        Returns:
+            str: Index name in format feed_<feed_id>
+        """
+        return f"feed_{getattr(cls, 'feed_id', cls.__name__.lower())}"
+    
+    @classmethod
+    def get_lookup_instance(cls, company_id):
+        """
+        Get the feed instance whose index holds IOCs visible to a company.
+        
+        Args:
+            company_id: The company ID to look up for
+            
+        Returns:
+            FeedModule: Feed instance or None if the feed is not configured
+        """
+        if cls.uses_shared_index():
+            feed_instance = cls.objects.filter(company__isnull=True).first()
+            if feed_instance:
+                return feed_instance
+        return cls.objects.filter(company_id=company_id).first()
+    
+    @classmethod
+    def get_es_client(cls):
+        """
+        Get the process-wide shared Elasticsearch client.
+        
+        Returns:
+            Elasticsearch: Client instance
+        """
+        return get_es_client()
+    
+    def get_index_name(self):
+        """
+        Get the Elasticsearch index this feed instance writes to.
+        
+        Returns:
+            str: Shared index for global feeds, the configured index otherwise
+        """
+        if self.uses_shared_index():
+            return self.get_shared_index_name()
+        return self.es_index_name
+    
+    def get_document_id(self, value, company_id=None):
+        """
+        Get the Elasticsearch document ID for an IOC value.
+        
+        Args:
+            value (str): IOC value
+            company_id: Company ID for per-tenant indices (defaults to the feed's company)
+            
+        Returns:
+            str: The value itself in shared indices, <value>-<company_id> otherwise
+        """
+        if self.uses_shared_index():
+            return value
+        return f"{value}-{company_id or self.company.id}"
+    
+    def get_tenant_fields(self):
+        """
+        Get tenant-specific fields for feed documents.
+        Shared indices carry no tenant data; it lives in the feed overlay instead.
+        
+        Returns:
+            dict: Fields to merge into each indexed document
+        """
+        if self.uses_shared_index():
+            return {}
+        return {
+            'tenant_id': str(self.company.id),
+            'tenant_name': self.company.name,
+            'is_confirmed_ioc': False  # Only confirmed when used in a case
+        }
+    
+    def get_ioc_doc_refs(self, value, company_id):
+        """
+        Get the documents that make up a company's view of an IOC.
+        
+        Args:
+            value (str): IOC value
+            company_id: The company ID to read for
+            
+        Returns:
+            list: _mget doc references; the feed document first, then the
+            tenant overlay for shared feeds
+        """
+        from sentinelvision.services.feed_overlay import OVERLAY_INDEX, overlay_doc_id
+        
+        refs = [{'_index': self.get_index_name(), '_id': self.get_document_id(value, company_id)}]
+        if self.uses_shared_index():
+            refs.append({'_index': OVERLAY_INDEX, '_id': overlay_doc_id(self.feed_id, company_id, value)})
+        return refs
+    
+    def merge_ioc_docs(self, docs, company_id):
+        """
+        Merge the _mget results for the references from get_ioc_doc_refs().
+        
+        Args:
+            docs (list): _mget docs, in the order of get_ioc_doc_refs()
+            company_id: The company ID the IOC was read for
+            
+        Returns:
+            dict: Document source or None if the IOC is not in the feed
+        """
+        feed_doc = docs[0] if docs else {}
+        if not feed_doc.get('found') or feed_doc.get('_source', {}).get('is_expired'):
+            return None
+        
+        if not self.uses_shared_index():
+            return feed_doc.get('_source', {})
+        
+        overlay_doc = docs[1] if len(docs) > 1 else {}
+        overlay = overlay_doc.get('_source', {}) if overlay_doc.get('found') else {}
+        return {
+            **feed_doc.get('_source', {}),
+            'tenant_id': str(company_id),
+            'is_confirmed_ioc': overlay.get('is_confirmed_ioc', False),
+            'sightings_count': overlay.get('sightings_count', 0)
+        }
+    
+    def get_ioc_hit_actions(self, value, company_id, source):
+        """
+        Get the bulk actions that record a company's hit on a feed IOC.
+        
+        Args:
+            value (str): IOC value
+            company_id: The company ID that saw the IOC
+            source (dict): Document returned by merge_ioc_docs()
+            
+        Returns:
+            list: (bulk action, action body) tuples
+        """
+        if self.uses_shared_index():
+            from sentinelvision.services.feed_overlay import sighting_action
+            return [sighting_action(self.feed_id, company_id, value, confirm=True)]
+        
+        if source.get('is_confirmed_ioc'):
+            return []
+        return [(
+            {"update": {"_index": self.get_index_name(), "_id": self.get_document_id(value, company_id)}},
+            {"doc": {"is_confirmed_ioc": True, "last_updated": datetime.now().isoformat()}}
+        )]
+    
+    @classmethod
+    def handles_ioc_type(cls, ioc_type):
+        """
+        Check whether the feed can contain IOCs of a type.
+        
+        Args:
+            ioc_type (str): Observable type, or None for any type
+            
+        Returns:
+            bool: True if the feed should be searched for the type
+        """
+        return not ioc_type or not cls.ioc_types or ioc_type in cls.ioc_types
+    
+    def format_ioc_result(self, source):
+        """
+        Build the lookup result for a feed document.
+        
+        Args:
+            source (dict): Document returned by merge_ioc_docs()
+            
+        Returns:
+            dict: IOC information reported to callers
+        """
+        result = {
+            'value': source.get('value'),
+            'type': source.get('type'),
+            'category': source.get('category'),
+            'feed_type': source.get('feed_type'),
+            'description': source.get('description'),
+            'first_seen': source.get('first_seen'),
+            'tags': source.get('tags', []),
+            'confidence': source.get('confidence', self.default_confidence),
+            'is_ioc': True
+        }
+        for field in self.ioc_result_fields:
+            result[field] = source.get(field)
+        return result
+    
+    def get_observable_defaults(self, source):
+        """
+        Get the field values for an Observable created from a confirmed feed IOC.
+        
+        Args:
+            source (dict): Document returned by merge_ioc_docs()
+            
+        Returns:
+            dict: Observable field values
+        """
+        first_seen = None
+        if source.get('first_seen'):
+            try:
+                first_seen = datetime.fromisoformat(source['first_seen'])
+                if timezone.is_naive(first_seen):
+                    first_seen = timezone.make_aware(first_seen)
+            except ValueError:
+                first_seen = None
+        
+        return {
+            'description': source.get('description', ''),
+            'category': source.get('category') or 'other',
+            'tags': source.get('tags', []),
+            'is_ioc': True,
+            'source': self.observable_source,
+            'confidence': source.get('confidence', self.default_confidence),
+            'first_seen': first_seen or timezone.now()
+        }
+    
+    @classmethod
+    def check_ioc_status(cls, value, company_id):
+        """
+        Check if a value exists as a potential IOC in this feed.
+        This method should be called when creating a case to determine if the
+        observable is a known IOC; a hit is marked as confirmed for the company.
+        Use FeedLookupService directly to check many values against every feed.
+        
+        Args:
+            value (str): The observable value to check
+            company_id: The company ID to check for
+            
+        Returns:
+            dict: Information about the IOC if found, None otherwise
+        """
+        from sentinelvision.services.ioc_lookup import FeedLookupService
+        
+        try:
+            results = FeedLookupService(company_id, feed_classes=[cls]).lookup(
+                [(None, value)], confirm=True
+            )
+        except Exception as e:
+            logger.error(f"Error checking {cls.__name__} IOC status: {str(e)}", exc_info=True)
+            return None
+        
+        hits = results.get((None, value))
+        return hits[0] if hits else None
+    
+    def get_sync_registries(self):
+        """
+        Get the registry entries that track this feed's sync state.
+        
+        Returns:
+            QuerySet: Every tenant's entry for shared feeds, the company's entry otherwise
+        """
+        from sentinelvision.models import FeedRegistry
+        
+        registries = FeedRegistry.objects.filter(feed_type=getattr(self, 'feed_id', ''))
+        if not self.uses_shared_index():
+            registries = registries.filter(company=self.company)
+        return registries
+    
+    def ingest_feed(self, es_client, index_name, headers=None, timeout=60):
+        """
+        Sync the feed into Elasticsearch using parse_feed_lines().
+        
+        With SENTINELVISION_FEED_DELTA_SYNC enabled only the changes since the
+        state recorded on the feed registry are written; otherwise the whole
+        feed is streamed and re-indexed.
+
+        Args:
+            es_client: Elasticsearch client instance
+            index_name (str): Target Elasticsearch index
+            headers (dict): Optional HTTP headers for the feed request
+            timeout (int): HTTP timeout in seconds
+
+        Returns:
+            FeedIngestionStats: Per-stage counters for the run
+        """
+        from sentinelvision.services.feed_ingestion import ingest_feed, sync_feed
+
+        if not settings.SENTINELVISION_FEED_DELTA_SYNC:
+            stats = ingest_feed(self, es_client, index_name, headers=headers, timeout=timeout)
+            self.refresh_ioc_filter(es_client, index_name)
+            return stats
+        
+        registries = self.get_sync_registries()
+        registry = registries.order_by('-last_sync').first()
+        stats = sync_feed(
+            self, es_client, index_name,
+            sync_state=registry.get_sync_state() if registry else None,
+            headers=headers,
+            timeout=timeout
+        )
+        
+        if not stats.docs_failed:
+            registries.update(
+                etag=stats.sync_state.get('etag', ''),
+                last_modified_header=stats.sync_state.get('last_modified', ''),
+                content_digest=stats.sync_state.get('content_digest', '')
+            )
+        
+        self.refresh_ioc_filter(es_client, index_name, changed=bool(stats.docs_flushed))
+        return stats
     
+    def refresh_ioc_filter(self, es_client, index_name, changed=True):
+        """
+        Rebuild the feed's IOC pre-filter after a sync.
+        
+        Failures are logged and never fail the sync; lookups fall back to
+        Elasticsearch while no filter is available.
+        
+        Args:
+            es_client: Elasticsearch client instance
+            index_name (str): Feed index to build the filter from
+            changed (bool): Whether the sync wrote anything to the index
+        """
+        from sentinelvision.services.ioc_filter import get_ioc_filter, request_ioc_filter_build
+        
+        if not settings.SENTINELVISION_IOC_FILTER_ENABLED:
+            return
+        
+        try:
+            if changed or get_ioc_filter(self.feed_id) is None:
+                # Deferred to the end of the run inside batch_ioc_filter_builds
+                request_ioc_filter_build(self.feed_id, es_client, index_name)
+        except Exception as e:
+            logger.warning(
+                f"Could not build IOC filter for feed {self.name}: {str(e)}",
+                extra={'feed_name': self.name, 'index_name': index_name, 'error': str(e)}
+            )
+
     def validate_configuration(self):
         """
         Validate feed configuration.
@@ -68,6 +68,12 @@ class FeedRegistry(CoreModel):
     # Logging
     last_log = models.TextField('Last Log', blank=True)
     
+    # Delta Sync State
+    etag = models.CharField('ETag', max_length=255, blank=True)
+    last_modified_header = models.CharField('Last-Modified', max_length=100, blank=True)
+    content_digest = models.CharField('Content Digest', max_length=64, blank=True,
+                                      help_text='SHA-256 of the last payload; clear it to force a full sync')
+    
     class Meta:
         verbose_name = 'Feed Registry'
         verbose_name_plural = 'Feed Registries'
@@ -161,6 +167,19 @@ class FeedRegistry(CoreModel):
             'enabled': self.enabled
         }
     
+    def get_sync_state(self):
+        """
+        Get the validators from the last successful sync.
+        
+        Returns:
+            dict: etag, last_modified and content_digest of the last payload
+        """
+        return {
+            'etag': self.etag,
+            'last_modified': self.last_modified_header,
+            'content_digest': self.content_digest
+        }
+    
     def is_due_for_sync(self):
         """
         Check if feed is due for sync.
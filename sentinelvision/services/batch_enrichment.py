@@ -0,0 +1,341 @@
+import time
+from collections import defaultdict
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from elasticsearch.helpers import scan
+from sentinelvision.logging import get_structured_logger
+from sentinelvision.models import EnrichedIOC, IOCFeedMatch
+from sentinelvision.models.EnrichedIOC import EnrichmentStatusEnum
+from sentinelvision.services.bulk_indexer import BulkIndexer
+from sentinelvision.services.feed_overlay import get_overlay_docs
+from sentinelvision.services.ioc_filter import definitely_absent
+
+logger = get_structured_logger('sentinelvision.enrichment.batch')
+
+FEED_INDEX_MAP_CACHE_KEY = 'sentinelvision:feed_index_map'
+
+FEED_SOURCE_FIELDS = ['type', 'value', 'source', 'tags', 'confidence', 'tlp', 'tenant_id']
+
+ENRICHED_IOC_MAPPING = {
+    "settings": {
+        "number_of_shards": 1,
+        "number_of_replicas": 1
+    },
+    "mappings": {
+        "properties": {
+            "ioc_type": {"type": "keyword"},
+            "value": {"type": "keyword"},
+            "status": {"type": "keyword"},
+            "first_seen": {"type": "date"},
+            "last_checked": {"type": "date"},
+            "last_matched": {"type": "date"},
+            "source": {"type": "keyword"},
+            "description": {"type": "text"},
+            "confidence": {"type": "float"},
+            "tlp": {"type": "keyword"},
+            "tags": {"type": "keyword"},
+            "matched_feeds": {"type": "keyword"},
+            "match_count": {"type": "integer"}
+        }
+    }
+}
+
+
+def build_feed_index_map():
+    """
+    Map feed indices to the FeedModule that owns their documents.
+
+    Shared indices are owned by the global (company-less) feed instance and
+    are keyed with a ``None`` tenant; per-tenant indices are keyed by the
+    company whose documents they hold.
+
+    Returns:
+        dict: {(index_name, tenant_id): (feed module pk, feed_id)}
+    """
+    from sentinelvision.feeds import get_all_feeds
+
+    index_map = {}
+    for feed_id, feed_class in get_all_feeds().items():
+        shared = feed_class.uses_shared_index()
+        for feed in feed_class.objects.all():
+            if shared and feed.company_id is None:
+                index_map[(feed_class.get_shared_index_name(), None)] = (feed.pk, feed_id)
+            elif not shared and feed.company_id and getattr(feed, 'es_index_name', None):
+                index_map[(feed.es_index_name, str(feed.company_id))] = (feed.pk, feed_id)
+    return index_map
+
+
+def get_feed_index_map():
+    """
+    Get the cached index to FeedModule map.
+
+    Returns:
+        dict: See build_feed_index_map()
+    """
+    return cache.get_or_set(
+        FEED_INDEX_MAP_CACHE_KEY,
+        build_feed_index_map,
+        settings.SENTINELVISION_FEED_INDEX_MAP_TTL
+    )
+
+
+def invalidate_feed_index_map():
+    """Drop the cached index map after feed modules change."""
+    cache.delete(FEED_INDEX_MAP_CACHE_KEY)
+
+
+def ensure_enriched_ioc_index(es_client, index_name):
+    """
+    Create a tenant's enriched IOC index if it does not exist yet.
+
+    Args:
+        es_client: Elasticsearch client instance
+        index_name (str): Tenant enriched IOC index
+    """
+    if not es_client.indices.exists(index=index_name):
+        es_client.indices.create(index=index_name, body=ENRICHED_IOC_MAPPING)
+
+
+def build_enriched_ioc_doc(enriched_ioc, matched_feeds):
+    """
+    Build the tenant enriched-index document for an IOC.
+
+    Args:
+        enriched_ioc (EnrichedIOC): The enriched IOC
+        matched_feeds (list): IDs of the feeds that matched
+
+    Returns:
+        dict: Elasticsearch document
+    """
+    return {
+        "ioc_type": enriched_ioc.ioc_type,
+        "value": enriched_ioc.value,
+        "status": enriched_ioc.status,
+        "first_seen": enriched_ioc.first_seen.isoformat(),
+        "last_checked": enriched_ioc.last_checked.isoformat(),
+        "last_matched": enriched_ioc.last_matched.isoformat() if enriched_ioc.last_matched else None,
+        "source": enriched_ioc.source,
+        "description": enriched_ioc.description,
+        "confidence": enriched_ioc.confidence,
+        "tlp": enriched_ioc.tlp,
+        "tags": enriched_ioc.tags,
+        "matched_feeds": matched_feeds,
+        "match_count": len(matched_feeds)
+    }
+
+
+def _search_feed_hits(es_client, indices, company_id, values):
+    """
+    Find feed documents visible to a company for a chunk of IOC values.
+
+    Args:
+        es_client: Elasticsearch client instance
+        indices (list): Feed indices to search
+        company_id (str): Company UUID
+        values (list): IOC values
+
+    Yields:
+        dict: Raw search hits
+    """
+    query = {
+        "bool": {
+            "filter": [
+                {"terms": {"value": values}},
+                {"bool": {
+                    "should": [
+                        {"term": {"tenant_id": company_id}},
+                        {"bool": {"must_not": [{"exists": {"field": "tenant_id"}}]}}
+                    ],
+                    "minimum_should_match": 1
+                }}
+            ],
+            "must_not": [{"term": {"is_expired": True}}]
+        }
+    }
+
+    yield from scan(
+        es_client,
+        index=','.join(indices),
+        query={"query": query, "_source": FEED_SOURCE_FIELDS},
+        size=5000,
+        ignore_unavailable=True
+    )
+
+
+def enrich_iocs(company, iocs, es_client, chunk_size=None):
+    """
+    Enrich many IOCs of a company against every feed with a handful of queries.
+
+    IOCs are grouped by type and looked up with one ``terms`` query per chunk
+    of values across all feed indices. Hits are resolved to feeds through the
+    cached index map, matches are written with bulk_create/bulk_update and the
+    tenant's enriched-index documents are sent through one bulk indexer.
+
+    Args:
+        company: Company the IOCs belong to
+        iocs: Iterable of EnrichedIOC instances
+        es_client: Elasticsearch client instance
+        chunk_size (int): Values per terms query
+
+    Returns:
+        dict: ``statuses`` ({EnrichedIOC pk: status}) and query/write ``stats``
+    """
+    chunk_size = chunk_size or settings.SENTINELVISION_ENRICHMENT_CHUNK_SIZE
+    started = time.monotonic()
+    company_id = str(company.id)
+    now = timezone.now()
+
+    index_map = get_feed_index_map()
+    indices = sorted({index_name for index_name, tenant_id in index_map})
+    feed_ids = {feed_id for feed_pk, feed_id in index_map.values()}
+
+    by_type = defaultdict(list)
+    for ioc in iocs:
+        by_type[ioc.ioc_type].append(ioc)
+
+    statuses = {}
+    hits_by_ioc = defaultdict(list)
+    search_seconds = 0.0
+    queries = 0
+
+    for ioc_type, type_iocs in by_type.items():
+        for offset in range(0, len(type_iocs), chunk_size):
+            chunk = type_iocs[offset:offset + chunk_size]
+            by_value = defaultdict(list)
+            for ioc in chunk:
+                by_value[ioc.value].append(ioc)
+
+            # Values every feed's pre-filter rules out need no query
+            values = [value for value in by_value if not definitely_absent(value, feed_ids)]
+            if not indices or not values:
+                continue
+
+            search_started = time.monotonic()
+            try:
+                hits = list(_search_feed_hits(es_client, indices, company_id, values))
+            except Exception as e:
+                logger.error(
+                    f"Feed lookup failed for {len(chunk)} {ioc_type} IOCs: {str(e)}",
+                    extra={'company_id': company_id, 'ioc_type': ioc_type, 'error': str(e)},
+                    exc_info=True
+                )
+                for ioc in chunk:
+                    statuses[ioc.pk] = 'error'
+                continue
+            finally:
+                search_seconds += time.monotonic() - search_started
+                queries += 1
+
+            # Tenant state for shared feed documents lives in the overlay
+            shared_keys = set()
+            for hit in hits:
+                feed_ref = index_map.get((hit['_index'], hit['_source'].get('tenant_id')))
+                if feed_ref and not hit['_source'].get('tenant_id'):
+                    shared_keys.add((feed_ref[1], hit['_source'].get('value')))
+            overlays = get_overlay_docs(es_client, company_id, shared_keys)
+
+            for hit in hits:
+                source = hit['_source']
+                feed_ref = index_map.get((hit['_index'], source.get('tenant_id')))
+                if not feed_ref:
+                    continue
+                metadata = {**source, **overlays.get((feed_ref[1], source.get('value')), {})}
+                for ioc in by_value.get(source.get('value'), []):
+                    hits_by_ioc[ioc.pk].append((feed_ref[0], metadata))
+
+    # Work out the new state of every IOC in memory
+    iocs_by_pk = {ioc.pk: ioc for type_iocs in by_type.values() for ioc in type_iocs}
+    existing_matches = {
+        (match.ioc_id, match.feed_id): match
+        for match in IOCFeedMatch.objects.filter(ioc_id__in=list(hits_by_ioc))
+    }
+    new_matches, changed_matches = [], []
+    matched_feeds_by_ioc = {}
+
+    for pk, ioc in iocs_by_pk.items():
+        if statuses.get(pk) == 'error':
+            continue
+
+        ioc.last_checked = now
+        hits = hits_by_ioc.get(pk)
+        if not hits:
+            ioc.status = EnrichmentStatusEnum.NOT_FOUND
+            statuses[pk] = 'not_found'
+            continue
+
+        matched_feeds = []
+        tags = set(ioc.tags or [])
+        max_confidence = 0.0
+        for feed_pk, metadata in hits:
+            if str(feed_pk) not in matched_feeds:
+                matched_feeds.append(str(feed_pk))
+
+            match = existing_matches.get((pk, feed_pk))
+            if match is None:
+                match = IOCFeedMatch(ioc_id=pk, feed_id=feed_pk)
+                existing_matches[(pk, feed_pk)] = match
+                new_matches.append(match)
+            elif match not in changed_matches:
+                changed_matches.append(match)
+            match.match_time = now
+            match.feed_confidence = metadata.get('confidence', 0.0)
+            match.feed_tags = metadata.get('tags', [])
+            match.metadata = metadata
+
+            tags.update(metadata.get('tags') or [])
+            if metadata.get('confidence') is not None:
+                max_confidence = max(max_confidence, float(metadata['confidence']))
+
+        ioc.status = EnrichmentStatusEnum.ENRICHED
+        ioc.last_matched = now
+        ioc.confidence = max_confidence
+        ioc.tags = list(tags)
+        ioc.es_index = ioc.get_index_name()
+        ioc.es_doc_id = ioc.elasticsearch_id
+        matched_feeds_by_ioc[pk] = matched_feeds
+        statuses[pk] = 'enriched'
+
+    write_started = time.monotonic()
+    with transaction.atomic():
+        IOCFeedMatch.objects.bulk_create(new_matches, batch_size=1000)
+        IOCFeedMatch.objects.bulk_update(
+            changed_matches,
+            ['match_time', 'feed_confidence', 'feed_tags', 'metadata'],
+            batch_size=1000
+        )
+        EnrichedIOC.objects.bulk_update(
+            [ioc for pk, ioc in iocs_by_pk.items() if statuses.get(pk) != 'error'],
+            ['status', 'last_checked', 'last_matched', 'confidence', 'tags', 'es_index', 'es_doc_id'],
+            batch_size=1000
+        )
+    db_seconds = time.monotonic() - write_started
+
+    index_summary = {'docs_indexed': 0, 'docs_failed': 0}
+    if matched_feeds_by_ioc:
+        tenant_index = f"tenant_{company_id}_enriched_iocs"
+        ensure_enriched_ioc_index(es_client, tenant_index)
+        with BulkIndexer(es_client) as indexer:
+            for pk, matched_feeds in matched_feeds_by_ioc.items():
+                ioc = iocs_by_pk[pk]
+                indexer.index(tenant_index, ioc.es_doc_id, build_enriched_ioc_doc(ioc, matched_feeds))
+        index_summary = indexer.summary()
+
+    stats = {
+        'queries': queries,
+        'matches_created': len(new_matches),
+        'matches_updated': len(changed_matches),
+        'docs_indexed': index_summary['docs_indexed'],
+        'docs_failed': index_summary['docs_failed'],
+        'search_seconds': round(search_seconds, 3),
+        'db_seconds': round(db_seconds, 3),
+        'total_seconds': round(time.monotonic() - started, 3)
+    }
+
+    logger.info(
+        f"Batch enriched {len(iocs_by_pk)} IOCs for company {company.name} with {queries} feed queries",
+        extra={'company_id': company_id, **stats}
+    )
+
+    return {'statuses': statuses, 'stats': stats}
@@ -0,0 +1,234 @@
+import json
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from sentinelvision.logging import get_structured_logger
+
+logger = get_structured_logger('sentinelvision.bulk_indexer')
+
+
+class BulkIndexer:
+    """
+    Buffered Elasticsearch bulk writer with concurrent in-flight requests.
+
+    Follows the semantics of ``elasticsearch.helpers.parallel_bulk``: actions
+    are chunked by document count and serialised size, up to ``max_in_flight``
+    bulk requests run concurrently, rejected (429) items are retried with
+    exponential backoff and every failed item is reported individually.
+    Nothing is refreshed per request; call ``close(refresh=True)`` to refresh
+    every touched index exactly once at the end.
+
+    Usage:
+        with BulkIndexer(es_client) as indexer:
+            for doc_id, doc in documents:
+                indexer.index('my-index', doc_id, doc)
+        indexer.errors
+    """
+
+    MAX_REPORTED_ERRORS = 100
+
+    def __init__(self, es_client, chunk_size=None, max_chunk_bytes=None,
+                 max_in_flight=None, max_retries=None, initial_backoff=2):
+        self.es_client = es_client
+        self.chunk_size = chunk_size or settings.ELASTICSEARCH_BULK_CHUNK_SIZE
+        self.max_chunk_bytes = max_chunk_bytes or settings.ELASTICSEARCH_BULK_MAX_CHUNK_BYTES
+        self.max_in_flight = max(max_in_flight or settings.ELASTICSEARCH_BULK_MAX_IN_FLIGHT, 1)
+        self.max_retries = settings.ELASTICSEARCH_BULK_MAX_RETRIES if max_retries is None else max_retries
+        self.initial_backoff = initial_backoff
+
+        # Metrics
+        self.docs_indexed = 0
+        self.docs_failed = 0
+        self.batches_sent = 0
+        self.bytes_sent = 0
+        self.request_seconds = 0.0
+        self.wait_seconds = 0.0
+        self.errors = []
+
+        self._indices = set()
+        self._buffer = []
+        self._buffer_bytes = 0
+        self._buffer_docs = 0
+        self._in_flight = deque()
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_in_flight,
+            thread_name_prefix='es-bulk'
+        )
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(refresh=exc_type is None)
+        return False
+
+    def index(self, index_name, doc_id, document):
+        """
+        Queue a document for indexing.
+
+        Args:
+            index_name (str): Target index
+            doc_id (str): Document ID
+            document (dict): Document body
+        """
+        self.add({"index": {"_index": index_name, "_id": doc_id}}, document)
+
+    def add(self, action, document=None):
+        """
+        Queue a raw bulk action with an optional body.
+
+        Args:
+            action (dict): Bulk action line, e.g. ``{"update": {...}}``
+            document (dict): Action body (omit for ``delete``)
+        """
+        if self._closed:
+            raise RuntimeError("BulkIndexer is closed")
+
+        op_type, meta = next(iter(action.items()))
+        self._indices.add(meta.get('_index'))
+
+        lines = [json.dumps(action, default=str)]
+        if document is not None:
+            lines.append(json.dumps(document, default=str))
+        size = sum(len(line) + 1 for line in lines)
+
+        if self._buffer and (
+            self._buffer_docs >= self.chunk_size
+            or self._buffer_bytes + size > self.max_chunk_bytes
+        ):
+            self.flush()
+
+        self._buffer.append(lines)
+        self._buffer_bytes += size
+        self._buffer_docs += 1
+
+    def flush(self):
+        """Submit buffered actions as one bulk request, waiting if too many are in flight."""
+        if not self._buffer:
+            return
+
+        batch = self._buffer
+        self._buffer = []
+        self._buffer_bytes = 0
+        self._buffer_docs = 0
+
+        while len(self._in_flight) >= self.max_in_flight:
+            self._collect(self._in_flight.popleft())
+
+        self._in_flight.append(self._executor.submit(self._send, batch))
+
+    def close(self, refresh=True):
+        """
+        Flush remaining actions, wait for all requests and optionally refresh.
+
+        Args:
+            refresh (bool): Refresh every index written to, once
+
+        Returns:
+            dict: Summary of the bulk run
+        """
+        if self._closed:
+            return self.summary()
+
+        try:
+            self.flush()
+            while self._in_flight:
+                self._collect(self._in_flight.popleft())
+        finally:
+            self._executor.shutdown(wait=True)
+            self._closed = True
+
+        if refresh and self._indices and self.docs_indexed:
+            indices = ','.join(sorted(index for index in self._indices if index))
+            self.es_client.indices.refresh(index=indices)
+
+        if self.docs_failed:
+            logger.warning(
+                f"Bulk indexing finished with {self.docs_failed} failed documents",
+                extra=self.summary()
+            )
+
+        return self.summary()
+
+    def summary(self):
+        """
+        Get bulk indexing metrics.
+
+        Returns:
+            dict: Counters, timings and the first reported item errors
+        """
+        return {
+            'docs_indexed': self.docs_indexed,
+            'docs_failed': self.docs_failed,
+            'batches_sent': self.batches_sent,
+            'bytes_sent': self.bytes_sent,
+            'request_seconds': round(self.request_seconds, 3),
+            'wait_seconds': round(self.wait_seconds, 3),
+            'errors': self.errors
+        }
+
+    def _send(self, batch):
+        """
+        Send one bulk request, retrying items rejected with 429.
+
+        Runs on a worker thread; returns results instead of mutating state.
+        """
+        indexed = 0
+        failed = []
+        attempts = 0
+        elapsed = 0.0
+        sent_bytes = 0
+
+        while batch:
+            body = [line for lines in batch for line in lines]
+            sent_bytes += sum(len(line) + 1 for line in body)
+
+            started = time.monotonic()
+            response = self.es_client.bulk(operations=body)
+            elapsed += time.monotonic() - started
+
+            if not response.get('errors'):
+                indexed += len(batch)
+                break
+
+            retry = []
+            for lines, item in zip(batch, response.get('items', [])):
+                op_type, result = next(iter(item.items()))
+                status = result.get('status', 500)
+                if status < 300:
+                    indexed += 1
+                elif status == 429 and attempts < self.max_retries:
+                    retry.append(lines)
+                else:
+                    failed.append({
+                        'op_type': op_type,
+                        '_index': result.get('_index'),
+                        '_id': result.get('_id'),
+                        'status': status,
+                        'error': result.get('error')
+                    })
+
+            batch = retry
+            if batch:
+                time.sleep(self.initial_backoff * (2 ** attempts))
+                attempts += 1
+
+        return indexed, failed, elapsed, sent_bytes
+
+    def _collect(self, future):
+        """Wait for a submitted request and fold its results into the metrics."""
+        started = time.monotonic()
+        indexed, failed, elapsed, sent_bytes = future.result()
+        self.wait_seconds += time.monotonic() - started
+
+        self.docs_indexed += indexed
+        self.docs_failed += len(failed)
+        self.batches_sent += 1
+        self.bytes_sent += sent_bytes
+        self.request_seconds += elapsed
+
+        remaining = self.MAX_REPORTED_ERRORS - len(self.errors)
+        if remaining > 0:
+            self.errors.extend(failed[:remaining])
@@ -0,0 +1,350 @@
+import hashlib
+import json
+import time
+import requests
+from datetime import datetime
+from django.conf import settings
+from elasticsearch.helpers import scan
+from sentinelvision.logging import get_structured_logger
+from sentinelvision.services.bulk_indexer import BulkIndexer
+
+logger = get_structured_logger('sentinelvision.feeds.ingestion')
+
+CONTENT_HASH_FIELD = 'content_hash'
+# Set from the clock on every parse, so they never count as a content change
+VOLATILE_FIELDS = frozenset({'first_seen', 'last_updated'})
+
+
+class FeedIngestionStats:
+    """
+    Per-stage counters for a single feed ingestion run.
+
+    Time is attributed to the stage that was executing: ``fetch_seconds`` is
+    spent waiting on the network, ``flush_seconds`` blocked on bulk requests
+    that could not be overlapped and ``parse_seconds`` is whatever remains of
+    the wall-clock time.
+    """
+
+    def __init__(self):
+        self.bytes_read = 0
+        self.lines_read = 0
+        self.rows_parsed = 0
+        self.docs_flushed = 0
+        self.docs_failed = 0
+        self.batches_flushed = 0
+        self.fetch_seconds = 0.0
+        self.flush_seconds = 0.0
+        self.total_seconds = 0.0
+        # Delta sync
+        self.not_modified = False
+        self.content_unchanged = False
+        self.docs_added = 0
+        self.docs_updated = 0
+        self.docs_expired = 0
+        self.sync_state = {}
+
+    @property
+    def parse_seconds(self):
+        return max(self.total_seconds - self.fetch_seconds - self.flush_seconds, 0.0)
+
+    def as_dict(self):
+        """
+        Get the counters as a JSON serialisable dict.
+
+        Returns:
+            dict: Stage counters and timings
+        """
+        return {
+            'bytes_read': self.bytes_read,
+            'lines_read': self.lines_read,
+            'rows_parsed': self.rows_parsed,
+            'docs_flushed': self.docs_flushed,
+            'docs_failed': self.docs_failed,
+            'batches_flushed': self.batches_flushed,
+            'fetch_seconds': round(self.fetch_seconds, 3),
+            'parse_seconds': round(self.parse_seconds, 3),
+            'flush_seconds': round(self.flush_seconds, 3),
+            'total_seconds': round(self.total_seconds, 3),
+            'not_modified': self.not_modified,
+            'content_unchanged': self.content_unchanged,
+            'docs_added': self.docs_added,
+            'docs_updated': self.docs_updated,
+            'docs_expired': self.docs_expired
+        }
+
+
+def iter_response_lines(response, stats, chunk_size=None, encoding='utf-8', digest=None):
+    """
+    Lazily decode a streamed HTTP response into text lines.
+
+    Only one network chunk plus a partial line is held in memory at a time.
+
+    Args:
+        response: A ``requests.Response`` opened with ``stream=True``
+        stats (FeedIngestionStats): Counters to update
+        chunk_size (int): Bytes to read per network call
+        encoding (str): Fallback encoding when the server does not send one
+        digest: Optional ``hashlib`` object updated with the raw payload
+
+    Yields:
+        str: One line of the payload without its line terminator
+    """
+    chunk_size = chunk_size or settings.FEED_INGESTION_CHUNK_SIZE
+    encoding = response.encoding or encoding
+    pending = b''
+    chunks = response.iter_content(chunk_size=chunk_size)
+
+    while True:
+        started = time.monotonic()
+        chunk = next(chunks, None)
+        stats.fetch_seconds += time.monotonic() - started
+
+        if chunk is None:
+            break
+        if not chunk:
+            continue
+
+        stats.bytes_read += len(chunk)
+        if digest is not None:
+            digest.update(chunk)
+        pending += chunk
+        lines = pending.split(b'\n')
+        pending = lines.pop()
+
+        for line in lines:
+            stats.lines_read += 1
+            yield line.rstrip(b'\r').decode(encoding, errors='replace')
+
+    if pending:
+        stats.lines_read += 1
+        yield pending.rstrip(b'\r').decode(encoding, errors='replace')
+
+
+def ingest_feed(feed, es_client, index_name, headers=None, timeout=60, batch_size=None):
+    """
+    Stream a feed from its URL into Elasticsearch.
+
+    The payload is read incrementally, handed line by line to the feed's
+    ``parse_feed_lines`` generator and written through a ``BulkIndexer``, so
+    parsing proceeds while the download and earlier bulk requests are still in
+    progress and peak memory does not grow with the feed size. The index is
+    refreshed once, after the last document.
+
+    Args:
+        feed: FeedModule instance implementing ``parse_feed_lines``
+        es_client: Elasticsearch client instance
+        index_name (str): Target Elasticsearch index
+        headers (dict): Optional HTTP headers for the feed request
+        timeout (int): HTTP timeout in seconds
+        batch_size (int): Documents per bulk request
+
+    Returns:
+        FeedIngestionStats: Counters for the run
+
+    Raises:
+        requests.RequestException: If the feed cannot be downloaded
+    """
+    stats = FeedIngestionStats()
+    started = time.monotonic()
+
+    with requests.get(feed.feed_url, headers=headers, timeout=timeout, stream=True) as response:
+        response.raise_for_status()
+
+        indexer = BulkIndexer(es_client, chunk_size=batch_size)
+        try:
+            for doc_id, document in feed.parse_feed_lines(iter_response_lines(response, stats)):
+                stats.rows_parsed += 1
+                document[CONTENT_HASH_FIELD] = document_hash(document)
+                indexer.index(index_name, doc_id, document)
+        except Exception:
+            indexer.close(refresh=False)
+            raise
+
+        summary = indexer.close(refresh=True)
+
+    stats.docs_flushed = summary['docs_indexed']
+    stats.docs_failed = summary['docs_failed']
+    stats.batches_flushed = summary['batches_sent']
+    stats.flush_seconds = summary['wait_seconds']
+    stats.total_seconds = time.monotonic() - started
+
+    logger.info(
+        f"Ingested {stats.docs_flushed} documents from {feed.feed_url} into {index_name}",
+        extra={
+            'feed_name': feed.name,
+            'feed_url': feed.feed_url,
+            'index_name': index_name,
+            **stats.as_dict()
+        }
+    )
+
+    if summary['errors']:
+        logger.warning(
+            f"{stats.docs_failed} documents from {feed.feed_url} were rejected by Elasticsearch",
+            extra={'index_name': index_name, 'errors': summary['errors'][:10]}
+        )
+
+    return stats
+
+
+def document_hash(document):
+    """
+    Hash the content of a feed document, ignoring its volatile fields.
+
+    Args:
+        document (dict): Document as yielded by ``parse_feed_lines``
+
+    Returns:
+        str: Hex digest stored in the document's ``content_hash`` field
+    """
+    content = {
+        key: value for key, value in document.items()
+        if key not in VOLATILE_FIELDS and key != CONTENT_HASH_FIELD
+    }
+    return hashlib.sha256(json.dumps(content, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def get_live_document_hashes(es_client, index_name, tenant_id=None):
+    """
+    Get the content hashes of the non-expired documents a feed currently has indexed.
+
+    Args:
+        es_client: Elasticsearch client instance
+        index_name (str): Feed index
+        tenant_id (str): Restrict to one tenant's documents in per-tenant indices
+
+    Returns:
+        dict: Content hash by document ID; None for documents indexed without one
+    """
+    query = {"bool": {"must_not": [{"term": {"is_expired": True}}]}}
+    if tenant_id:
+        query["bool"]["filter"] = [{"term": {"tenant_id": tenant_id}}]
+
+    return {
+        hit['_id']: hit.get('_source', {}).get(CONTENT_HASH_FIELD) for hit in scan(
+            es_client,
+            index=index_name,
+            query={"query": query},
+            _source=[CONTENT_HASH_FIELD],
+            size=5000,
+            ignore_unavailable=True
+        )
+    }
+
+
+def sync_feed(feed, es_client, index_name, sync_state=None, headers=None, timeout=60, batch_size=None):
+    """
+    Incrementally sync a feed into Elasticsearch.
+
+    The request is made conditional on the ETag/Last-Modified validators of the
+    previous sync and a 304 ends the run without parsing anything. Otherwise the
+    content hashes of the indexed documents are prefetched and the payload is
+    streamed against them: indicators missing from the index or whose content
+    hash changed are indexed as they are parsed, and once the download
+    completes the indicators that disappeared from the feed are marked expired.
+    Only the IDs seen so far are kept in memory, not the documents.
+
+    Args:
+        feed: FeedModule instance implementing ``parse_feed_lines``
+        es_client: Elasticsearch client instance
+        index_name (str): Target Elasticsearch index
+        sync_state (dict): etag, last_modified and content_digest of the previous sync
+        headers (dict): Optional HTTP headers for the feed request
+        timeout (int): HTTP timeout in seconds
+        batch_size (int): Documents per bulk request
+
+    Returns:
+        FeedIngestionStats: Counters for the run, with the validators to store
+        for the next sync in ``sync_state``
+
+    Raises:
+        requests.RequestException: If the feed cannot be downloaded
+    """
+    sync_state = sync_state or {}
+    stats = FeedIngestionStats()
+    stats.sync_state = dict(sync_state)
+    started = time.monotonic()
+
+    headers = dict(headers or {})
+    if sync_state.get('etag'):
+        headers['If-None-Match'] = sync_state['etag']
+    if sync_state.get('last_modified'):
+        headers['If-Modified-Since'] = sync_state['last_modified']
+
+    log_extra = {'feed_name': feed.name, 'feed_url': feed.feed_url, 'index_name': index_name}
+
+    with requests.get(feed.feed_url, headers=headers, timeout=timeout, stream=True) as response:
+        if response.status_code == 304:
+            stats.not_modified = True
+            stats.total_seconds = time.monotonic() - started
+            logger.info(f"Feed {feed.feed_url} not modified since last sync", extra=log_extra)
+            return stats
+
+        response.raise_for_status()
+
+        existing = get_live_document_hashes(es_client, index_name, feed.get_tenant_fields().get('tenant_id'))
+        digest = hashlib.sha256()
+        seen = set()
+        indexer = BulkIndexer(es_client, chunk_size=batch_size)
+        try:
+            for doc_id, document in feed.parse_feed_lines(iter_response_lines(response, stats, digest=digest)):
+                stats.rows_parsed += 1
+                seen.add(doc_id)
+                content_hash = document_hash(document)
+                if doc_id not in existing:
+                    stats.docs_added += 1
+                elif existing[doc_id] != content_hash:
+                    stats.docs_updated += 1
+                else:
+                    continue
+                document[CONTENT_HASH_FIELD] = content_hash
+                indexer.index(index_name, doc_id, document)
+        except Exception:
+            indexer.close(refresh=False)
+            raise
+
+        stats.sync_state = {
+            'etag': response.headers.get('ETag', ''),
+            'last_modified': response.headers.get('Last-Modified', ''),
+            'content_digest': digest.hexdigest()
+        }
+
+    stats.content_unchanged = stats.sync_state['content_digest'] == sync_state.get('content_digest')
+
+    # An empty payload is far more likely a broken download than an emptied feed
+    removed = existing.keys() - seen if seen else set()
+    if not seen and existing:
+        logger.warning(f"Feed {feed.feed_url} returned no indicators, keeping existing ones", extra=log_extra)
+
+    expired_at = datetime.now().isoformat()
+    try:
+        for doc_id in removed:
+            indexer.add(
+                {"update": {"_index": index_name, "_id": doc_id}},
+                {"doc": {"is_expired": True, "expired_at": expired_at}}
+            )
+    except Exception:
+        indexer.close(refresh=False)
+        raise
+    summary = indexer.close(refresh=True)
+
+    stats.docs_expired = len(removed)
+    stats.docs_flushed = summary['docs_indexed']
+    stats.docs_failed = summary['docs_failed']
+    stats.batches_flushed = summary['batches_sent']
+    stats.flush_seconds = summary['wait_seconds']
+    stats.total_seconds = time.monotonic() - started
+
+    logger.info(
+        f"Synced {feed.feed_url} into {index_name}: "
+        f"{stats.docs_added} added, {stats.docs_updated} updated, {stats.docs_expired} expired",
+        extra={**log_extra, **stats.as_dict()}
+    )
+
+    if summary['errors']:
+        logger.warning(
+            f"{stats.docs_failed} documents from {feed.feed_url} were rejected by Elasticsearch",
+            extra={'index_name': index_name, 'errors': summary['errors'][:10]}
+        )
+
+    return stats
@@ -0,0 +1,130 @@
+from datetime import datetime
+from sentinelvision.logging import get_structured_logger
+
+logger = get_structured_logger('sentinelvision.feeds.overlay')
+
+# Single index holding tenant-specific state for IOCs stored in shared feed indices
+OVERLAY_INDEX = 'sentineliq-feed-overlay'
+
+OVERLAY_MAPPING = {
+    "mappings": {
+        "properties": {
+            "feed_type": {"type": "keyword"},
+            "value": {"type": "keyword"},
+            "tenant_id": {"type": "keyword"},
+            "is_confirmed_ioc": {"type": "boolean"},
+            "sightings_count": {"type": "integer"},
+            "first_sighting": {"type": "date"},
+            "last_sighting": {"type": "date"}
+        }
+    },
+    "settings": {
+        "number_of_shards": 1,
+        "number_of_replicas": 1
+    }
+}
+
+# Painless script used to upsert a sighting without a read-modify-write round trip
+SIGHTING_SCRIPT = """
+ctx._source.sightings_count = (ctx._source.sightings_count == null ? 0 : ctx._source.sightings_count) + 1;
+ctx._source.last_sighting = params.now;
+if (params.confirm) { ctx._source.is_confirmed_ioc = true; }
+"""
+
+
+def overlay_doc_id(feed_type, company_id, value):
+    """
+    Build the overlay document ID for a tenant's view of a shared IOC.
+
+    Args:
+        feed_type (str): Feed identifier (e.g. 'blocklist_de')
+        company_id: Company UUID
+        value (str): IOC value
+
+    Returns:
+        str: Overlay document ID
+    """
+    return f"{feed_type}:{company_id}:{value}"
+
+
+def ensure_overlay_index(es_client):
+    """
+    Create the overlay index if it does not exist yet.
+
+    Args:
+        es_client: Elasticsearch client instance
+    """
+    if not es_client.indices.exists(index=OVERLAY_INDEX):
+        es_client.indices.create(index=OVERLAY_INDEX, body=OVERLAY_MAPPING)
+        logger.info(f"Created Elasticsearch index {OVERLAY_INDEX} for tenant feed overlays")
+
+
+def get_overlay_docs(es_client, company_id, keys):
+    """
+    Fetch the tenant overlay for several shared IOCs in one request.
+
+    Args:
+        es_client: Elasticsearch client instance
+        company_id: Company UUID
+        keys: Iterable of (feed_type, value) tuples
+
+    Returns:
+        dict: {(feed_type, value): overlay source} for IOCs the tenant has seen
+    """
+    keys = list(keys)
+    if not keys:
+        return {}
+
+    ids = [overlay_doc_id(feed_type, company_id, value) for feed_type, value in keys]
+
+    try:
+        response = es_client.mget(index=OVERLAY_INDEX, ids=ids)
+    except Exception as e:
+        # Missing overlay index simply means no tenant has sighted anything yet
+        logger.debug(f"Feed overlay lookup failed: {str(e)}")
+        return {}
+
+    overlays = {}
+    for key, doc in zip(keys, response.get('docs', [])):
+        if doc.get('found'):
+            overlays[key] = doc.get('_source', {})
+    return overlays
+
+
+def sighting_action(feed_type, company_id, value, confirm=True):
+    """
+    Build the bulk upsert that records a tenant sighting of a shared IOC.
+
+    Args:
+        feed_type (str): Feed identifier
+        company_id: Company UUID
+        value (str): IOC value
+        confirm (bool): Mark the IOC as confirmed for this tenant
+
+    Returns:
+        tuple: (bulk action, action body)
+    """
+    now = datetime.now().isoformat()
+    action = {"update": {
+        "_index": OVERLAY_INDEX,
+        "_id": overlay_doc_id(feed_type, company_id, value),
+        "retry_on_conflict": 3
+    }}
+    body = {
+        "script": {
+            "source": SIGHTING_SCRIPT,
+            "lang": "painless",
+            "params": {"now": now, "confirm": confirm}
+        },
+        "upsert": {
+            "feed_type": feed_type,
+            "value": value,
+            "tenant_id": str(company_id),
+            "is_confirmed_ioc": confirm,
+            "sightings_count": 1,
+            "first_sighting": now,
+            "last_sighting": now
+        }
+    }
+    return action, body
+
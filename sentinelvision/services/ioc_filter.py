@@ -0,0 +1,340 @@
+import hashlib
+import math
+import struct
+import threading
+import time
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from django.conf import settings
+from django.utils import timezone
+from elasticsearch.helpers import scan
+from sentinelvision.logging import get_structured_logger
+
+logger = get_structured_logger('sentinelvision.feeds.ioc_filter')
+
+KEY_PREFIX = 'sentinelvision:ioc_filter'
+
+# Header of a serialised filter: bit count, hash count, entry count
+_HEADER = struct.Struct('>QIQ')
+
+
+class BloomFilter:
+    """
+    Compact probabilistic set membership test.
+
+    ``might_contain`` never returns False for a value that was added, and
+    returns True for an absent value with probability ``error_rate``. Values
+    are hashed once with BLAKE2b and the k bit positions derived by double
+    hashing.
+    """
+
+    def __init__(self, size_bits, num_hashes, count=0, bits=None):
+        self.size_bits = size_bits
+        self.num_hashes = num_hashes
+        self.count = count
+        self.bits = bits if bits is not None else bytearray((size_bits + 7) // 8)
+
+    @classmethod
+    def for_capacity(cls, capacity, error_rate):
+        """
+        Create an empty filter sized for a number of entries.
+
+        Args:
+            capacity (int): Expected number of entries
+            error_rate (float): Target false positive rate
+
+        Returns:
+            BloomFilter: Empty filter
+        """
+        capacity = max(capacity, 1)
+        size_bits = max(int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))), 8)
+        num_hashes = max(int(round(size_bits / capacity * math.log(2))), 1)
+        return cls(size_bits, num_hashes)
+
+    def _positions(self, value):
+        digest = hashlib.blake2b(value.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'big')
+        h2 = int.from_bytes(digest[8:], 'big') | 1
+        return ((h1 + i * h2) % self.size_bits for i in range(self.num_hashes))
+
+    def add(self, value):
+        for position in self._positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def might_contain(self, value):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+    __contains__ = might_contain
+
+    @property
+    def size_bytes(self):
+        return len(self.bits)
+
+    @property
+    def estimated_error_rate(self):
+        """False positive rate expected for the current number of entries."""
+        if not self.count:
+            return 0.0
+        return (1 - math.exp(-self.num_hashes * self.count / self.size_bits)) ** self.num_hashes
+
+    def to_bytes(self):
+        return _HEADER.pack(self.size_bits, self.num_hashes, self.count) + bytes(self.bits)
+
+    @classmethod
+    def from_bytes(cls, data):
+        size_bits, num_hashes, count = _HEADER.unpack_from(data)
+        return cls(size_bits, num_hashes, count, bytearray(data[_HEADER.size:]))
+
+
+# Per-process copies of the filters and counters not yet pushed to Redis
+_local_filters = {}
+_pending_counters = defaultdict(lambda: defaultdict(int))
+_lock = threading.Lock()
+_redis_client = None
+# Builds requested inside batch_ioc_filter_builds: {feed_id: (es_client, index names)}
+_batched_builds = threading.local()
+
+
+def _get_redis():
+    global _redis_client
+    if _redis_client is None:
+        import redis
+        _redis_client = redis.Redis.from_url(settings.SENTINELVISION_IOC_FILTER_REDIS_URL)
+    return _redis_client
+
+
+def _key(feed_id, suffix):
+    return f"{KEY_PREFIX}:{feed_id}:{suffix}"
+
+
+def build_ioc_filter(feed_id, es_client, index_name):
+    """
+    Build a feed's filter from the live values in its index and publish it.
+
+    Args:
+        feed_id (str): Feed identifier
+        es_client: Elasticsearch client instance
+        index_name (str or list): Feed index, or indices, to read values from
+
+    Returns:
+        BloomFilter: The published filter
+    """
+    started = time.monotonic()
+    values = {
+        hit['_source']['value'] for hit in scan(
+            es_client,
+            index=index_name,
+            query={
+                "query": {"bool": {"must_not": [{"term": {"is_expired": True}}]}},
+                "_source": ["value"]
+            },
+            size=5000,
+            ignore_unavailable=True
+        )
+        if hit.get('_source', {}).get('value')
+    }
+
+    bloom = BloomFilter.for_capacity(
+        int(len(values) * 1.2) + 1000,
+        settings.SENTINELVISION_IOC_FILTER_ERROR_RATE
+    )
+    for value in values:
+        bloom.add(value)
+
+    client = _get_redis()
+    pipe = client.pipeline()
+    pipe.set(_key(feed_id, 'bits'), bloom.to_bytes())
+    pipe.delete(_key(feed_id, 'counters'))
+    pipe.hset(_key(feed_id, 'meta'), mapping={
+        'version': uuid.uuid4().hex,
+        'count': bloom.count,
+        'size_bytes': bloom.size_bytes,
+        'num_hashes': bloom.num_hashes,
+        'error_rate': settings.SENTINELVISION_IOC_FILTER_ERROR_RATE,
+        'estimated_error_rate': bloom.estimated_error_rate,
+        'built_at': timezone.now().isoformat()
+    })
+    pipe.execute()
+
+    logger.info(
+        f"Built IOC filter for {feed_id} with {bloom.count} values",
+        extra={
+            'feed_id': feed_id,
+            'index_name': index_name,
+            'count': bloom.count,
+            'size_bytes': bloom.size_bytes,
+            'build_seconds': round(time.monotonic() - started, 3)
+        }
+    )
+    return bloom
+
+
+def request_ioc_filter_build(feed_id, es_client, index_name):
+    """
+    Build a feed's filter now, or once at the end of the enclosing batch.
+
+    Args:
+        feed_id (str): Feed identifier
+        es_client: Elasticsearch client instance
+        index_name (str): Feed index to read values from
+    """
+    pending = getattr(_batched_builds, 'pending', None)
+    if pending is None:
+        build_ioc_filter(feed_id, es_client, index_name)
+        return
+    pending.setdefault(feed_id, (es_client, set()))[1].add(index_name)
+
+
+@contextmanager
+def batch_ioc_filter_builds():
+    """
+    Build each feed's filter once for all the updates run inside the block.
+
+    Feed tasks that update a feed type company by company use this (also as a
+    decorator) so the per-tenant index is scanned once per run instead of once
+    per company. Pending builds run even if the block raises; build failures
+    are logged, as lookups fall back to Elasticsearch without a filter.
+    """
+    if getattr(_batched_builds, 'pending', None) is not None:
+        # Nested batches are part of the outer one
+        yield
+        return
+
+    _batched_builds.pending = {}
+    try:
+        yield
+    finally:
+        pending, _batched_builds.pending = _batched_builds.pending, None
+        for feed_id, (es_client, index_names) in pending.items():
+            try:
+                build_ioc_filter(feed_id, es_client, sorted(index_names))
+            except Exception as e:
+                logger.warning(
+                    f"Could not build IOC filter for {feed_id}: {str(e)}",
+                    extra={'feed_id': feed_id, 'index_name': sorted(index_names), 'error': str(e)}
+                )
+
+
+def _flush_counters(client, feed_id):
+    counters = _pending_counters.pop(feed_id, None)
+    if counters:
+        pipe = client.pipeline()
+        for name, amount in counters.items():
+            pipe.hincrby(_key(feed_id, 'counters'), name, amount)
+        pipe.execute()
+
+
+def get_ioc_filter(feed_id):
+    """
+    Get the current filter of a feed, refreshing the local copy periodically.
+
+    Args:
+        feed_id (str): Feed identifier
+
+    Returns:
+        BloomFilter: The filter, or None if none has been built or Redis is unavailable
+    """
+    now = time.monotonic()
+    entry = _local_filters.get(feed_id)
+    if entry and now - entry['checked_at'] < settings.SENTINELVISION_IOC_FILTER_REFRESH_SECONDS:
+        return entry['filter']
+
+    with _lock:
+        try:
+            client = _get_redis()
+            _flush_counters(client, feed_id)
+            version = client.hget(_key(feed_id, 'meta'), 'version')
+
+            if version is None:
+                bloom = None
+            elif entry and entry['version'] == version:
+                bloom = entry['filter']
+            else:
+                data = client.get(_key(feed_id, 'bits'))
+                bloom = BloomFilter.from_bytes(data) if data else None
+        except Exception as e:
+            # Fall back to Elasticsearch until Redis is reachable again
+            logger.warning(f"Could not load IOC filter for {feed_id}: {str(e)}")
+            version, bloom = None, None
+
+        _local_filters[feed_id] = {'filter': bloom, 'version': version, 'checked_at': now}
+        return bloom
+
+
+def might_contain(feed_id, value):
+    """
+    Check a feed's filter before querying Elasticsearch.
+
+    Args:
+        feed_id (str): Feed identifier
+        value (str): IOC value
+
+    Returns:
+        bool: False if the feed definitely lacks the value, True if it may
+        contain it, None if the feed has no filter
+    """
+    if not settings.SENTINELVISION_IOC_FILTER_ENABLED:
+        return None
+
+    bloom = get_ioc_filter(feed_id)
+    if bloom is None:
+        return None
+
+    present = bloom.might_contain(value)
+    _pending_counters[feed_id]['hits' if present else 'misses'] += 1
+    return present
+
+
+def definitely_absent(value, feed_ids):
+    """
+    Check whether no feed can contain a value.
+
+    Args:
+        value (str): IOC value
+        feed_ids: Feed identifiers to check
+
+    Returns:
+        bool: True only if every feed has a filter and all of them rule the value out
+    """
+    feed_ids = list(feed_ids)
+    return bool(feed_ids) and all(might_contain(feed_id, value) is False for feed_id in feed_ids)
+
+
+def record_false_positive(feed_id):
+    """Count a lookup that passed the filter but was not found in Elasticsearch."""
+    _pending_counters[feed_id]['false_positives'] += 1
+
+
+def get_ioc_filter_stats(feed_id):
+    """
+    Get size, error rate and counters of a feed's filter.
+
+    Args:
+        feed_id (str): Feed identifier
+
+    Returns:
+        dict: Filter metadata and counters, empty if no filter has been built
+    """
+    client = _get_redis()
+    _flush_counters(client, feed_id)
+    meta = {k.decode(): v.decode() for k, v in client.hgetall(_key(feed_id, 'meta')).items()}
+    if not meta:
+        return {}
+
+    counters = {k.decode(): int(v) for k, v in client.hgetall(_key(feed_id, 'counters')).items()}
+    misses = counters.get('misses', 0)
+    false_positives = counters.get('false_positives', 0)
+    return {
+        'count': int(meta['count']),
+        'size_bytes': int(meta['size_bytes']),
+        'error_rate': float(meta['error_rate']),
+        'estimated_error_rate': float(meta['estimated_error_rate']),
+        'built_at': meta['built_at'],
+        'hits': counters.get('hits', 0),
+        'misses': misses,
+        'false_positives': false_positives,
+        # Share of absent values the filter let through
+        'observed_error_rate': false_positives / (false_positives + misses) if false_positives + misses else 0.0
+    }
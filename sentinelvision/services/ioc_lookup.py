@@ -0,0 +1,182 @@
+from collections import defaultdict
+from django.db import transaction
+from sentinelvision.logging import get_structured_logger
+from sentinelvision.services.bulk_indexer import BulkIndexer
+from sentinelvision.services.feed_overlay import ensure_overlay_index
+from sentinelvision.services.ioc_filter import might_contain, record_false_positive
+
+logger = get_structured_logger('sentinelvision.feeds.lookup')
+
+
+class FeedLookupService:
+    """
+    Look up many observables against every registered feed at once.
+
+    All candidate documents (feed documents plus tenant overlays) are fetched
+    with a single _mget, values ruled out by a feed's IOC pre-filter are never
+    requested, and confirming hits is done with one bulk request and one set
+    of Observable queries instead of a round trip per observable and feed.
+
+    Usage:
+        service = FeedLookupService(company_id)
+        results = service.lookup([('ip', '1.2.3.4'), ('hash-sha1', 'ab...')], confirm=True)
+        results[('ip', '1.2.3.4')]  # list of per-feed hits
+    """
+
+    def __init__(self, company_id, feed_classes=None, es_client=None):
+        """
+        Initialize the lookup service for a company.
+
+        Args:
+            company_id: UUID of the company for tenant isolation
+            feed_classes: Feed classes to search (defaults to every registered feed)
+            es_client: Elasticsearch client (defaults to the shared client)
+        """
+        if feed_classes is None:
+            from sentinelvision.feeds import get_all_feeds
+            feed_classes = get_all_feeds().values()
+
+        self.company_id = company_id
+        self.es_client = es_client
+        self.feeds = []
+        for feed_class in feed_classes:
+            feed = feed_class.get_lookup_instance(company_id)
+            if feed:
+                self.feeds.append(feed)
+            else:
+                logger.debug(f"No {feed_class.__name__} feed configured for company {company_id}")
+
+    def lookup(self, iocs, confirm=False, created_by=None):
+        """
+        Resolve (type, value) pairs against every feed.
+
+        Args:
+            iocs: Iterable of (observable type or None, value) tuples
+            confirm (bool): Mark hits as confirmed IOCs for the company and flag
+                the matching observables with is_ioc
+            created_by: User to create missing observables for confirmed hits;
+                without it only existing observables are flagged
+
+        Returns:
+            dict: {(type, value): [hit dicts with a 'feed_id' key]} for pairs with hits
+        """
+        candidates = []
+        refs = []
+        for ioc_type, value in dict.fromkeys(iocs):
+            for feed in self.feeds:
+                if not feed.handles_ioc_type(ioc_type):
+                    continue
+                maybe_present = might_contain(feed.feed_id, value)
+                if maybe_present is False:
+                    continue
+
+                feed_refs = feed.get_ioc_doc_refs(value, self.company_id)
+                candidates.append((ioc_type, value, feed, maybe_present, len(refs), len(feed_refs)))
+                refs.extend(feed_refs)
+
+        if not refs:
+            return {}
+
+        es_client = self.es_client or self.feeds[0].get_es_client()
+        docs = es_client.mget(docs=refs).get('docs', [])
+
+        results = defaultdict(list)
+        hits = []
+        for ioc_type, value, feed, maybe_present, offset, count in candidates:
+            source = feed.merge_ioc_docs(docs[offset:offset + count], self.company_id)
+            if source is None:
+                if maybe_present:
+                    record_false_positive(feed.feed_id)
+                continue
+
+            results[(ioc_type, value)].append({**feed.format_ioc_result(source), 'feed_id': feed.feed_id})
+            hits.append((ioc_type, value, feed, source))
+
+        if confirm and hits:
+            self._confirm_hits(es_client, hits, created_by)
+
+        logger.info(
+            f"Looked up {len(candidates)} feed candidates with one request: {len(hits)} hits",
+            extra={
+                'company_id': str(self.company_id),
+                'candidates': len(candidates),
+                'documents_requested': len(refs),
+                'hits': len(hits)
+            }
+        )
+        return dict(results)
+
+    def _confirm_hits(self, es_client, hits, created_by=None):
+        """
+        Record hits as confirmed IOCs in one bulk request and flag observables.
+
+        Args:
+            es_client: Elasticsearch client instance
+            hits (list): (type, value, feed, source) tuples
+            created_by: User for observables that do not exist yet
+        """
+        newly_confirmed = {}
+        if any(feed.uses_shared_index() for _, _, feed, _ in hits):
+            ensure_overlay_index(es_client)
+
+        indexer = BulkIndexer(es_client)
+        for ioc_type, value, feed, source in hits:
+            for action, body in feed.get_ioc_hit_actions(value, self.company_id, source):
+                indexer.add(action, body)
+            if not source.get('is_confirmed_ioc'):
+                newly_confirmed.setdefault((ioc_type, value), (feed, source))
+        summary = indexer.close(refresh=False)
+
+        if summary['docs_failed']:
+            logger.warning(
+                f"{summary['docs_failed']} IOC confirmations were rejected by Elasticsearch",
+                extra={'company_id': str(self.company_id), 'errors': summary['errors'][:10]}
+            )
+
+        if newly_confirmed:
+            self._flag_observables(newly_confirmed, created_by)
+
+    def _flag_observables(self, confirmed, created_by=None):
+        """
+        Set is_ioc on the observables of newly confirmed IOCs.
+
+        Args:
+            confirmed (dict): {(type, value): (feed, source)}
+            created_by: User for observables that do not exist yet
+        """
+        from observables.models import Observable
+
+        values = {value for _, value in confirmed}
+        existing = Observable.objects.filter(company_id=self.company_id, value__in=values)
+
+        to_update = []
+        found = set()
+        for observable in existing:
+            for key in ((observable.type, observable.value), (None, observable.value)):
+                if key in confirmed:
+                    found.add(key)
+                    if not observable.is_ioc:
+                        observable.is_ioc = True
+                        to_update.append(observable)
+                    break
+
+        with transaction.atomic():
+            Observable.objects.bulk_update(to_update, ['is_ioc'], batch_size=500)
+
+            if created_by is not None:
+                Observable.objects.bulk_create([
+                    Observable(
+                        type=ioc_type or feed.observable_type,
+                        value=value,
+                        company_id=self.company_id,
+                        created_by=created_by,
+                        **feed.get_observable_defaults(source)
+                    )
+                    for (ioc_type, value), (feed, source) in confirmed.items()
+                    if (ioc_type, value) not in found
+                ], batch_size=500, ignore_conflicts=True)
+
+        logger.info(
+            f"Marked {len(to_update)} observables as confirmed IOCs",
+            extra={'company_id': str(self.company_id), 'confirmed': len(confirmed), 'updated': len(to_update)}
+        )
@@ -1,5 +1,5 @@
 import logging
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import post_save, pre_save, post_delete, post_migrate
 from django.dispatch import receiver
 from django.utils import timezone
 from sentinelvision.models import (
@@ -13,6 +13,13 @@ from api.v1.sentinelvision.enums import ExecutionStatusEnum
 logger = get_structured_logger(__name__)
 
 
+@receiver(post_migrate)
+def create_feed_records(sender, **kwargs):
+    """Create database records for known feeds after migrating sentinelvision."""
+    if sender.name == 'sentinelvision':
+        from sentinelvision.feeds import ensure_feeds_in_database
+        ensure_feeds_in_database()
+
 @receiver(pre_save, sender=FeedModule)
 def validate_feed_module(sender, instance, **kwargs):
     """Validate feed module configuration before saving."""
@@ -28,6 +35,20 @@ def validate_feed_module(sender, instance, **kwargs):
         )
         raise
 
+def invalidate_feed_index_map(sender, **kwargs):
+    """Drop the cached feed index map when a feed module changes."""
+    from sentinelvision.services.batch_enrichment import invalidate_feed_index_map as invalidate
+    invalidate()
+
+def connect_feed_signals(feed_class):
+    """Connect the feed module handlers for one feed class (saves of other models never reach them)."""
+    for signal in (post_save, post_delete):
+        signal.connect(
+            invalidate_feed_index_map,
+            sender=feed_class,
+            dispatch_uid=f"invalidate_feed_index_map:{feed_class._meta.label}"
+        )
+
 @receiver(pre_save, sender=AnalyzerModule)
 def validate_analyzer_module(sender, instance, **kwargs):
     """Validate analyzer module configuration before saving."""
@@ -60,8 +81,18 @@ def validate_responder_module(sender, instance, **kwargs):
 
 @receiver(post_save, sender=FeedModule)
 def create_feed_registry(sender, instance, created, **kwargs):
-    """Create or update feed registry when a feed module is saved."""
-    if created:
+    """
+    Create or update feed registry when a feed module is saved.
+    
+    Registry entries belong to a company; global feeds (company=None) get one
+    per company from the feed update tasks instead.
+    """
+    if created and instance.company_id is None:
+        logger.debug(
+            "Skipped feed registry for global feed module",
+            extra={"module_name": instance.name}
+        )
+    elif created:
         FeedRegistry.objects.create(
             name=instance.name,
             feed_type=instance.module_type,
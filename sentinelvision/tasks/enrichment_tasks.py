@@ -11,6 +11,10 @@ from sentinelvision.services.executor import ModuleExecutor
 from sentinelvision.logging import get_structured_logger
 from observables.models import Observable
 from observables.services.elastic import BaseElasticIndexer, ElasticLookupService
+from api.core.utils.elastic_utils import get_es_client
+from sentinelvision.services.batch_enrichment import (
+    enrich_iocs, ensure_enriched_ioc_index, build_enriched_ioc_doc
+)
 import time
 
 from sentinelvision.models import (
@@ -512,7 +516,7 @@ def enrich_observable(self, company_id, ioc_type, ioc_value, source='api', descr
         enriched_ioc.mark_checked()
         
         # Connect to Elasticsearch
-        if not hasattr(settings, 'ELASTICSEARCH') or not settings.ELASTICSEARCH.get('hosts'):
+        if not settings.ELASTICSEARCH_HOSTS:
             error_msg = "Elasticsearch is not configured"
             logger.error(
                 error_msg,
@@ -525,12 +529,25 @@ def enrich_observable(self, company_id, ioc_type, ioc_value, source='api', descr
                 'ioc_value': ioc_value
             }
         
+        # Skip Elasticsearch when every feed's pre-filter rules the value out
+        from sentinelvision.feeds import get_all_feeds
+        from sentinelvision.services.ioc_filter import definitely_absent
+        
+        if definitely_absent(ioc_value, get_all_feeds()):
+            enriched_ioc.mark_not_found()
+            return {
+                'status': 'not_found',
+                'ioc_id': str(enriched_ioc.id),
+                'ioc_type': ioc_type,
+                'ioc_value': ioc_value,
+                'elapsed_time': time.time() - start_time
+            }
+        
         # Get all feed indices from Elasticsearch
-        from elasticsearch_dsl.connections import connections
         from elasticsearch.exceptions import NotFoundError
         
-        # Get ES connection
-        es = connections.get_connection()
+        # Get the shared ES client
+        es = get_es_client()
         
         # Get all feed indices
         indices = []
@@ -578,11 +595,29 @@ def enrich_observable(self, company_id, ioc_type, ioc_value, source='api', descr
         # Build search query
         search = Search(using=es, index=indices)
         search = search.query(ESQ("term", **{field: ioc_value}))
-        search = search.source(['type', 'value', 'source', 'tags', 'confidence', 'tlp'])
+        # Only the company's own documents or shared feed documents (no tenant_id)
+        search = search.filter(ESQ(
+            "bool",
+            should=[
+                ESQ("term", tenant_id=str(company.id)),
+                ESQ("bool", must_not=[ESQ("exists", field="tenant_id")])
+            ],
+            minimum_should_match=1
+        ))
+        # Indicators removed from their feed are kept but expired
+        search = search.exclude(ESQ("term", is_expired=True))
+        search = search.source(['type', 'value', 'source', 'tags', 'confidence', 'tlp', 'tenant_id'])
         
         # Execute search
         search_results = search.execute()
         
+        # Tenant state for hits from shared feed indices lives in the overlay
+        from sentinelvision.services.feed_overlay import get_overlay_docs
+        overlays = get_overlay_docs(es, company.id, [
+            (hit.meta.index.replace('feed_', '', 1), ioc_value)
+            for hit in search_results if not getattr(hit, 'tenant_id', None)
+        ])
+        
         # Process results
         if search_results.hits.total.value > 0:
             # We found matches
@@ -600,6 +635,7 @@ def enrich_observable(self, company_id, ioc_type, ioc_value, source='api', descr
             for hit in search_results:
                 source_meta = hit.to_dict()
                 feed_name = hit.meta.index.replace('feed_', '', 1)  # Extract feed name from index
+                source_meta.update(overlays.get((feed_name, ioc_value), {}))
                 
                 # Get corresponding FeedModule
                 feed = FeedModule.objects.filter(
@@ -642,51 +678,10 @@ def enrich_observable(self, company_id, ioc_type, ioc_value, source='api', descr
             tenant_index = f"tenant_{company.id}_enriched_iocs"
             
             # Ensure index exists
-            if not es.indices.exists(index=tenant_index):
-                # Create the index
-                es.indices.create(
-                    index=tenant_index,
-                    body={
-                        "settings": {
-                            "number_of_shards": 1,
-                            "number_of_replicas": 1
-                        },
-                        "mappings": {
-                            "properties": {
-                                "ioc_type": {"type": "keyword"},
-                                "value": {"type": "keyword"},
-                                "status": {"type": "keyword"},
-                                "first_seen": {"type": "date"},
-                                "last_checked": {"type": "date"},
-                                "last_matched": {"type": "date"},
-                                "source": {"type": "keyword"},
-                                "description": {"type": "text"},
-                                "confidence": {"type": "float"},
-                                "tlp": {"type": "keyword"},
-                                "tags": {"type": "keyword"},
-                                "matched_feeds": {"type": "keyword"},
-                                "match_count": {"type": "integer"}
-                            }
-                        }
-                    }
-                )
+            ensure_enriched_ioc_index(es, tenant_index)
             
             # Prepare document
-            doc = {
-                "ioc_type": enriched_ioc.ioc_type,
-                "value": enriched_ioc.value,
-                "status": enriched_ioc.status,
-                "first_seen": enriched_ioc.first_seen.isoformat(),
-                "last_checked": enriched_ioc.last_checked.isoformat(),
-                "last_matched": enriched_ioc.last_matched.isoformat() if enriched_ioc.last_matched else None,
-                "source": enriched_ioc.source,
-                "description": enriched_ioc.description,
-                "confidence": enriched_ioc.confidence,
-                "tlp": enriched_ioc.tlp,
-                "tags": enriched_ioc.tags,
-                "matched_feeds": matched_feeds,
-                "match_count": len(matched_feeds)
-            }
+            doc = build_enriched_ioc_doc(enriched_ioc, matched_feeds)
             
             # Update Elasticsearch
             doc_id = enriched_ioc.elasticsearch_id
@@ -818,12 +813,14 @@ def enrich_ioc_batch(self, company_id, ioc_ids=None, limit=100):
                 'elapsed_time': time.time() - start_time
             }
         
+        iocs = list(iocs.select_related('company'))
+        
         # Track results
         results = {
             'status': 'success',
             'company_id': company_id,
             'company_name': company.name,
-            'total_processed': iocs.count(),
+            'total_processed': len(iocs),
             'enriched_count': 0,
             'not_found_count': 0,
             'error_count': 0,
@@ -831,55 +828,26 @@ def enrich_ioc_batch(self, company_id, ioc_ids=None, limit=100):
             'ioc_results': []
         }
         
-        # Process each IOC
+        # Look up all IOCs with a few terms queries instead of one search per IOC
+        batch_result = enrich_iocs(company, iocs, get_es_client())
+        statuses = batch_result['statuses']
+        results['enrichment_stats'] = batch_result['stats']
+        
         for ioc in iocs:
-            try:
-                # Enrich the IOC
-                enrich_result = enrich_observable(
-                    company_id=company_id,
-                    ioc_type=ioc.ioc_type,
-                    ioc_value=ioc.value,
-                    source=ioc.source,
-                    description=ioc.description
-                )
-                
-                # Track result
-                if enrich_result['status'] == 'enriched':
-                    results['enriched_count'] += 1
-                elif enrich_result['status'] == 'not_found':
-                    results['not_found_count'] += 1
-                else:
-                    results['error_count'] += 1
-                
-                results['ioc_results'].append({
-                    'ioc_id': str(ioc.id),
-                    'ioc_type': ioc.ioc_type,
-                    'ioc_value': ioc.value,
-                    'status': enrich_result['status']
-                })
-            
-            except Exception as e:
-                logger.error(
-                    f"Error processing IOC {str(ioc.id)}: {str(e)}",
-                    extra={
-                        'company_id': company_id,
-                        'company_name': company.name,
-                        'ioc_id': str(ioc.id),
-                        'ioc_type': ioc.ioc_type,
-                        'ioc_value': ioc.value,
-                        'error': str(e)
-                    },
-                    exc_info=True
-                )
-                
+            status = statuses.get(ioc.pk, 'error')
+            if status == 'enriched':
+                results['enriched_count'] += 1
+            elif status == 'not_found':
+                results['not_found_count'] += 1
+            else:
                 results['error_count'] += 1
-                results['ioc_results'].append({
-                    'ioc_id': str(ioc.id),
-                    'ioc_type': ioc.ioc_type,
-                    'ioc_value': ioc.value,
-                    'status': 'error',
-                    'error': str(e)
-                })
+            
+            results['ioc_results'].append({
+                'ioc_id': str(ioc.id),
+                'ioc_type': ioc.ioc_type,
+                'ioc_value': ioc.value,
+                'status': status
+            })
         
         # Calculate elapsed time
         results['elapsed_time'] = time.time() - start_time
@@ -7,8 +7,9 @@ from django.utils import timezone
 from django.db.models import Q, F
 from sentinelvision.models import FeedRegistry, FeedModule, FeedExecutionRecord, ExecutionSourceEnum, ExecutionStatusEnum
 from companies.models import Company
-from sentinelvision.feeds import get_feed_class
+from sentinelvision.feeds import get_feed_class, run_feed_update
 from sentinelvision.logging import get_structured_logger
+from sentinelvision.services.ioc_filter import batch_ioc_filter_builds
 from io import StringIO
 
 # Get structured JSON logger
@@ -283,6 +284,7 @@ def retry_failed_feeds():
     autoretry_for=(Exception,),
     retry_kwargs={"max_retries": 3}
 )
+@batch_ioc_filter_builds()
 def update_ssl_blacklist_feed(self, company_id=None):
     """
     Update SSL Certificate Blacklist from abuse.ch
@@ -314,6 +316,7 @@ def update_ssl_blacklist_feed(self, company_id=None):
             }
         
         results = []
+        shared_results = {}
         
         # Process for each company
         for company in companies:
@@ -353,8 +356,8 @@ def update_ssl_blacklist_feed(self, company_id=None):
             # Mark as syncing
             feed_registry.mark_sync_started()
             
-            # Run the update
-            result = feed_instance.update_feed()
+            # Run the update (global feeds are fetched once for all companies)
+            result = run_feed_update(feed_instance, shared_results)
             
             # Update registry status
             if result.get('status') == 'success':
@@ -429,6 +432,7 @@ def update_ssl_blacklist_feed(self, company_id=None):
     autoretry_for=(Exception,),
     retry_kwargs={"max_retries": 3}
 )
+@batch_ioc_filter_builds()
 def dynamic_feed_update(self, feed_type, company_id=None):
     """
     Dynamically update any feed type based on the feed registry.
@@ -437,7 +441,7 @@ def dynamic_feed_update(self, feed_type, company_id=None):
         feed_type: The type/ID of the feed to update
         company_id: Optional UUID of specific company to update for
     """
-    from sentinelvision.feeds import get_feed_class
+    from sentinelvision.feeds import get_feed_class, run_feed_update
     
     logger.info(
         f"Starting dynamic feed update for {feed_type}",
@@ -476,6 +480,7 @@ def dynamic_feed_update(self, feed_type, company_id=None):
             }
         
         results = []
+        shared_results = {}
         
         # Process for each company
         for company in companies:
@@ -505,8 +510,8 @@ def dynamic_feed_update(self, feed_type, company_id=None):
             # Mark as syncing
             feed_registry.mark_sync_started()
             
-            # Run the update
-            result = feed_instance.update_feed()
+            # Run the update (global feeds are fetched once for all companies)
+            result = run_feed_update(feed_instance, shared_results)
             
             # Update registry status
             if result.get('status') == 'success':
@@ -619,6 +624,7 @@ def schedule_all_feeds():
 @shared_task(
     queue="sentineliq_soar_vision_feed"
 )
+@batch_ioc_filter_builds()
 def update_all_feeds():
     """
     Update all enabled feeds in the system.
@@ -636,6 +642,7 @@ def update_all_feeds():
         }
     
     results = []
+    shared_results = {}
     
     for feed in feeds:
         try:
@@ -668,8 +675,8 @@ def update_all_feeds():
                     extra={'feed_name': feed.name, 'feed_type': feed.feed_type}
                 )
                 
-                # Update the feed
-                result = feed_instance.update_feed()
+                # Update the feed (global feeds are fetched once for all companies)
+                result = run_feed_update(feed_instance, shared_results)
                 
                 results.append({
                     'feed_name': feed.name,
@@ -844,7 +851,8 @@ def run_feed_task(self, feed_id, execution_record_id=None, company_id=None):
             # Update execution record
             execution_record.mark_success(
                 iocs_processed=processed_count,
-                log=log_capture.getvalue()
+                log=log_capture.getvalue(),
+                ingestion_stats=result.get('ingestion_stats')
             )
             
             # Update feed metrics
@@ -0,0 +1,112 @@
+import json
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from rest_framework import status
+from rest_framework.test import APITestCase
+from alerts.models import Alert
+from companies.models import Company
+from observables.models import Observable
+
+User = get_user_model()
+
+
+class AlertIngestBatchTestCase(APITestCase):
+    """Test case for the batch alert ingestion endpoint."""
+
+    url = '/api/v1/alerts/ingest-batch/'
+
+    def setUp(self):
+        self.company = Company.objects.create(name="Test Company")
+        self.analyst = User.objects.create_user(
+            username="batchanalyst",
+            email="batchanalyst@testcompany.com",
+            password="analystpassword",
+            role="analyst_company",
+            company=self.company,
+        )
+        self.client.force_authenticate(user=self.analyst)
+
+    def _alert(self, source_ref, **extra):
+        return {
+            "title": f"Alert {source_ref}",
+            "description": "Detected by SIEM",
+            "source": "SIEM",
+            "source_ref": source_ref,
+            **extra
+        }
+
+    def test_batch_reports_each_item(self):
+        """Created, duplicate, in-batch duplicate and invalid items are reported in order"""
+        existing = Alert.objects.create(
+            title="Existing", description="Existing alert", source="SIEM", source_ref="REF-1",
+            external_source="SIEM", company=self.company, created_by=self.analyst
+        )
+        batch = [
+            self._alert("REF-1"),
+            self._alert("REF-2", observable_data={"ip-src": ["10.0.0.1"], "domain": "evil.example.com"}),
+            self._alert("REF-2"),
+            {"description": "No title", "source": "SIEM", "source_ref": "REF-3"},
+            self._alert("REF-4", severity="not-a-severity"),
+        ]
+
+        response = self.client.post(self.url, batch, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.data['data']
+        self.assertEqual(
+            [result['status'] for result in data['results']],
+            ['duplicate', 'created', 'duplicate', 'error', 'error']
+        )
+        self.assertEqual(data['results'][0]['alert_id'], existing.id)
+        self.assertEqual(data['results'][2]['alert_id'], data['results'][1]['alert_id'])
+        self.assertIn('title', data['results'][3]['errors'])
+        self.assertIn('severity', data['results'][4]['errors'])
+        self.assertEqual(data['summary'], {'total': 5, 'created': 1, 'duplicate': 2, 'error': 2})
+
+        alert = Alert.objects.get(id=data['results'][1]['alert_id'])
+        self.assertEqual(alert.external_source, 'SIEM')
+        self.assertEqual(
+            sorted(alert.observables.values_list('type', 'value')),
+            [('domain', 'evil.example.com'), ('ip', '10.0.0.1')]
+        )
+        # Two linked observables plus the two entries in observable_data
+        self.assertEqual(alert.artifact_count, 4)
+
+    def test_ndjson_reuses_existing_observables(self):
+        """NDJSON bodies are accepted and existing observables are linked, not duplicated"""
+        observable = Observable.objects.create(
+            type='ip', value='10.0.0.1', company=self.company, created_by=self.analyst
+        )
+        body = "\n".join(json.dumps(self._alert(f"REF-{i}", observable_data={"ip": "10.0.0.1"})) for i in range(3))
+
+        response = self.client.post(self.url, body + "\n", content_type='application/x-ndjson')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['data']['summary']['created'], 3)
+        self.assertEqual(Observable.objects.filter(company=self.company).count(), 1)
+        self.assertEqual(observable.alerts.count(), 3)
+
+    def test_rejects_non_list_body(self):
+        """A single object must go through the ingest endpoint instead"""
+        response = self.client.post(self.url, self._alert("REF-1"), format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Alert.objects.exists())
+
+    def test_unique_constraint_ignores_blank_source_ref(self):
+        """The database rejects duplicate references but not alerts without one"""
+        for _ in range(2):
+            Alert.objects.create(
+                title="Manual", description="Manual alert", source="analyst",
+                company=self.company, created_by=self.analyst
+            )
+
+        Alert.objects.create(
+            title="Ingested", description="Ingested alert", source="SIEM", source_ref="REF-9",
+            external_source="SIEM", company=self.company, created_by=self.analyst
+        )
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Alert.objects.bulk_create([Alert(
+                title="Ingested", description="Ingested alert", source="SIEM", source_ref="REF-9",
+                external_source="SIEM", company=self.company, created_by=self.analyst
+            )])
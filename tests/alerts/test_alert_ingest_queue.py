@@ -0,0 +1,91 @@
+import json
+from unittest.mock import MagicMock, patch
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase
+from alerts.models import Alert
+from alerts.services.ingest_queue import AlertIngestQueue, AlertIngestQueueFull, CONSUMER_GROUP
+from companies.models import Company
+
+User = get_user_model()
+
+
+class AlertIngestQueueTestCase(APITestCase):
+    """Test case for queued (mode=async) alert ingestion."""
+
+    url = '/api/v1/alerts/ingest-batch/'
+
+    def setUp(self):
+        self.company = Company.objects.create(name="Test Company")
+        self.analyst = User.objects.create_user(
+            username="queueanalyst",
+            email="queueanalyst@testcompany.com",
+            password="analystpassword",
+            role="analyst_company",
+            company=self.company,
+        )
+        self.client.force_authenticate(user=self.analyst)
+        self.batch = [
+            {"title": "Alert 1", "description": "SIEM", "source": "SIEM", "source_ref": "REF-1"},
+            {"title": "Alert 2", "description": "SIEM", "source": "SIEM", "source_ref": "REF-2"},
+        ]
+
+    @patch('api.v1.alerts.views.alert_custom_actions.schedule_drain')
+    @patch.object(AlertIngestQueue, 'enqueue', return_value='a' * 32)
+    @patch.object(AlertIngestQueue, '__init__', return_value=None)
+    def test_async_mode_returns_tracking_id(self, mock_init, mock_enqueue, mock_schedule):
+        """Alerts are queued without touching the database"""
+        response = self.client.post(f'{self.url}?mode=async', self.batch, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['data'], {'tracking_id': 'a' * 32, 'queued': 2})
+        mock_enqueue.assert_called_once_with(self.company.id, self.analyst.id, self.batch)
+        mock_schedule.assert_called_once()
+        self.assertFalse(Alert.objects.exists())
+
+    @patch.object(AlertIngestQueue, 'enqueue', side_effect=AlertIngestQueueFull(60000, 120))
+    @patch.object(AlertIngestQueue, '__init__', return_value=None)
+    def test_full_queue_returns_429(self, mock_init, mock_enqueue):
+        """A backlog over the limit is answered with 429 and Retry-After"""
+        response = self.client.post(f'{self.url}?mode=async', self.batch, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response['Retry-After'], '120')
+
+    @override_settings(ALERT_INGEST_QUEUE_MAX_DEPTH=10, ALERT_INGEST_DRAIN_RATE=4, ALERT_INGEST_MAX_RETRY_AFTER=300)
+    def test_enqueue_applies_back_pressure(self):
+        """Enqueueing past the max depth raises with a drain-rate based delay"""
+        client = MagicMock()
+        client.xlen.return_value = 9
+        queue = AlertIngestQueue(client=client)
+
+        with self.assertRaises(AlertIngestQueueFull) as raised:
+            queue.enqueue(self.company.id, self.analyst.id, self.batch)
+
+        self.assertEqual(raised.exception.retry_after, 3)
+        client.pipeline.assert_not_called()
+
+    def test_process_ingests_and_acknowledges(self):
+        """A micro-batch is ingested per company and acked after results are stored"""
+        client = MagicMock()
+        pipe = client.pipeline.return_value
+        queue = AlertIngestQueue(client=client)
+        entries = [
+            (f'1-{index}', {
+                'tracking_id': 'b' * 32,
+                'index': str(index),
+                'company_id': str(self.company.id),
+                'user_id': str(self.analyst.id),
+                'payload': json.dumps(item)
+            })
+            for index, item in enumerate(self.batch + [self.batch[0]])
+        ]
+
+        totals = queue.process(entries)
+
+        self.assertEqual(totals, {'created': 2, 'duplicate': 1, 'error': 0})
+        self.assertEqual(Alert.objects.filter(company=self.company).count(), 2)
+        pipe.xack.assert_called_once_with(queue.stream, CONSUMER_GROUP, '1-0', '1-1', '1-2')
+        pipe.xdel.assert_called_once_with(queue.stream, '1-0', '1-1', '1-2')
+        pipe.execute.assert_called_once()
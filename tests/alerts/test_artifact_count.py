@@ -0,0 +1,101 @@
+from io import StringIO
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from alerts.models import Alert
+from companies.models import Company
+from observables.models import Observable
+
+User = get_user_model()
+
+
+class ArtifactCountTest(TestCase):
+    """Test suite for the incrementally maintained Alert.artifact_count"""
+
+    def setUp(self):
+        self.company = Company.objects.create(name="Test Company")
+        self.user = User.objects.create_user(
+            username="countanalyst",
+            email="countanalyst@testcompany.com",
+            password="analystpassword",
+            role="analyst_company",
+            company=self.company,
+        )
+        self.alert = Alert.objects.create(
+            title="Alert", description="Alert", source="SIEM", source_ref="REF-1",
+            company=self.company, created_by=self.user,
+            observable_data={"ip": ["10.0.0.1", "10.0.0.2"]}
+        )
+        self.observables = [
+            Observable.objects.create(type='ip', value=f'10.0.1.{i}', company=self.company, created_by=self.user)
+            for i in range(3)
+        ]
+
+    def _db_count(self):
+        return Alert.objects.values_list('artifact_count', flat=True).get(id=self.alert.id)
+
+    def test_links_adjust_the_counter(self):
+        """Adding, removing and clearing observables on either side update the count"""
+        self.assertEqual(self.alert.artifact_count, 2)
+
+        self.alert.observables.add(*self.observables[:2])
+        self.alert.observables.add(self.observables[0])  # already linked
+        self.assertEqual(self._db_count(), 4)
+        self.assertEqual(self.alert.artifact_count, 4)
+
+        self.observables[2].alerts.add(self.alert)
+        self.assertEqual(self._db_count(), 5)
+
+        self.alert.observables.remove(self.observables[0], self.observables[0])
+        self.observables[1].alerts.remove(self.alert)
+        self.assertEqual(self._db_count(), 3)
+
+        self.alert.observables.clear()
+        self.assertEqual(self._db_count(), 2)
+
+    def test_deleting_an_observable_decrements_linked_alerts(self):
+        """Deleting a linked observable, alone or in a queryset, lowers the count"""
+        self.alert.observables.add(*self.observables)
+        self.assertEqual(self._db_count(), 5)
+
+        self.observables[0].delete()
+        self.assertEqual(self._db_count(), 4)
+
+        Observable.objects.filter(id__in=[obs.id for obs in self.observables[1:]]).delete()
+        self.assertEqual(self._db_count(), 2)
+
+    def test_status_update_does_not_recount(self):
+        """Saving a stale instance neither counts the M2M nor overwrites the counter"""
+        stale = Alert.objects.get(id=self.alert.id)
+        self.alert.observables.add(*self.observables)
+
+        stale.status = 'in_progress'
+        with CaptureQueriesContext(connection) as queries:
+            stale.save()
+
+        self.assertFalse(any('COUNT(' in query['sql'] for query in queries))
+        self.assertEqual(self._db_count(), 5)
+
+    def test_observable_data_changes_apply_a_delta(self):
+        """Editing observable_data shifts the counter by the difference"""
+        self.alert.observables.add(self.observables[0])
+        self.alert.observable_data = {"ip": ["10.0.0.1"], "domain": "evil.example.com", "hash": ["a", "b"]}
+        self.alert.save()
+
+        self.assertEqual(self._db_count(), 5)
+        self.assertEqual(self.alert.artifact_count, 5)
+
+    def test_reconcile_command_repairs_drift(self):
+        """The reconciliation command recomputes drifted counters in bulk"""
+        self.alert.observables.add(*self.observables)
+        Alert.objects.filter(id=self.alert.id).update(artifact_count=0)
+
+        out = StringIO()
+        call_command('reconcile_artifact_counts', dry_run=True, stdout=out)
+        self.assertIn('1 of 1 alerts', out.getvalue())
+        self.assertEqual(self._db_count(), 0)
+
+        call_command('reconcile_artifact_counts', batch_size=1, stdout=StringIO())
+        self.assertEqual(self._db_count(), 5)
@@ -0,0 +1,39 @@
+from unittest.mock import patch
+from django.test import TestCase
+from api.core.utils import elastic_utils
+from api.core.utils.elastic_utils import get_es_client, get_es_pool_metrics, reset_es_clients
+
+
+class ElasticClientRegistryTest(TestCase):
+    """Test suite for the shared Elasticsearch client registry"""
+
+    def setUp(self):
+        reset_es_clients()
+
+    def tearDown(self):
+        reset_es_clients()
+
+    def test_client_is_shared(self):
+        """Every caller in a process gets the same client"""
+        self.assertIs(get_es_client(), get_es_client())
+
+    def test_client_rebuilt_after_fork(self):
+        """A new process ID gets its own client"""
+        client = get_es_client()
+
+        with patch.object(elastic_utils.os, 'getpid', return_value=-1):
+            forked_client = get_es_client()
+
+        self.assertIsNot(client, forked_client)
+
+    def test_pool_metrics(self):
+        """Pool size and utilisation are reported per node"""
+        with self.settings(ELASTICSEARCH_CONNECTIONS_PER_NODE=7):
+            get_es_client()
+
+        metrics = get_es_pool_metrics()
+
+        node = metrics['clients']['default']['nodes'][0]
+        self.assertEqual(node['max_connections'], 7)
+        self.assertEqual(node['in_use'], 0)
+        self.assertEqual(node['utilisation'], 0)
@@ -0,0 +1,89 @@
+from io import StringIO
+from unittest.mock import patch
+from auditlog.models import LogEntry
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.test import APIRequestFactory, force_authenticate
+from api.models import AuditLogEntryIndex
+from api.v1.reporting.views.audit_report import AuditSummaryReportView
+from companies.models import Company
+
+User = get_user_model()
+
+
+class AuditLogEntryIndexTestCase(TestCase):
+    """
+    Test case for the indexed company and entity columns of audit log entries.
+    """
+
+    def setUp(self):
+        self.company = Company.objects.create(name="Test Company")
+        self.other_company = Company.objects.create(name="Other Company")
+        self.user = User.objects.create_user(
+            username="auditor",
+            email="auditor@testcompany.com",
+            password="securepassword",
+            company=self.company,
+            role="admin_company"
+        )
+
+    def _log(self, company=None, entity_type=None, action=LogEntry.Action.CREATE):
+        additional_data = {'request_method': 'POST'}
+        if company:
+            additional_data['company_id'] = str(company.id)
+        if entity_type:
+            additional_data['entity_type'] = entity_type
+        return LogEntry.objects.create(
+            content_type=ContentType.objects.get_for_model(Company), object_pk='1', object_repr="Entry", action=action,
+            actor=self.user, additional_data=additional_data
+        )
+
+    def test_entries_are_indexed_on_write(self):
+        """New entries with a tenant or entity get their index row, others do not"""
+        entry = self._log(self.company, 'alert')
+        self._log()
+
+        index = AuditLogEntryIndex.objects.get()
+        self.assertEqual(index.log_entry_id, entry.id)
+        self.assertEqual(index.company_id, str(self.company.id))
+        self.assertEqual(index.entity_type, 'alert')
+        self.assertEqual(index.timestamp, entry.timestamp)
+
+    def test_backfill_indexes_existing_entries(self):
+        """The backfill command indexes entries written before the index existed"""
+        entries = [self._log(self.company, 'incident') for _ in range(3)] + [self._log()]
+        AuditLogEntryIndex.objects.all().delete()
+
+        out = StringIO()
+        call_command('backfill_audit_log_index', batch_size=2, stdout=out)
+        call_command('backfill_audit_log_index', stdout=out)
+
+        self.assertEqual(
+            set(AuditLogEntryIndex.objects.values_list('log_entry_id', flat=True)),
+            {entry.id for entry in entries[:3]}
+        )
+        first_run, second_run = out.getvalue().splitlines()
+        self.assertTrue(first_run.endswith("indexed 3"))
+        self.assertTrue(second_run.endswith("indexed 0"))
+
+    @patch.object(AuditSummaryReportView, 'permission_classes', [IsAuthenticated])
+    def test_summary_report_filters_on_indexed_columns(self):
+        """Company scoping and entity distribution read the indexed columns"""
+        for entity_type in ('alert', 'alert', 'incident'):
+            self._log(self.company, entity_type)
+        self._log(self.other_company, 'alert')
+
+        request = APIRequestFactory().get('/reporting/audit/summary/')
+        force_authenticate(request, user=self.user)
+        response = AuditSummaryReportView.as_view()(request)
+
+        self.assertEqual(response.status_code, 200)
+        data = response.data['data']
+        self.assertEqual(data['total_logs'], 3)
+        self.assertEqual(data['entity_distribution'], [
+            {'entity_type': 'alert', 'count': 2},
+            {'entity_type': 'incident', 'count': 1},
+        ])
@@ -0,0 +1,102 @@
+from unittest.mock import patch
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError, connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from incidents.models import Incident, TimelineEvent
+from incidents.signals import track_incident_field_changes
+from companies.models import Company
+
+User = get_user_model()
+
+
+class IncidentChangeTrackingTest(TestCase):
+    """Test that incident field changes become timeline events in one write."""
+
+    def setUp(self):
+        self.company = Company.objects.create(name="Test Company")
+        self.user = User.objects.create_user(
+            username="trackinganalyst",
+            email="trackinganalyst@testcompany.com",
+            password="analystpassword",
+            first_name="Tracking",
+            last_name="Analyst",
+            role="analyst_company",
+            company=self.company,
+        )
+        self.incident = Incident.objects.create(
+            title="Test Incident",
+            description="Test incident description",
+            company=self.company,
+            created_by=self.user,
+        )
+
+    def _change_events(self):
+        return self.incident.timeline_events.exclude(type='created')
+
+    def test_diff_uses_the_loaded_snapshot(self):
+        """Computing the changes of a save issues no query"""
+        incident = Incident.objects.get(pk=self.incident.pk)
+        incident.status = 'in_progress'
+
+        with self.assertNumQueries(0), self.captureOnCommitCallbacks() as callbacks:
+            track_incident_field_changes(Incident, incident)
+
+        self.assertEqual(len(callbacks), 1)
+
+    def test_changes_are_written_in_one_insert_on_commit(self):
+        """All timeline events of a save are bulk inserted after commit"""
+        incident = Incident.objects.get(pk=self.incident.pk)
+        incident.status = 'in_progress'
+        incident.severity = 'critical'
+        incident.description = "Updated description"
+
+        with CaptureQueriesContext(connection) as queries:
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                incident.save()
+
+        self.assertEqual(len(callbacks), 1)
+        inserts = [query for query in queries if query['sql'].startswith('INSERT INTO "incidents_timelineevent"')]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(
+            sorted(event.metadata['field'] for event in self._change_events()),
+            ['description', 'severity', 'status']
+        )
+        status_event = self._change_events().get(metadata__field='status')
+        self.assertEqual(status_event.type, 'status_changed')
+        self.assertEqual(status_event.metadata['new_value'], 'in_progress')
+
+    def test_failed_timeline_write_is_logged(self):
+        """A failing timeline insert is logged and does not undo the save"""
+        incident = Incident.objects.get(pk=self.incident.pk)
+        incident.status = 'in_progress'
+
+        with patch.object(TimelineEvent.objects, 'bulk_create', side_effect=DatabaseError("insert failed")):
+            with self.assertLogs('api.incidents', level='ERROR') as logs:
+                with self.captureOnCommitCallbacks(execute=True):
+                    incident.save()
+
+        self.assertIn(f"incident {incident.pk}: insert failed", logs.output[0])
+        self.assertEqual(Incident.objects.get(pk=incident.pk).status, 'in_progress')
+        self.assertFalse(self._change_events().exists())
+
+    def test_assignee_change_resolves_names(self):
+        """Assignee events carry display names and ids"""
+        self.incident.assignee = self.user
+        with self.captureOnCommitCallbacks(execute=True):
+            self.incident.save()
+
+        event = self._change_events().get()
+        self.assertEqual(event.type, 'assigned')
+        self.assertEqual(event.title, "Assignee changed: Unassigned → Tracking Analyst")
+        self.assertEqual(event.metadata['new_value'], str(self.user.pk))
+
+    def test_unchanged_and_unsaved_fields_create_no_events(self):
+        """Saves without changes, or that do not write the changed field, are silent"""
+        self.incident.severity = 'high'
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            Incident.objects.get(pk=self.incident.pk).save()
+            self.incident.save(update_fields=['title'])
+
+        self.assertEqual(callbacks, [])
+        self.assertFalse(self._change_events().exists())
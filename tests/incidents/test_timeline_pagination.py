@@ -0,0 +1,123 @@
+import importlib
+import uuid
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from incidents.models import Incident, TimelineEvent
+from companies.models import Company
+
+User = get_user_model()
+
+backfill_migration = importlib.import_module('incidents.migrations.0003_timeline_events_source_of_truth')
+
+
+class TimelinePaginationTestCase(APITestCase):
+    """Test case for the TimelineEvent-backed, keyset-paginated incident timeline."""
+
+    def setUp(self):
+        self.company = Company.objects.create(name="Test Company")
+        self.user = User.objects.create_user(
+            username="timelineadmin",
+            email="timelineadmin@testcompany.com",
+            password="adminpassword",
+            role="admin_company",
+            company=self.company,
+            is_superuser=True,
+        )
+        self.client.force_authenticate(user=self.user)
+        self.incident = Incident.objects.create(
+            title="Test Incident",
+            description="Test incident description",
+            company=self.company,
+            created_by=self.user,
+        )
+        self.timeline_url = f'/api/v1/incidents/{self.incident.id}/timeline/'
+
+    @override_settings(INCIDENT_TIMELINE_CACHE_SIZE=3)
+    def test_entries_are_events_with_a_bounded_cache(self):
+        """Each entry is one TimelineEvent and the JSON column keeps only the latest few"""
+        existing = self.incident.timeline_events.count()
+        for i in range(5):
+            entry = self.incident.add_timeline_entry(
+                title=f"Entry {i}", content="Details", event_type='evidence', created_by=self.user
+            )
+
+        self.assertEqual(self.incident.timeline_events.count(), existing + 5)
+        event = TimelineEvent.objects.get(id=entry['id'])
+        self.assertEqual(event.type, 'note')
+        self.assertEqual(event.metadata['entry_type'], 'evidence')
+        self.assertEqual(entry['type'], 'evidence')
+
+        self.incident.refresh_from_db()
+        self.assertEqual([item['title'] for item in self.incident.timeline], ["Entry 2", "Entry 3", "Entry 4"])
+
+    def test_timeline_pages_do_not_overlap(self):
+        """Following next_cursor walks every event exactly once, newest first"""
+        TimelineEvent.objects.filter(incident=self.incident).delete()
+        now = timezone.now()
+        TimelineEvent.objects.bulk_create([
+            TimelineEvent(
+                incident=self.incident, company=self.company, type='note', title=f"Event {i}",
+                # Pairs of events share a timestamp so the id tie-breaker is exercised
+                timestamp=now - timedelta(minutes=i // 2)
+            )
+            for i in range(7)
+        ])
+
+        seen, cursor = [], None
+        while True:
+            params = {'limit': 3, **({'cursor': cursor} if cursor else {})}
+            response = self.client.get(self.timeline_url, params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            seen.extend(event['id'] for event in response.data['data'])
+            cursor = response.data['metadata']['pagination']['next_cursor']
+            if not cursor:
+                break
+
+        expected = [
+            str(pk) for pk in self.incident.timeline_events.order_by('-timestamp', '-id').values_list('id', flat=True)
+        ]
+        self.assertEqual(seen, expected)
+
+        response = self.client.get(self.timeline_url, {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(INCIDENT_TIMELINE_CACHE_SIZE=1)
+    def test_backfill_copies_json_entries_once(self):
+        """The migration backfill creates one event per JSON entry and is idempotent"""
+        entry_id = str(uuid.uuid4())
+        timeline = [
+            {"id": entry_id, "title": "Assigned", "content": "To analyst", "type": "assignment",
+             "timestamp": "2024-01-01T10:00:00+00:00", "created_by": str(self.user.id)},
+            {"title": "Legacy note", "type": "evidence", "timestamp": "not-a-date"},
+        ]
+        Incident.objects.filter(id=self.incident.id).update(timeline=timeline)
+        existing = self.incident.timeline_events.count()
+
+        backfill_migration.backfill_timeline_events(apps, None)
+        backfill_migration.backfill_timeline_events(apps, None)
+
+        self.assertEqual(self.incident.timeline_events.count(), existing + 2)
+        assigned = TimelineEvent.objects.get(id=entry_id)
+        self.assertEqual((assigned.type, assigned.user, assigned.message), ('assigned', self.user, "To analyst"))
+        legacy = self.incident.timeline_events.get(title="Legacy note")
+        self.assertEqual(legacy.metadata['entry_type'], 'evidence')
+
+        self.incident.refresh_from_db()
+        self.assertEqual(self.incident.timeline, timeline[-1:])
+
+    def test_backfill_reads_naive_timestamps_as_utc(self):
+        """Entries without a UTC offset are backfilled as UTC"""
+        entry_id = str(uuid.uuid4())
+        Incident.objects.filter(id=self.incident.id).update(timeline=[
+            {"id": entry_id, "title": "Naive", "type": "note", "timestamp": "2024-01-01T10:00:00"},
+        ])
+
+        backfill_migration.backfill_timeline_events(apps, None)
+
+        event = TimelineEvent.objects.get(id=entry_id)
+        self.assertEqual(event.timestamp, datetime(2024, 1, 1, 10, 0, tzinfo=dt_timezone.utc))
@@ -0,0 +1,107 @@
+import uuid
+from datetime import datetime, timezone as dt_timezone
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from alerts.models import Alert
+from incidents.models import IncidentObservable, TimelineEvent
+from observables.models import Observable
+from api.v1.misp_sync.models import MISPAttribute, MISPEvent, MISPServer
+from api.v1.misp_sync.tasks import (
+    convert_misp_event_to_alert,
+    convert_misp_events_to_alerts,
+    convert_misp_events_to_incidents
+)
+from companies.models import Company
+
+User = get_user_model()
+
+TIMESTAMP = datetime(2024, 1, 1, tzinfo=dt_timezone.utc)
+
+
+class MISPBulkConversionTestCase(TestCase):
+    """
+    Test case for converting sets of MISP events with bulk writes.
+    """
+
+    def setUp(self):
+        self.company = Company.objects.create(name="Test Company")
+        self.user = User.objects.create_user(
+            username="mispadmin",
+            email="mispadmin@testcompany.com",
+            password="securepassword",
+            company=self.company,
+            role="admin_company"
+        )
+        self.server = MISPServer.objects.create(
+            name="Community MISP", url="https://misp.example.com", api_key="key",
+            company=self.company, created_by=self.user
+        )
+        self.events = [self._event(number) for number in (1, 2)]
+        # Shared by both events, and already known to the company
+        Observable.objects.create(
+            type='ip', value="10.0.0.1", company=self.company, created_by=self.user
+        )
+
+    def _event(self, number):
+        event = MISPEvent.objects.create(
+            misp_id=number, misp_uuid=uuid.UUID(int=number), info=f"Event {number}", threat_level_id=1,
+            date=TIMESTAMP.date(), timestamp=TIMESTAMP, org_name="CIRCL", orgc_name="CIRCL",
+            misp_server=self.server, company=self.company
+        )
+        for index, (attr_type, value) in enumerate([
+            ('ip-dst', "10.0.0.1"), ('domain', f"evil{number}.example"), ('comment', "not an observable")
+        ]):
+            MISPAttribute.objects.create(
+                misp_id=number * 10 + index, misp_uuid=uuid.UUID(int=number * 10 + index + 1000),
+                type=attr_type, category="Network activity", value=value, to_ids=True,
+                timestamp=TIMESTAMP, event=event, company=self.company
+            )
+        return event
+
+    def test_events_convert_to_alerts_with_shared_observables(self):
+        """Each event gets an alert linked to deduplicated observables"""
+        result = convert_misp_events_to_alerts([event.id for event in self.events])
+
+        self.assertEqual(result['summary'], {'completed': 2})
+        self.assertEqual(Observable.objects.filter(company=self.company).count(), 3)
+        for event in self.events:
+            event.refresh_from_db()
+            alert = Alert.objects.get(id=event.alert_id)
+            self.assertEqual(alert.observables.count(), 2)
+            self.assertEqual(alert.artifact_count, 2)
+            self.assertEqual(alert.severity, 'critical')
+
+    def test_converted_event_is_not_converted_twice(self):
+        """A second conversion reports the existing alert"""
+        first = convert_misp_event_to_alert(self.events[0].id)
+        second = convert_misp_event_to_alert(self.events[0].id)
+
+        self.assertEqual(first['status'], 'completed')
+        self.assertEqual(second['status'], 'already_converted')
+        self.assertEqual(second['alert_id'], first['alert_id'])
+        self.assertEqual(Alert.objects.count(), 1)
+
+    def test_events_convert_to_incidents(self):
+        """Observables are linked in bulk and recorded with one timeline entry"""
+        result = convert_misp_events_to_incidents([event.id for event in self.events])
+
+        self.assertEqual(result['summary'], {'completed': 2})
+        event = MISPEvent.objects.get(id=self.events[0].id)
+        links = IncidentObservable.objects.filter(incident_id=event.incident_id)
+        self.assertEqual(links.count(), 2)
+        self.assertTrue(all(link.is_ioc for link in links))
+        self.assertEqual(
+            TimelineEvent.objects.filter(incident_id=event.incident_id, title__contains="observables imported").count(), 1
+        )
+
+        again = convert_misp_events_to_incidents([event.id])
+        self.assertEqual(again['summary'], {'already_converted': 1})
+
+    def test_unknown_event_is_reported(self):
+        """IDs matching no event fail without affecting the others"""
+        missing = uuid.uuid4()
+
+        result = convert_misp_events_to_alerts([self.events[0].id, missing])
+
+        self.assertEqual(result['results'][str(missing)]['status'], 'failed')
+        self.assertEqual(result['results'][str(self.events[0].id)]['status'], 'completed')
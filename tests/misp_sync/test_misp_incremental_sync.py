@@ -0,0 +1,242 @@
+import uuid
+from datetime import datetime, timezone as dt_timezone
+from unittest.mock import patch
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.test import TestCase, override_settings
+from api.v1.misp_sync.models import MISPAttribute, MISPEvent, MISPObject, MISPServer
+from api.v1.misp_sync.tasks import _sync_event_page, sync_misp_server
+from companies.models import Company
+
+User = get_user_model()
+
+BASE_TIMESTAMP = 1700000000
+
+
+def misp_event(number, timestamp=None, attributes=1):
+    """Event dict as returned by MISP restSearch."""
+    return {
+        'Event': {
+            'id': str(number),
+            'uuid': str(uuid.UUID(int=number)),
+            'info': f"Event {number}",
+            'date': '2024-01-01',
+            'published': True,
+            'timestamp': str(timestamp or BASE_TIMESTAMP + number),
+            'Org': {'name': 'CIRCL'},
+            'Orgc': {'name': 'CIRCL'},
+            'Attribute': [
+                {
+                    'id': str(number * 100 + i),
+                    'uuid': str(uuid.UUID(int=number * 100 + i + 10 ** 6)),
+                    'type': 'ip-dst',
+                    'category': 'Network activity',
+                    'value': f"10.0.{number}.{i}",
+                    'to_ids': True,
+                    'timestamp': str(timestamp or BASE_TIMESTAMP + number),
+                }
+                for i in range(attributes)
+            ],
+        }
+    }
+
+
+def with_object(event, number):
+    """Attach one MISP object to an event dict."""
+    event['Event']['Object'] = [{
+        'id': str(number),
+        'uuid': f"00000000-0000-0000-0000-{number:012d}",
+        'name': 'domain-ip',
+        'meta-category': 'network',
+        'template_uuid': '43b3b146-77eb-4931-b4cc-b66c60f28734',
+        'template_version': '9',
+        'timestamp': event['Event']['timestamp'],
+    }]
+    return event
+
+
+@override_settings(MISP_SYNC_PAGE_SIZE=2)
+@patch('api.v1.misp_sync.tasks.PyMISP')
+class MISPIncrementalSyncTestCase(TestCase):
+    """
+    Test case for paginated, watermark-based MISP synchronization.
+    """
+
+    def setUp(self):
+        self.company = Company.objects.create(name="Test Company")
+        self.user = User.objects.create_user(
+            username="mispadmin",
+            email="mispadmin@testcompany.com",
+            password="securepassword",
+            company=self.company,
+            role="admin_company"
+        )
+        self.server = MISPServer.objects.create(
+            name="Community MISP", url="https://misp.example.com", api_key="key",
+            company=self.company, created_by=self.user
+        )
+        self.events = [misp_event(number) for number in (1, 2, 3)]
+
+    def _serve(self, mock_pymisp, events):
+        def search(page, limit, **kwargs):
+            return events[(page - 1) * limit:page * limit]
+        mock_pymisp.return_value.search.side_effect = search
+        return mock_pymisp.return_value.search
+
+    def test_pages_are_streamed_and_watermark_advances(self, mock_pymisp):
+        """Every page is stored and the watermark moves to the newest event"""
+        search = self._serve(mock_pymisp, self.events)
+
+        result = sync_misp_server(self.server.id)
+
+        self.assertEqual(result['stats']['events_imported'], 3)
+        self.assertEqual(result['stats']['pages'], 2)
+        self.assertEqual([call.kwargs['page'] for call in search.call_args_list], [1, 2])
+        self.assertEqual(MISPEvent.objects.count(), 3)
+        self.assertEqual(MISPAttribute.objects.count(), 3)
+
+        self.server.refresh_from_db()
+        self.assertEqual(self.server.sync_watermark, datetime.fromtimestamp(BASE_TIMESTAMP + 3, tz=dt_timezone.utc))
+        self.assertEqual(self.server.sync_cursor, {})
+
+        # The next run starts at the watermark and skips events that did not change
+        search.reset_mock()
+        result = sync_misp_server(self.server.id)
+        self.assertEqual(search.call_args_list[0].kwargs['timestamp'], BASE_TIMESTAMP + 3)
+        self.assertEqual(result['stats']['events_imported'], 0)
+        self.assertEqual(result['stats']['events_skipped'], 3)
+
+    def test_interrupted_run_resumes_after_last_committed_page(self, mock_pymisp):
+        """A run stopped after one page continues with the next page and the same filter"""
+        search = self._serve(mock_pymisp, self.events)
+
+        result = sync_misp_server(self.server.id, max_events=2)
+
+        self.assertTrue(result['stats']['resumable'])
+        self.server.refresh_from_db()
+        self.assertIsNone(self.server.sync_watermark)
+        self.assertEqual(self.server.sync_cursor['page'], 1)
+        since = search.call_args.kwargs['timestamp']
+
+        search.reset_mock()
+        result = sync_misp_server(self.server.id)
+
+        self.assertEqual(search.call_args_list[0].kwargs, {
+            'controller': 'events', 'timestamp': since, 'published': True,
+            'page': 2, 'limit': 2, 'pythonify': False
+        })
+        self.assertEqual(result['stats']['events_imported'], 1)
+        self.assertEqual(MISPEvent.objects.count(), 3)
+        self.server.refresh_from_db()
+        self.assertEqual(self.server.sync_cursor, {})
+        self.assertIsNotNone(self.server.sync_watermark)
+
+    def test_updated_event_is_rewritten(self, mock_pymisp):
+        """An event whose MISP timestamp advanced replaces the stored copy"""
+        self._serve(mock_pymisp, self.events)
+        sync_misp_server(self.server.id)
+
+        updated = misp_event(2, timestamp=BASE_TIMESTAMP + 50, attributes=2)
+        updated['Event']['info'] = "Event 2 (revised)"
+        self._serve(mock_pymisp, [updated])
+        result = sync_misp_server(self.server.id)
+
+        self.assertEqual(result['stats']['events_imported'], 1)
+        self.assertEqual(MISPEvent.objects.get(misp_id=2).info, "Event 2 (revised)")
+        self.assertEqual(MISPAttribute.objects.filter(event__misp_id=2).count(), 2)
+
+
+class MISPBulkUpsertTestCase(TestCase):
+    """
+    Test case for set-based storage of MISP event pages.
+    """
+
+    def setUp(self):
+        self.company = Company.objects.create(name="Test Company")
+        self.user = User.objects.create_user(
+            username="mispadmin",
+            email="mispadmin@testcompany.com",
+            password="securepassword",
+            company=self.company,
+            role="admin_company"
+        )
+        self.server = MISPServer.objects.create(
+            name="Community MISP", url="https://misp.example.com", api_key="key",
+            company=self.company, created_by=self.user
+        )
+
+    def _page(self, timestamp=None, attributes=50):
+        return [
+            with_object(misp_event(number, timestamp=timestamp, attributes=attributes), 900 + number)['Event']
+            for number in (1, 2, 3)
+        ]
+
+    def test_page_costs_a_fixed_number_of_queries(self):
+        """Lookup and upsert once per model, whatever the number of attributes"""
+        with transaction.atomic(), self.assertNumQueries(6):
+            stats = _sync_event_page(self.server, self._page())
+
+        self.assertEqual(stats, {'events': 3, 'attributes': 150, 'objects': 3, 'skipped': 0})
+        self.assertEqual(MISPAttribute.objects.filter(event__misp_id=2).count(), 50)
+        self.assertEqual(MISPObject.objects.get(misp_id=902).event.misp_id, 2)
+
+    def test_updates_keep_identity_of_stored_rows(self):
+        """Re-synced rows are updated in place rather than recreated"""
+        _sync_event_page(self.server, self._page(attributes=2))
+        event = MISPEvent.objects.get(misp_id=1)
+        attribute = MISPAttribute.objects.get(misp_id=100)
+
+        revised = self._page(timestamp=BASE_TIMESTAMP + 50, attributes=2)
+        revised[0]['info'] = "Event 1 (revised)"
+        revised[0]['Attribute'][0]['value'] = "192.0.2.1"
+        with transaction.atomic():
+            stats = _sync_event_page(self.server, revised)
+
+        self.assertEqual(stats['events'], 3)
+        self.assertEqual(MISPEvent.objects.count(), 3)
+        self.assertEqual(MISPAttribute.objects.count(), 6)
+        updated_event = MISPEvent.objects.get(misp_id=1)
+        self.assertEqual((updated_event.id, updated_event.uuid), (event.id, event.uuid))
+        self.assertEqual(updated_event.info, "Event 1 (revised)")
+        updated_attribute = MISPAttribute.objects.get(misp_id=100)
+        self.assertEqual((updated_attribute.id, updated_attribute.value), (attribute.id, "192.0.2.1"))
+
+    def test_servers_of_other_tenants_keep_their_own_copies(self):
+        """An event stored by one tenant's server is stored again, not taken over, by another's"""
+        other_company = Company.objects.create(name="Other Company")
+        other_server = MISPServer.objects.create(
+            name="Community MISP", url="https://misp.example.com", api_key="key",
+            company=other_company, created_by=self.user
+        )
+        _sync_event_page(self.server, self._page(attributes=2))
+
+        with transaction.atomic():
+            same = _sync_event_page(other_server, self._page(attributes=2))
+        with transaction.atomic():
+            newer = _sync_event_page(other_server, self._page(timestamp=BASE_TIMESTAMP + 50, attributes=2))
+
+        self.assertEqual((same['events'], same['skipped']), (3, 0))
+        self.assertEqual((newer['events'], newer['skipped']), (3, 0))
+        for company in (self.company, other_company):
+            self.assertEqual(MISPEvent.objects.filter(company=company).count(), 3)
+            self.assertEqual(MISPAttribute.objects.filter(event__company=company, company=company).count(), 6)
+            self.assertEqual(MISPObject.objects.filter(event__company=company, company=company).count(), 3)
+        self.assertEqual(
+            MISPEvent.objects.get(misp_server=self.server, misp_id=1).timestamp,
+            datetime.fromtimestamp(BASE_TIMESTAMP + 1, tz=dt_timezone.utc)
+        )
+
+    @patch('api.v1.misp_sync.tasks.PyMISP')
+    def test_sync_records_throughput(self, mock_pymisp):
+        """The run's duration and rates are stored on the server"""
+        mock_pymisp.return_value.search.side_effect = lambda page, limit, **kwargs: (
+            [{'Event': event} for event in self._page(attributes=4)] if page == 1 else []
+        )
+
+        result = sync_misp_server(self.server.id)
+
+        self.server.refresh_from_db()
+        self.assertGreater(self.server.last_sync_duration, 0)
+        self.assertGreater(self.server.last_sync_events_per_second, 0)
+        self.assertGreater(self.server.last_sync_attributes_per_second, self.server.last_sync_events_per_second)
+        self.assertEqual(result['stats']['attributes_per_second'], self.server.last_sync_attributes_per_second)
@@ -0,0 +1,175 @@
+import uuid
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest.mock import patch
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from api.v1.misp_sync.models import MISPEvent, MISPServer
+from api.v1.misp_sync.tasks import (
+    _shard_windows,
+    dispatch_misp_sync,
+    finish_misp_sync,
+    schedule_misp_sync_for_active_servers,
+    sync_misp_window
+)
+from companies.models import Company
+
+User = get_user_model()
+
+BASE_TIMESTAMP = 1700000000
+HOUR = 3600
+
+
+def misp_event(number):
+    """Event dict without attributes as returned by MISP restSearch."""
+    return {
+        'Event': {
+            'id': str(number),
+            'uuid': str(uuid.UUID(int=number)),
+            'info': f"Event {number}",
+            'date': '2024-01-01',
+            'published': True,
+            'timestamp': str(BASE_TIMESTAMP + number),
+        }
+    }
+
+
+@override_settings(MISP_SYNC_SHARD_HOURS=24, MISP_SYNC_MAX_SHARDS=4)
+class MISPShardWindowsTestCase(TestCase):
+    """
+    Test case for splitting a sync range into windows.
+    """
+
+    def test_windows_cover_range_without_overlap(self):
+        """Consecutive inclusive windows of the configured width"""
+        windows = _shard_windows(0, 3 * 24 * HOUR - 1)
+
+        self.assertEqual(windows, [(0, 24 * HOUR - 1), (24 * HOUR, 48 * HOUR - 1), (48 * HOUR, 72 * HOUR - 1)])
+
+    def test_windows_widen_past_shard_limit(self):
+        """A long range is split into at most MISP_SYNC_MAX_SHARDS windows"""
+        windows = _shard_windows(0, 30 * 24 * HOUR)
+
+        self.assertEqual(len(windows), 4)
+        self.assertEqual(windows[0][0], 0)
+        self.assertEqual(windows[-1][1], 30 * 24 * HOUR)
+        self.assertTrue(all(nxt[0] == prev[1] + 1 for prev, nxt in zip(windows, windows[1:])))
+
+
+@patch('api.v1.misp_sync.tasks.chord')
+@patch('api.v1.misp_sync.tasks.MISPSyncLock')
+@override_settings(MISP_SYNC_SHARD_HOURS=24, MISP_SYNC_MAX_SHARDS=32)
+class MISPSyncCoordinatorTestCase(TestCase):
+    """
+    Test case for dispatching parallel, locked MISP sync runs.
+    """
+
+    def setUp(self):
+        self.company = Company.objects.create(name="Test Company")
+        self.user = User.objects.create_user(
+            username="mispadmin",
+            email="mispadmin@testcompany.com",
+            password="securepassword",
+            company=self.company,
+            role="admin_company"
+        )
+        self.server = MISPServer.objects.create(
+            name="Community MISP", url="https://misp.example.com", api_key="key",
+            company=self.company, created_by=self.user, sync_max_concurrency=3
+        )
+
+    def test_long_range_is_sharded_into_windows(self, mock_lock, mock_chord):
+        """A first sync over several days runs one shard per window under the server's cap"""
+        mock_lock.return_value.acquire.return_value = "token"
+
+        dispatch_misp_sync(self.server, days_back=3)
+
+        header = mock_chord.call_args.args[0]
+        self.assertGreaterEqual(len(header), 3)
+        self.assertTrue(all(signature.args[:2] == (str(self.server.id), 3) for signature in header))
+        body = mock_chord.return_value.call_args.args[0]
+        self.assertEqual(body.args, (str(self.server.id), "token"))
+        self.assertIsNotNone(body.kwargs['started'])
+        self.server.refresh_from_db()
+        self.assertIsNotNone(self.server.last_sync)
+
+    def test_short_range_runs_single_incremental_sync(self, mock_lock, mock_chord):
+        """A server synced recently is not split"""
+        mock_lock.return_value.acquire.return_value = "token"
+        self.server.sync_watermark = timezone.now() - timedelta(hours=2)
+        self.server.save()
+
+        dispatch_misp_sync(self.server)
+
+        header = mock_chord.call_args.args[0]
+        self.assertEqual(len(header), 1)
+        self.assertEqual(header[0].args, (str(self.server.id), 3))
+
+    def test_locked_server_is_skipped(self, mock_lock, mock_chord):
+        """Overlapping scheduler runs never start a second sync of the same server"""
+        mock_lock.return_value.acquire.return_value = None
+
+        result = schedule_misp_sync_for_active_servers()
+
+        mock_chord.assert_not_called()
+        self.assertEqual(result['servers_scheduled'], 0)
+        self.assertEqual(result['servers_already_running'], 1)
+
+    def test_finish_moves_watermark_and_releases_lock(self, mock_lock, mock_chord):
+        """The watermark advances only when every window completed"""
+        results = [
+            {'status': 'completed', 'max_timestamp': BASE_TIMESTAMP + 10, 'stats': {'events_imported': 2}},
+            {'status': 'completed', 'max_timestamp': BASE_TIMESTAMP + 20, 'stats': {'events_imported': 1}},
+        ]
+
+        summary = finish_misp_sync(results, str(self.server.id), "token", started=0)
+
+        self.assertEqual(summary['stats']['events_imported'], 3)
+        mock_lock.return_value.release.assert_called_once_with("token")
+        self.server.refresh_from_db()
+        self.assertEqual(self.server.sync_watermark, datetime.fromtimestamp(BASE_TIMESTAMP + 20, tz=dt_timezone.utc))
+
+        results.append({'status': 'failed', 'error': 'timeout'})
+        results[0]['max_timestamp'] = BASE_TIMESTAMP + 30
+        summary = finish_misp_sync(results, str(self.server.id), "token", started=0)
+
+        self.assertEqual(summary['status'], 'failed')
+        self.server.refresh_from_db()
+        self.assertEqual(self.server.sync_watermark, datetime.fromtimestamp(BASE_TIMESTAMP + 20, tz=dt_timezone.utc))
+
+
+@override_settings(MISP_SYNC_PAGE_SIZE=2)
+@patch('api.v1.misp_sync.tasks.PyMISP')
+class MISPSyncWindowTestCase(TestCase):
+    """
+    Test case for syncing one window of a sharded run.
+    """
+
+    def setUp(self):
+        self.company = Company.objects.create(name="Test Company")
+        self.user = User.objects.create_user(
+            username="mispadmin",
+            email="mispadmin@testcompany.com",
+            password="securepassword",
+            company=self.company,
+            role="admin_company"
+        )
+        self.server = MISPServer.objects.create(
+            name="Community MISP", url="https://misp.example.com", api_key="key",
+            company=self.company, created_by=self.user
+        )
+
+    def test_window_reads_bounded_range_and_leaves_watermark(self, mock_pymisp):
+        """Pages are searched within the window and the watermark is left to the callback"""
+        events = [misp_event(number) for number in (1, 2, 3)]
+        search = mock_pymisp.return_value.search
+        search.side_effect = lambda page, limit, **kwargs: events[(page - 1) * limit:page * limit]
+
+        result = sync_misp_window(self.server.id, BASE_TIMESTAMP, BASE_TIMESTAMP + HOUR)
+
+        self.assertEqual(search.call_args.kwargs['timestamp'], [BASE_TIMESTAMP, BASE_TIMESTAMP + HOUR])
+        self.assertEqual(result['max_timestamp'], BASE_TIMESTAMP + 3)
+        self.assertEqual(result['stats']['events_imported'], 3)
+        self.assertEqual(MISPEvent.objects.count(), 3)
+        self.server.refresh_from_db()
+        self.assertIsNone(self.server.sync_watermark)
@@ -1,5 +1,4 @@
 import os
-import json
 import unittest
 from unittest.mock import patch, MagicMock
 from django.test import TestCase
@@ -117,6 +116,12 @@ class TestMitreImport(TestCase):
         importer = MitreImporter()
         stats = importer.run_full_sync(force=True)
         
+        self.assertEqual(
+            [stats[key] for key in ("tactics", "techniques", "subtechniques", "mitigations", "relationships")],
+            [1, 0, 1, 1, 1]
+        )
+        self.assertEqual(sum(stats["updated"].values()), 0)
+        
         # Check that the expected objects were created
         self.assertEqual(MitreTactic.objects.count(), 1)
         self.assertEqual(MitreTechnique.objects.count(), 1)
@@ -136,6 +141,53 @@ class TestMitreImport(TestCase):
         self.assertEqual(technique.tactics.count(), 1)
         self.assertEqual(technique.tactics.first().external_id, "TA0001")
 
+    @patch('requests.get')
+    def test_mitre_importer_links_and_reimport(self, mock_get):
+        """Test parent, tactic and mitigation links and that a re-import updates in place"""
+        self.stix_data["objects"].append({
+            "type": "attack-pattern",
+            "id": "attack-pattern--a62a8db3-f23a-4d8f-afd6-9dbc77e7813b",
+            "name": "Phishing",
+            "description": "Adversaries may send phishing messages.",
+            "kill_chain_phases": [{"kill_chain_name": "mitre-attack", "phase_name": "initial-access"}],
+            "external_references": [{"source_name": "mitre-attack", "external_id": "T1566"}]
+        })
+        self.stix_data["objects"][0]["x_mitre_shortname"] = "initial-access"
+        mock_get.return_value = MockResponse(self.stix_data)
+        
+        stats = MitreImporter().run_full_sync()
+        
+        self.assertEqual(stats["techniques"], 1)
+        self.assertEqual(stats["subtechniques"], 1)
+        self.assertEqual(stats["relationships"], 1)
+        for phase in ("fetch", "index", "tactics", "techniques", "mitigations", "relationships", "total"):
+            self.assertIn(phase, stats["timings"])
+        
+        parent = MitreTechnique.objects.get(external_id="T1566")
+        subtechnique = MitreTechnique.objects.get(external_id="T1566.001")
+        self.assertEqual(subtechnique.parent_technique, parent)
+        self.assertEqual(parent.tactics.first().external_id, "TA0001")
+        self.assertEqual(list(subtechnique.mitigations.values_list("external_id", flat=True)), ["M1017"])
+        
+        # A second import updates the stored rows in place and creates nothing
+        self.stix_data["objects"][1]["name"] = "Spearphishing Attachment (revised)"
+        stats = MitreImporter().run_full_sync()
+        
+        self.assertEqual(
+            [stats[key] for key in ("tactics", "techniques", "subtechniques", "mitigations", "relationships")],
+            [0, 0, 0, 0, 0]
+        )
+        self.assertEqual(
+            stats["updated"],
+            {"tactics": 1, "techniques": 1, "subtechniques": 1, "mitigations": 1, "relationships": 1}
+        )
+        revised = MitreTechnique.objects.get(external_id="T1566.001")
+        self.assertEqual(revised.id, subtechnique.id)
+        self.assertEqual(revised.name, "Spearphishing Attachment (revised)")
+        self.assertEqual(revised.parent_technique, parent)
+        self.assertEqual(MitreRelationship.objects.count(), 1)
+        self.assertEqual(revised.tactics.count(), 1)
+
     @patch('mitre.services.MitreImporter.run_full_sync')
     def test_import_mitre_command(self, mock_run_full_sync):
         """Test that the management command works correctly"""
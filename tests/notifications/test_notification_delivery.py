@@ -0,0 +1,99 @@
+import smtplib
+from unittest.mock import MagicMock, patch
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from companies.models import Company
+from notifications.models import Notification, NotificationChannel, NotificationDeliveryStatus
+from notifications.services.delivery import NotificationDeliveryEngine, SMTPConnectionPool
+from notifications.tasks import deliver_pending_notifications, queue_deliveries
+
+User = get_user_model()
+
+
+class NotificationDeliveryEngineTestCase(TestCase):
+    """
+    Test case for batched notification delivery.
+    """
+
+    def setUp(self):
+        self.company = Company.objects.create(name="Test Company")
+        self.users = [
+            User.objects.create_user(
+                username=f"recipient{i}",
+                email=f"recipient{i}@testcompany.com",
+                password="securepassword",
+                company=self.company,
+                role="analyst_company"
+            )
+            for i in range(5)
+        ]
+        self.notification = Notification.objects.create(
+            title="Incident created", message="A new incident", category='incident',
+            priority='high', company=self.company
+        )
+        self.email_channel = NotificationChannel.objects.create(
+            name="Email", channel_type='email', company=self.company,
+            config={'smtp_host': 'smtp.example.com', 'smtp_username': 'bot', 'smtp_password': 'secret'}
+        )
+        self.slack_channel = NotificationChannel.objects.create(
+            name="Slack", channel_type='slack', company=self.company,
+            config={'webhook_url': 'https://hooks.example.com/slack'}
+        )
+
+    @override_settings(NOTIFICATION_EMAIL_BCC_BATCH_SIZE=2)
+    @patch('notifications.services.delivery.smtplib.SMTP')
+    def test_email_reuses_one_connection_and_batches_bcc(self, mock_smtp):
+        """Five recipients are sent as three BCC messages over one login"""
+        connection = mock_smtp.return_value
+        connection.noop.return_value = (250, b'OK')
+        connection.send_message.side_effect = [{}, {'recipient3@testcompany.com': (550, b'No such user')}, {}]
+        queue_deliveries(self.notification, self.email_channel, self.users)
+
+        engine = NotificationDeliveryEngine(pool=SMTPConnectionPool())
+        with self.assertNumQueries(2):
+            summary = engine.deliver(list(
+                NotificationDeliveryStatus.objects.select_related(
+                    'notification', 'channel', 'recipient'
+                ).order_by('recipient__username')
+            ))
+
+        self.assertEqual(summary, {'total': 5, 'delivered': 4, 'failed': 1})
+        mock_smtp.assert_called_once()
+        connection.login.assert_called_once_with('bot', 'secret')
+        self.assertEqual(
+            [call.kwargs['to_addrs'] for call in connection.send_message.call_args_list],
+            [[user.email for user in self.users[i:i + 2]] for i in (0, 2, 4)]
+        )
+        message = connection.send_message.call_args_list[0].args[0]
+        self.assertNotIn('recipient1@testcompany.com', message.as_string())
+        failed = NotificationDeliveryStatus.objects.get(status='failed')
+        self.assertEqual(failed.recipient, self.users[3])
+
+    def test_slack_posts_once_per_channel_with_timeout(self):
+        """Shared-channel webhooks post once for all recipients over the session"""
+        session = MagicMock()
+        session.post.return_value.status_code = 200
+        queue_deliveries(self.notification, self.slack_channel, self.users)
+
+        with patch('notifications.tasks.NotificationDeliveryEngine',
+                   side_effect=lambda: NotificationDeliveryEngine(http_session=session)):
+            summary = deliver_pending_notifications(self.notification.id)
+
+        self.assertEqual(summary, {'total': 5, 'delivered': 5, 'failed': 0})
+        session.post.assert_called_once()
+        self.assertIn('timeout', session.post.call_args.kwargs)
+        self.assertFalse(NotificationDeliveryStatus.objects.filter(status='pending').exists())
+
+    def test_dropped_smtp_connection_is_reopened(self):
+        """A connection closed by the server is replaced on the next checkout"""
+        pool = SMTPConnectionPool()
+        with patch('notifications.services.delivery.smtplib.SMTP') as mock_smtp:
+            stale, fresh = MagicMock(), MagicMock()
+            stale.noop.side_effect = smtplib.SMTPServerDisconnected()
+            mock_smtp.side_effect = [stale, fresh]
+
+            pool.get(self.email_channel.config)
+            connection = pool.get(self.email_channel.config)
+
+        self.assertIs(connection, fresh)
+        self.assertEqual(mock_smtp.call_count, 2)
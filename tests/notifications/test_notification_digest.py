@@ -0,0 +1,117 @@
+from unittest.mock import patch
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from companies.models import Company
+from notifications.models import Notification, NotificationChannel, NotificationDeliveryStatus, NotificationRule
+from notifications.services.coalesce import ChannelRateLimiter, outbound_calls, schedule_digest_flush
+from notifications.tasks import flush_notification_digest, queue_deliveries
+
+User = get_user_model()
+
+
+class NotificationDigestTestCase(TestCase):
+    """
+    Test case for coalescing rule notifications into rate-limited digests.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.company = Company.objects.create(name="Test Company")
+        self.users = [
+            User.objects.create_user(
+                username=f"oncall{i}",
+                email=f"oncall{i}@testcompany.com",
+                password="securepassword",
+                company=self.company,
+                role="admin_company"
+            )
+            for i in range(3)
+        ]
+        self.rule = NotificationRule.objects.create(
+            name="Critical alerts", event_type='alert_created', message_template="{{ alert.title }}",
+            company=self.company, created_by=self.users[0]
+        )
+        self.in_app = NotificationChannel.objects.create(name="In-app", channel_type='in_app', company=self.company)
+        self.slack = NotificationChannel.objects.create(
+            name="Slack", channel_type='slack', company=self.company,
+            config={'webhook_url': 'https://hooks.example.com/slack'}
+        )
+
+    def _notify(self, title, channel, recipients, priority='medium'):
+        notification = Notification.objects.create(
+            title=title, message=title, category='alert', priority=priority,
+            triggered_by_rule=self.rule, company=self.company
+        )
+        notification.recipients.add(*recipients)
+        queue_deliveries(notification, channel, recipients)
+        return notification
+
+    @override_settings(NOTIFICATION_COALESCE_WINDOW=30)
+    @patch('notifications.tasks.flush_notification_digest.apply_async')
+    def test_first_notification_of_window_schedules_flush(self, mock_apply_async):
+        """A burst of notifications schedules a single flush per rule and channel"""
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(3):
+                schedule_digest_flush(self._notify(f"Alert {i}", self.in_app, self.users), self.in_app.id)
+
+        mock_apply_async.assert_called_once_with(
+            args=[str(self.company.id), str(self.rule.id), str(self.in_app.id)], countdown=30
+        )
+
+    def test_flush_sends_one_digest_per_recipient_set(self):
+        """Recipients owed the same notifications share one digest"""
+        storm = [self._notify(f"Alert {i}", self.in_app, self.users[:2]) for i in range(3)]
+        storm.append(self._notify("Alert 3", self.in_app, self.users[:1], priority='critical'))
+        single = self._notify("Alert 4", self.in_app, self.users[2:])
+
+        totals = flush_notification_digest(str(self.company.id), str(self.rule.id), str(self.in_app.id))
+
+        self.assertEqual(totals, {'total': 3, 'delivered': 3, 'failed': 0, 'coalesced': 7, 'deferred': 0})
+        digests = Notification.objects.filter(triggered_by_rule=self.rule).exclude(
+            id__in=[notification.id for notification in storm + [single]]
+        )
+        self.assertEqual(digests.count(), 2)
+
+        first = digests.get(recipients=self.users[0])
+        self.assertEqual(first.title, "Critical alerts: 4 notifications")
+        self.assertEqual(first.priority, 'critical')
+        self.assertIn("- [CRITICAL] Alert 3", first.message)
+        self.assertEqual(digests.get(recipients=self.users[1]).title, "Critical alerts: 3 notifications")
+
+        self.assertEqual(NotificationDeliveryStatus.objects.get(notification=single).status, 'delivered')
+        self.assertFalse(NotificationDeliveryStatus.objects.filter(status='pending').exists())
+
+    @patch('notifications.tasks.flush_notification_digest.apply_async')
+    @patch.object(ChannelRateLimiter, 'acquire', return_value=2.5)
+    def test_empty_bucket_defers_flush(self, mock_acquire, mock_apply_async):
+        """Without tokens nothing is sent and the flush is retried when they refill"""
+        for i in range(2):
+            self._notify(f"Alert {i}", self.slack, self.users)
+
+        args = [str(self.company.id), str(self.rule.id), str(self.slack.id)]
+        totals = flush_notification_digest(*args)
+
+        self.assertEqual(totals['deferred'], 6)
+        mock_acquire.assert_called_once_with(self.slack, 1)
+        mock_apply_async.assert_called_once_with(args=args, countdown=3)
+        self.assertEqual(NotificationDeliveryStatus.objects.filter(status='pending').count(), 6)
+        self.assertEqual(Notification.objects.count(), 2)
+
+    @override_settings(NOTIFICATION_EMAIL_BCC_BATCH_SIZE=50)
+    def test_token_cost_follows_outbound_requests(self):
+        """Buckets are charged per request the delivery engine will make"""
+        email = NotificationChannel(channel_type='email')
+        webhook = NotificationChannel(channel_type='webhook')
+
+        self.assertEqual(outbound_calls(self.slack, 120), 1)
+        self.assertEqual(outbound_calls(email, 120), 3)
+        self.assertEqual(outbound_calls(webhook, 120), 120)
+        self.assertEqual(outbound_calls(self.in_app, 120), 0)
+        self.assertEqual(ChannelRateLimiter().acquire(self.in_app, 0), 0)
+        self.assertEqual(
+            ChannelRateLimiter().limits(NotificationChannel(channel_type='slack', config={
+                'rate_limit': {'rate': '0.5', 'burst': 2}
+            })),
+            (0.5, 2)
+        )
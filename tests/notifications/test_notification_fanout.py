@@ -0,0 +1,85 @@
+from unittest.mock import patch
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from companies.models import Company
+from notifications.models import (
+    Notification,
+    NotificationChannel,
+    NotificationDeliveryStatus,
+    UserNotificationPreference
+)
+from notifications.services.fanout import iter_recipient_chunks
+from notifications.tasks import deliver_notification_chunk, fan_out_notification
+
+User = get_user_model()
+
+
+class NotificationFanOutTestCase(TestCase):
+    """
+    Test case for chunked company-wide notification fan-out.
+    """
+
+    def setUp(self):
+        self.company = Company.objects.create(name="Test Company")
+        other_company = Company.objects.create(name="Other Company")
+        self.users = [
+            User.objects.create_user(
+                username=f"member{i}",
+                email=f"member{i}@testcompany.com",
+                password="securepassword",
+                company=self.company,
+                role="analyst_company"
+            )
+            for i in range(5)
+        ]
+        User.objects.create_user(
+            username="outsider", email="outsider@othercompany.com", password="securepassword",
+            company=other_company, role="analyst_company"
+        )
+        # Opted out of email incidents; opted in to Mattermost incidents but critical-only
+        UserNotificationPreference.objects.create(user=self.users[0], email_incidents=False)
+        UserNotificationPreference.objects.create(user=self.users[1], mattermost_incidents=True)
+
+        self.notification = Notification.objects.create(
+            title="Company update", message="Maintenance tonight", category='incident',
+            priority='high', company=self.company, is_company_wide=True
+        )
+        self.email_channel = NotificationChannel.objects.create(name="Email", channel_type='email', company=self.company)
+        self.mattermost_channel = NotificationChannel.objects.create(
+            name="Mattermost", channel_type='mattermost', company=self.company,
+            config={'webhook_url': 'https://chat.example.com/hooks/1'}
+        )
+
+    def test_chunks_respect_preferences_in_one_query_each(self):
+        """Each page is a single query and opted-out users are never returned"""
+        with self.assertNumQueries(3):
+            chunks = list(iter_recipient_chunks(self.notification, self.email_channel, chunk_size=2))
+
+        self.assertEqual(chunks, [
+            [self.users[1].id, self.users[2].id],
+            [self.users[3].id, self.users[4].id],
+        ])
+
+        mattermost = [user_id for chunk in iter_recipient_chunks(self.notification, self.mattermost_channel)
+                      for user_id in chunk]
+        # users[0] keeps the Mattermost default (off), users[1] is critical-only
+        self.assertEqual(mattermost, [user.id for user in self.users[2:]])
+
+    @patch('notifications.tasks.deliver_notification_chunk.delay')
+    def test_fan_out_queues_one_task_per_chunk(self, mock_delay):
+        """Delivery rows are created in bulk and one task is queued per chunk"""
+        with self.settings(NOTIFICATION_FANOUT_CHUNK_SIZE=3):
+            result = fan_out_notification(self.notification.id, self.email_channel.id)
+
+        self.assertEqual(result, {'recipients': 4, 'chunks': 2})
+        self.assertEqual(mock_delay.call_count, 2)
+        self.assertEqual(
+            NotificationDeliveryStatus.objects.filter(notification=self.notification, status='pending').count(), 4
+        )
+
+        notification_id, channel_id, recipient_ids = mock_delay.call_args_list[1].args
+        with patch('notifications.services.delivery.NotificationDeliveryEngine._send_email',
+                   side_effect=lambda channel, notification, recipients: dict.fromkeys(r.id for r in recipients)):
+            summary = deliver_notification_chunk(notification_id, channel_id, recipient_ids)
+
+        self.assertEqual(summary, {'total': 1, 'delivered': 1, 'failed': 0})
@@ -0,0 +1,123 @@
+from types import SimpleNamespace
+from unittest.mock import patch
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from alerts.models import Alert
+from companies.models import Company
+from incidents.models import Incident
+from notifications.models import Notification, NotificationChannel, NotificationDeliveryStatus, NotificationRule
+from notifications.services.rules import get_rule_matcher
+from notifications.tasks import evaluate_notification_rules
+
+User = get_user_model()
+
+
+class NotificationRuleMatcherTestCase(TestCase):
+    """
+    Test case for the compiled, cached notification rule matcher.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.company = Company.objects.create(name="Test Company")
+        self.user = User.objects.create_user(
+            username="rulesadmin",
+            email="rulesadmin@testcompany.com",
+            password="securepassword",
+            company=self.company,
+            role="admin_company"
+        )
+        self.channel = NotificationChannel.objects.create(name="In-app", channel_type='in_app', company=self.company)
+        self.critical_rule = self._rule("Critical alerts", conditions={'severity': 'critical'})
+        self.any_rule = self._rule("Any alert")
+        self.mixed_rule = self._rule("Critical SIEM alerts", conditions={'severity': 'critical', 'source': 'SIEM'})
+
+    def _rule(self, name, event_type='alert_created', conditions=None):
+        rule = NotificationRule.objects.create(
+            name=name, event_type=event_type, conditions=conditions or {},
+            message_template="{{ alert.title }}", company=self.company, created_by=self.user
+        )
+        rule.channels.add(self.channel)
+        return rule
+
+    def test_match_uses_condition_index(self):
+        """Only rules whose conditions hold are returned, in rule order"""
+        matcher = get_rule_matcher(self.company.id)
+        critical = SimpleNamespace(severity='critical', source='EDR')
+        low = SimpleNamespace(severity='low')
+
+        self.assertEqual(
+            [rule.id for rule in matcher.match('alert_created', critical)],
+            [self.any_rule.id, self.critical_rule.id]
+        )
+        self.assertEqual([rule.id for rule in matcher.match('alert_created', low)], [self.any_rule.id])
+        self.assertEqual(matcher.match('incident_created', critical), [])
+        self.assertEqual(matcher.match('alert_created', critical)[0].channel_ids, (self.channel.id,))
+
+    def test_matcher_is_cached_until_rules_or_channels_change(self):
+        """The compiled rule set is reused and dropped when rules or channels change"""
+        get_rule_matcher(self.company.id)
+        with self.assertNumQueries(0):
+            get_rule_matcher(self.company.id)
+
+        self.critical_rule.is_active = False
+        self.critical_rule.save()
+        critical = SimpleNamespace(severity='critical', source='SIEM')
+        self.assertEqual(
+            [rule.id for rule in get_rule_matcher(self.company.id).match('alert_created', critical)],
+            [self.mixed_rule.id, self.any_rule.id]
+        )
+
+        self.channel.is_enabled = False
+        self.channel.save()
+        self.assertEqual(get_rule_matcher(self.company.id).match('alert_created', critical)[0].channel_ids, ())
+
+    @patch('notifications.signals.evaluate_notification_rules.delay')
+    def test_saves_only_queue_evaluation_on_commit(self, mock_delay):
+        """Alert saves evaluate nothing inline and queue one task after commit"""
+        get_rule_matcher(self.company.id)
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            alert = Alert.objects.create(
+                title="Alert", description="Alert", source="SIEM", severity='critical',
+                company=self.company, created_by=self.user
+            )
+            alert.title = "Updated"
+            alert.save()
+
+        self.assertEqual(len(callbacks), 1)
+        mock_delay.assert_called_once_with('alert', str(alert.pk), ['alert_created'])
+
+    def test_evaluation_creates_notifications(self):
+        """Matched rules create a notification for the company's admins with pending deliveries"""
+        alert = Alert.objects.create(
+            title="Alert", description="Alert", source="SIEM", severity='critical',
+            company=self.company, created_by=self.user
+        )
+
+        evaluate_notification_rules('alert', str(alert.pk), ['alert_created'])
+
+        notifications = Notification.objects.filter(related_object_type='alert', related_object_id=str(alert.pk))
+        self.assertEqual(notifications.count(), 3)
+        self.assertEqual(list(notifications[0].recipients.all()), [self.user])
+        self.assertEqual(NotificationDeliveryStatus.objects.filter(notification__in=notifications).count(), 3)
+
+    def test_incident_evaluation_creates_notification(self):
+        """Incident rules notify the company's admins and analysts"""
+        analyst = User.objects.create_user(
+            username="rulesanalyst",
+            email="rulesanalyst@testcompany.com",
+            password="securepassword",
+            company=self.company,
+            role="analyst_company"
+        )
+        self._rule("Incidents", event_type='incident_created')
+        incident = Incident.objects.create(
+            title="Incident", description="Incident", company=self.company, created_by=self.user
+        )
+
+        evaluate_notification_rules('incident', str(incident.pk), ['incident_created'])
+
+        notification = Notification.objects.get(related_object_type='incident', related_object_id=str(incident.pk))
+        self.assertEqual(set(notification.recipients.all()), {self.user, analyst})
@@ -0,0 +1,145 @@
+import json
+import os
+import tempfile
+from datetime import datetime, timezone as dt_timezone
+from io import StringIO
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from companies.models import Company
+from observables.models import Observable
+from observables.services.bulk_import import ObservableBulkImporter, iter_csv_records, iter_misp_records
+
+User = get_user_model()
+
+CSV_HEADER = 'value,type,tags,confidence,is_ioc\n'
+
+
+class ObservableBulkImportTest(TestCase):
+    """Test suite for the chunked observable import engine"""
+
+    def setUp(self):
+        self.company = Company.objects.create(name="Test Company")
+        self.user = User.objects.create_user(
+            username="analyst",
+            email="analyst@testcompany.com",
+            password="analystpassword",
+            role="analyst_company",
+            company=self.company,
+        )
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def _write(self, name, content):
+        path = os.path.join(self.tmpdir.name, name)
+        with open(path, 'w') as f:
+            f.write(content)
+        return path
+
+    def test_csv_import_creates_and_merges(self):
+        """New rows are inserted and existing ones merged in one upsert per chunk"""
+        Observable.objects.create(
+            type='ip', value='10.0.0.1', company=self.company, created_by=self.user,
+            tags=['existing'], confidence=90
+        )
+        path = self._write('iocs.csv', CSV_HEADER + (
+            '10.0.0.1,ip,scanner,60,true\n'
+            '10.0.0.2,ip,,40,false\n'
+            '10.0.0.2,ip,dup,80,false\n'
+            'evil.example.com,domain,,50,\n'
+            'bad,not-a-type,,50,\n'
+        ))
+
+        importer = ObservableBulkImporter(self.company, self.user, chunk_size=2)
+        totals = importer.run(iter_csv_records(path, 'import', 'other'))
+
+        self.assertEqual(totals['processed'], 5)
+        # The duplicate 10.0.0.2 row lands in the next chunk and updates the first
+        self.assertEqual(totals['created'], 2)
+        self.assertEqual(totals['updated'], 2)
+        self.assertEqual(totals['errors'], 1)
+        existing = Observable.objects.get(value='10.0.0.1')
+        self.assertEqual(existing.tags, ['existing', 'scanner', 'import'])
+        self.assertEqual(existing.confidence, 90)
+        self.assertTrue(existing.is_ioc)
+        duplicate = Observable.objects.get(value='10.0.0.2')
+        self.assertEqual(duplicate.confidence, 80)
+        self.assertEqual(duplicate.tags, ['import', 'dup'])
+
+    def test_ignore_mode_leaves_existing_rows(self):
+        """With on_conflict='ignore' existing observables are skipped"""
+        Observable.objects.create(type='ip', value='10.0.0.1', company=self.company, created_by=self.user)
+        path = self._write('iocs.csv', CSV_HEADER + '10.0.0.1,ip,scanner,60,true\n10.0.0.3,ip,,50,\n')
+
+        importer = ObservableBulkImporter(self.company, self.user, on_conflict='ignore')
+        totals = importer.run(iter_csv_records(path, 'import', 'other'))
+
+        self.assertEqual((totals['created'], totals['skipped']), (1, 1))
+        self.assertFalse(Observable.objects.get(value='10.0.0.1').is_ioc)
+
+    def test_resume_skips_checkpointed_records(self):
+        """A resumed import starts after the records a previous run committed"""
+        path = self._write('iocs.csv', CSV_HEADER + ''.join(f'10.0.1.{i},ip,,50,\n' for i in range(6)))
+        checkpoint = self._write('iocs.checkpoint', json.dumps({'records_done': 4, 'created': 4}))
+
+        importer = ObservableBulkImporter(self.company, self.user, chunk_size=2)
+        totals = importer.run(iter_csv_records(path, 'import', 'other'), checkpoint_path=checkpoint, resume=True)
+
+        self.assertEqual(sorted(Observable.objects.values_list('value', flat=True)), ['10.0.1.4', '10.0.1.5'])
+        self.assertEqual((totals['processed'], totals['created']), (6, 6))
+        self.assertFalse(os.path.exists(checkpoint))
+
+    def test_misp_command(self):
+        """The management command imports MISP attributes"""
+        path = self._write('misp.json', json.dumps({'response': [{'Event': {
+            'id': '7',
+            'info': 'Campaign',
+            'Tag': [{'name': 'tlp:red'}],
+            'Attribute': [
+                {'type': 'ip-dst', 'value': '10.0.0.9', 'category': 'Network activity', 'to_ids': True},
+                {'type': 'unknown-type', 'value': 'x'}
+            ]
+        }}]}))
+
+        out = StringIO()
+        call_command(
+            'import_observables', path, format='misp',
+            company=str(self.company.id), user=str(self.user.id), stdout=out
+        )
+
+        observable = Observable.objects.get(value='10.0.0.9')
+        self.assertEqual(observable.tlp, 3)
+        self.assertEqual(observable.source, 'MISP:7')
+        self.assertIn('Imported 1 new', out.getvalue())
+        self.assertEqual(len(list(iter_misp_records(path, 'import'))), 2)
+
+    def test_misp_attribute_timestamp_sets_first_seen(self):
+        """An attribute without first_seen is dated from its timestamp"""
+        path = self._write('misp.json', json.dumps({'response': [{'Event': {
+            'id': '8',
+            'info': 'Campaign',
+            'Attribute': [
+                {'type': 'domain', 'value': 'evil.example', 'timestamp': '1700000000'}
+            ]
+        }}]}))
+
+        [record] = iter_misp_records(path, 'import')
+
+        self.assertEqual(record['first_seen'], datetime(2023, 11, 14, 22, 13, 20, tzinfo=dt_timezone.utc))
+
+    def test_misp_single_event_exports(self):
+        """Single-event exports are read with or without the response wrapper"""
+        event = {'Event': {
+            'id': '9',
+            'info': 'Campaign',
+            'Attribute': [
+                {'type': 'ip-dst', 'value': '10.0.0.10'},
+                {'type': 'domain', 'value': 'evil.example'}
+            ]
+        }}
+
+        for name, payload in (('wrapped.json', {'response': event}), ('bare.json', event)):
+            path = self._write(name, json.dumps(payload))
+            records = list(iter_misp_records(path, 'import'))
+            self.assertEqual([record['value'] for record in records], ['10.0.0.10', 'evil.example'])
+            self.assertEqual(records[0]['source'], 'MISP:9')
@@ -0,0 +1,95 @@
+from unittest.mock import patch, MagicMock
+from django.core.cache import cache
+from django.test import TestCase
+from companies.models import Company
+from sentinelvision.feeds.blocklist_de_feed import BlocklistDeFeed
+from sentinelvision.models import EnrichedIOC, IOCFeedMatch
+from sentinelvision.models.EnrichedIOC import EnrichmentStatusEnum
+from sentinelvision.services.batch_enrichment import enrich_iocs, get_feed_index_map
+
+
+class BatchEnrichmentTest(TestCase):
+    """Test suite for vectorised IOC enrichment"""
+
+    def setUp(self):
+        cache.clear()
+        self.company = Company.objects.create(name="Test Company")
+        self.feed = BlocklistDeFeed.objects.create(
+            company=self.company,
+            name='blocklist.de',
+            feed_url='https://example.com/all.txt'
+        )
+        self.iocs = [
+            EnrichedIOC.objects.create(company=self.company, ioc_type='ip', value=value)
+            for value in ('10.0.0.1', '10.0.0.2', '10.0.0.3')
+        ]
+        self.es_client = MagicMock()
+        self.es_client.bulk.return_value = {'errors': False, 'items': []}
+        self.es_client.mget.return_value = {'docs': []}
+
+    def _hit(self, value, confidence):
+        return {
+            '_index': self.feed.es_index_name,
+            '_source': {
+                'value': value,
+                'confidence': confidence,
+                'tags': ['blocklist.de'],
+                'tenant_id': str(self.company.id)
+            }
+        }
+
+    def test_feed_index_map_resolves_tenant_index(self):
+        """Per-tenant feed indices map back to the company's feed module"""
+        index_map = get_feed_index_map()
+
+        self.assertEqual(
+            index_map[(self.feed.es_index_name, str(self.company.id))],
+            (self.feed.pk, 'blocklist_de')
+        )
+
+    @patch('sentinelvision.services.batch_enrichment.invalidate_feed_index_map')
+    def test_feed_index_map_invalidated_by_feed_changes_only(self, mock_invalidate):
+        """Saving another model keeps the cached map; saving or deleting a feed drops it"""
+        Company.objects.create(name="Other Company")
+        self.iocs[0].save()
+        mock_invalidate.assert_not_called()
+
+        self.feed.save()
+        self.feed.delete()
+        self.assertEqual(mock_invalidate.call_count, 2)
+
+    @patch('sentinelvision.services.batch_enrichment.scan')
+    def test_enrich_iocs_in_one_query(self, mock_scan):
+        """All IOCs of a type are looked up and written in bulk"""
+        mock_scan.return_value = iter([self._hit('10.0.0.1', 60), self._hit('10.0.0.2', 80)])
+
+        result = enrich_iocs(self.company, self.iocs, self.es_client)
+
+        self.assertEqual(mock_scan.call_count, 1)
+        terms = mock_scan.call_args.kwargs['query']['query']['bool']['filter'][0]['terms']['value']
+        self.assertCountEqual(terms, ['10.0.0.1', '10.0.0.2', '10.0.0.3'])
+
+        statuses = result['statuses']
+        self.assertEqual(statuses[self.iocs[0].pk], 'enriched')
+        self.assertEqual(statuses[self.iocs[2].pk], 'not_found')
+        self.assertEqual(IOCFeedMatch.objects.filter(feed=self.feed).count(), 2)
+        self.assertEqual(self.es_client.bulk.call_count, 1)
+
+        enriched = EnrichedIOC.objects.get(pk=self.iocs[1].pk)
+        self.assertEqual(enriched.status, EnrichmentStatusEnum.ENRICHED)
+        self.assertEqual(enriched.confidence, 80.0)
+        self.assertEqual(EnrichedIOC.objects.get(pk=self.iocs[2].pk).status, EnrichmentStatusEnum.NOT_FOUND)
+
+    @patch('sentinelvision.services.batch_enrichment.scan')
+    def test_reenrichment_updates_existing_matches(self, mock_scan):
+        """Running again updates match rows instead of duplicating them"""
+        mock_scan.return_value = iter([self._hit('10.0.0.1', 60)])
+        enrich_iocs(self.company, self.iocs, self.es_client)
+
+        mock_scan.return_value = iter([self._hit('10.0.0.1', 90)])
+        result = enrich_iocs(self.company, self.iocs, self.es_client)
+
+        self.assertEqual(result['stats']['matches_created'], 0)
+        self.assertEqual(result['stats']['matches_updated'], 1)
+        match = IOCFeedMatch.objects.get(ioc=self.iocs[0])
+        self.assertEqual(match.feed_confidence, 90)
@@ -0,0 +1,57 @@
+import json
+from unittest.mock import MagicMock
+from django.test import TestCase
+from sentinelvision.services.bulk_indexer import BulkIndexer
+
+
+class BulkIndexerTest(TestCase):
+    """Test suite for the concurrent Elasticsearch bulk writer"""
+
+    def setUp(self):
+        self.es_client = MagicMock()
+        self.es_client.bulk.return_value = {'errors': False, 'items': []}
+
+    def test_chunks_by_document_count(self):
+        """Actions are split into requests of at most chunk_size documents"""
+        with BulkIndexer(self.es_client, chunk_size=3, max_in_flight=2) as indexer:
+            for i in range(7):
+                indexer.index('iocs', str(i), {'value': i})
+
+        self.assertEqual(self.es_client.bulk.call_count, 3)
+        self.assertEqual(indexer.docs_indexed, 7)
+        self.es_client.indices.refresh.assert_called_once_with(index='iocs')
+
+    def test_chunks_by_bytes(self):
+        """A request is flushed before it would exceed max_chunk_bytes"""
+        indexer = BulkIndexer(self.es_client, chunk_size=100, max_chunk_bytes=120, max_in_flight=1)
+        for i in range(4):
+            indexer.index('iocs', str(i), {'value': 'x' * 40})
+        summary = indexer.close(refresh=False)
+
+        self.assertEqual(summary['batches_sent'], 4)
+        self.es_client.indices.refresh.assert_not_called()
+
+    def test_reports_item_errors_and_retries_rejections(self):
+        """429 items are retried, other failures are reported per item"""
+        self.es_client.bulk.side_effect = [
+            {'errors': True, 'items': [
+                {'index': {'_index': 'iocs', '_id': '0', 'status': 201}},
+                {'index': {'_index': 'iocs', '_id': '1', 'status': 429}},
+                {'index': {'_index': 'iocs', '_id': '2', 'status': 400,
+                           'error': {'type': 'mapper_parsing_exception'}}},
+            ]},
+            {'errors': False, 'items': [{'index': {'_index': 'iocs', '_id': '1', 'status': 201}}]},
+        ]
+
+        indexer = BulkIndexer(self.es_client, max_in_flight=1, initial_backoff=0)
+        for i in range(3):
+            indexer.index('iocs', str(i), {'value': i})
+        summary = indexer.close()
+
+        self.assertEqual(summary['docs_indexed'], 2)
+        self.assertEqual(summary['docs_failed'], 1)
+        self.assertEqual(summary['errors'][0]['_id'], '2')
+        self.assertEqual(summary['errors'][0]['status'], 400)
+
+        retried = [json.loads(line) for line in self.es_client.bulk.call_args_list[1].kwargs['operations']]
+        self.assertEqual(retried[0]['index']['_id'], '1')
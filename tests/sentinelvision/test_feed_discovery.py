@@ -0,0 +1,24 @@
+from unittest.mock import patch
+from django.test import SimpleTestCase
+from sentinelvision import feeds
+from sentinelvision.feeds import get_feed_class, get_feed_task
+from sentinelvision.feeds.blocklist_de_feed import BlocklistDeFeed
+
+
+class FeedDiscoveryTest(SimpleTestCase):
+    """Test suite for manifest-based lazy feed loading"""
+
+    def test_feed_class_resolved_from_manifest(self):
+        """Feeds are looked up by ID without scanning the package"""
+        self.assertIs(get_feed_class('blocklist_de'), BlocklistDeFeed)
+        self.assertIsNone(get_feed_class('does_not_exist'))
+        self.assertIsNone(get_feed_task('does_not_exist'))
+
+    def test_feed_task_created_on_first_use(self):
+        """The Celery task of a feed is only built when first requested"""
+        with patch.dict(feeds.TASK_REGISTRY, clear=True):
+            task = get_feed_task('blocklist_de')
+
+            self.assertEqual(task.name, 'sentinelvision.feeds.blocklist_de.update')
+            self.assertEqual(list(feeds.TASK_REGISTRY), ['blocklist_de'])
+            self.assertIs(get_feed_task('blocklist_de'), task)
@@ -0,0 +1,178 @@
+import json
+from unittest.mock import patch, MagicMock
+from django.test import TestCase
+from companies.models import Company
+from sentinelvision.feeds.blocklist_de_feed import BlocklistDeFeed
+from sentinelvision.feeds.ssl_blacklist_feed import SSLBlacklistFeed
+from sentinelvision.services.feed_ingestion import (
+    FeedIngestionStats, document_hash, iter_response_lines, ingest_feed, sync_feed
+)
+
+
+class FakeStreamResponse:
+    """Mock for a streamed requests.Response"""
+
+    def __init__(self, chunks, encoding='utf-8', status_code=200, headers=None):
+        self.chunks = chunks
+        self.encoding = encoding
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def iter_content(self, chunk_size=None):
+        return iter(self.chunks)
+
+    def raise_for_status(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+
+class FeedIngestionTest(TestCase):
+    """Test suite for the streaming feed ingestion pipeline"""
+
+    def setUp(self):
+        self.company = Company.objects.create(name="Test Company")
+        self.es_client = MagicMock()
+        self.es_client.bulk.return_value = {'errors': False, 'items': []}
+
+    def test_iter_response_lines_across_chunks(self):
+        """Lines split across network chunks are reassembled"""
+        stats = FeedIngestionStats()
+        response = FakeStreamResponse([b'1.1.1.1\r\n2.2.', b'2.2\n', b'', b'3.3.3.3'])
+
+        lines = list(iter_response_lines(response, stats))
+
+        self.assertEqual(lines, ['1.1.1.1', '2.2.2.2', '3.3.3.3'])
+        self.assertEqual(stats.lines_read, 3)
+        self.assertEqual(stats.bytes_read, 24)
+
+    @patch('sentinelvision.services.feed_ingestion.requests.get')
+    def test_ingest_blocklist_feed_in_batches(self, mock_get):
+        """Rows are parsed lazily and flushed in bounded batches"""
+        payload = b''.join(f'10.0.0.{i}\n'.encode() for i in range(5)) + b'\n'
+        mock_get.return_value = FakeStreamResponse([payload[:7], payload[7:]])
+        feed = BlocklistDeFeed(company=self.company, feed_url='https://example.com/all.txt')
+
+        stats = ingest_feed(feed, self.es_client, 'test-index', batch_size=2)
+
+        self.assertEqual(stats.rows_parsed, 5)
+        self.assertEqual(stats.docs_flushed, 5)
+        self.assertEqual(stats.batches_flushed, 3)
+        self.assertEqual(self.es_client.bulk.call_count, 3)
+        self.assertTrue(mock_get.call_args.kwargs['stream'])
+
+        # No per-batch refresh, one refresh at the end
+        self.assertNotIn('refresh', self.es_client.bulk.call_args.kwargs)
+        self.es_client.indices.refresh.assert_called_once_with(index='test-index')
+
+        first_batch = [json.loads(line) for line in self.es_client.bulk.call_args_list[0].kwargs['operations']]
+        self.assertEqual(first_batch[0], {"index": {"_index": "test-index", "_id": f"10.0.0.0-{self.company.id}"}})
+        self.assertEqual(first_batch[1]['value'], '10.0.0.0')
+
+    def test_ssl_blacklist_parser_skips_comments(self):
+        """The SSL blacklist parser ignores comment and blank lines"""
+        feed = SSLBlacklistFeed(company=self.company)
+        lines = iter([
+            '# abuse.ch SSLBL',
+            '2024-01-01 00:00:00,abcdef0123456789,Dridex C&C',
+            '',
+            '2024-01-02 00:00:00,,Missing hash',
+        ])
+
+        docs = list(feed.parse_feed_lines(lines))
+
+        self.assertEqual(len(docs), 1)
+        doc_id, doc = docs[0]
+        self.assertEqual(doc_id, f"abcdef0123456789-{self.company.id}")
+        self.assertEqual(doc['listing_reason'], 'Dridex C&C')
+        self.assertIn('dridex_c&c', doc['tags'])
+
+
+class FeedDeltaSyncTest(TestCase):
+    """Test suite for incremental feed sync"""
+
+    def setUp(self):
+        self.company = Company.objects.create(name="Test Company")
+        self.feed = BlocklistDeFeed(company=self.company, feed_url='https://example.com/all.txt')
+        self.es_client = MagicMock()
+        self.es_client.bulk.return_value = {'errors': False, 'items': []}
+
+    def _hit(self, line, content_hash=None):
+        """Scan hit for an indexed document of the feed"""
+        [(doc_id, document)] = self.feed.parse_feed_lines(iter([line]))
+        return {'_id': doc_id, '_source': {'content_hash': content_hash or document_hash(document)}}
+
+    @patch('sentinelvision.services.feed_ingestion.requests.get')
+    def test_not_modified_skips_parsing(self, mock_get):
+        """A 304 response ends the sync without touching Elasticsearch"""
+        mock_get.return_value = FakeStreamResponse([], status_code=304)
+        state = {'etag': '"abc"', 'last_modified': 'Mon, 01 Jan 2024 00:00:00 GMT', 'content_digest': 'x'}
+
+        stats = sync_feed(self.feed, self.es_client, 'test-index', sync_state=state)
+
+        self.assertTrue(stats.not_modified)
+        self.assertEqual(stats.sync_state, state)
+        self.assertEqual(mock_get.call_args.kwargs['headers']['If-None-Match'], '"abc"')
+        self.es_client.bulk.assert_not_called()
+
+    @patch('sentinelvision.services.feed_ingestion.scan')
+    @patch('sentinelvision.services.feed_ingestion.requests.get')
+    def test_unchanged_payload_skips_writes(self, mock_get, mock_scan):
+        """An identical payload writes nothing"""
+        mock_get.return_value = FakeStreamResponse([b'10.0.0.1\n'], headers={'ETag': '"v2"'})
+        mock_scan.return_value = iter([])
+        first = sync_feed(self.feed, self.es_client, 'test-index')
+        indexed = [json.loads(line) for line in self.es_client.bulk.call_args.kwargs['operations']]
+
+        mock_get.return_value = FakeStreamResponse([b'10.0.0.1\n'])
+        mock_scan.return_value = iter([{'_id': indexed[0]['index']['_id'], '_source': {
+            'content_hash': indexed[1]['content_hash']
+        }}])
+        self.es_client.reset_mock()
+        stats = sync_feed(self.feed, self.es_client, 'test-index', sync_state=first.sync_state)
+
+        self.assertEqual(first.sync_state['etag'], '"v2"')
+        self.assertEqual(first.docs_added, 1)
+        self.assertTrue(stats.content_unchanged)
+        self.assertEqual((stats.docs_added, stats.docs_updated, stats.docs_expired), (0, 0, 0))
+        self.es_client.bulk.assert_not_called()
+
+    @patch('sentinelvision.services.feed_ingestion.scan')
+    @patch('sentinelvision.services.feed_ingestion.requests.get')
+    def test_changed_payload_writes_only_the_diff(self, mock_get, mock_scan):
+        """Only new indicators are indexed and removed ones are expired"""
+        company_id = self.company.id
+        mock_get.return_value = FakeStreamResponse([b'10.0.0.1\n10.0.0.3\n'])
+        mock_scan.return_value = iter([self._hit('10.0.0.1'), self._hit('10.0.0.2')])
+
+        stats = sync_feed(self.feed, self.es_client, 'test-index', sync_state={'content_digest': 'old'})
+
+        self.assertEqual(stats.docs_added, 1)
+        self.assertEqual(stats.docs_expired, 1)
+        operations = [json.loads(line) for line in self.es_client.bulk.call_args.kwargs['operations']]
+        self.assertEqual(operations[0], {"index": {"_index": "test-index", "_id": f"10.0.0.3-{company_id}"}})
+        self.assertEqual(operations[2], {"update": {"_index": "test-index", "_id": f"10.0.0.2-{company_id}"}})
+        self.assertTrue(operations[3]['doc']['is_expired'])
+        self.assertEqual(
+            mock_scan.call_args.kwargs['query']['query']['bool']['filter'],
+            [{"term": {"tenant_id": str(company_id)}}]
+        )
+
+    @patch('sentinelvision.services.feed_ingestion.scan')
+    @patch('sentinelvision.services.feed_ingestion.requests.get')
+    def test_changed_record_is_reindexed(self, mock_get, mock_scan):
+        """An indicator whose content changed under the same ID is indexed again"""
+        mock_get.return_value = FakeStreamResponse([b'10.0.0.1\n10.0.0.2\n'])
+        mock_scan.return_value = iter([self._hit('10.0.0.1', content_hash='stale'), self._hit('10.0.0.2')])
+
+        stats = sync_feed(self.feed, self.es_client, 'test-index', sync_state={'content_digest': 'old'})
+
+        self.assertEqual((stats.docs_added, stats.docs_updated, stats.docs_expired), (0, 1, 0))
+        operations = [json.loads(line) for line in self.es_client.bulk.call_args.kwargs['operations']]
+        self.assertEqual(len(operations), 2)
+        self.assertEqual(operations[0], {"index": {"_index": "test-index", "_id": f"10.0.0.1-{self.company.id}"}})
+        self.assertEqual(operations[1]['content_hash'], self._hit('10.0.0.1')['_source']['content_hash'])
@@ -2,7 +2,8 @@ from django.test import TestCase
 from django.utils import timezone
 from django.db import transaction, IntegrityError
 from datetime import timedelta
-from sentinelvision.models import FeedRegistry
+from sentinelvision.feeds import ensure_feeds_in_database
+from sentinelvision.models import FeedModule, FeedRegistry
 from companies.models import Company
 
 
@@ -172,4 +173,23 @@ class FeedRegistryTest(TestCase):
         feed.refresh_from_db()
         
         # Check that next_sync is now set
-        self.assertIsNotNone(feed.next_sync) 
\ No newline at end of file
+        self.assertIsNotNone(feed.next_sync) 
+
+    def test_global_feed_modules_get_no_registry(self):
+        """Feed modules without a company create no registry entry"""
+        FeedModule.objects.create(name="Global Feed", module_type='feed', feed_url="https://example.com/global.csv")
+        FeedModule.objects.create(
+            name="Tenant Feed", module_type='feed', feed_url="https://example.com/tenant.csv", company=self.company
+        )
+
+        self.assertEqual(list(FeedRegistry.objects.values_list('name', 'company')), [("Tenant Feed", self.company.id)])
+
+    def test_feed_registration_is_repeatable(self):
+        """Registering the known feeds on every migrate raises no errors"""
+        Company.objects.all().delete()
+
+        with self.assertNoLogs('sentinelvision.feeds', level='ERROR'):
+            ensure_feeds_in_database()
+            ensure_feeds_in_database()
+
+        self.assertFalse(FeedRegistry.objects.exists())
@@ -0,0 +1,71 @@
+from unittest.mock import patch, MagicMock
+from django.test import TestCase, override_settings
+from companies.models import Company
+from sentinelvision.feeds.blocklist_de_feed import BlocklistDeFeed
+from sentinelvision.services import ioc_filter
+from sentinelvision.services.ioc_filter import BloomFilter, batch_ioc_filter_builds, definitely_absent
+
+
+class BloomFilterTest(TestCase):
+    """Test suite for the IOC pre-filter"""
+
+    def test_no_false_negatives(self):
+        """Every added value is reported as possibly present"""
+        bloom = BloomFilter.for_capacity(1000, 0.01)
+        values = [f'10.0.{i // 256}.{i % 256}' for i in range(1000)]
+        for value in values:
+            bloom.add(value)
+
+        self.assertTrue(all(value in bloom for value in values))
+
+    def test_false_positive_rate_close_to_target(self):
+        """Absent values pass the filter at roughly the configured rate"""
+        bloom = BloomFilter.for_capacity(2000, 0.01)
+        for i in range(2000):
+            bloom.add(f'present-{i}')
+
+        false_positives = sum(f'absent-{i}' in bloom for i in range(10000))
+
+        self.assertLess(false_positives / 10000, 0.03)
+        self.assertAlmostEqual(bloom.estimated_error_rate, 0.01, delta=0.005)
+
+    def test_serialisation_round_trip(self):
+        """A filter loaded from bytes answers like the original"""
+        bloom = BloomFilter.for_capacity(100, 0.001)
+        bloom.add('evil.example.com')
+
+        loaded = BloomFilter.from_bytes(bloom.to_bytes())
+
+        self.assertEqual(loaded.count, 1)
+        self.assertIn('evil.example.com', loaded)
+        self.assertEqual(loaded.size_bits, bloom.size_bits)
+
+    @patch.object(ioc_filter, 'get_ioc_filter')
+    def test_definitely_absent_requires_every_filter(self, mock_get_filter):
+        """A feed without a filter always forces an Elasticsearch lookup"""
+        bloom = BloomFilter.for_capacity(100, 0.001)
+        mock_get_filter.side_effect = lambda feed_id: bloom if feed_id == 'blocklist_de' else None
+
+        self.assertTrue(definitely_absent('10.0.0.1', ['blocklist_de']))
+        self.assertFalse(definitely_absent('10.0.0.1', ['blocklist_de', 'ssl_blacklist']))
+        self.assertFalse(definitely_absent('10.0.0.1', []))
+
+    @override_settings(SENTINELVISION_IOC_FILTER_ENABLED=True)
+    @patch.object(ioc_filter, 'build_ioc_filter')
+    def test_batched_builds_scan_once_per_feed(self, mock_build):
+        """Per-company syncs inside a batch build the feed's filter once, after the last one"""
+        es_client = MagicMock()
+        feeds = [
+            BlocklistDeFeed(company=Company.objects.create(name=f"Company {i}"), es_index_name=index_name)
+            for i, index_name in enumerate(['blocklist_de', 'blocklist_de', 'blocklist_de_eu'])
+        ]
+
+        with batch_ioc_filter_builds():
+            for feed in feeds:
+                feed.refresh_ioc_filter(es_client, feed.get_index_name())
+            mock_build.assert_not_called()
+
+        mock_build.assert_called_once_with('blocklist_de', es_client, ['blocklist_de', 'blocklist_de_eu'])
+
+        feeds[0].refresh_ioc_filter(es_client, 'blocklist_de')
+        self.assertEqual(mock_build.call_count, 2)
@@ -0,0 +1,105 @@
+from unittest.mock import patch, MagicMock
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from companies.models import Company
+from observables.models import Observable
+from sentinelvision.feeds.blocklist_de_feed import BlocklistDeFeed
+from sentinelvision.feeds.ssl_blacklist_feed import SSLBlacklistFeed
+from sentinelvision.services import ioc_filter
+from sentinelvision.services.feed_overlay import OVERLAY_INDEX
+from sentinelvision.services.ioc_lookup import FeedLookupService
+
+User = get_user_model()
+
+SHA1 = 'a' * 40
+
+
+@override_settings(SENTINELVISION_SHARED_FEED_INDEX=True)
+@patch.object(ioc_filter, 'get_ioc_filter', return_value=None)
+class FeedLookupServiceTest(TestCase):
+    """Test suite for looking up many observables against every feed at once"""
+
+    def setUp(self):
+        self.company = Company.objects.create(name="Test Company")
+        self.user = User.objects.create_user(
+            username="analyst",
+            email="analyst@company.com",
+            password="password123",
+            company=self.company
+        )
+        BlocklistDeFeed.objects.create(name='blocklist.de', feed_url='https://example.com/all.txt')
+        SSLBlacklistFeed.objects.create(name='SSL Blacklist', feed_url='https://example.com/ssl.csv')
+
+        self.es_client = MagicMock()
+        self.es_client.indices.exists.return_value = True
+        self.es_client.bulk.return_value = {'errors': False, 'items': []}
+        self.service = FeedLookupService(
+            self.company.id,
+            feed_classes=[BlocklistDeFeed, SSLBlacklistFeed],
+            es_client=self.es_client
+        )
+
+    def _respond(self, found):
+        """Answer every requested feed document found in ``found``, overlays as missing."""
+        def mget(docs):
+            return {'docs': [
+                {'found': True, '_source': found[ref['_id']]}
+                if ref['_index'] != OVERLAY_INDEX and ref['_id'] in found
+                else {'found': False}
+                for ref in docs
+            ]}
+        self.es_client.mget.side_effect = mget
+
+    def test_lookup_uses_one_request_for_every_feed(self, mock_get_filter):
+        """Feed and overlay documents of all pairs are fetched with a single mget"""
+        self._respond({'10.0.0.1': {'value': '10.0.0.1', 'type': 'ipv4', 'threat_type': 'ssh'}})
+
+        results = self.service.lookup([('ip', '10.0.0.1'), ('ip', '10.0.0.2'), ('hash-sha1', SHA1)])
+
+        self.assertEqual(self.es_client.mget.call_count, 1)
+        requested = self.es_client.mget.call_args.kwargs['docs']
+        # Feed document plus overlay per pair, IP values only against IP feeds
+        self.assertEqual(len(requested), 6)
+        self.assertEqual(list(results), [('ip', '10.0.0.1')])
+        hit = results[('ip', '10.0.0.1')][0]
+        self.assertEqual(hit['feed_id'], 'blocklist_de')
+        self.assertEqual(hit['threat_type'], 'ssh')
+        self.assertEqual(hit['confidence'], 75)
+        self.es_client.bulk.assert_not_called()
+
+    def test_filtered_misses_skip_elasticsearch(self, mock_get_filter):
+        """Values every feed's pre-filter rules out are never requested"""
+        mock_get_filter.return_value = ioc_filter.BloomFilter.for_capacity(100, 0.001)
+
+        self.assertEqual(self.service.lookup([('ip', '10.0.0.1'), ('hash-sha1', SHA1)]), {})
+        self.es_client.mget.assert_not_called()
+
+    def test_confirm_writes_in_one_bulk_request(self, mock_get_filter):
+        """Hits are confirmed with one bulk call and existing observables are flagged"""
+        self._respond({
+            '10.0.0.1': {'value': '10.0.0.1', 'type': 'ipv4'},
+            '10.0.0.2': {'value': '10.0.0.2', 'type': 'ipv4'},
+        })
+        observable = Observable.objects.create(
+            type='ip', value='10.0.0.1', company=self.company, created_by=self.user
+        )
+
+        self.service.lookup([('ip', '10.0.0.1'), ('ip', '10.0.0.2')], confirm=True, created_by=self.user)
+
+        self.assertEqual(self.es_client.bulk.call_count, 1)
+        observable.refresh_from_db()
+        self.assertTrue(observable.is_ioc)
+        created = Observable.objects.get(value='10.0.0.2', company=self.company)
+        self.assertTrue(created.is_ioc)
+        self.assertEqual(created.source, 'Blocklist.de')
+
+    def test_check_ioc_status_delegates_to_service(self, mock_get_filter):
+        """The single-value helper returns the feed's hit"""
+        self._respond({SHA1: {'value': SHA1, 'type': 'hash-sha1', 'listing_reason': 'C2'}})
+
+        with patch.object(SSLBlacklistFeed, 'get_es_client', return_value=self.es_client):
+            result = SSLBlacklistFeed.check_ioc_status(SHA1, self.company.id)
+
+        self.assertEqual(result['listing_reason'], 'C2')
+        self.assertEqual(result['feed_id'], 'ssl_blacklist')
+        self.assertTrue(result['is_ioc'])
@@ -0,0 +1,72 @@
+from unittest.mock import patch, MagicMock
+from django.test import TestCase, override_settings
+from companies.models import Company
+from sentinelvision.feeds import run_feed_update
+from sentinelvision.feeds.blocklist_de_feed import BlocklistDeFeed
+from sentinelvision.services.feed_overlay import OVERLAY_INDEX, overlay_doc_id
+
+
+@override_settings(SENTINELVISION_SHARED_FEED_INDEX=True)
+class SharedFeedIndexTest(TestCase):
+    """Test suite for global feeds stored in a shared index with a tenant overlay"""
+
+    def setUp(self):
+        self.company = Company.objects.create(name="Test Company")
+        self.feed = BlocklistDeFeed(company=self.company, feed_url='https://example.com/all.txt')
+        self.es_client = MagicMock()
+
+    def test_shared_documents_carry_no_tenant_data(self):
+        """Shared feed documents are keyed by value only"""
+        docs = list(self.feed.parse_feed_lines(['10.0.0.1']))
+
+        self.assertEqual(self.feed.get_index_name(), 'feed_blocklist_de')
+        self.assertEqual(docs[0][0], '10.0.0.1')
+        self.assertNotIn('tenant_id', docs[0][1])
+
+    @override_settings(SENTINELVISION_SHARED_FEED_INDEX=False)
+    def test_legacy_documents_are_per_tenant(self):
+        """Without the shared index each tenant keeps its own copy"""
+        doc_id, doc = next(self.feed.parse_feed_lines(['10.0.0.1']))
+
+        self.assertEqual(doc_id, f'10.0.0.1-{self.company.id}')
+        self.assertEqual(doc['tenant_id'], str(self.company.id))
+
+    def test_merge_ioc_docs_reads_overlay(self):
+        """Tenant confirmation state is read from the overlay"""
+        refs = self.feed.get_ioc_doc_refs('10.0.0.1', self.company.id)
+        doc = self.feed.merge_ioc_docs([
+            {'found': True, '_source': {'value': '10.0.0.1', 'type': 'ip'}},
+            {'found': True, '_source': {'is_confirmed_ioc': True, 'sightings_count': 2}}
+        ], self.company.id)
+
+        self.assertTrue(doc['is_confirmed_ioc'])
+        self.assertEqual(doc['sightings_count'], 2)
+        self.assertEqual(doc['tenant_id'], str(self.company.id))
+        self.assertEqual(refs[1], {
+            '_index': OVERLAY_INDEX,
+            '_id': overlay_doc_id('blocklist_de', self.company.id, '10.0.0.1')
+        })
+
+    def test_hit_actions_update_overlay_only(self):
+        """Confirming a shared IOC never rewrites the shared document"""
+        actions = self.feed.get_ioc_hit_actions('10.0.0.1', self.company.id, {'is_confirmed_ioc': False})
+
+        self.assertEqual(len(actions), 1)
+        self.assertEqual(actions[0][0]['update']['_index'], OVERLAY_INDEX)
+
+    @patch.object(BlocklistDeFeed, 'update_feed')
+    def test_run_feed_update_fetches_once(self, mock_update):
+        """A global feed is updated once however many companies use it"""
+        mock_update.return_value = {'status': 'success', 'processed_count': 3}
+        other = BlocklistDeFeed(
+            company=Company.objects.create(name="Other Company"),
+            feed_url='https://example.com/all.txt'
+        )
+        shared_results = {}
+
+        first = run_feed_update(self.feed, shared_results)
+        second = run_feed_update(other, shared_results)
+
+        self.assertEqual(mock_update.call_count, 1)
+        self.assertEqual(first, second)
+        self.assertTrue(BlocklistDeFeed.objects.filter(company__isnull=True).exists())